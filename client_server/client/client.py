@@ -4,12 +4,14 @@ import socket
 import json
 import threading
 import time
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
 import platform
 import datetime
 import uuid
 import random
+import argparse
+import signal
+import logging
+from logging.handlers import RotatingFileHandler
 
 # Tambahkan path untuk mengimpor dari direktori common
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,13 +20,46 @@ sys.path.append(parent_dir)
 
 from common.network import NetworkMessage, send_message, receive_message, DEFAULT_PORT
 from common.db_utils import FirebirdConnector
+from common.result_spool import ResultSpool, SpooledResult, count_rows, DEFAULT_THRESHOLD_ROWS, DEFAULT_BUDGET_BYTES
+from common.remote_cursor import CursorRegistry, CursorError, DEFAULT_PAGE_SIZE, DEFAULT_CURSOR_TTL
+from common.session import ReconnectManager, extract_table_names, schema_hash
+from common.delta import DeltaTracker, MODE_DELTA
+from common.standing_query import StandingQuery, StandingQueryWatcher
+from common.query_history import QueryHistory, format_size, STATUS_RUNNING, STATUS_SUCCESS, STATUS_ERROR
+from common.query_plan import plan_result
 
 # Path konfigurasi
 CONFIG_FILE = os.path.join(current_dir, "client_config.json")
+# Nama direktori spool untuk hasil query besar (di samping file konfigurasi)
+SPOOL_DIR_NAME = "spool"
+# File history query persisten (di samping file konfigurasi)
+HISTORY_FILE = os.path.join("history", "history.sqlite")
+# Jumlah maksimum hasil yang disimpan untuk dikirim ulang setelah reconnect
+MAX_OFFLINE_RESULTS = 50
+# Log bergilir untuk mode headless
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# Jumlah baris maksimum per result set yang dirender ke panel hasil
+DISPLAY_ROW_LIMIT = 1000
+
+# tkinter baru diimpor saat UI dibuat, mode headless tidak memuatnya sama sekali
+tk = ttk = scrolledtext = messagebox = filedialog = None
+
+def import_tkinter():
+    """Impor modul tkinter yang dipakai UI client"""
+    global tk, ttk, scrolledtext, messagebox, filedialog
+    import tkinter
+    from tkinter import ttk as tk_ttk, scrolledtext as tk_scrolledtext
+    from tkinter import messagebox as tk_messagebox, filedialog as tk_filedialog
+    tk, ttk, scrolledtext = tkinter, tk_ttk, tk_scrolledtext
+    messagebox, filedialog = tk_messagebox, tk_filedialog
 
 class ClientApp:
     """Aplikasi client yang terhubung ke server dan menjalankan query di database lokal"""
-    def __init__(self):
+    def __init__(self, headless=False, config_file=CONFIG_FILE, server_address=None, server_port=None):
+        self.headless = headless
+        self.config_file = config_file
+        self.logger = None
         self.socket = None
         self.server_address = None
         self.server_port = DEFAULT_PORT
@@ -35,18 +70,74 @@ class ClientApp:
         self.db_connector = None
         self.receive_thread = None
         self.last_result = None
-        self.query_history = []
+        self.query_history = None  # QueryHistory persisten, key request_id dari server
+        
+        # Parameter spool hasil query besar
+        self.spool_threshold_rows = DEFAULT_THRESHOLD_ROWS
+        self.spool_budget_mb = DEFAULT_BUDGET_BYTES // (1024 * 1024)
+        self.result_spool = None
+        
+        # Remote cursor untuk paginasi hasil dari server
+        self.cursor_ttl = DEFAULT_CURSOR_TTL
         
         # Parameter untuk auto-reconnect
         self.auto_reconnect = False
-        self.reconnect_interval = 5  # detik
-        self.reconnect_thread = None
+        self.reconnect_interval = 5  # detik, delay awal backoff
+        self.reconnect_max_interval = 60  # detik, batas atas backoff
+        self.reconnector = None
         self.is_connecting = False
         
+        # Session di server (untuk melanjutkan session setelah reconnect)
+        self.session_token = None
+        self.schema_hash = None
+        self.offline_results = []  # (msg_type, data) yang gagal dikirim saat offline
+        self.offline_lock = threading.Lock()
+        
         # Load konfigurasi jika ada
         self.load_config()
         
+        # Alamat server dari command line menggantikan konfigurasi
+        if server_address:
+            self.server_address = server_address
+        if server_port:
+            self.server_port = server_port
+        
+        try:
+            self.result_spool = ResultSpool(
+                os.path.join(os.path.dirname(os.path.abspath(self.config_file)), SPOOL_DIR_NAME),
+                budget_bytes=self.spool_budget_mb * 1024 * 1024,
+                threshold_rows=self.spool_threshold_rows
+            )
+        except Exception as e:
+            print(f"Error initializing result spool: {e}")
+        try:
+            self.query_history = QueryHistory(
+                os.path.join(os.path.dirname(os.path.abspath(self.config_file)), HISTORY_FILE))
+        except Exception as e:
+            print(f"Error initializing query history: {e}")
+        self.cursors = CursorRegistry(ttl=self.cursor_ttl)
+        self.delta_tracker = DeltaTracker()  # Hash baris hasil terakhir per delta key dari server
+        self.send_lock = threading.Lock()  # Hasil standing query dikirim dari thread watcher
+        self.standing_queries = StandingQueryWatcher(
+            lambda: self.db_connector.db_path if self.db_connector else None,
+            lambda query: self.db_connector.execute_query(query),
+            self.push_standing_result
+        )
+        self.reconnector = ReconnectManager(
+            self.reconnect_once,
+            lambda: self.running and self.auto_reconnect and not self.connected,
+            base_delay=self.reconnect_interval,
+            max_delay=self.reconnect_max_interval,
+            log=self.log
+        )
+        
+        if self.headless:
+            # Mode service: hanya koneksi, eksekutor query dan connector
+            self.init_headless()
+            return
+        
         # Inisialisasi UI
+        import_tkinter()
         self.init_ui()
         
         # Coba koneksi otomatis ke database jika ada di konfigurasi
@@ -56,11 +147,61 @@ class ClientApp:
         if self.auto_reconnect and self.server_address:
             self.start_auto_reconnect()
     
+    def init_headless(self):
+        """Inisialisasi mode headless: log ke file bergilir, tanpa Tk"""
+        log_dir = os.path.join(os.path.dirname(os.path.abspath(self.config_file)), "logs")
+        os.makedirs(log_dir, exist_ok=True)
+        
+        self.logger = logging.getLogger(f"ifess.client.{self.client_id}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        formatter = logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+        
+        file_handler = RotatingFileHandler(
+            os.path.join(log_dir, "client_service.log"),
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        )
+        file_handler.setFormatter(formatter)
+        self.logger.addHandler(file_handler)
+        
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        self.logger.addHandler(console_handler)
+        
+        # Service harus selalu mencoba terhubung kembali ke server
+        self.auto_reconnect = True
+    
+    def get_client_id(self):
+        """Client ID aktif (dari UI jika ada)"""
+        if self.headless:
+            return self.client_id
+        return self.client_id_var.get() or self.client_id
+    
+    def get_display_name(self):
+        """Nama tampilan aktif (dari UI jika ada)"""
+        if self.headless:
+            return self.display_name
+        return self.display_name_var.get() or self.display_name
+    
+    def get_server_target(self):
+        """Alamat dan port server untuk (re)connect"""
+        if self.headless:
+            return self.server_address, self.server_port
+        
+        address = self.server_address_var.get().strip()
+        try:
+            port = int(self.server_port_var.get().strip())
+        except:
+            port = DEFAULT_PORT
+        return address, port
+    
     def load_config(self):
         """Memuat konfigurasi dari file"""
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r') as f:
+            if os.path.exists(self.config_file):
+                with open(self.config_file, 'r') as f:
                     config = json.load(f)
                 
                 # Load server config
@@ -68,6 +209,13 @@ class ClientApp:
                 self.server_port = config.get('server_port', DEFAULT_PORT)
                 self.auto_reconnect = config.get('auto_reconnect', False)
                 self.reconnect_interval = config.get('reconnect_interval', 5)
+                self.reconnect_max_interval = config.get('reconnect_max_interval', self.reconnect_max_interval)
+                
+                # Load konfigurasi spool
+                spool_config = config.get('spool', {})
+                self.spool_threshold_rows = spool_config.get('threshold_rows', self.spool_threshold_rows)
+                self.spool_budget_mb = spool_config.get('budget_mb', self.spool_budget_mb)
+                self.cursor_ttl = config.get('cursor_ttl', self.cursor_ttl)
                 
                 # Load client config
                 if 'client_id' in config:
@@ -83,7 +231,8 @@ class ClientApp:
                         self.db_connector = FirebirdConnector(
                             db_path=db_config['path'],
                             username=db_config.get('username', 'SYSDBA'),
-                            password=db_config.get('password', 'masterkey')
+                            password=db_config.get('password', 'masterkey'),
+                            isql_path=db_config.get('isql_path')
                         )
                         print("Debug: Database connector initialized from config")
                     except Exception as e:
@@ -98,9 +247,15 @@ class ClientApp:
                 'server_address': self.server_address,
                 'server_port': self.server_port,
                 'auto_reconnect': self.auto_reconnect,
+                'cursor_ttl': self.cursor_ttl,
+                'spool': {
+                    'threshold_rows': self.spool_threshold_rows,
+                    'budget_mb': self.spool_budget_mb
+                },
                 'reconnect_interval': self.reconnect_interval,
-                'client_id': self.client_id_var.get() or self.client_id,
-                'display_name': self.display_name_var.get() or self.display_name,
+                'reconnect_max_interval': self.reconnect_max_interval,
+                'client_id': self.get_client_id(),
+                'display_name': self.get_display_name(),
                 'database': {}
             }
             
@@ -109,17 +264,18 @@ class ClientApp:
                 config['database'] = {
                     'path': self.db_connector.db_path,
                     'username': self.db_connector.username,
-                    'password': self.db_connector.password
+                    'password': self.db_connector.password,
+                    'isql_path': self.db_connector.isql_path
                 }
             
             # Pastikan direktori ada
-            os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
+            os.makedirs(os.path.dirname(os.path.abspath(self.config_file)), exist_ok=True)
             
             # Tulis ke file
-            with open(CONFIG_FILE, 'w') as f:
+            with open(self.config_file, 'w') as f:
                 json.dump(config, f, indent=2)
             
-            print(f"Config saved to {CONFIG_FILE}")
+            print(f"Config saved to {self.config_file}")
         except Exception as e:
             print(f"Error saving config: {e}")
     
@@ -250,13 +406,13 @@ class ClientApp:
         
         ttk.Button(history_toolbar, text="Clear History", command=self.clear_history).pack(side=tk.LEFT, padx=2)
         
-        self.history_tree = ttk.Treeview(history_frame, columns=("Timestamp", "Query", "Status"), show="headings")
-        self.history_tree.heading("Timestamp", text="Timestamp")
-        self.history_tree.heading("Query", text="Query")
-        self.history_tree.heading("Status", text="Status")
-        self.history_tree.column("Timestamp", width=150)
-        self.history_tree.column("Query", width=450)
-        self.history_tree.column("Status", width=100)
+        # iid item = request_id, sehingga update status langsung ke item tanpa scan
+        history_columns = ("Timestamp", "Query", "Status", "Duration", "Rows", "Bytes")
+        history_widths = {"Timestamp": 150, "Query": 450, "Status": 80, "Duration": 70, "Rows": 70, "Bytes": 80}
+        self.history_tree = ttk.Treeview(history_frame, columns=history_columns, show="headings")
+        for column in history_columns:
+            self.history_tree.heading(column, text=column)
+            self.history_tree.column(column, width=history_widths[column])
         self.history_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Add vertical scrollbar to history
@@ -264,6 +420,7 @@ class ClientApp:
         self.history_tree.configure(yscrollcommand=history_vsb.set)
         history_vsb.pack(side=tk.RIGHT, fill=tk.Y)
         self.history_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5, side=tk.LEFT)
+        self.load_history()
         
         # Last Result Tab (if needed)
         result_frame = ttk.Frame(notebook)
@@ -285,39 +442,25 @@ class ClientApp:
         
         if self.auto_reconnect and not self.connected and self.server_address:
             self.start_auto_reconnect()
-        elif not self.auto_reconnect and self.reconnect_thread:
-            # Stop reconnect thread
-            self.auto_reconnect = False
+        # Jika dimatikan, ReconnectManager berhenti sendiri pada percobaan berikutnya
     
     def start_auto_reconnect(self):
-        """Memulai thread untuk auto-reconnect"""
-        if self.reconnect_thread and self.reconnect_thread.is_alive():
-            return
-        
+        """Minta ReconnectManager mencoba terhubung kembali (aman dipanggil berkali-kali)"""
         self.auto_reconnect = True
-        self.reconnect_thread = threading.Thread(target=self.auto_reconnect_loop)
-        self.reconnect_thread.daemon = True
-        self.reconnect_thread.start()
-        self.log("Auto-reconnect diaktifkan")
+        self.reconnector.trigger()
     
-    def auto_reconnect_loop(self):
-        """Loop untuk mencoba auto-reconnect ke server"""
-        while self.running and self.auto_reconnect and not self.connected:
-            if not self.is_connecting:
-                address = self.server_address_var.get().strip()
-                try:
-                    port = int(self.server_port_var.get().strip())
-                except:
-                    port = DEFAULT_PORT
-                
-                self.log(f"Mencoba auto-reconnect ke {address}:{port}...")
-                self.connect_to_server(address, port, auto_reconnect=True)
-            
-            # Tunggu interval
-            for i in range(self.reconnect_interval):
-                if not self.running or not self.auto_reconnect or self.connected:
-                    break
-                time.sleep(1)
+    def reconnect_once(self):
+        """Satu percobaan reconnect, dipanggil oleh ReconnectManager"""
+        if self.is_connecting:
+            return False
+        
+        address, port = self.get_server_target()
+        if not address:
+            return False
+        
+        self.log(f"Mencoba auto-reconnect ke {address}:{port}...")
+        self.connect_to_server(address, port, auto_reconnect=True)
+        return self.connected
     
     def update_loading_indicator(self):
         """Update indikator loading"""
@@ -347,11 +490,19 @@ class ClientApp:
             self.db_status.config(text="Not Selected")
             self.select_db_button.config(text="Select Database")
         
+        # Tutup cursor yang sudah melewati TTL
+        self.cursors.expire()
+        
         # Schedule next update
         self.root.after(1000, self.update_ui)
     
     def log(self, message):
         """Tambahkan pesan ke log"""
+        if self.headless:
+            # Ditulis ke file log bergilir dan stdout
+            self.logger.info(message)
+            return
+        
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_message = f"[{timestamp}] {message}\n"
         
@@ -391,7 +542,7 @@ class ClientApp:
     def connect_to_server(self, address, port, auto_reconnect=False):
         """Terhubung ke server"""
         if self.connected:
-            if not auto_reconnect:
+            if not auto_reconnect and not self.headless:
                 messagebox.showinfo("Already Connected", "Already connected to server. Please disconnect first.")
             return
         
@@ -401,9 +552,10 @@ class ClientApp:
         self.is_connecting = True
         
         # Mulai indikator loading
-        loading_thread = threading.Thread(target=self.update_loading_indicator)
-        loading_thread.daemon = True
-        loading_thread.start()
+        if not self.headless:
+            loading_thread = threading.Thread(target=self.update_loading_indicator)
+            loading_thread.daemon = True
+            loading_thread.start()
         
         try:
             # Buat socket
@@ -430,7 +582,7 @@ class ClientApp:
             self.save_config()
         except Exception as e:
             self.log(f"Error saat terhubung ke server: {e}")
-            if not auto_reconnect:
+            if not auto_reconnect and not self.headless:
                 messagebox.showerror("Connection Error", f"Tidak dapat terhubung ke server: {e}")
             
             # Reset status
@@ -476,8 +628,8 @@ class ClientApp:
         
         try:
             # Persiapkan data registrasi
-            display_name = self.display_name_var.get() or self.display_name
-            client_id = self.client_id_var.get() or self.client_id
+            display_name = self.get_display_name()
+            client_id = self.get_client_id()
             
             db_info = {}
             if self.db_connector:
@@ -489,6 +641,8 @@ class ClientApp:
             register_data = {
                 'display_name': display_name,
                 'db_info': db_info,
+                'session_token': self.session_token,
+                'schema_hash': self.schema_hash,
                 'platform': platform.system(),
                 'hostname': platform.node(),
                 'timestamp': datetime.datetime.now().isoformat()
@@ -498,7 +652,7 @@ class ClientApp:
             register_message = NetworkMessage(NetworkMessage.TYPE_REGISTER, register_data, client_id)
             
             # Pastikan kirim pesan registrasi berhasil
-            success = send_message(self.socket, register_message)
+            success = self.send_to_server(register_message)
             
             if success:
                 self.log(f"Terhubung ke server: {self.server_address}:{self.server_port}")
@@ -512,7 +666,8 @@ class ClientApp:
     def disconnect_from_server(self):
         """Putuskan koneksi dari server"""
         if not self.connected:
-            messagebox.showinfo("Not Connected", "Not connected to any server.")
+            if not self.headless:
+                messagebox.showinfo("Not Connected", "Not connected to any server.")
             return
         
         try:
@@ -523,8 +678,8 @@ class ClientApp:
             
             self.log("Terputus dari server")
             
-            # Mulai auto-reconnect jika diaktifkan
-            if self.auto_reconnect:
+            # Mulai auto-reconnect jika diaktifkan (satu-satunya titik pemicu dari thread ini)
+            if self.auto_reconnect and self.running:
                 self.start_auto_reconnect()
         except Exception as e:
             self.log(f"Error saat memutuskan koneksi: {e}")
@@ -554,6 +709,16 @@ class ClientApp:
                     elif message.msg_type == NetworkMessage.TYPE_QUERY:
                         # Eksekusi query
                         self.execute_query(message.data)
+                    elif message.msg_type == NetworkMessage.TYPE_REGISTER:
+                        # Balasan registrasi: session token dan status resume
+                        self.handle_register_reply(message.data)
+                    elif message.msg_type == NetworkMessage.TYPE_FETCH:
+                        # Permintaan halaman berikutnya dari remote cursor
+                        self.fetch_cursor_page(message.data)
+                    elif message.msg_type == NetworkMessage.TYPE_CLOSE_CURSOR:
+                        self.cursors.close(message.data.get('cursor_id'))
+                    elif message.msg_type == NetworkMessage.TYPE_STANDING_QUERY:
+                        self.handle_standing_query(message.data)
                 except socket.timeout:
                     # Log timeout dan coba kirim ping untuk mengecek koneksi
                     self.log("Socket timeout, mencoba kirim heartbeat...")
@@ -580,27 +745,34 @@ class ClientApp:
                     except:
                         pass
                     self.socket = None
-                
-                # Mulai auto-reconnect jika diaktifkan
-                if self.auto_reconnect:
-                    self.start_auto_reconnect()
         except Exception as e:
             self.log(f"Error di thread receive_messages: {e}")
         finally:
             self.connected = False
             
+            # Standing query hanya berlaku selama koneksi ke server. Cursor tetap terbuka
+            # (sampai TTL) agar hasil yang dikirim ulang setelah resume masih bisa di-paging
+            if not self.auto_reconnect:
+                self.cursors.close_all()
+            self.standing_queries.clear()
+            
             # Mulai auto-reconnect jika diaktifkan
             if self.auto_reconnect:
                 self.start_auto_reconnect()
     
+    def send_to_server(self, message):
+        """Kirim pesan ke server; satu pesan pada satu waktu agar frame tidak bercampur"""
+        with self.send_lock:
+            return send_message(self.socket, message)
+    
     def send_pong(self):
         """Kirim respons pong ke server"""
         if not self.connected or not self.socket:
             return
         
         try:
-            pong_message = NetworkMessage(NetworkMessage.TYPE_PONG, {}, self.client_id_var.get() or self.client_id)
-            send_message(self.socket, pong_message)
+            pong_message = NetworkMessage(NetworkMessage.TYPE_PONG, {}, self.get_client_id())
+            self.send_to_server(pong_message)
         except Exception as e:
             self.log(f"Error sending pong: {e}")
     
@@ -608,6 +780,12 @@ class ClientApp:
         """Eksekusi query dari server"""
         query = query_data.get('query', '')
         description = query_data.get('description', '')
+        cursor_options = query_data.get('cursor')
+        delta_options = query_data.get('delta')
+        # Query metadata dari server (daftar tabel/kolom) tidak masuk history
+        record_history = query_data.get('record_history', True)
+        cursor_info = None
+        delta_info = None
         
         print("="*50)
         print(f"EXECUTE QUERY: Menerima permintaan eksekusi query")
@@ -631,17 +809,34 @@ class ClientApp:
             self.send_error_result(f"File database tidak ditemukan: {self.db_connector.db_path}", query_data)
             return
             
+        # Pre-flight dari server: hanya plan, query tidak dijalankan dan tidak masuk history
+        if query_data.get('plan_only'):
+            self.send_query_plan(query, query_data)
+            return
+        
         self.log(f"Menerima query: {query}")
         
         # Tambahkan ke history
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        history_item = (timestamp, query, "Running")
-        self.history_tree.insert("", 0, values=history_item)
+        request_id = query_data.get('request_id') or uuid.uuid4().hex
+        if record_history:
+            self.add_history_item(request_id, query)
         
         try:
             # Eksekusi query
             print(f"DEBUG: Mengeksekusi query via db_connector...")
-            result = self.db_connector.execute_query(query)
+            if cursor_options:
+                # Server meminta hasil per halaman: buka cursor dan kirim halaman pertama
+                cursor = self.cursors.open(
+                    cursor_options.get('cursor_id'),
+                    query,
+                    self.db_connector.execute_query,
+                    page_size=cursor_options.get('page_size', DEFAULT_PAGE_SIZE),
+                    materialize=self.spool_result
+                )
+                result, cursor_info = cursor.fetch(0)
+            else:
+                result = self.db_connector.execute_query(query)
+                result = self.spool_result(result, query)
             print(f"DEBUG: Query berhasil dieksekusi")
             
             # Debug info
@@ -659,19 +854,29 @@ class ClientApp:
                 if rows and len(rows) > 0:
                     print(f"  Sample row data: {str(rows[0])[:200]}...")
             
-            # Update history
-            for item in self.history_tree.get_children():
-                values = self.history_tree.item(item, 'values')
-                if values[0] == timestamp and values[1] == query:
-                    self.history_tree.item(item, values=(timestamp, query, "Success"))
-                    break
-            
             # Kirim hasil ke server
             print("DEBUG: Mengirim hasil ke server...")
-            self.send_query_result(query, result, description)
+            if description == 'get_tables':
+                self.schema_hash = schema_hash(extract_table_names(result))
+            
+            # Query monitoring berulang: kirim hanya baris yang berubah sejak hasil terakhir
+            send_result = result
+            if delta_options and not cursor_options:
+                send_result, delta_info = self.delta_tracker.prepare(
+                    delta_options.get('key'), delta_options.get('base'), result, delta_options.get('key_columns'))
+                if delta_info and delta_info['mode'] == MODE_DELTA:
+                    self.log(f"Delta: {count_rows(send_result)} baris baru/berubah, "
+                             f"{len(delta_info['deleted'])} dihapus dari {count_rows(result)} baris")
+            
+            sent_size = self.send_query_result(query, send_result, description, cursor_info,
+                                               query_data.get('request_id'), delta_info)
+            
+            # Update history
+            if record_history:
+                self.update_history_status(request_id, STATUS_SUCCESS, rows=count_rows(result), size=sent_size)
             
             # Simpan hasil terakhir
-            self.last_result = result
+            self.set_last_result(result)
             self.update_result_display(result)
             
             self.log("Query berhasil dieksekusi")
@@ -682,20 +887,108 @@ class ClientApp:
             traceback.print_exc()
             
             # Update history
-            for item in self.history_tree.get_children():
-                values = self.history_tree.item(item, 'values')
-                if values[0] == timestamp and values[1] == query:
-                    self.history_tree.item(item, values=(timestamp, query, "Error"))
-                    break
+            if record_history:
+                self.update_history_status(request_id, STATUS_ERROR, error=error_message)
+            
+            # Cursor yang gagal mengambil halaman pertama tidak akan dipakai server
+            if cursor_options:
+                self.cursors.close(cursor_options.get('cursor_id'))
             
             self.log(f"Error saat eksekusi query: {error_message}")
             self.send_error_result(error_message, query_data)
     
-    def send_query_result(self, query, result, description):
-        """Kirim hasil query ke server"""
+    def add_history_item(self, request_id, query):
+        """Catat query yang mulai berjalan ke history persisten dan UI"""
+        if self.query_history is not None:
+            try:
+                self.query_history.add(query, self.history_target(), request_id=request_id)
+            except Exception as e:
+                self.log(f"Gagal mencatat history query: {e}")
+        if self.headless:
+            return
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        values = (timestamp, query, STATUS_RUNNING.capitalize(), "", "", "")
+        if self.history_tree.exists(request_id):
+            # Query yang sama dikirim ulang server setelah reconnect
+            self.history_tree.item(request_id, values=values)
+            self.history_tree.move(request_id, "", 0)
+        else:
+            self.history_tree.insert("", 0, iid=request_id, values=values)
+    
+    def update_history_status(self, request_id, status, rows=None, size=None, error=None):
+        """Update status dan statistik query di history berdasarkan request_id"""
+        entry = None
+        if self.query_history is not None:
+            try:
+                self.query_history.finish(request_id, status, rows=rows, size=size, error=error)
+                entry = self.query_history.get(request_id)
+            except Exception as e:
+                self.log(f"Gagal mencatat history query: {e}")
+        if self.headless or not self.history_tree.exists(request_id):
+            return
+        values = list(self.history_tree.item(request_id, 'values'))
+        values[2] = status.capitalize()
+        if entry is not None:
+            values[3:] = self.history_stats(entry)
+        self.history_tree.item(request_id, values=values)
+    
+    def history_target(self):
+        """Target history di client: nama file database aktif"""
+        return os.path.basename(self.db_connector.db_path) if self.db_connector else ""
+    
+    @staticmethod
+    def history_stats(entry):
+        """Kolom Duration, Rows, Bytes untuk satu entri history"""
+        if entry['duration'] is None:
+            return "", "", ""
+        return f"{entry['duration']:.2f}s", entry['rows'], format_size(entry['bytes'])
+    
+    def load_history(self, limit=500):
+        """Tampilkan entri history terbaru dari store persisten"""
+        if self.query_history is None:
+            return
+        try:
+            entries = self.query_history.search(limit=limit)
+        except Exception as e:
+            self.log(f"Gagal memuat history query: {e}")
+            return
+        for entry in entries:
+            timestamp = datetime.datetime.fromtimestamp(entry['ts']).strftime("%Y-%m-%d %H:%M:%S")
+            self.history_tree.insert("", tk.END, iid=entry['request_id'],
+                                     values=(timestamp, entry['query'], entry['status'].capitalize())
+                                     + self.history_stats(entry))
+    
+    def send_query_plan(self, query, query_data):
+        """Ambil plan query (SET PLANONLY) dan kirim ke server sebagai hasil 'get_plan'"""
+        try:
+            plans = self.db_connector.get_plan(query)
+        except Exception as e:
+            self.log(f"Gagal mengambil plan query: {e}")
+            self.send_error_result(str(e), query_data)
+            return
+        self.log(f"Plan query: {'; '.join(plans) or '-'}")
+        self.send_query_result(query, plan_result(plans), query_data.get('description', ''),
+                               request_id=query_data.get('request_id'))
+    
+    def send_query_result(self, query, result, description, cursor_info=None, request_id=None, delta_info=None):
+        """Kirim hasil query ke server. Return ukuran pesan terkirim (byte) atau None"""
+        result_data = {
+            'query': query,
+            'description': description,
+            'result': result,
+            'timestamp': datetime.datetime.now().isoformat()
+        }
+        if cursor_info:
+            result_data['cursor'] = cursor_info
+        if delta_info:
+            result_data['delta'] = delta_info
+        if request_id:
+            result_data['request_id'] = request_id
+        
         if not self.connected or not self.socket:
             print("DEBUG: Tidak dapat mengirim hasil - tidak terhubung ke server")
-            return
+            self.queue_offline_result(NetworkMessage.TYPE_RESULT, result_data)
+            return None
         
         try:
             # Debug info tentang data yang akan dikirim
@@ -713,60 +1006,198 @@ class ClientApp:
                 if rows and len(rows) > 0:
                     print(f"  Sample row: {str(rows[0])[:200]}...")
             
-            result_data = {
-                'query': query,
-                'description': description,
-                'result': result,
-                'timestamp': datetime.datetime.now().isoformat()
-            }
-            
             result_message = NetworkMessage(
                 NetworkMessage.TYPE_RESULT,
                 result_data,
-                self.client_id_var.get() or self.client_id
+                self.get_client_id()
             )
             
             print(f"DEBUG: Mengirim pesan hasil query...")
-            success = send_message(self.socket, result_message)
+            success = self.send_to_server(result_message)
             if success:
                 print("DEBUG: Hasil query berhasil dikirim ke server")
                 self.log("Hasil query berhasil dikirim ke server")
             else:
                 print("DEBUG: Gagal mengirim hasil query ke server")
                 self.log("Gagal mengirim hasil query ke server")
+                self.queue_offline_result(NetworkMessage.TYPE_RESULT, result_data)
             print("="*50)
+            return result_message.size if success else None
         except Exception as e:
             print(f"ERROR saat mengirim hasil query: {e}")
             import traceback
             traceback.print_exc()
             self.log(f"Error saat mengirim hasil query: {e}")
+            return None
+    
+    def fetch_cursor_page(self, fetch_data):
+        """Kirim halaman tertentu dari cursor yang masih terbuka"""
+        cursor_id = fetch_data.get('cursor_id')
+        page = fetch_data.get('page', 0)
+        
+        try:
+            cursor = self.cursors.get(cursor_id)
+            result, cursor_info = cursor.fetch(page)
+            print(f"DEBUG: Mengirim halaman {page + 1} cursor {cursor_id} ({len(result[0]['rows'])} baris)")
+            self.send_query_result(cursor.query, result, 'cursor_page', cursor_info)
+        except Exception as e:
+            if not isinstance(e, CursorError):
+                self.log(f"Error saat mengambil halaman cursor: {e}")
+            self.send_error_result(str(e), {
+                'description': 'cursor_page',
+                'cursor': {'cursor_id': cursor_id, 'page': page}
+            })
+    
+    def handle_standing_query(self, data):
+        """Daftarkan atau hapus standing query dari server"""
+        action = data.get('action')
+        if action == 'register':
+            standing_query = StandingQuery.from_message(data)
+            self.standing_queries.register(standing_query)
+            self.standing_queries.start()
+            self.log(f"Standing query {standing_query.query_id} didaftarkan"
+                     + (f" (probe: {standing_query.probe})" if standing_query.probe else ""))
+        elif action == 'unregister':
+            if self.standing_queries.unregister(data.get('query_id')):
+                self.delta_tracker.forget(f"standing:{data.get('query_id')}")
+                self.log(f"Standing query {data.get('query_id')} dihapus")
+    
+    def push_standing_result(self, standing_query, result, error):
+        """Kirim hasil standing query ke server tanpa diminta (thread watcher)"""
+        data = {
+            'query': standing_query.query,
+            'description': 'standing_query',
+            'standing_query': standing_query.query_id,
+            'timestamp': datetime.datetime.now().isoformat()
+        }
+        delta_info = None
+        if error:
+            msg_type = NetworkMessage.TYPE_ERROR
+            data['error'] = error
+        else:
+            msg_type = NetworkMessage.TYPE_RESULT
+            data['result'], delta_info = self.delta_tracker.prepare(
+                f"standing:{standing_query.query_id}", standing_query.base, result, standing_query.key_columns)
+            if delta_info:
+                data['delta'] = delta_info
+        
+        sent = False
+        if self.connected and self.socket:
+            try:
+                sent = self.send_to_server(NetworkMessage(msg_type, data, self.get_client_id()))
+            except Exception as e:
+                self.log(f"Error saat mengirim hasil standing query: {e}")
+        
+        # Base delta berikutnya adalah hasil yang baru saja diterima server
+        standing_query.base = delta_info['hash'] if sent and delta_info else None
+        if sent and not error:
+            rows = count_rows(data['result'])
+            self.log(f"Standing query {standing_query.query_id}: database berubah, "
+                     f"{rows} baris dikirim ({delta_info['mode'] if delta_info else 'full'})")
+    
+    def spool_result(self, result, query):
+        """Pindahkan hasil besar ke file spool agar tidak menetap di memori"""
+        if not self.result_spool or not self.result_spool.should_spool(result):
+            return result
+        
+        try:
+            spooled = self.result_spool.spool(result, query)
+            self.log(f"Hasil besar ({count_rows(result)} baris) disimpan ke spool {spooled.spool_id} "
+                     f"({spooled.size // 1024} KB)")
+            return spooled
+        except Exception as e:
+            self.log(f"Gagal menyimpan hasil ke spool, hasil tetap di memori: {e}")
+            return result
+    
+    def set_last_result(self, result):
+        """Simpan hasil terakhir, menutup spool hasil sebelumnya"""
+        previous = self.last_result
+        self.last_result = result
+        if isinstance(previous, SpooledResult) and previous is not result:
+            previous.close()
     
     def send_error_result(self, error_message, query_data):
         """Kirim pesan error ke server"""
+        error_data = {
+            'query': query_data.get('query', ''),
+            'description': query_data.get('description', ''),
+            'error': error_message,
+            'timestamp': datetime.datetime.now().isoformat()
+        }
+        if query_data.get('cursor'):
+            error_data['cursor'] = query_data['cursor']
+        if query_data.get('request_id'):
+            error_data['request_id'] = query_data['request_id']
+        
         if not self.connected or not self.socket:
+            self.queue_offline_result(NetworkMessage.TYPE_ERROR, error_data)
             return
         
         try:
-            error_data = {
-                'query': query_data.get('query', ''),
-                'description': query_data.get('description', ''),
-                'error': error_message,
-                'timestamp': datetime.datetime.now().isoformat()
-            }
-            
             error_message = NetworkMessage(
                 NetworkMessage.TYPE_ERROR,
                 error_data,
-                self.client_id_var.get() or self.client_id
+                self.get_client_id()
             )
             
-            send_message(self.socket, error_message)
+            if not self.send_to_server(error_message):
+                self.queue_offline_result(NetworkMessage.TYPE_ERROR, error_data)
         except Exception as e:
             self.log(f"Error saat mengirim pesan error: {e}")
     
+    def queue_offline_result(self, msg_type, data):
+        """Simpan hasil yang gagal dikirim untuk dikirim ulang setelah session dipulihkan"""
+        # Hanya hasil dari request server yang bisa dicocokkan kembali; halaman cursor tidak disimpan
+        if not data.get('request_id') or data.get('description') == 'cursor_page':
+            return
+        
+        result = data.get('result')
+        if isinstance(result, SpooledResult):
+            # Handle sendiri agar tidak ikut tertutup saat last_result berganti
+            data = dict(data, result=self.result_spool.open(result.spool_id))
+        
+        with self.offline_lock:
+            self.offline_results.append((msg_type, data))
+            dropped = self.offline_results[:-MAX_OFFLINE_RESULTS]
+            del self.offline_results[:-MAX_OFFLINE_RESULTS]
+        for _, old_data in dropped:
+            self.release_offline_result(old_data)
+        self.log(f"Hasil request {data['request_id']} disimpan untuk dikirim ulang setelah reconnect")
+    
+    def release_offline_result(self, data):
+        if isinstance(data.get('result'), SpooledResult):
+            data['result'].close()
+    
+    def handle_register_reply(self, reply):
+        """Simpan session token dan kirim ulang hasil yang tertunda"""
+        resumed = reply.get('resumed', False)
+        self.session_token = reply.get('session_token')
+        
+        with self.offline_lock:
+            pending = self.offline_results
+            self.offline_results = []
+        
+        if resumed:
+            self.log(f"Session dilanjutkan, {len(pending)} hasil tertunda akan dikirim ulang")
+        else:
+            # Server tidak mengenali session lama (misalnya server restart): cursor dan hasil lama tidak berlaku
+            self.cursors.close_all()
+            if pending:
+                self.log(f"Session baru, {len(pending)} hasil tertunda dibuang")
+        
+        for i, (msg_type, data) in enumerate(pending):
+            if resumed and self.connected and self.socket:
+                if not self.send_to_server(NetworkMessage(msg_type, data, self.get_client_id())):
+                    # Kembalikan sisa antrian, dicoba lagi pada reconnect berikutnya
+                    with self.offline_lock:
+                        self.offline_results = pending[i:] + self.offline_results
+                    return
+                self.log(f"Hasil request {data.get('request_id')} dikirim ulang")
+            self.release_offline_result(data)
+    
     def update_result_display(self, result):
         """Update tampilan hasil query"""
-        if not result:
+        if not result or self.headless:
             return
         
         # Format hasil untuk ditampilkan
@@ -794,7 +1225,9 @@ class ClientApp:
             for header in headers:
                 col_widths[header] = len(str(header))
             
-            for row in rows:
+            # Hasil besar (terutama dari spool) hanya dirender sebagian
+            display_rows = rows[:DISPLAY_ROW_LIMIT]
+            for row in display_rows:
                 for header in headers:
                     value = row.get(header, "")
                     col_widths[header] = max(col_widths[header], len(str(value)))
@@ -807,10 +1240,12 @@ class ClientApp:
             output.append(separator)
             
             # Format data rows
-            for row in rows:
+            for row in display_rows:
                 data_row = " | ".join(str(row.get(header, "")).ljust(col_widths[header]) for header in headers)
                 output.append(data_row)
             
+            if len(rows) > len(display_rows):
+                output.append(f"... {len(rows) - len(display_rows)} baris lainnya tidak ditampilkan")
             output.append("")
             output.append(f"Total rows: {len(rows)}")
             output.append("")
@@ -839,7 +1274,10 @@ class ClientApp:
             else:
                 # Buat koneksi baru
                 from common.db_utils import FirebirdConnector
-                self.db_connector = FirebirdConnector(db_path=file_path)
+                self.db_connector = FirebirdConnector(
+                    db_path=file_path,
+                    isql_path=os.environ.get('IFESS_ISQL_PATH')
+                )
             
             # Test koneksi
             tables = self.db_connector.get_tables()
@@ -998,6 +1436,7 @@ class ClientApp:
                 
                 # Eksekusi query
                 result = self.db_connector.execute_query(query)
+                result = self.spool_result(result, query)
                 
                 # Log hasil
                 self.log(f"Test query berhasil: {len(result)} result sets")
@@ -1020,7 +1459,7 @@ class ClientApp:
                         print(f"  First row data: {rows[0]}")
                 
                 # Update tampilan hasil
-                self.last_result = result
+                self.set_last_result(result)
                 self.update_result_display(result)
                 
                 # Jika terhubung ke server, kirim hasil ke server
@@ -1036,10 +1475,10 @@ class ClientApp:
                     result_message = NetworkMessage(
                         NetworkMessage.TYPE_RESULT,
                         result_data,
-                        self.client_id_var.get() or self.client_id
+                        self.get_client_id()
                     )
                     
-                    success = send_message(self.socket, result_message)
+                    success = self.send_to_server(result_message)
                     if success:
                         print("DEBUG: Hasil test query berhasil dikirim ke server")
                         self.log("Hasil test query berhasil dikirim ke server")
@@ -1067,7 +1506,56 @@ class ClientApp:
     
     def run(self):
         """Jalankan aplikasi"""
-        self.root.mainloop()
+        if self.headless:
+            self.run_headless()
+        else:
+            self.root.mainloop()
+    
+    def run_headless(self):
+        """Loop utama mode service sampai dihentikan (Ctrl+C / SIGTERM)"""
+        if not self.server_address:
+            self.log("Alamat server belum dikonfigurasi, gunakan --server atau isi server_address di konfigurasi")
+            return 2
+        
+        def stop(signum, frame):
+            self.log(f"Menerima sinyal {signum}, menghentikan client...")
+            self.running = False
+        
+        signal.signal(signal.SIGTERM, stop)
+        
+        self.log(f"Client {self.display_name} ({self.client_id}) berjalan dalam mode headless")
+        self.auto_connect_to_database()
+        if not self.db_connector:
+            self.log("Database belum dikonfigurasi atau tidak dapat diakses")
+        self.start_auto_reconnect()
+        
+        try:
+            while self.running:
+                time.sleep(1)
+                # Tutup cursor yang sudah melewati TTL
+                self.cursors.expire()
+        except KeyboardInterrupt:
+            self.log("Dihentikan oleh pengguna")
+        finally:
+            self.shutdown()
+        return 0
+    
+    def shutdown(self):
+        """Tutup koneksi dan sumber daya tanpa UI"""
+        self.running = False
+        self.connected = False
+        if self.socket:
+            try:
+                self.socket.close()
+            except:
+                pass
+            self.socket = None
+        self.reconnector.stop()
+        self.standing_queries.stop()
+        self.cursors.close_all()
+        self.set_last_result(None)
+        if self.query_history is not None:
+            self.query_history.close()
 
     def clear_log(self):
         """Bersihkan log"""
@@ -1109,11 +1597,23 @@ class ClientApp:
             print(f"Error writing to log file: {e}")
     
     def clear_history(self):
-        """Bersihkan history query"""
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        self.query_history = []
+        """Bersihkan history query (termasuk store persisten)"""
+        self.history_tree.delete(*self.history_tree.get_children())
+        if self.query_history is not None:
+            self.query_history.clear()
+
+def parse_args(argv=None):
+    """Parse argumen command line client"""
+    parser = argparse.ArgumentParser(description="Firebird Query Client")
+    parser.add_argument("--headless", action="store_true",
+                        help="Jalankan tanpa UI (mode service), log ke client/logs/client_service.log")
+    parser.add_argument("--config", default=CONFIG_FILE, help="Path file konfigurasi client")
+    parser.add_argument("--server", help="Alamat server (menggantikan konfigurasi)")
+    parser.add_argument("--port", type=int, help="Port server (menggantikan konfigurasi)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    app = ClientApp()
-    app.run() 
\ No newline at end of file
+    args = parse_args()
+    app = ClientApp(headless=args.headless, config_file=args.config,
+                    server_address=args.server, server_port=args.port)
+    sys.exit(app.run()) 
\ No newline at end of file
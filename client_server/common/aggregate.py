@@ -0,0 +1,354 @@
+"""
+Pushdown agregat dua tahap untuk query lintas estate.
+
+Query agregat (SUM/COUNT/MIN/MAX/AVG dengan GROUP BY) ditulis ulang menjadi
+agregat parsial yang dijalankan di setiap client. Hanya baris hasil agregasi
+parsial yang dikirim ke server, lalu digabung di server:
+
+    SUM  -> SUM parsial dijumlahkan
+    COUNT -> COUNT parsial dijumlahkan
+    MIN/MAX -> MIN/MAX dari nilai parsial
+    AVG  -> SUM dan COUNT parsial, dibagi setelah digabung
+
+Query yang tidak bisa digabung dengan benar (DISTINCT, HAVING, FIRST/ROWS,
+UNION, kolom non-agregat di luar GROUP BY) tidak ditulis ulang.
+"""
+import re
+
+AGGREGATE_FUNCTIONS = ('SUM', 'COUNT', 'MIN', 'MAX', 'AVG')
+
+_SELECT_RE = re.compile(r'^\s*SELECT\s+(.*)$', re.IGNORECASE | re.DOTALL)
+_AGGREGATE_RE = re.compile(r'^(SUM|COUNT|MIN|MAX|AVG)\s*\(', re.IGNORECASE)
+_ALIAS_RE = re.compile(r'^(.*?)\s+(?:AS\s+)?("[^"]+"|[A-Za-z_][\w$]*)$', re.IGNORECASE | re.DOTALL)
+_IDENTIFIER_RE = re.compile(r'^(?:[A-Za-z_][\w$]*\.)?("[^"]+"|[A-Za-z_][\w$]*)$')
+_KEYWORDS = {'FROM', 'WHERE', 'GROUP', 'ORDER', 'HAVING', 'UNION', 'ROWS', 'PLAN', 'BY', 'AND', 'OR', 'NOT'}
+
+
+def _scan(text):
+    """Iterasi (posisi, karakter, level kurung) di luar string literal dan identifier berquote;
+    kurung buka/tutup dilaporkan pada level di luarnya"""
+    depth = 0
+    quote = None
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+            continue
+        if ch in ("'", '"'):
+            quote = ch
+        elif ch == '(':
+            yield i, ch, depth
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            yield i, ch, depth
+        else:
+            yield i, ch, depth
+
+
+def split_top_level(text, separator=','):
+    """Pisahkan teks berdasarkan separator yang tidak berada di dalam kurung atau string"""
+    parts = []
+    start = 0
+    for i, ch, depth in _scan(text):
+        if ch == separator and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return parts
+
+
+def find_keyword(text, *words):
+    """
+    Cari posisi keyword (mis. 'GROUP', 'BY') di level teratas query
+
+    :return: Tuple (awal, akhir) atau None
+    """
+    pattern = re.compile(r'\b' + r'\s+'.join(words) + r'\b', re.IGNORECASE)
+    top_level = set(i for i, _, depth in _scan(text) if depth == 0)
+    for match in pattern.finditer(text):
+        if match.start() in top_level:
+            return match.start(), match.end()
+    return None
+
+
+def normalize_expression(expr):
+    """Normalisasi ekspresi untuk perbandingan (huruf besar, spasi tunggal)"""
+    return re.sub(r'\s+', ' ', expr.strip()).upper()
+
+
+def default_header(expr):
+    """Nama kolom yang dipakai isql untuk ekspresi tanpa alias"""
+    match = _IDENTIFIER_RE.match(expr.strip())
+    if match:
+        return match.group(1).strip('"').upper()
+    match = _AGGREGATE_RE.match(expr.strip())
+    if match:
+        return match.group(1).upper()
+    return normalize_expression(expr)
+
+
+def _split_alias(item):
+    """Pisahkan 'ekspresi AS alias' menjadi (ekspresi, alias atau None)"""
+    match = _ALIAS_RE.match(item.strip())
+    if match:
+        expr, alias = match.group(1).strip(), match.group(2)
+        # Kata terakhir hanya alias jika ekspresi di depannya lengkap
+        if (alias.upper() not in _KEYWORDS and expr
+                and expr[-1] not in '+-*/|(,' and not expr.upper().endswith((' AND', ' OR', ' NOT'))):
+            return expr, alias.strip('"').upper()
+    return item.strip(), None
+
+
+def _parse_aggregate(expr):
+    """
+    Parse 'FUNC(arg)' yang berdiri sendiri
+
+    :return: Tuple (FUNC, arg) atau None jika ekspresi bukan satu fungsi agregat utuh
+    """
+    match = _AGGREGATE_RE.match(expr)
+    if not match:
+        return None
+    open_pos = match.end() - 1
+    for i, ch, depth in _scan(expr):
+        if i > open_pos and ch == ')' and depth == 0:
+            if expr[i + 1:].strip():
+                return None  # Contoh: SUM(A) + SUM(B)
+            return match.group(1).upper(), expr[open_pos + 1:i].strip()
+    return None
+
+
+def _to_number(value):
+    """Konversi nilai dari client ke int/float; None untuk NULL"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value).strip()
+    if not text or text == '<null>':
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _comparable(value):
+    """Nilai MIN/MAX: angka jika bisa, selain itu teks apa adanya"""
+    try:
+        return _to_number(value)
+    except ValueError:
+        return str(value).strip()
+
+
+class AggregateColumn:
+    """Satu kolom output query agregat"""
+    def __init__(self, header, expr, function=None, argument=None):
+        self.header = header
+        self.expr = expr
+        self.function = function  # None untuk kolom GROUP BY
+        self.argument = argument
+        self.partials = []  # Alias kolom parsial di query client
+
+
+class AggregatePlan:
+    """Rencana eksekusi dua tahap: query parsial untuk client dan penggabungan di server"""
+    def __init__(self, query, columns, client_query, order_by):
+        self.query = query
+        self.columns = columns
+        self.client_query = client_query
+        self.order_by = order_by  # List (indeks kolom output, descending)
+
+    @property
+    def headers(self):
+        return [column.header for column in self.columns]
+
+    def combine(self, results):
+        """
+        Gabungkan hasil agregat parsial dari semua client
+
+        :param results: Iterable hasil client (list result set)
+        :return: List berisi satu result set {'headers', 'rows'}
+        """
+        group_columns = [column for column in self.columns if column.function is None]
+        groups = {}
+        for result in results:
+            for result_set in result or []:
+                for row in result_set.get('rows', []):
+                    key = tuple(self._group_value(row.get(column.partials[0])) for column in group_columns)
+                    state = groups.get(key)
+                    if state is None:
+                        state = groups[key] = {}
+                    for column in self.columns:
+                        if column.function is not None:
+                            self._accumulate(column, state, row)
+
+        # Agregat tanpa GROUP BY selalu menghasilkan satu baris
+        if not groups and not group_columns:
+            groups[()] = {}
+
+        rows = []
+        for key, state in groups.items():
+            values = iter(key)
+            row = {}
+            for column in self.columns:
+                row[column.header] = next(values) if column.function is None else self._final(column, state)
+            rows.append(row)
+
+        for index, descending in reversed(self.order_by):
+            header = self.columns[index].header
+            rows.sort(key=lambda row: _sort_key(row[header]), reverse=descending)
+        return [{'headers': self.headers, 'rows': rows}]
+
+    @staticmethod
+    def _group_value(value):
+        if value is None:
+            return None
+        text = str(value).strip()
+        return None if text == '<null>' else text
+
+    @staticmethod
+    def _accumulate(column, state, row):
+        values = [_comparable(row.get(alias)) if column.function in ('MIN', 'MAX') else _to_number(row.get(alias))
+                  for alias in column.partials]
+        current = state.get(column.header)
+        if column.function == 'AVG':
+            total, count = current or (None, 0)
+            if values[0] is not None:
+                total = values[0] if total is None else total + values[0]
+            state[column.header] = (total, count + (values[1] or 0))
+            return
+        value = values[0]
+        if value is None:
+            state.setdefault(column.header, None)
+        elif current is None:
+            state[column.header] = value
+        elif column.function in ('SUM', 'COUNT'):
+            state[column.header] = current + value
+        elif column.function == 'MIN':
+            state[column.header] = min(current, value)
+        else:
+            state[column.header] = max(current, value)
+
+    @staticmethod
+    def _final(column, state):
+        value = state.get(column.header)
+        if column.function == 'AVG':
+            total, count = value or (None, 0)
+            return total / count if count and total is not None else None
+        if column.function == 'COUNT' and value is None:
+            return 0
+        return value
+
+
+def _sort_key(value):
+    """NULL di awal seperti isql untuk ASC"""
+    if value is None:
+        return (0, 0, '')
+    if isinstance(value, (int, float)):
+        return (1, value, '')
+    return (2, 0, str(value))
+
+
+def plan_aggregate(query):
+    """
+    Buat rencana pushdown agregat
+
+    :param query: Query SELECT dengan fungsi agregat
+    :return: AggregatePlan, atau None jika query tidak bisa ditulis ulang
+    """
+    query = query.strip().rstrip(';').strip()
+    match = _SELECT_RE.match(query)
+    if not match or ';' in query:
+        return None
+    body = match.group(1)
+    if re.match(r'(FIRST|SKIP|DISTINCT)\b', body, re.IGNORECASE):
+        return None
+    for words in (('UNION',), ('HAVING',), ('ROWS',), ('PLAN',), ('FOR', 'UPDATE')):
+        if find_keyword(body, *words):
+            return None
+
+    from_pos = find_keyword(body, 'FROM')
+    if not from_pos:
+        return None
+    select_list = body[:from_pos[0]]
+    rest = body[from_pos[1]:]
+
+    order_pos = find_keyword(rest, 'ORDER', 'BY')
+    order_text = rest[order_pos[1]:] if order_pos else ''
+    rest = rest[:order_pos[0]] if order_pos else rest
+    group_pos = find_keyword(rest, 'GROUP', 'BY')
+    group_text = rest[group_pos[1]:] if group_pos else ''
+    from_text = (rest[:group_pos[0]] if group_pos else rest).strip()
+
+    group_exprs = [normalize_expression(expr) for expr in split_top_level(group_text)] if group_text.strip() else []
+
+    columns = []
+    seen_headers = set()
+    partial_items = []
+    for index, item in enumerate(split_top_level(select_list)):
+        if not item or item == '*' or item.endswith('.*'):
+            return None
+        expr, alias = _split_alias(item)
+        aggregate = _parse_aggregate(expr)
+        if aggregate is None:
+            # Kolom non-agregat harus ada di GROUP BY
+            if normalize_expression(expr) not in group_exprs:
+                return None
+            column = AggregateColumn(alias or default_header(expr), expr)
+            column.partials = [f"G{index}"]
+            partial_items.append(f"{expr} AS G{index}")
+        else:
+            function, argument = aggregate
+            if re.match(r'DISTINCT\b', argument, re.IGNORECASE) or not argument:
+                return None
+            column = AggregateColumn(alias or function, expr, function, argument)
+            if function == 'AVG':
+                column.partials = [f"A{index}_SUM", f"A{index}_CNT"]
+                partial_items.append(f"SUM({argument}) AS A{index}_SUM")
+                partial_items.append(f"COUNT({argument}) AS A{index}_CNT")
+            else:
+                column.partials = [f"A{index}"]
+                partial_items.append(f"{function}({argument}) AS A{index}")
+
+        # Nama kolom output harus unik karena baris disimpan sebagai dict
+        header = column.header
+        suffix = 2
+        while column.header in seen_headers:
+            column.header = f"{header}_{suffix}"
+            suffix += 1
+        seen_headers.add(column.header)
+        columns.append(column)
+
+    if not any(column.function for column in columns):
+        return None
+
+    order_by = []
+    if order_text.strip():
+        for item in split_top_level(order_text):
+            parts = item.split()
+            descending = False
+            if parts and parts[-1].upper() in ('ASC', 'DESC', 'ASCENDING', 'DESCENDING'):
+                descending = parts.pop().upper().startswith('DESC')
+            expr = ' '.join(parts)
+            index = _resolve_order_column(expr, columns)
+            if index is None:
+                return None
+            order_by.append((index, descending))
+
+    client_query = f"SELECT {', '.join(partial_items)} FROM {from_text}"
+    if group_text.strip():
+        client_query += f" GROUP BY {group_text.strip()}"
+    return AggregatePlan(query, columns, client_query, order_by)
+
+
+def _resolve_order_column(expr, columns):
+    """Cari kolom output untuk item ORDER BY (posisi, alias/nama kolom, atau ekspresi)"""
+    if expr.isdigit():
+        index = int(expr) - 1
+        return index if 0 <= index < len(columns) else None
+    normalized = normalize_expression(expr)
+    for index, column in enumerate(columns):
+        if normalized in (column.header, normalize_expression(column.expr)):
+            return index
+    return None
@@ -0,0 +1,181 @@
+"""
+Registry client dengan snapshot copy-on-write.
+
+Pembaca (UI, heartbeat, fan-out query) mengambil snapshot daftar client tanpa
+lock: snapshot adalah mapping read-only yang tidak pernah diubah, setiap
+perubahan registry menerbitkan mapping baru. Lock registry hanya dipegang
+sebentar saat menambah/menghapus client dan tidak pernah selama I/O. State
+per client (request tertunda, daftar tabel, socket) dilindungi lock milik
+client itu sendiri.
+
+InstrumentedLock mencatat waktu tunggu dan lama lock dipegang agar
+contention dapat dipantau.
+"""
+import threading
+import time
+from types import MappingProxyType
+
+SLOW_HOLD_SECONDS = 0.1
+
+
+class InstrumentedLock:
+    """threading.Lock yang mencatat statistik contention"""
+    def __init__(self, name, slow_hold=SLOW_HOLD_SECONDS):
+        self.name = name
+        self.slow_hold = slow_hold
+        self._lock = threading.Lock()
+        self._acquired_at = 0.0
+        self._reset()
+
+    def _reset(self):
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+        self.slow_holds = 0
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(False):
+            waited = 0.0
+        else:
+            if not blocking:
+                return False
+            start = time.perf_counter()
+            if not self._lock.acquire(True, timeout):
+                return False
+            waited = time.perf_counter() - start
+            self.contended += 1
+
+        # Statistik hanya diubah selama lock dipegang
+        self.acquisitions += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self._acquired_at = time.perf_counter()
+        return True
+
+    def release(self):
+        held = time.perf_counter() - self._acquired_at
+        self.hold_total += held
+        self.hold_max = max(self.hold_max, held)
+        if held > self.slow_hold:
+            self.slow_holds += 1
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def stats(self, reset=False):
+        """
+        Statistik contention sejak reset terakhir
+
+        :param reset: Reset statistik setelah dibaca
+        :return: Dict statistik (waktu dalam detik)
+        """
+        # Lock internal langsung, agar pembacaan statistik tidak ikut tercatat
+        with self._lock:
+            stats = {
+                'name': self.name,
+                'acquisitions': self.acquisitions,
+                'contended': self.contended,
+                'wait_total': self.wait_total,
+                'wait_max': self.wait_max,
+                'hold_total': self.hold_total,
+                'hold_max': self.hold_max,
+                'slow_holds': self.slow_holds
+            }
+            if reset:
+                self._reset()
+        return stats
+
+
+def format_lock_stats(stats):
+    """Ringkasan statistik lock untuk log"""
+    return (f"{stats['name']}: {stats['acquisitions']} acquire, {stats['contended']} menunggu "
+            f"(maks {stats['wait_max'] * 1000:.1f} ms), dipegang maks {stats['hold_max'] * 1000:.1f} ms, "
+            f"{stats['slow_holds']} lambat")
+
+
+class ClientRegistry:
+    """Daftar client terhubung dengan pembacaan lock-free"""
+    def __init__(self):
+        self.lock = InstrumentedLock("client_registry")
+        self._clients = MappingProxyType({})
+
+    def snapshot(self):
+        """Mapping client_id -> client (read-only) saat ini; tidak berubah walaupun registry berubah"""
+        return self._clients
+
+    def get(self, client_id):
+        return self._clients.get(client_id)
+
+    def connected(self):
+        """List client yang sedang terhubung"""
+        return [client for client in self._clients.values() if client.is_connected]
+
+    def find_by_name(self, display_name):
+        for client in self._clients.values():
+            if client.display_name == display_name:
+                return client
+        return None
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __contains__(self, client_id):
+        return client_id in self._clients
+
+    def __iter__(self):
+        return iter(self._clients)
+
+    def _publish(self, clients):
+        # Penggantian referensi atomik; pembaca melihat snapshot lama atau baru, tidak pernah setengah jadi
+        self._clients = MappingProxyType(clients)
+
+    def register(self, client_id, resume, create):
+        """
+        Daftarkan client secara atomik
+
+        :param resume: Callable(existing) -> bool; True jika entri lama dipakai ulang
+        :param create: Callable() -> client baru
+        :return: Tuple (client, resumed)
+        """
+        with self.lock:
+            existing = self._clients.get(client_id)
+            if existing is not None and resume(existing):
+                return existing, True
+            client = create()
+            clients = dict(self._clients)
+            clients[client_id] = client
+            self._publish(clients)
+            return client, False
+
+    def add(self, client):
+        with self.lock:
+            clients = dict(self._clients)
+            clients[client.client_id] = client
+            self._publish(clients)
+
+    def remove(self, client_id):
+        with self.lock:
+            if client_id not in self._clients:
+                return None
+            clients = dict(self._clients)
+            client = clients.pop(client_id)
+            self._publish(clients)
+            return client
+
+    def clear(self):
+        """Kosongkan registry dan kembalikan client yang terakhir terdaftar"""
+        with self.lock:
+            clients = list(self._clients.values())
+            self._publish({})
+            return clients
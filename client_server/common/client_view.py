@@ -0,0 +1,132 @@
+"""
+Index daftar client untuk panel client dan pemilih target di server.
+
+Setiap client direpresentasikan oleh satu baris dengan key client_id. update()
+membandingkan snapshot registry dengan baris sebelumnya dan hanya melaporkan
+baris yang ditambah, berubah atau dihapus, sehingga Treeview cukup mengubah
+item tersebut. Teks pencarian (nama, database/estate, status) disiapkan sekali
+per perubahan baris, dan label pemilih target dipetakan langsung ke client_id
+tanpa parsing string.
+"""
+
+STATUS_CONNECTED = "Connected"
+STATUS_DISCONNECTED = "Disconnected"
+ALL_CLIENTS_LABEL = "All Clients"
+_STATUS_WORDS = {STATUS_CONNECTED.lower(): STATUS_CONNECTED, STATUS_DISCONNECTED.lower(): STATUS_DISCONNECTED}
+
+
+class ClientRow:
+    """Nilai yang ditampilkan untuk satu client"""
+    __slots__ = ('client_id', 'name', 'status', 'database', 'search_text')
+
+    def __init__(self, client_id, name, status, database):
+        self.client_id = client_id
+        self.name = name
+        self.status = status
+        self.database = database
+        self.search_text = f"{name}\n{database}\n{client_id}".lower()
+
+    @classmethod
+    def from_client(cls, client):
+        return cls(client.client_id, client.display_name,
+                   STATUS_CONNECTED if client.is_connected else STATUS_DISCONNECTED,
+                   client.db_info.get('name', '') if client.db_info else '')
+
+    @property
+    def connected(self):
+        return self.status == STATUS_CONNECTED
+
+    @property
+    def values(self):
+        return (self.name, self.status, self.database)
+
+    @property
+    def sort_key(self):
+        return (self.name.lower(), self.client_id)
+
+    def __eq__(self, other):
+        return isinstance(other, ClientRow) and self.values == other.values and self.client_id == other.client_id
+
+
+class ClientIndex:
+    """Baris client per client_id, dengan filter dan pemetaan label target"""
+    def __init__(self):
+        self.rows = {}  # client_id -> ClientRow
+        self._target_ids = {}  # label pemilih target -> client_id
+        self._targets = None  # Cache label target; None jika perlu dihitung ulang
+
+    def __len__(self):
+        return len(self.rows)
+
+    def update(self, clients):
+        """
+        Sinkronkan dengan snapshot registry
+
+        :param clients: Mapping client_id -> client
+        :return: Tuple (list client_id baru, list client_id berubah, list client_id dihapus)
+        """
+        added, changed = [], []
+        removed = [client_id for client_id in self.rows if client_id not in clients]
+        for client_id in removed:
+            del self.rows[client_id]
+        for client_id, client in clients.items():
+            row = ClientRow.from_client(client)
+            previous = self.rows.get(client_id)
+            if previous is None:
+                added.append(client_id)
+            elif previous != row:
+                changed.append(client_id)
+            else:
+                continue
+            self.rows[client_id] = row
+        if added or changed or removed:
+            self._targets = None
+        return added, changed, removed
+
+    def filter(self, text=""):
+        """
+        client_id yang cocok dengan teks pencarian, urut nama
+
+        Semua kata harus muncul di nama, database/estate atau ID; kata
+        "connected"/"disconnected" memfilter status. Misalnya "pge connected".
+        """
+        words = text.lower().split()
+        # Status dicocokkan persis, karena "connected" adalah bagian dari "disconnected"
+        statuses = {_STATUS_WORDS[word] for word in words if word in _STATUS_WORDS}
+        words = [word for word in words if word not in _STATUS_WORDS]
+        rows = self.rows.values()
+        if words or statuses:
+            rows = [row for row in rows if (not statuses or row.status in statuses)
+                    and all(word in row.search_text for word in words)]
+        return [row.client_id for row in sorted(rows, key=lambda row: row.sort_key)]
+
+    def target_labels(self):
+        """Label pemilih target: "All Clients" lalu client yang terhubung"""
+        if self._targets is None:
+            self._target_ids = {}
+            for row in sorted(self.rows.values(), key=lambda row: row.sort_key):
+                if row.connected:
+                    self._target_ids[f"{row.name} ({row.client_id})"] = row.client_id
+            self._targets = [ALL_CLIENTS_LABEL] + list(self._target_ids)
+        return self._targets
+
+    def resolve_target(self, label):
+        """
+        client_id untuk label target; None untuk semua client
+
+        Teks yang diketik manual dicocokkan dengan client_id atau nama client.
+
+        :raises KeyError: Jika tidak ada client yang cocok
+        """
+        label = label.strip()
+        if not label or label == ALL_CLIENTS_LABEL:
+            return None
+        self.target_labels()
+        if label in self._target_ids:
+            return self._target_ids[label]
+        if label in self.rows:
+            return label
+        for row in self.rows.values():
+            if row.name == label:
+                return row.client_id
+        raise KeyError(label)
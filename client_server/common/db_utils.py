@@ -4,6 +4,8 @@ import json
 import tempfile
 import re
 
+from common.query_plan import parse_plan
+
 class FirebirdConnector:
     """
     Utilitas untuk koneksi ke database Firebird menggunakan isql
@@ -268,10 +270,10 @@ class FirebirdConnector:
                 
             # If we found header/separator, collect data rows
             if has_separator_line and possible_header_line:
-                # Skip lines immediately after separator that might be empty or contain column info
-                if i > 0 and lines[i-1].rstrip() and ('=' * 3) in lines[i-1] or ('-' * 3) in lines[i-1]:
+                # Baris header yang diulang (isql -page) bukan data
+                if line == possible_header_line:
                     continue
-                    
+
                 data_lines.append(line)
             
         # Process collected data if we have a header
@@ -564,6 +566,49 @@ class FirebirdConnector:
         print(f"Detected positions: {positions}")
         return positions
             
+    def get_plan(self, query):
+        """
+        Ambil plan query tanpa menjalankannya (SET PLANONLY ON: query hanya di-prepare)
+        
+        :param query: Query SQL
+        :return: List baris plan ('PLAN ...'), satu per query/subquery
+        """
+        fd, sql_path = tempfile.mkstemp(suffix='.sql')
+        output_fd, output_path = tempfile.mkstemp(suffix='.txt')
+        os.close(output_fd)
+        connection_string = f"localhost:{self.db_path}"
+        
+        try:
+            with os.fdopen(fd, 'w') as sql_file:
+                sql_file.write(f"CONNECT \"{connection_string}\" USER {self.username} PASSWORD {self.password};\n")
+                sql_file.write("SET PLANONLY ON;\n")
+                sql_file.write(f"{query};\n")
+                sql_file.write("EXIT;\n")
+            
+            cmd = [
+                self.isql_path,
+                "-user", self.username,
+                "-password", self.password,
+                connection_string,
+                "-i", sql_path,
+                "-o", output_path,
+                "-m"
+            ]
+            try:
+                subprocess.run(cmd, check=True, capture_output=True)
+            except subprocess.CalledProcessError as cpe:
+                with open(output_path, 'r') as output_file:
+                    lines = [line for line in output_file.read().splitlines() if not line.startswith("Database:")]
+                detail = "\n".join(lines).strip() or (cpe.stderr.decode() if cpe.stderr else 'Unknown error')
+                raise Exception(f"Error mengambil plan query: {detail}")
+            
+            with open(output_path, 'r') as output_file:
+                return parse_plan(output_file.read())
+        finally:
+            for path in (sql_path, output_path):
+                if os.path.exists(path):
+                    os.unlink(path)
+            
     def test_connection(self):
         """
         Tes koneksi ke database
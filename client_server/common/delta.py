@@ -0,0 +1,315 @@
+"""
+Transfer hasil query secara delta berdasarkan hash baris.
+
+Query monitoring yang dijalankan berulang biasanya hanya berubah sedikit.
+Client menyimpan hash baris dari hasil terakhir yang dikirim untuk setiap
+delta key (misalnya nama job) dan hanya mengirim baris yang ditambah/diubah
+serta identitas baris yang dihapus. Server menyimpan salinan hasil terakhir
+per client dan delta key, menerapkan delta, lalu memverifikasi hasilnya
+dengan hash hasil.
+
+Identitas baris adalah hash isi baris, atau hash kolom kunci jika
+key_columns diberikan (baris yang berubah dikirim sebagai update). Hash
+hasil tidak bergantung pada urutan baris sehingga server dapat menghitungnya
+secara bertahap. Urutan baris dikirim terpisah sebagai daftar segmen: rentang
+posisi baris lama yang tetap, atau sejumlah baris dari upsert; server menyusun
+ulang hasil dengan urutan yang sama seperti di client.
+"""
+import hashlib
+import json
+import threading
+from collections import Counter, OrderedDict
+
+MODE_FULL = 'full'
+MODE_DELTA = 'delta'
+HASH_MODULUS = 2 ** 128
+DEFAULT_MAX_KEYS = 100     # Jumlah delta key yang disimpan client
+DEFAULT_MAX_BASES = 1000   # Jumlah salinan hasil (client, key) yang disimpan server
+
+
+class DeltaError(Exception):
+    """Delta tidak dapat diterapkan pada salinan hasil di server"""
+    pass
+
+
+def _digest(values):
+    text = json.dumps(values, default=str, ensure_ascii=False, separators=(',', ':'))
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(), 'big')
+
+
+def row_hash(headers, row):
+    """Hash isi satu baris (int 128 bit) sesuai urutan headers"""
+    return _digest([row.get(header) for header in headers])
+
+
+def row_identity(headers, row, key_columns=None):
+    """Identitas baris: hash kolom kunci, atau hash seluruh baris jika tanpa kunci"""
+    if key_columns:
+        return _digest([row.get(column) for column in key_columns])
+    return row_hash(headers, row)
+
+
+def result_hash(headers, row_hashes_total):
+    """Hash hasil dari headers dan jumlah hash baris (tidak bergantung urutan)"""
+    return format((_digest(list(headers)) + row_hashes_total) % HASH_MODULUS, '032x')
+
+
+def _hex(value):
+    return format(value, '032x')
+
+
+class RowState:
+    """Hash baris hasil terakhir yang dikirim client untuk satu delta key"""
+    def __init__(self, headers, key_columns=None):
+        self.headers = list(headers)
+        self.key_columns = list(key_columns) if key_columns else None
+        self.rows = {} if self.key_columns else Counter()  # identitas -> hash baris / jumlah baris
+        self.order = []  # identitas baris sesuai urutan hasil
+        self.total = 0
+        self.hash = None
+
+    @classmethod
+    def build(cls, headers, rows, key_columns=None):
+        """
+        Hitung state dari baris hasil
+
+        :return: Tuple (state, dict identitas -> baris); None jika kolom kunci tidak unik
+        """
+        state = cls(headers, key_columns)
+        by_identity = {}
+        for row in rows:
+            hashed = row_hash(state.headers, row)
+            if state.key_columns:
+                identity = row_identity(state.headers, row, state.key_columns)
+                if identity in state.rows:
+                    return None, None
+                state.rows[identity] = hashed
+            else:
+                identity = hashed
+                state.rows[identity] += 1
+            by_identity[identity] = row
+            state.order.append(identity)
+            state.total += hashed
+        state.hash = result_hash(state.headers, state.total)
+        return state, by_identity
+
+
+class DeltaTracker:
+    """State hasil terakhir per delta key di sisi client"""
+    def __init__(self, max_keys=DEFAULT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._states = OrderedDict()  # delta key -> RowState
+        self._lock = threading.Lock()
+
+    def prepare(self, key, base, result, key_columns=None):
+        """
+        Siapkan hasil yang dikirim ke server
+
+        :param key: Delta key dari server
+        :param base: Hash hasil yang dimiliki server (None jika server belum punya salinan)
+        :param result: List result set hasil query
+        :return: Tuple (result yang dikirim, info delta untuk server)
+        """
+        if len(result) != 1:
+            # Delta hanya untuk satu result set
+            with self._lock:
+                self._states.pop(key, None)
+            return result, None
+
+        headers = list(result[0].get('headers', []))
+        state, by_identity = RowState.build(headers, result[0].get('rows', []), key_columns)
+        if state is None:
+            # Kolom kunci tidak unik: kirim penuh dengan identitas isi baris
+            key_columns = None
+            state, by_identity = RowState.build(headers, result[0].get('rows', []))
+
+        with self._lock:
+            previous = self._states.pop(key, None)
+            self._states[key] = state
+            while len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+
+        info = {'key': key, 'hash': state.hash, 'key_columns': state.key_columns}
+        if (previous is None or base is None or previous.hash != base
+                or previous.headers != state.headers or previous.key_columns != state.key_columns):
+            info['mode'] = MODE_FULL
+            return result, info
+
+        if state.key_columns:
+            deleted = [_hex(identity) for identity in previous.rows if identity not in state.rows]
+        else:
+            deleted = [_hex(identity) for identity, count in (previous.rows - state.rows).items()
+                       for _ in range(count)]
+        upserts, order = self._order(previous, state, by_identity)
+
+        info.update({'mode': MODE_DELTA, 'base': base, 'deleted': deleted, 'order': order})
+        return [{'headers': headers, 'rows': upserts}], info
+
+    @staticmethod
+    def _order(previous, state, by_identity):
+        """
+        Baris upsert dan segmen urutan hasil baru
+
+        :return: Tuple (list baris upsert, list segmen [posisi lama, jumlah] atau [None, jumlah] untuk upsert)
+        """
+        positions = {}  # identitas -> posisi di hasil lama yang belum dipakai
+        for index in range(len(previous.order) - 1, -1, -1):
+            positions.setdefault(previous.order[index], []).append(index)
+        upserts = []
+        order = []
+        for identity in state.order:
+            available = positions.get(identity)
+            unchanged = available and (not state.key_columns or previous.rows[identity] == state.rows[identity])
+            start = available.pop() if unchanged else None
+            if start is None:
+                upserts.append(by_identity[identity])
+            last = order[-1] if order else None
+            if last is not None and (last[0] is None if start is None else
+                                     last[0] is not None and last[0] + last[1] == start):
+                last[1] += 1
+            else:
+                order.append([start, 1])
+        return upserts, order
+
+    def forget(self, key):
+        with self._lock:
+            self._states.pop(key, None)
+
+
+class DeltaBase:
+    """Salinan hasil terakhir di server untuk satu client dan delta key"""
+    def __init__(self, headers, key_columns=None):
+        self.headers = list(headers)
+        self.key_columns = list(key_columns) if key_columns else None
+        self.rows = {}  # identitas -> baris (dengan kunci) atau list baris (tanpa kunci)
+        self.row_hashes = {}  # identitas -> hash baris (hanya dengan kunci)
+        self.order = []  # baris sesuai urutan hasil client
+        self.total = 0
+        self.hash = None
+
+    def __len__(self):
+        if self.key_columns:
+            return len(self.rows)
+        return sum(len(rows) for rows in self.rows.values())
+
+    def _add(self, row):
+        hashed = row_hash(self.headers, row)
+        if self.key_columns:
+            identity = row_identity(self.headers, row, self.key_columns)
+            previous = self.row_hashes.get(identity)
+            if previous is not None:
+                self.total -= previous
+            self.rows[identity] = row
+            self.row_hashes[identity] = hashed
+        else:
+            self.rows.setdefault(hashed, []).append(row)
+        self.total += hashed
+
+    def _delete(self, identity):
+        if self.key_columns:
+            if identity not in self.rows:
+                raise DeltaError("Baris yang dihapus tidak ada di salinan server")
+            del self.rows[identity]
+            self.total -= self.row_hashes.pop(identity)
+            return
+        rows = self.rows.get(identity)
+        if not rows:
+            raise DeltaError("Baris yang dihapus tidak ada di salinan server")
+        rows.pop()
+        if not rows:
+            del self.rows[identity]
+        self.total -= identity
+
+    @classmethod
+    def from_result(cls, result_set, key_columns=None):
+        base = cls(result_set.get('headers', []), key_columns)
+        for row in result_set.get('rows', []):
+            base._add(row)
+            base.order.append(row)
+        base.hash = result_hash(base.headers, base.total)
+        return base
+
+    def apply(self, info, result_set):
+        """
+        Terapkan delta (penghapusan lalu upsert) dan susun ulang baris sesuai
+        segmen urutan dari client
+        """
+        if list(result_set.get('headers', [])) != self.headers:
+            raise DeltaError("Kolom hasil berubah")
+        if info.get('order') is None:
+            raise DeltaError("Urutan baris tidak ada di delta")
+        upserts = result_set.get('rows', [])
+        for identity in info.get('deleted', []):
+            self._delete(int(identity, 16))
+        for row in upserts:
+            self._add(row)
+        self.hash = result_hash(self.headers, self.total)
+
+        order = []
+        taken = 0
+        for start, count in info['order']:
+            if start is None:
+                segment = upserts[taken:taken + count]
+                taken += count
+            elif start < 0 or start + count > len(self.order):
+                raise DeltaError("Segmen urutan di luar salinan server")
+            else:
+                segment = self.order[start:start + count]
+            order.extend(segment)
+        if taken != len(upserts) or len(order) != len(self):
+            raise DeltaError("Urutan baris tidak cocok dengan salinan server")
+        self.order = order
+
+    def result(self):
+        """Hasil lengkap dalam format result set"""
+        return [{'headers': list(self.headers), 'rows': list(self.order)}]
+
+
+class DeltaCache:
+    """Salinan hasil per (client_id, delta key) di server, LRU"""
+    def __init__(self, max_bases=DEFAULT_MAX_BASES):
+        self.max_bases = max_bases
+        self._bases = OrderedDict()
+        self._lock = threading.Lock()
+
+    def base_hash(self, client_id, key):
+        """Hash salinan yang dimiliki server, dikirim ke client bersama query"""
+        with self._lock:
+            base = self._bases.get((client_id, key))
+            return base.hash if base is not None else None
+
+    def discard(self, client_id, key):
+        with self._lock:
+            self._bases.pop((client_id, key), None)
+
+    def receive(self, client_id, info, result):
+        """
+        Terima hasil dari client dan kembalikan hasil lengkap
+
+        :param info: Info delta dari client
+        :param result: Result yang dikirim client (penuh atau delta)
+        :return: Tuple (hasil lengkap, jumlah baris yang dikirim client)
+        :raises DeltaError: Jika delta tidak cocok dengan salinan server
+        """
+        cache_key = (client_id, info.get('key'))
+        sent_rows = sum(len(result_set.get('rows', [])) for result_set in result)
+        if info.get('mode') == MODE_DELTA:
+            with self._lock:
+                base = self._bases.pop(cache_key, None)
+            if base is None or base.hash != info.get('base'):
+                raise DeltaError("Salinan server tidak sesuai dengan base delta")
+            base.apply(info, result[0])
+            if base.hash != info.get('hash'):
+                raise DeltaError("Hash hasil tidak cocok setelah delta diterapkan")
+        else:
+            base = DeltaBase.from_result(result[0], info.get('key_columns'))
+            if base.hash != info.get('hash'):
+                # Nilai tidak terbaca sama seperti di client: hasil dipakai, tapi tidak menjadi base delta
+                return result, sent_rows
+
+        with self._lock:
+            self._bases[cache_key] = base
+            self._bases.move_to_end(cache_key)
+            while len(self._bases) > self.max_bases:
+                self._bases.popitem(last=False)
+        return base.result(), sent_rows
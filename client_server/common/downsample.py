@@ -0,0 +1,70 @@
+"""
+Downsampling seri waktu untuk grafik tren.
+
+LTTB (Largest-Triangle-Three-Buckets) memilih satu titik per bucket, yaitu
+titik yang membentuk segitiga terbesar dengan titik terpilih sebelumnya dan
+rata-rata bucket berikutnya. Puncak dan lembah tetap terlihat walaupun
+jumlah titik dikurangi sampai kira-kira satu titik per piksel.
+"""
+
+
+def lttb(points, threshold):
+    """
+    Kurangi titik dengan algoritma LTTB
+
+    :param points: List tuple (x, y) urut berdasarkan x
+    :param threshold: Jumlah titik hasil (minimal 3)
+    :return: List tuple (x, y); titik pertama dan terakhir selalu ikut
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (count - 2) / (threshold - 2)
+    selected = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Rata-rata bucket berikutnya (titik terakhir untuk bucket terakhir)
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        if next_start >= next_end:
+            next_start, next_end = count - 1, count
+        span = next_end - next_start
+        avg_x = sum(points[i][0] for i in range(next_start, next_end)) / span
+        avg_y = sum(points[i][1] for i in range(next_start, next_end)) / span
+
+        ax, ay = points[selected]
+        best_area = -1.0
+        best = start
+        for i in range(start, end):
+            x, y = points[i]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = i
+        sampled.append(points[best])
+        selected = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def plot_coords(points, x_range, y_range, width, height, margin=0):
+    """
+    Konversi titik (x, y) ke koordinat canvas datar [x0, y0, x1, y1, ...]
+
+    :param x_range: Tuple (x_min, x_max) area yang terlihat
+    :param y_range: Tuple (y_min, y_max); sumbu y canvas terbalik
+    """
+    x_min, x_max = x_range
+    y_min, y_max = y_range
+    x_scale = (width - 2 * margin) / ((x_max - x_min) or 1)
+    y_scale = (height - 2 * margin) / ((y_max - y_min) or 1)
+    coords = []
+    for x, y in points:
+        coords.append(margin + (x - x_min) * x_scale)
+        coords.append(height - margin - (y - y_min) * y_scale)
+    return coords
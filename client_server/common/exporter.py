@@ -0,0 +1,224 @@
+"""
+Export hasil query ke file secara streaming.
+
+Baris dibaca per potongan dari sumber (ResultStore, hasil gabungan atau
+remote cursor) dan langsung ditulis ke file, sehingga memori tetap konstan
+berapa pun jumlah barisnya. Format yang didukung:
+
+- csv: quoting standar (modul csv), UTF-8 dengan BOM agar terbaca Excel
+- jsonl: satu objek JSON per baris
+- xlsx: workbook Office Open XML yang ditulis langsung ke zip (inline
+  string, tanpa shared string table), terbaca Excel dan LibreOffice. Sheet
+  baru dibuat jika baris melebihi batas satu sheet.
+
+File ditulis ke <nama>.part lalu di-rename setelah selesai; jika dibatalkan
+file sementara dihapus.
+"""
+import csv
+import json
+import os
+import re
+import threading
+import zipfile
+from xml.sax.saxutils import escape
+
+CHUNK_ROWS = 5000
+XLSX_MAX_ROWS = 1048576
+FORMATS = ('csv', 'jsonl', 'xlsx')
+
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_NUMBER = re.compile(r'-?(0|[1-9]\d{0,14})(\.\d+)?$')
+
+
+class ExportCancelled(Exception):
+    """Export dibatalkan pengguna"""
+    pass
+
+
+def format_for(path):
+    """Format export dari ekstensi file (default csv)"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension in ('json', 'jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension == 'xlsx':
+        return 'xlsx'
+    return 'csv'
+
+
+class CsvWriter:
+    def __init__(self, path, headers):
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+
+    def write_rows(self, rows):
+        self._writer.writerows(["" if value is None else value for value in row] for row in rows)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlWriter:
+    def __init__(self, path, headers):
+        self._file = open(path, 'w', encoding='utf-8')
+        self._headers = list(headers)
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._file.write(json.dumps(dict(zip(self._headers, row)), ensure_ascii=False, default=str))
+            self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+
+class XlsxWriter:
+    """Penulis XLSX minimal yang streaming langsung ke entri zip"""
+    def __init__(self, path, headers, max_rows=XLSX_MAX_ROWS):
+        self._zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        self._headers = list(headers)
+        self._max_rows = max_rows
+        self._sheets = 0
+        self._sheet = None
+        self._row = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self._close_sheet()
+        self._sheets += 1
+        self._sheet = self._zip.open(f"xl/worksheets/sheet{self._sheets}.xml", 'w', force_zip64=True)
+        self._sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                          b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                          b'<sheetData>')
+        self._row = 0
+        self._write_row(self._headers)
+
+    def _close_sheet(self):
+        if self._sheet is not None:
+            self._sheet.write(b'</sheetData></worksheet>')
+            self._sheet.close()
+            self._sheet = None
+
+    @staticmethod
+    def _cell(value):
+        if value is None or value == "":
+            return '<c/>'
+        # Angka ditulis sebagai angka; kode dengan nol di depan atau angka panjang tetap teks
+        if not isinstance(value, bool) and _NUMBER.match(str(value).strip()):
+            return f'<c><v>{str(value).strip()}</v></c>'
+        text = escape(_ILLEGAL_XML.sub('', str(value)))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+    def _write_row(self, values):
+        self._row += 1
+        cells = "".join(self._cell(value) for value in values)
+        self._sheet.write(f'<row r="{self._row}">{cells}</row>'.encode('utf-8'))
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self._row >= self._max_rows:
+                self._new_sheet()
+            self._write_row(row)
+
+    def close(self):
+        self._close_sheet()
+        sheets = range(1, self._sheets + 1)
+        self._zip.writestr("[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                      'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                      for i in sheets)
+            + '</Types>')
+        self._zip.writestr("_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>')
+        self._zip.writestr("xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + "".join(f'<sheet name="Result{"" if i == 1 else f" {i}"}" sheetId="{i}" r:id="rId{i}"/>' for i in sheets)
+            + '</sheets></workbook>')
+        self._zip.writestr("xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(f'<Relationship Id="rId{i}" '
+                      'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                      f'Target="worksheets/sheet{i}.xml"/>' for i in sheets)
+            + '</Relationships>')
+        self._zip.close()
+
+
+WRITERS = {'csv': CsvWriter, 'jsonl': JsonlWriter, 'xlsx': XlsxWriter}
+
+
+def source_chunks(source, chunk_rows=CHUNK_ROWS):
+    """Potongan baris (list tuple nilai) dari sumber grid (ListSource, MergedSource)"""
+    for start in range(0, len(source), chunk_rows):
+        yield source.get(start, min(start + chunk_rows, len(source)))
+
+
+def remote_chunks(remote_cursor, headers, timeout=120):
+    """
+    Potongan baris dari RemoteCursor, halaman demi halaman sampai habis. Setiap
+    halaman ditunggu secara sinkron (dipanggil dari thread export, bukan UI thread).
+    """
+    page = 0
+    while remote_cursor.last_page is None or page <= remote_cursor.last_page:
+        done = threading.Event()
+        result = {}
+
+        def on_page(rows, error):
+            result['rows'], result['error'] = rows, error
+            done.set()
+
+        remote_cursor.get_page(page, on_page)
+        if not done.wait(timeout):
+            raise TimeoutError(f"Halaman {page + 1} tidak diterima dalam {timeout} detik")
+        if result['error']:
+            raise RuntimeError(result['error'])
+        rows = result['rows'] or []
+        yield [tuple(row.get(header) for header in headers) for row in rows]
+        if not rows:
+            break
+        page += 1
+
+
+def export_rows(path, fmt, headers, chunks, progress=None, cancel=None):
+    """
+    Tulis semua potongan baris ke file
+
+    :param chunks: Iterable list tuple nilai sesuai urutan headers
+    :param progress: Callable(jumlah baris yang sudah ditulis)
+    :param cancel: threading.Event untuk membatalkan
+    :return: Jumlah baris yang ditulis
+    :raises ExportCancelled: Jika dibatalkan (file sementara dihapus)
+    """
+    temp_path = path + ".part"
+    writer = WRITERS[fmt](temp_path, headers)
+    written = 0
+    try:
+        for rows in chunks:
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled()
+            writer.write_rows(rows)
+            written += len(rows)
+            if progress:
+                progress(written)
+        writer.close()
+        os.replace(temp_path, path)
+        return written
+    except BaseException:
+        try:
+            writer.close()
+        except Exception:
+            pass
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
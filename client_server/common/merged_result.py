@@ -0,0 +1,312 @@
+"""
+Gabungan hasil query dari banyak client dalam satu tabel.
+
+Hasil dari setiap client disimpan sebagai segmen di ResultStore (kolumnar,
+ikut budget memori bersama dan dapat di-spill ke SQLite), dengan kolom pertama
+berisi nama client/estate. Filter, sort dan total dihitung di model ini, bukan
+per widget, dan hasil dapat ditambahkan secara bertahap saat tiap client menjawab.
+"""
+import bisect
+import threading
+
+from common.result_store import ResultStore, ResultHandle
+
+CLIENT_COLUMN = "CLIENT"
+DEFAULT_MAX_ROWS = 200000
+SCAN_CHUNK_ROWS = 5000
+
+
+def to_number(value):
+    """Konversi nilai ke float jika berupa angka, selain itu None"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        text = str(value).strip()
+        return float(text) if text else None
+    except ValueError:
+        return None
+
+
+def sort_key(value):
+    """Kunci sort bertipe: angka, lalu teks, lalu nilai kosong"""
+    number = to_number(value)
+    if number is not None:
+        return (0, number, '')
+    if value is None or str(value).strip() in ('', '<null>'):
+        return (2, 0, '')
+    return (1, 0, str(value).lower())
+
+
+class _Segment:
+    """Baris satu kali append: handle ResultStore dan jumlah baris yang dipakai"""
+    __slots__ = ('client_name', 'handle', 'count')
+
+    def __init__(self, client_name, handle, count):
+        self.client_name = client_name
+        self.handle = handle
+        self.count = count
+
+
+class MergedResult:
+    """Hasil gabungan lintas client; baris disimpan per segmen di ResultStore"""
+    def __init__(self, query, max_rows=DEFAULT_MAX_ROWS, store=None):
+        """
+        :param store: ResultStore untuk baris (budget memori server); None untuk store sendiri
+        """
+        self.query = query
+        self.max_rows = max_rows
+        self.store = store if store is not None else ResultStore()
+        self.truncated = False
+        self.version = 0  # Bertambah setiap kali ada baris baru
+        self._columns = [CLIENT_COLUMN]
+        self._segments = []
+        self._starts = []  # Indeks baris pertama setiap segmen
+        self._count = 0
+        self._client_rows = {}  # nama client -> jumlah baris
+        self._released = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+    @property
+    def columns(self):
+        with self._lock:
+            return list(self._columns)
+
+    def client_counts(self):
+        """Jumlah baris per client"""
+        with self._lock:
+            return dict(self._client_rows)
+
+    def _store_rows(self, client_name, headers, rows):
+        """Simpan baris ke ResultStore (di luar lock, spill tidak menahan pembaca); None jika kosong"""
+        if not rows:
+            return None
+        if isinstance(rows, ResultHandle) and len(rows) <= self.max_rows:
+            return rows.share()
+        return self.store.put(headers, rows if len(rows) <= self.max_rows else rows[:self.max_rows],
+                              label=client_name)
+
+    @staticmethod
+    def _release(handles):
+        for handle in handles:
+            if handle is not None:
+                handle.release()
+
+    def append(self, client_name, headers, rows):
+        """
+        Tambahkan baris dari satu client
+
+        :param client_name: Nama client/estate untuk kolom pertama
+        :param headers: Daftar kolom hasil
+        :param rows: List dict baris atau ResultHandle
+        :return: Jumlah baris yang ditambahkan (dapat terpotong oleh max_rows)
+        """
+        with self._lock:
+            if self._released:
+                return 0
+            if self._count >= self.max_rows:
+                # Sudah penuh: baris tidak perlu disimpan ke store
+                return self._append(client_name, headers, None, len(rows))[0]
+        handle = self._store_rows(client_name, headers, rows)
+        with self._lock:
+            if self._released:
+                added, unused = 0, handle
+            else:
+                added, unused = self._append(client_name, headers, handle, len(rows))
+        self._release([unused])
+        return added
+
+    def replace(self, client_name, headers, rows):
+        """Ganti seluruh isi dengan baris baru (misalnya hasil agregat yang digabung ulang)"""
+        handle = self._store_rows(client_name, headers, rows)
+        with self._lock:
+            old = [segment.handle for segment in self._segments]
+            self._columns = [CLIENT_COLUMN]
+            self._set_segments([])
+            self._client_rows = {}
+            self.truncated = False
+            self.version += 1
+            added, unused = self._append(client_name, headers, handle, len(rows))
+        self._release(old + [unused])
+        return added
+
+    def replace_client(self, client_name, headers, rows):
+        """Ganti baris milik satu client (misalnya hasil baru standing query)"""
+        handle = self._store_rows(client_name, headers, rows)
+        with self._lock:
+            old = []
+            if self._client_rows.pop(client_name, 0):
+                old = [segment.handle for segment in self._segments if segment.client_name == client_name]
+                self._set_segments([segment for segment in self._segments if segment.client_name != client_name])
+                self.truncated = False
+                self.version += 1
+            added, unused = self._append(client_name, headers, handle, len(rows))
+        self._release(old + [unused])
+        return added
+
+    def release(self):
+        """Lepas semua baris dari ResultStore (tab hasil ditutup); append berikutnya diabaikan"""
+        with self._lock:
+            old = [segment.handle for segment in self._segments]
+            self._released = True
+            self._set_segments([])
+            self._client_rows = {}
+            self.version += 1
+        self._release(old)
+
+    def _set_segments(self, segments):
+        """Ganti daftar segmen dan hitung ulang indeks awal (lock harus dipegang)"""
+        self._segments = segments
+        self._starts = []
+        self._count = 0
+        for segment in segments:
+            self._starts.append(self._count)
+            self._count += segment.count
+
+    def _append(self, client_name, headers, handle, available):
+        """
+        Tambahkan segmen (lock harus dipegang)
+
+        :return: Tuple (jumlah baris ditambahkan, handle yang tidak terpakai atau None)
+        """
+        for header in headers:
+            if header not in self._columns:
+                # Kolom baru: baris lama bernilai None
+                self._columns.append(header)
+
+        count = min(max(0, self.max_rows - self._count), available)
+        if count < available:
+            self.truncated = True
+        self._client_rows[client_name] = self._client_rows.get(client_name, 0) + count
+        if not count:
+            return 0, handle
+        self._starts.append(self._count)
+        self._segments.append(_Segment(client_name, handle, count))
+        self._count += count
+        self.version += 1
+        return count, None
+
+    def _values(self, segment, row):
+        return tuple(segment.client_name if column == CLIENT_COLUMN else row.get(column)
+                     for column in self._columns)
+
+    def _locate(self, index):
+        """Posisi segmen dan offset dalam segmen untuk indeks baris (lock harus dipegang)"""
+        position = bisect.bisect_right(self._starts, index) - 1
+        return position, index - self._starts[position]
+
+    def _scan(self):
+        """Semua baris sebagai (indeks, segmen, dict baris), dibaca per potongan (lock harus dipegang)"""
+        index = 0
+        for segment in self._segments:
+            for start in range(0, segment.count, SCAN_CHUNK_ROWS):
+                for row in segment.handle[start:min(start + SCAN_CHUNK_ROWS, segment.count)]:
+                    yield index, segment, row
+                    index += 1
+
+    def row(self, index):
+        """Ambil satu baris sebagai tuple sesuai urutan columns"""
+        with self._lock:
+            if index < 0:
+                index += self._count
+            if not 0 <= index < self._count:
+                raise IndexError("row index out of range")
+            position, offset = self._locate(index)
+            segment = self._segments[position]
+            return self._values(segment, segment.handle[offset])
+
+    def rows(self, indices):
+        """
+        Ambil beberapa baris sebagai list tuple. Indeks dari view lama yang sudah
+        tidak ada (baris client diganti) menghasilkan None.
+        """
+        with self._lock:
+            result = [None] * len(indices)
+            wanted = {}  # posisi segmen -> list (posisi di hasil, offset di segmen)
+            for position, index in enumerate(indices):
+                if 0 <= index < self._count:
+                    segment_position, offset = self._locate(index)
+                    wanted.setdefault(segment_position, []).append((position, offset))
+            for segment_position, items in wanted.items():
+                segment = self._segments[segment_position]
+                # Satu akses ke ResultStore per segmen, juga untuk segmen yang di-spill
+                rows = segment.handle.rows_at([offset for _, offset in items])
+                for (position, _), row in zip(items, rows):
+                    result[position] = self._values(segment, row)
+            return result
+
+    def view(self, filter_text=None, filter_column=None, sort_column=None, descending=False):
+        """
+        Hitung urutan baris yang ditampilkan
+
+        :param filter_text: Teks yang dicari (case-insensitive, substring)
+        :param filter_column: Kolom tempat mencari; None berarti semua kolom
+        :param sort_column: Kolom untuk sort; None berarti urutan kedatangan
+        :return: List indeks baris
+        """
+        with self._lock:
+            sort = sort_column in self._columns
+            if not filter_text and not sort:
+                return list(range(self._count))
+
+            needle = filter_text.lower() if filter_text else None
+            columns = [filter_column] if filter_column in self._columns else list(self._columns)
+            indices = []
+            keys = []
+            for index, segment, row in self._scan():
+                if needle is not None:
+                    for column in columns:
+                        value = segment.client_name if column == CLIENT_COLUMN else row.get(column)
+                        if value is not None and needle in str(value).lower():
+                            break
+                    else:
+                        continue
+                indices.append(index)
+                if sort:
+                    keys.append(sort_key(segment.client_name if sort_column == CLIENT_COLUMN
+                                         else row.get(sort_column)))
+
+            if sort:
+                order = sorted(range(len(indices)), key=keys.__getitem__, reverse=descending)
+                return [indices[i] for i in order]
+            return indices
+
+    def totals(self, indices=None):
+        """
+        Total kolom numerik (semua nilai yang terisi berupa angka)
+
+        :param indices: Baris yang dihitung; None berarti semua baris
+        :return: Dict kolom -> total
+        """
+        with self._lock:
+            selected = None
+            if indices is not None:
+                selected = bytearray(self._count)
+                for i in indices:
+                    if 0 <= i < self._count:
+                        selected[i] = 1
+            columns = self._columns[1:]
+            totals = dict.fromkeys(columns, 0)
+            numeric = set()
+            text = set()
+            for index, segment, row in self._scan():
+                if selected is not None and not selected[index]:
+                    continue
+                for column in columns:
+                    if column in text:
+                        continue
+                    value = row.get(column)
+                    if value is None or str(value).strip() in ('', '<null>'):
+                        continue
+                    number = to_number(value)
+                    if number is None:
+                        text.add(column)
+                        continue
+                    totals[column] += number
+                    numeric.add(column)
+            return {column: totals[column] for column in columns if column in numeric and column not in text}
@@ -0,0 +1,270 @@
+"""
+Penyimpanan time-series untuk metrik monitoring di server.
+
+Metrik numerik diambil dari hasil query monitoring (jumlah baris, total kolom
+angka) dan disimpan per (client, metrik) di SQLite mode WAL. Titik baru
+dikumpulkan di memori lalu ditulis per batch dalam satu transaksi.
+
+Saat batch ditulis, rollup per menit, jam dan hari (count, sum, min, max)
+ikut diperbarui dengan upsert, sehingga tampilan tren untuk rentang panjang
+cukup membaca tabel rollup yang kecil dan terindeks. Titik mentah hanya
+disimpan selama raw_days hari; rollup menit dan jam juga punya masa simpan,
+rollup harian disimpan selamanya.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+RESOLUTION_RAW = 'raw'
+RESOLUTIONS = (('minute', 60), ('hour', 3600), ('day', 86400))  # (nama, lebar bucket dalam detik)
+DEFAULT_RAW_DAYS = 14
+DEFAULT_RETENTION = {'minute': 30 * 86400, 'hour': 400 * 86400, 'day': None}  # detik; None selamanya
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 5.0  # detik
+DEFAULT_MAX_POINTS = 2000  # Batas titik untuk pemilihan resolusi otomatis
+PRUNE_INTERVAL = 3600.0  # detik
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS series ("
+    "series_id INTEGER PRIMARY KEY, client TEXT NOT NULL, metric TEXT NOT NULL, "
+    "first_ts REAL, last_ts REAL, last_value REAL, UNIQUE (client, metric))",
+    "CREATE TABLE IF NOT EXISTS points ("
+    "series_id INTEGER NOT NULL, ts REAL NOT NULL, value REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS points_series_ts ON points (series_id, ts)",
+    "CREATE INDEX IF NOT EXISTS points_ts ON points (ts)",
+    "CREATE TABLE IF NOT EXISTS rollups ("
+    "resolution TEXT NOT NULL, series_id INTEGER NOT NULL, bucket INTEGER NOT NULL, "
+    "count INTEGER NOT NULL, total REAL NOT NULL, min_value REAL NOT NULL, max_value REAL NOT NULL, "
+    "PRIMARY KEY (resolution, series_id, bucket)) WITHOUT ROWID",
+)
+
+
+def to_number(value):
+    """Konversi nilai sel hasil query menjadi float; None jika bukan angka"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    if not text or text == '<null>':
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def extract_metrics(prefix, result):
+    """
+    Ambil metrik numerik dari hasil query monitoring
+
+    Untuk result set pertama: jumlah baris sebagai "<prefix>.rows" dan total
+    setiap kolom yang seluruh nilainya angka sebagai "<prefix>.<kolom>".
+
+    :param prefix: Awalan nama metrik (misalnya nama job)
+    :param result: List result set
+    :return: Dict nama metrik -> nilai
+    """
+    for result_set in result[:1]:
+        rows = result_set.get('rows', [])
+        metrics = {f"{prefix}.rows": float(len(rows))}
+        for header in result_set.get('headers', []):
+            total = 0.0
+            numeric = False
+            for row in rows:
+                value = row.get(header)
+                number = to_number(value)
+                if number is None:
+                    if value not in (None, '', '<null>'):
+                        numeric = False
+                        break
+                    continue
+                total += number
+                numeric = True
+            if numeric:
+                metrics[f"{prefix}.{header}"] = total
+        return metrics
+    return {}
+
+
+class MetricStore:
+    """Time-series metrik per client di SQLite (WAL) dengan rollup menit/jam/hari"""
+    def __init__(self, path, raw_days=DEFAULT_RAW_DAYS, retention=None,
+                 batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        """
+        :param path: File SQLite (':memory:' untuk test)
+        :param raw_days: Masa simpan titik mentah (hari)
+        :param retention: Dict resolusi -> masa simpan rollup (detik, None selamanya)
+        :param batch_size: Jumlah titik tertunda yang memicu penulisan
+        :param flush_interval: Umur maksimum titik tertunda sebelum ditulis (detik)
+        """
+        self.path = path
+        self.raw_days = raw_days
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []  # (client, metric, ts, value)
+        self._pending_since = None
+        self._series_ids = {}  # (client, metric) -> series_id
+        self._lock = threading.Lock()  # Buffer titik tertunda
+        self._db_lock = threading.Lock()  # Koneksi SQLite
+        self._last_prune = 0.0
+        self._db = self._connect()
+
+    def _connect(self):
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute("PRAGMA synchronous = NORMAL")
+        for statement in _SCHEMA:
+            db.execute(statement)
+        db.commit()
+        for series_id, client, metric in db.execute("SELECT series_id, client, metric FROM series"):
+            self._series_ids[(client, metric)] = series_id
+        return db
+
+    def record(self, client, metrics, ts=None):
+        """
+        Tambahkan titik metrik untuk satu client; ditulis per batch
+
+        :param metrics: Dict nama metrik -> nilai
+        """
+        ts = ts if ts is not None else time.time()
+        with self._lock:
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            self._pending.extend((client, metric, ts, float(value)) for metric, value in metrics.items())
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def maintain(self, now=None):
+        """Dipanggil berkala: tulis batch yang sudah cukup lama dan buang data lama"""
+        with self._lock:
+            due = self._pending_since is not None and time.monotonic() - self._pending_since >= self.flush_interval
+        if due:
+            self.flush()
+        now = now if now is not None else time.time()
+        if now - self._last_prune >= PRUNE_INTERVAL:
+            self.prune(now)
+
+    def flush(self):
+        """Tulis semua titik tertunda dan perbarui rollup dalam satu transaksi"""
+        with self._lock:
+            points, self._pending = self._pending, []
+            self._pending_since = None
+        if not points:
+            return 0
+
+        with self._db_lock:
+            with self._db:
+                rows = [(self._series_id(client, metric), ts, value) for client, metric, ts, value in points]
+                self._db.executemany("INSERT INTO points (series_id, ts, value) VALUES (?, ?, ?)", rows)
+                for resolution, width in RESOLUTIONS:
+                    self._db.executemany(
+                        "INSERT INTO rollups (resolution, series_id, bucket, count, total, min_value, max_value) "
+                        "VALUES (?, ?, ?, 1, ?, ?, ?) "
+                        "ON CONFLICT (resolution, series_id, bucket) DO UPDATE SET "
+                        "count = count + 1, total = total + excluded.total, "
+                        "min_value = MIN(min_value, excluded.min_value), max_value = MAX(max_value, excluded.max_value)",
+                        ((resolution, series_id, int(ts // width) * width, value, value, value)
+                         for series_id, ts, value in rows)
+                    )
+                spans = {}  # series_id -> (ts pertama, ts terakhir, nilai terakhir) dalam batch
+                for series_id, ts, value in rows:
+                    first, last, last_value = spans.get(series_id, (ts, ts, value))
+                    if ts >= last:
+                        last, last_value = ts, value
+                    spans[series_id] = (min(first, ts), last, last_value)
+                self._db.executemany(
+                    "UPDATE series SET first_ts = COALESCE(MIN(first_ts, ?), ?), "
+                    "last_value = CASE WHEN last_ts IS NULL OR ? >= last_ts THEN ? ELSE last_value END, "
+                    "last_ts = COALESCE(MAX(last_ts, ?), ?) WHERE series_id = ?",
+                    ((first, first, last, last_value, last, last, series_id)
+                     for series_id, (first, last, last_value) in spans.items())
+                )
+        return len(rows)
+
+    def _series_id(self, client, metric):
+        """ID seri (client, metrik); dibuat jika belum ada (lock db harus dipegang)"""
+        series_id = self._series_ids.get((client, metric))
+        if series_id is None:
+            cursor = self._db.execute("INSERT INTO series (client, metric) VALUES (?, ?)", (client, metric))
+            series_id = self._series_ids[(client, metric)] = cursor.lastrowid
+        return series_id
+
+    def prune(self, now=None):
+        """Hapus titik mentah dan rollup yang melewati masa simpan"""
+        now = now if now is not None else time.time()
+        self._last_prune = now
+        self.flush()
+        with self._db_lock:
+            with self._db:
+                self._db.execute("DELETE FROM points WHERE ts < ?", (now - self.raw_days * 86400,))
+                for resolution, _ in RESOLUTIONS:
+                    keep = self.retention.get(resolution)
+                    if keep:
+                        self._db.execute("DELETE FROM rollups WHERE resolution = ? AND bucket < ?",
+                                         (resolution, now - keep))
+
+    def series(self):
+        """
+        Daftar seri yang tersimpan
+
+        :return: List dict client, metric, first_ts, last_ts, last_value
+        """
+        self.flush()
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT client, metric, first_ts, last_ts, last_value FROM series ORDER BY metric, client"
+            ).fetchall()
+        return [{'client': client, 'metric': metric, 'first_ts': first_ts, 'last_ts': last_ts,
+                 'last_value': last_value} for client, metric, first_ts, last_ts, last_value in rows]
+
+    def choose_resolution(self, start, end, max_points=DEFAULT_MAX_POINTS, now=None):
+        """Resolusi paling rinci yang mencakup rentang dengan paling banyak max_points bucket"""
+        now = now if now is not None else time.time()
+        if start >= now - self.raw_days * 86400 and end - start <= max_points * RESOLUTIONS[0][1]:
+            return RESOLUTION_RAW
+        for resolution, width in RESOLUTIONS:
+            keep = self.retention.get(resolution)
+            if (keep is None or start >= now - keep) and (end - start) / width <= max_points:
+                return resolution
+        return RESOLUTIONS[-1][0]
+
+    def query(self, client, metric, start, end, resolution=None, max_points=DEFAULT_MAX_POINTS):
+        """
+        Titik satu seri dalam rentang waktu
+
+        :param resolution: 'raw', 'minute', 'hour', 'day' atau None untuk memilih otomatis
+        :return: Tuple (resolusi, list tuple (ts, rata-rata, min, max, count) urut waktu)
+        """
+        self.flush()
+        resolution = resolution or self.choose_resolution(start, end, max_points)
+        series_id = self._series_ids.get((client, metric))
+        if series_id is None:
+            return resolution, []
+
+        with self._db_lock:
+            if resolution == RESOLUTION_RAW:
+                rows = self._db.execute(
+                    "SELECT ts, value, value, value, 1 FROM points WHERE series_id = ? AND ts >= ? AND ts <= ? "
+                    "ORDER BY ts", (series_id, start, end)
+                ).fetchall()
+            else:
+                width = dict(RESOLUTIONS)[resolution]
+                rows = self._db.execute(
+                    "SELECT bucket, total / count, min_value, max_value, count FROM rollups "
+                    "WHERE resolution = ? AND series_id = ? AND bucket >= ? AND bucket <= ? ORDER BY bucket",
+                    (resolution, series_id, int(start // width) * width, end)
+                ).fetchall()
+        return resolution, rows
+
+    def close(self):
+        self.flush()
+        with self._db_lock:
+            self._db.close()
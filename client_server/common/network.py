@@ -2,6 +2,7 @@ import socket
 import json
 import struct
 import time
+from collections.abc import Mapping, Sequence
 
 # Konstanta untuk komunikasi
 DEFAULT_PORT = 5555
@@ -16,12 +17,16 @@ class NetworkMessage:
     TYPE_REGISTER = 'register'
     TYPE_PING = 'ping'
     TYPE_PONG = 'pong'
+    TYPE_FETCH = 'fetch'  # Permintaan halaman remote cursor
+    TYPE_CLOSE_CURSOR = 'close_cursor'
+    TYPE_STANDING_QUERY = 'standing_query'  # Daftarkan/hapus standing query di client
     
     def __init__(self, msg_type, data, client_id=None):
         self.msg_type = msg_type
         self.data = data
         self.client_id = client_id
         self.timestamp = time.time()
+        self.size = None  # Ukuran pesan di jaringan (byte), diisi saat dikirim/diterima
         
     def to_json(self):
         """Konversi pesan ke format JSON"""
@@ -45,6 +50,55 @@ class NetworkMessage:
         except json.JSONDecodeError:
             return cls(cls.TYPE_ERROR, "Invalid JSON message", None)
 
+# Penanda posisi data mentah (misalnya rows dari spool hasil query) di JSON pesan
+RAW_MARKER = '\x00raw:%d\x00'
+
+def encode_message(message):
+    """
+    Encode pesan menjadi potongan-potongan bytes.
+    Nilai yang memiliki method json_chunks() dan json_length() (misalnya rows dari
+    spool hasil query) disisipkan apa adanya tanpa dimuat ke memori.
+    
+    :param message: Objek NetworkMessage
+    :return: Tuple (panjang total dalam bytes, list potongan bytes atau objek data mentah)
+    """
+    raw_values = []
+    
+    def encode_special(value):
+        if hasattr(value, 'json_chunks'):
+            raw_values.append(value)
+            return RAW_MARKER % (len(raw_values) - 1)
+        if isinstance(value, Mapping):
+            return dict(value)
+        if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+            return list(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    
+    json_data = json.dumps({
+        'msg_type': message.msg_type,
+        'data': message.data,
+        'client_id': message.client_id,
+        'timestamp': message.timestamp
+    }, default=encode_special)
+    
+    if not raw_values:
+        data = json_data.encode(ENCODING)
+        return len(data), [data]
+    
+    parts = []
+    total = 0
+    remaining = json_data
+    for i, raw in enumerate(raw_values):
+        before, remaining = remaining.split(json.dumps(RAW_MARKER % i), 1)
+        data = before.encode(ENCODING)
+        parts.append(data)
+        parts.append(raw)
+        total += len(data) + raw.json_length()
+    data = remaining.encode(ENCODING)
+    parts.append(data)
+    total += len(data)
+    return total, parts
+
 def send_message(sock, message):
     """
     Kirim pesan melalui socket.
@@ -56,7 +110,7 @@ def send_message(sock, message):
     """
     try:
         # Konversi pesan ke JSON
-        json_data = message.to_json()
+        msg_len, parts = encode_message(message)
         
         # Debug info tentang pesan yang akan dikirim
         msg_type = message.msg_type
@@ -72,16 +126,18 @@ def send_message(sock, message):
                 rows = rs.get('rows', [])
                 print(f"  Result set {i+1}: {len(rows)} rows, {len(headers)} columns")
         
-        # Konversi string JSON ke bytes
-        data = json_data.encode(ENCODING)
-        # Dapatkan panjang data dalam bytes
-        msg_len = len(data)
         print(f"Message size: {msg_len} bytes")
+        message.size = msg_len
         
         # Kirim panjang pesan sebagai unsigned int (4 bytes)
         sock.sendall(struct.pack('>I', msg_len))
         # Kirim data pesan
-        sock.sendall(data)
+        for part in parts:
+            if isinstance(part, bytes):
+                sock.sendall(part)
+            else:
+                for chunk in part.json_chunks():
+                    sock.sendall(chunk)
         print(f"Message sent successfully")
         return True
     except ConnectionError as ce:
@@ -140,7 +196,9 @@ def receive_message(sock):
         try:
             json_data = data.decode(ENCODING)
             # Parse pesan JSON
-            return NetworkMessage.from_json(json_data)
+            message = NetworkMessage.from_json(json_data)
+            message.size = msg_len
+            return message
         except UnicodeDecodeError as ude:
             print(f"Error saat mendekode pesan: {ude}")
             return None
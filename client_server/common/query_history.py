@@ -0,0 +1,218 @@
+"""
+History query yang persisten untuk server dan client.
+
+Setiap eksekusi disimpan sebagai satu baris SQLite (mode WAL) dengan key
+request_id, sehingga update status dan statistik (durasi, jumlah baris, byte)
+cukup satu lookup terindeks. History bisa difilter berdasarkan waktu, target
+dan status, dan teks query dicari dengan FTS5 (fallback ke LIKE jika SQLite
+tidak mendukung FTS5). Jumlah entri dibatasi; entri tertua dibuang.
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+STATUS_RUNNING = 'running'
+STATUS_SUCCESS = 'success'
+STATUS_ERROR = 'error'
+STATUS_PARTIAL = 'partial'
+STATUSES = (STATUS_RUNNING, STATUS_SUCCESS, STATUS_ERROR, STATUS_PARTIAL)
+DEFAULT_MAX_ENTRIES = 50000
+DEFAULT_LIMIT = 500
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS history ("
+    "entry_id INTEGER PRIMARY KEY, request_id TEXT NOT NULL UNIQUE, ts REAL NOT NULL, "
+    "target TEXT NOT NULL DEFAULT '', status TEXT NOT NULL, query TEXT NOT NULL, "
+    "duration REAL, rows INTEGER NOT NULL DEFAULT 0, bytes INTEGER NOT NULL DEFAULT 0, error TEXT)",
+    "CREATE INDEX IF NOT EXISTS history_ts ON history (ts)",
+    "CREATE INDEX IF NOT EXISTS history_target_ts ON history (target, ts)",
+    "CREATE INDEX IF NOT EXISTS history_status_ts ON history (status, ts)",
+)
+
+# Index FTS5 atas teks query, disinkronkan dengan trigger (external content)
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+    "query, content='history', content_rowid='entry_id')",
+    "CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN "
+    "INSERT INTO history_fts (rowid, query) VALUES (new.entry_id, new.query); END",
+    "CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN "
+    "INSERT INTO history_fts (history_fts, rowid, query) VALUES ('delete', old.entry_id, old.query); END",
+    "CREATE TRIGGER IF NOT EXISTS history_au AFTER UPDATE OF query ON history BEGIN "
+    "INSERT INTO history_fts (history_fts, rowid, query) VALUES ('delete', old.entry_id, old.query); "
+    "INSERT INTO history_fts (rowid, query) VALUES (new.entry_id, new.query); END",
+)
+
+_COLUMNS = "request_id, ts, target, status, query, duration, rows, bytes, error"
+
+
+def format_size(size):
+    """Ukuran byte untuk ditampilkan, misalnya '1.5 MB'"""
+    if not size:
+        return ""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def fts_query(text):
+    """Teks pencarian menjadi query FTS5: setiap kata sebagai frasa prefix, semua harus cocok"""
+    words = [word.replace('"', '""') for word in text.split()]
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class QueryHistory:
+    """History query di SQLite dengan key request_id"""
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        :param path: File SQLite (':memory:' untuk test)
+        :param max_entries: Jumlah entri maksimum yang disimpan
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.fts = True
+        self._lock = threading.Lock()
+        self._db = self._connect()
+        self._count = self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def _connect(self):
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute("PRAGMA synchronous = NORMAL")
+        for statement in _SCHEMA:
+            db.execute(statement)
+        try:
+            for statement in _FTS_SCHEMA:
+                db.execute(statement)
+        except sqlite3.OperationalError:
+            self.fts = False  # SQLite tanpa FTS5: pencarian memakai LIKE
+        db.commit()
+        return db
+
+    def __len__(self):
+        return self._count
+
+    def add(self, query, target="", request_id=None, status=STATUS_RUNNING, ts=None, error=None):
+        """
+        Catat query yang mulai dijalankan
+
+        Request_id yang sudah ada (misalnya dikirim ulang setelah reconnect)
+        diperbarui, bukan diduplikasi.
+
+        :return: request_id entri
+        """
+        request_id = request_id or uuid.uuid4().hex
+        ts = ts if ts is not None else time.time()
+        with self._lock:
+            with self._db:
+                exists = self._db.execute("SELECT 1 FROM history WHERE request_id = ?", (request_id,)).fetchone()
+                self._db.execute(
+                    "INSERT INTO history (request_id, ts, target, status, query, error) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (request_id) DO UPDATE SET ts = excluded.ts, status = excluded.status, "
+                    "error = excluded.error",
+                    (request_id, ts, target or "", status, query, error)
+                )
+                if not exists:
+                    self._count += 1
+                if self._count > self.max_entries:
+                    self._prune()
+        return request_id
+
+    def _prune(self):
+        """Buang entri tertua di atas max_entries (lock harus dipegang)"""
+        excess = self._count - self.max_entries
+        self._db.execute(
+            "DELETE FROM history WHERE entry_id IN (SELECT entry_id FROM history ORDER BY ts, entry_id LIMIT ?)",
+            (excess,)
+        )
+        self._count = self.max_entries
+
+    def add_stats(self, request_id, rows=0, size=0):
+        """Tambahkan jumlah baris dan byte hasil (misalnya per client yang menjawab)"""
+        with self._lock:
+            with self._db:
+                self._db.execute("UPDATE history SET rows = rows + ?, bytes = bytes + ? WHERE request_id = ?",
+                                 (int(rows or 0), int(size or 0), request_id))
+
+    def finish(self, request_id, status, duration=None, rows=None, size=None, error=None):
+        """
+        Tandai query selesai
+
+        :param duration: Durasi (detik); None untuk dihitung dari waktu mulai
+        :param rows: Jumlah baris; None untuk mempertahankan nilai dari add_stats
+        :param size: Jumlah byte; None untuk mempertahankan nilai dari add_stats
+        """
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    "UPDATE history SET status = ?, duration = COALESCE(?, ? - ts), rows = COALESCE(?, rows), "
+                    "bytes = COALESCE(?, bytes), error = COALESCE(?, error) WHERE request_id = ?",
+                    (status, duration, time.time(), rows, size, error, request_id)
+                )
+
+    def get(self, request_id):
+        """Entri history sebagai dict, None jika tidak ada"""
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM history WHERE request_id = ?", (request_id,)).fetchone()
+        return dict(row) if row else None
+
+    def search(self, text=None, target=None, status=None, since=None, until=None, limit=DEFAULT_LIMIT):
+        """
+        Entri history terbaru lebih dulu
+
+        :param text: Kata yang harus ada di query (pencarian prefix per kata)
+        :param target: Filter target persis
+        :param status: Filter status persis
+        :param since: Batas waktu awal (epoch detik)
+        :param until: Batas waktu akhir (epoch detik)
+        """
+        conditions, params = [], []
+        source = "history"
+        if text and text.strip():
+            if self.fts:
+                source = "history JOIN history_fts ON history_fts.rowid = history.entry_id"
+                conditions.append("history_fts MATCH ?")
+                params.append(fts_query(text))
+            else:
+                for word in text.split():
+                    conditions.append("query LIKE ? ESCAPE '\\'")
+                    params.append("%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        for column, value in (('target', target), ('status', status)):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("ts <= ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        columns = ", ".join(f"history.{column.strip()}" for column in _COLUMNS.split(","))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {columns} FROM {source}{where} ORDER BY history.ts DESC, history.entry_id DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def targets(self):
+        """Daftar target yang pernah dipakai"""
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT DISTINCT target FROM history ORDER BY target")]
+
+    def clear(self):
+        with self._lock:
+            with self._db:
+                self._db.execute("DELETE FROM history")
+            self._count = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,132 @@
+"""
+Pre-flight plan query Firebird sebelum query dijalankan.
+
+Client mengambil plan dengan SET PLANONLY ON di isql (query hanya di-prepare,
+tidak dieksekusi) dan mengirim baris 'PLAN ...' ke server. Server mencari
+stream yang dibaca NATURAL (full scan), memberi perkiraan jumlah baris dari
+jumlah baris tabel yang diketahui, lalu memperingatkan atau menahan query.
+
+Plan di-cache per (schema hash client, query yang dinormalisasi) sehingga
+query yang sama ke client dengan schema yang sama tidak perlu pre-flight lagi.
+"""
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+from common.sql_analyzer import tokenize, WORD, PUNCT
+
+CHECK_OFF = 'Off'
+CHECK_WARN = 'Warn'
+CHECK_BLOCK = 'Block'
+CHECK_MODES = (CHECK_OFF, CHECK_WARN, CHECK_BLOCK)
+PLAN_COLUMN = 'PLAN'
+DEFAULT_SCAN_THRESHOLD = 100000  # baris; full scan di atas ini dianggap berat
+DEFAULT_CACHE_SIZE = 1000
+
+# Stream di plan: '(E NATURAL', ', D INDEX (...)', '(V EMPLOYEE ORDER IDX'
+_NAME = r'(?:"[^"]*"|[^\s(),"]+)'
+_STREAM = re.compile(r'[(,]\s*(' + _NAME + r'(?:\s+' + _NAME + r')*?)\s+(NATURAL|INDEX|ORDER)\b', re.I)
+
+PlanScan = namedtuple('PlanScan', 'table stream rows sorted')
+
+
+def parse_plan(output_text):
+    """Baris 'PLAN ...' dari output isql dengan SET PLANONLY ON"""
+    return [line.strip() for line in (output_text or "").splitlines() if re.match(r'\s*PLAN\b', line, re.I)]
+
+
+def plan_result(plans):
+    """Plan sebagai result set untuk dikirim ke server"""
+    return [{'headers': [PLAN_COLUMN], 'rows': [{PLAN_COLUMN: plan} for plan in plans]}]
+
+
+def plan_rows(result):
+    """Kebalikan plan_result"""
+    return [row.get(PLAN_COLUMN) for result_set in result or []
+            for row in result_set.get('rows', []) if isinstance(row, dict) and row.get(PLAN_COLUMN)]
+
+
+def normalize_query(query):
+    """Query tanpa komentar, spasi berlebih dan perbedaan huruf besar/kecil keyword; key cache plan"""
+    tokens = tokenize(query)
+    if tokens and tokens[-1].kind == PUNCT and tokens[-1].text == ';':
+        tokens = tokens[:-1]
+    return " ".join(token.upper if token.kind == WORD else token.text for token in tokens)
+
+
+def _stream_name(name):
+    return name[1:-1].replace('""', '"') if name.startswith('"') else name.upper()
+
+
+def natural_scans(plans, analysis=None, row_counts=None):
+    """
+    Stream yang dibaca NATURAL (tanpa index)
+
+    :param analysis: QueryAnalysis untuk memetakan alias ke nama tabel
+    :param row_counts: Fungsi nama tabel -> jumlah baris (atau None)
+    :return: List PlanScan(table, stream, rows, sorted)
+    """
+    aliases = {}
+    for statement in (analysis.statements if analysis is not None else ()):
+        aliases.update((name, table) for name, table in statement.aliases.items() if table)
+    scans = []
+    for plan in plans:
+        is_sorted = bool(re.search(r'\bSORT\s*\(', plan, re.I))
+        for match in _STREAM.finditer(plan):
+            if match.group(2).upper() != 'NATURAL':
+                continue
+            names = [_stream_name(name) for name in re.findall(_NAME, match.group(1))]
+            table = next((aliases[name] for name in reversed(names) if name in aliases), names[-1])
+            rows = row_counts(table) if row_counts else None
+            scans.append(PlanScan(table, " ".join(names), rows, is_sorted))
+    return scans
+
+
+def large_scans(scans, threshold=DEFAULT_SCAN_THRESHOLD, has_row_limit=False):
+    """
+    Full scan pada tabel dengan jumlah baris diketahui >= threshold.
+    Query dengan FIRST/ROWS tanpa SORT berhenti lebih awal sehingga tidak dihitung.
+    """
+    return [scan for scan in scans
+            if scan.rows is not None and scan.rows >= threshold and (scan.sorted or not has_row_limit)]
+
+
+class PlanCache:
+    """Cache plan (LRU) per (schema hash client, query yang dinormalisasi)"""
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, schema_hash, query):
+        """Plan yang di-cache atau None (schema hash None tidak pernah di-cache)"""
+        if schema_hash is None:
+            return None
+        key = (schema_hash, normalize_query(query))
+        with self._lock:
+            plans = self._entries.get(key)
+            if plans is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return plans
+
+    def put(self, schema_hash, query, plans):
+        if schema_hash is None:
+            return
+        key = (schema_hash, normalize_query(query))
+        with self._lock:
+            self._entries[key] = tuple(plans)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
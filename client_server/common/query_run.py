@@ -0,0 +1,205 @@
+"""
+Fan-out query ke banyak client secara bersamaan.
+
+Satu QueryRun mewakili satu kali pengiriman query ke beberapa client
+("All Clients"). Pengiriman ke tiap client berjalan paralel dengan deadline
+sendiri, sehingga satu socket yang macet tidak menahan client lain. Jawaban
+dicatat per client; hasil yang sudah masuk dapat dilihat selagi client lain
+masih berjalan, dan progres dilaporkan sebagai "N dari M".
+
+Baris hasil sendiri disimpan di ResultStore/cursor/hasil gabungan. Run hanya
+mencatat status dan jumlah baris per client, kecuali run dengan keep_results
+(agregat lintas client) yang perlu hasil parsial setiap client.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import wait
+
+from common.result_spool import count_rows
+
+STATUS_PENDING = 'pending'   # Belum terkirim
+STATUS_SENT = 'sent'         # Terkirim, menunggu jawaban
+STATUS_DONE = 'done'         # Hasil diterima
+STATUS_ERROR = 'error'       # Gagal dikirim atau client mengembalikan error
+STATUS_TIMEOUT = 'timeout'   # Tidak ada jawaban sebelum deadline
+
+FINAL_STATUSES = (STATUS_DONE, STATUS_ERROR, STATUS_TIMEOUT)
+
+DEFAULT_SEND_TIMEOUT = 10.0        # detik, batas pengiriman query ke satu client
+DEFAULT_RESPONSE_TIMEOUT = 300.0   # detik, batas menunggu jawaban satu client
+
+
+class ClientRun:
+    """Status query pada satu client"""
+    def __init__(self, client_id, display_name):
+        self.client_id = client_id
+        self.display_name = display_name
+        self.status = STATUS_PENDING
+        self.added = time.time()
+        self.request_id = None
+        self.sent_at = None
+        self.finished_at = None
+        self.result = None  # Hanya diisi untuk run dengan keep_results
+        self.rows = None    # Jumlah baris hasil
+        self.error = None
+
+    @property
+    def elapsed(self):
+        if self.sent_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.sent_at
+
+
+class QueryRun:
+    """Satu query yang dikirim ke beberapa client sekaligus"""
+    def __init__(self, query, targets, send_timeout=DEFAULT_SEND_TIMEOUT,
+                 response_timeout=DEFAULT_RESPONSE_TIMEOUT, on_update=None, keep_results=False):
+        """
+        :param query: Query yang dikirim
+        :param targets: List tuple (client_id, display_name)
+        :param send_timeout: Deadline pengiriman per client (detik)
+        :param response_timeout: Deadline jawaban per client sejak query terkirim (detik)
+        :param on_update: Callable(run) dipanggil setiap kali status client berubah
+        :param keep_results: Simpan hasil lengkap per client (untuk results())
+        """
+        self.run_id = uuid.uuid4().hex[:8]
+        self.query = query
+        self.created = time.time()
+        self.send_timeout = send_timeout
+        self.response_timeout = response_timeout
+        self.on_update = on_update
+        self.keep_results = keep_results
+        self.clients = {client_id: ClientRun(client_id, name) for client_id, name in targets}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.clients)
+
+    def _update(self, client_id, status, **fields):
+        """Ubah status client; status final tidak bisa diubah lagi"""
+        with self._lock:
+            entry = self.clients.get(client_id)
+            if entry is None or entry.status in FINAL_STATUSES:
+                return False
+            entry.status = status
+            for name, value in fields.items():
+                setattr(entry, name, value)
+            if status in FINAL_STATUSES:
+                entry.finished_at = time.time()
+        if self.on_update:
+            self.on_update(self)
+        return True
+
+    def add_target(self, client_id, display_name):
+        """
+        Tambahkan client ke run yang sudah berjalan (misalnya catch-up client yang baru terhubung)
+
+        :return: True jika client belum ada di run
+        """
+        with self._lock:
+            if client_id in self.clients:
+                return False
+            self.clients[client_id] = ClientRun(client_id, display_name)
+        if self.on_update:
+            self.on_update(self)
+        return True
+
+    def mark_sent(self, client_id, request_id):
+        return self._update(client_id, STATUS_SENT, request_id=request_id, sent_at=time.time())
+
+    def add_result(self, client_id, result=None, rows=None):
+        """
+        Catat jawaban client. Hasil hanya disimpan jika keep_results; selain itu
+        hanya jumlah barisnya (dari result, atau rows jika result tidak diberikan).
+        """
+        if rows is None:
+            rows = count_rows(result or [])
+        return self._update(client_id, STATUS_DONE, rows=rows, result=result if self.keep_results else None)
+
+    def add_error(self, client_id, error):
+        return self._update(client_id, STATUS_ERROR, error=error)
+
+    def expire(self, now=None):
+        """
+        Tandai client yang melewati deadline sebagai timeout
+
+        :return: List ClientRun yang baru saja timeout
+        """
+        now = now or time.time()
+        with self._lock:
+            expired = [entry for entry in self.clients.values()
+                       if (entry.status == STATUS_SENT and now - entry.sent_at > self.response_timeout)
+                       or (entry.status == STATUS_PENDING and now - entry.added > self.send_timeout + self.response_timeout)]
+        for entry in expired:
+            self._update(entry.client_id, STATUS_TIMEOUT, error="Tidak ada jawaban sebelum deadline")
+        return expired
+
+    def counts(self):
+        """Jumlah client per status"""
+        with self._lock:
+            counts = dict.fromkeys((STATUS_PENDING, STATUS_SENT) + FINAL_STATUSES, 0)
+            for entry in self.clients.values():
+                counts[entry.status] += 1
+        return counts
+
+    def progress(self):
+        """Tuple (jumlah client yang sudah selesai, total client)"""
+        counts = self.counts()
+        return sum(counts[s] for s in FINAL_STATUSES), len(self.clients)
+
+    def progress_label(self):
+        """Label progres untuk UI, misalnya '12 dari 40 client (1 error, 2 timeout)'"""
+        counts = self.counts()
+        returned = sum(counts[s] for s in FINAL_STATUSES)
+        label = f"{returned} dari {len(self.clients)} client"
+        extra = []
+        if counts[STATUS_ERROR]:
+            extra.append(f"{counts[STATUS_ERROR]} error")
+        if counts[STATUS_TIMEOUT]:
+            extra.append(f"{counts[STATUS_TIMEOUT]} timeout")
+        if extra:
+            label += f" ({', '.join(extra)})"
+        return label
+
+    @property
+    def finished(self):
+        returned, total = self.progress()
+        return returned == total
+
+    def results(self):
+        """Hasil yang sudah masuk sejauh ini: dict client_id -> result (hanya run dengan keep_results)"""
+        with self._lock:
+            return {entry.client_id: entry.result for entry in self.clients.values()
+                    if entry.status == STATUS_DONE}
+
+    def stragglers(self):
+        """Client yang belum menjawab"""
+        with self._lock:
+            return [entry for entry in self.clients.values() if entry.status not in FINAL_STATUSES]
+
+
+def send_to_client(run, send, client_id):
+    """Kirim query run ke satu client dan catat hasil pengirimannya"""
+    try:
+        request_id = send(client_id, run.send_timeout)
+    except Exception as e:
+        run.add_error(client_id, f"Gagal mengirim query: {e}")
+    else:
+        run.mark_sent(client_id, request_id)
+
+
+def dispatch(run, send, executor, wait_sends=True):
+    """
+    Kirim query ke semua client dalam run secara paralel
+
+    :param run: QueryRun
+    :param send: Callable(client_id, timeout) -> request_id; raise exception jika gagal
+    :param executor: concurrent.futures.Executor untuk pengiriman
+    :param wait_sends: Tunggu sampai semua pengiriman selesai atau melewati deadline
+    :return: List future pengiriman
+    """
+    futures = [executor.submit(send_to_client, run, send, client_id) for client_id in list(run.clients)]
+    if wait_sends:
+        wait(futures, timeout=run.send_timeout + 1)
+    return futures
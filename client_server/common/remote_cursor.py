@@ -0,0 +1,332 @@
+"""
+Remote cursor untuk paginasi hasil query yang dikendalikan server.
+
+Server tidak lagi menulis ulang query menjadi SELECT FIRST 10000 lalu
+mem-paging hasilnya secara lokal. Server membuka cursor di client dan meminta
+halaman tertentu hanya ketika pengguna berpindah halaman (ditambah prefetch
+satu halaman ke depan).
+
+- ClientCursor (sisi client): isql tidak bisa menahan statement tetap terbuka
+  di antara pemanggilan, sehingga halaman awal diambil dengan jendela
+  FIRST/SKIP atas query yang urutannya dibuat unik (RDB$DB_KEY sebagai kunci
+  terakhir ORDER BY); tanpa urutan unik Firebird bisa mengembalikan baris
+  dengan urutan berbeda di setiap eksekusi sehingga halaman tumpang tindih.
+  Query yang urutannya tidak bisa dibuat unik (JOIN, DISTINCT, GROUP BY,
+  UNION, sudah memakai FIRST/ROWS, multi statement) dieksekusi sekali dan
+  halaman dipotong dari hasil lengkapnya. Halaman jauh (SKIP besar, biaya
+  O(N) per halaman) juga beralih ke hasil lengkap yang diambil sekali.
+  Cursor yang tidak diakses melewati TTL ditutup otomatis.
+- RemoteCursor (sisi server): cache halaman, prefetch, dan callback ketika
+  halaman yang diminta tiba.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from common.sql_analyzer import analyze
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_CURSOR_TTL = 600  # detik
+DEFAULT_MAX_CURSORS = 20
+DEFAULT_PREFETCH_PAGES = 1
+DEFAULT_MAX_CACHED_PAGES = 50
+DEFAULT_MAX_WINDOW_SKIP = 5000  # baris; di atas ini hasil diambil lengkap sekali
+
+
+
+def add_page_window(query, first, skip):
+    """
+    Tambahkan jendela FIRST/SKIP ke query SELECT
+
+    :param query: Query SELECT asli
+    :param first: Jumlah baris yang diambil
+    :param skip: Jumlah baris yang dilewati
+    :return: Query dengan FIRST/SKIP, atau None jika query tidak bisa diberi jendela
+    """
+    return analyze(query).page_window(first, skip)
+
+
+class CursorError(Exception):
+    """Cursor tidak ditemukan, sudah ditutup, atau kedaluwarsa"""
+    pass
+
+
+class ClientCursor:
+    """Cursor hasil query di sisi client"""
+    def __init__(self, cursor_id, query, execute, page_size=DEFAULT_PAGE_SIZE, materialize=None,
+                 max_window_skip=DEFAULT_MAX_WINDOW_SKIP):
+        """
+        :param cursor_id: ID cursor dari server
+        :param query: Query SELECT asli
+        :param execute: Callable(query) -> list result set
+        :param page_size: Jumlah baris per halaman
+        :param materialize: Callable(result, query) untuk menyimpan hasil lengkap (misalnya ke spool)
+        :param max_window_skip: SKIP terbesar yang masih diambil dengan jendela FIRST/SKIP
+        """
+        self.cursor_id = cursor_id
+        self.query = query
+        self.page_size = max(1, int(page_size))
+        # Urutan unik agar jendela yang dieksekusi ulang konsisten; hasil lengkap memakai urutan yang sama
+        self.ordered_query = analyze(query).stable_order()
+        self.windowed = self.ordered_query is not None and add_page_window(self.ordered_query, 1, 0) is not None
+        self.max_window_skip = max_window_skip
+        self.last_access = time.time()
+        self._execute = execute
+        self._materialize = materialize
+        self._result = None
+        self._lock = threading.Lock()
+
+    def fetch(self, page):
+        """
+        Ambil satu halaman
+
+        :param page: Nomor halaman berbasis 0
+        :return: Tuple (result, cursor_info)
+        """
+        page = max(0, int(page))
+        start = page * self.page_size
+        with self._lock:
+            self.last_access = time.time()
+            info = {
+                'cursor_id': self.cursor_id,
+                'page': page,
+                'page_size': self.page_size,
+                'row_offset': start
+            }
+
+            if self.windowed and self._result is None and start <= self.max_window_skip:
+                # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+                result = self._execute(add_page_window(self.ordered_query, self.page_size + 1, start))
+                result_set = result[0] if result else {}
+                rows = list(result_set.get('rows', []))
+                info['has_more'] = len(rows) > self.page_size
+                rows = rows[:self.page_size]
+            else:
+                if self._result is None:
+                    query = self.ordered_query or self.query
+                    result = self._execute(query)
+                    if self._materialize:
+                        result = self._materialize(result, query)
+                    self._result = result
+                result_set = self._result[0] if self._result else {}
+                all_rows = result_set.get('rows', [])
+                rows = list(all_rows[start:start + self.page_size])
+                info['has_more'] = start + self.page_size < len(all_rows)
+                info['total_rows'] = len(all_rows)
+
+            self.last_access = time.time()
+            return [{'headers': list(result_set.get('headers', [])), 'rows': rows}], info
+
+    def close(self):
+        """Lepaskan hasil lengkap (jika ada)"""
+        with self._lock:
+            if self._result is not None and hasattr(self._result, 'close'):
+                self._result.close()
+            self._result = None
+
+
+class CursorRegistry:
+    """Kumpulan cursor terbuka di client, dengan TTL dan batas jumlah"""
+    def __init__(self, ttl=DEFAULT_CURSOR_TTL, max_cursors=DEFAULT_MAX_CURSORS):
+        self.ttl = ttl
+        self.max_cursors = max_cursors
+        self._cursors = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cursors)
+
+    def open(self, cursor_id, query, execute, page_size=DEFAULT_PAGE_SIZE, materialize=None):
+        """Buka cursor baru (cursor lama dengan ID sama ditutup)"""
+        cursor = ClientCursor(cursor_id, query, execute, page_size, materialize)
+        with self._lock:
+            stale = [self._cursors.pop(cursor_id)] if cursor_id in self._cursors else []
+            self._cursors[cursor_id] = cursor
+            while len(self._cursors) > self.max_cursors:
+                stale.append(self._cursors.popitem(last=False)[1])
+        for old in stale:
+            old.close()
+        self.expire()
+        return cursor
+
+    def get(self, cursor_id):
+        """Ambil cursor; raise CursorError jika tidak ada atau kedaluwarsa"""
+        self.expire()
+        with self._lock:
+            cursor = self._cursors.get(cursor_id)
+            if cursor is None:
+                raise CursorError(f"Cursor {cursor_id} tidak ditemukan atau sudah kedaluwarsa")
+            self._cursors.move_to_end(cursor_id)
+            return cursor
+
+    def close(self, cursor_id):
+        with self._lock:
+            cursor = self._cursors.pop(cursor_id, None)
+        if cursor:
+            cursor.close()
+        return cursor is not None
+
+    def close_all(self):
+        with self._lock:
+            cursors = list(self._cursors.values())
+            self._cursors.clear()
+        for cursor in cursors:
+            cursor.close()
+
+    def expire(self, now=None):
+        """Tutup cursor yang tidak diakses melewati TTL"""
+        now = now or time.time()
+        with self._lock:
+            expired = [cursor_id for cursor_id, cursor in self._cursors.items()
+                       if now - cursor.last_access > self.ttl]
+            cursors = [self._cursors.pop(cursor_id) for cursor_id in expired]
+        for cursor in cursors:
+            cursor.close()
+        return expired
+
+
+class RemoteCursor:
+    """Proxy cursor di sisi server: cache halaman, prefetch, dan permintaan halaman ke client"""
+    def __init__(self, cursor_id, client_id, query, request_page, page_size=DEFAULT_PAGE_SIZE,
+                 prefetch=DEFAULT_PREFETCH_PAGES, max_cached_pages=DEFAULT_MAX_CACHED_PAGES):
+        """
+        :param request_page: Callable(cursor_id, page) -> bool untuk mengirim permintaan ke client
+        """
+        self.cursor_id = cursor_id
+        self.client_id = client_id
+        self.query = query
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.max_cached_pages = max_cached_pages
+        self.headers = []
+        self.total_rows = None
+        self.last_page = None  # Indeks halaman terakhir jika sudah diketahui
+        self.known_pages = 1  # Jumlah halaman yang diketahui ada
+        self.error = None
+        self.closed = False
+        self._request_page = request_page
+        self._pages = OrderedDict()
+        self._pending = set()
+        self._waiters = {}
+        self._lock = threading.Lock()
+
+    def add_page(self, page, headers, rows, has_more, total_rows=None):
+        """Simpan halaman yang diterima dari client dan jalankan callback yang menunggu"""
+        with self._lock:
+            self._pages[page] = list(rows)
+            self._pages.move_to_end(page)
+            while len(self._pages) > self.max_cached_pages:
+                self._pages.popitem(last=False)
+            self._pending.discard(page)
+            if headers:
+                self.headers = list(headers)
+            if total_rows is not None:
+                self.total_rows = total_rows
+                self.last_page = max(0, (total_rows - 1) // self.page_size)
+            elif not has_more:
+                self.last_page = page
+                self.total_rows = page * self.page_size + len(rows)
+            self.known_pages = max(self.known_pages, page + (2 if has_more else 1))
+            if self.last_page is not None:
+                self.known_pages = self.last_page + 1
+            waiters = self._waiters.pop(page, [])
+            rows = self._pages[page]
+
+        for callback in waiters:
+            callback(rows, None)
+
+    def fail(self, page, error):
+        """Tandai permintaan halaman gagal; page None berarti seluruh cursor gagal"""
+        with self._lock:
+            if page is None:
+                self.error = error
+                waiters = [cb for callbacks in self._waiters.values() for cb in callbacks]
+                self._waiters.clear()
+                self._pending.clear()
+            else:
+                waiters = self._waiters.pop(page, [])
+                self._pending.discard(page)
+
+        for callback in waiters:
+            callback(None, error)
+
+    def fail_pending(self, error):
+        """Gagalkan semua halaman yang sedang diminta; cursor tetap bisa dipakai (misalnya setelah resume)"""
+        with self._lock:
+            waiters = [cb for callbacks in self._waiters.values() for cb in callbacks]
+            self._waiters.clear()
+            self._pending.clear()
+
+        for callback in waiters:
+            callback(None, error)
+
+    def get_page(self, page, callback):
+        """
+        Minta satu halaman. callback(rows, error) dipanggil saat halaman tersedia
+        (langsung jika sudah ada di cache). Halaman berikutnya di-prefetch.
+        """
+        with self._lock:
+            error = self.error or ("Cursor sudah ditutup" if self.closed else None)
+            rows = self._pages.get(page)
+            if rows is not None:
+                self._pages.move_to_end(page)
+            elif not error:
+                self._waiters.setdefault(page, []).append(callback)
+
+        if error:
+            callback(None, error)
+            return
+        if rows is not None:
+            callback(rows, None)
+        else:
+            self._request(page, explicit=True)
+
+        for next_page in range(page + 1, page + 1 + self.prefetch):
+            self._request(next_page)
+
+    def has_page(self, page):
+        with self._lock:
+            return page in self._pages
+
+    def page_count(self):
+        """Jumlah halaman yang diketahui ada"""
+        return self.known_pages
+
+    def page_count_label(self):
+        """Label jumlah halaman untuk UI, misalnya '12' atau '3+'"""
+        if self.last_page is not None:
+            return str(self.last_page + 1)
+        return f"{self.known_pages}+"
+
+    def row_count_label(self):
+        if self.total_rows is not None:
+            return str(self.total_rows)
+        return f"{(self.known_pages - 1) * self.page_size}+"
+
+    def _request(self, page, explicit=False):
+        with self._lock:
+            if self.closed or self.error or page in self._pages or page in self._pending:
+                return
+            if not explicit and page >= self.known_pages:
+                return
+            if self.last_page is not None and page > self.last_page:
+                waiters = self._waiters.pop(page, [])
+                skip = True
+            else:
+                self._pending.add(page)
+                skip = False
+
+        if skip:
+            for callback in waiters:
+                callback([], None)
+            return
+
+        if not self._request_page(self.cursor_id, page):
+            self.fail(page, "Gagal mengirim permintaan halaman ke client")
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            self._pages.clear()
+        self.fail(None, "Cursor sudah ditutup")
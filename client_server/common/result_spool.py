@@ -0,0 +1,360 @@
+"""
+Spool hasil query ke file di disk yang dibaca melalui mmap.
+
+Hasil query besar tidak disimpan sebagai list of dict di memori, melainkan
+ditulis ke file spool. Baris disimpan sebagai objek JSON yang dipisahkan koma
+sehingga bagian "rows" dapat dikirim ke server langsung dari file tanpa
+di-decode ulang. Index offset per baris disimpan di file yang sama sehingga
+akses acak (tampilan, halaman) tetap murah.
+
+Format file:
+    MAGIC | rows result set 1 | rows result set 2 | ... | index offset (uint64)
+    | footer JSON | offset footer (uint64) | MAGIC
+"""
+import os
+import json
+import mmap
+import struct
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+
+SPOOL_MAGIC = b'IFSPOOL1'
+SPOOL_EXTENSION = '.spool'
+DEFAULT_THRESHOLD_ROWS = 5000
+DEFAULT_BUDGET_BYTES = 512 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+_OFFSET = struct.Struct('<Q')
+
+
+def count_rows(result):
+    """Hitung total baris dari semua result set"""
+    return sum(len(rs.get('rows', [])) for rs in result)
+
+
+def encode_row(row):
+    """Encode satu baris ke JSON ringkas (bytes)"""
+    return json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def write_spool_file(path, result, query=None):
+    """
+    Tulis hasil query ke file spool
+
+    :param path: Path file tujuan
+    :param result: List result set (dict dengan headers dan rows)
+    :param query: Query asal hasil (disimpan di footer)
+    :return: Ukuran file dalam bytes
+    """
+    result_sets = []
+    offsets = array('Q')
+    temp_path = path + '.tmp'
+
+    with open(temp_path, 'wb') as f:
+        f.write(SPOOL_MAGIC)
+        pos = len(SPOOL_MAGIC)
+
+        for rs in result:
+            rows = rs.get('rows', [])
+            rows_start = pos
+            index_start = len(offsets)
+            for i, row in enumerate(rows):
+                data = encode_row(row)
+                if i > 0:
+                    f.write(b',')
+                    pos += 1
+                offsets.append(pos)
+                f.write(data)
+                pos += len(data)
+            result_sets.append({
+                'headers': list(rs.get('headers', [])),
+                'rows_start': rows_start,
+                'rows_end': pos,
+                'count': len(rows),
+                'index_start': index_start
+            })
+
+        index_pos = pos
+        offsets.tofile(f)
+        pos += len(offsets) * offsets.itemsize
+
+        footer = json.dumps({
+            'query': query,
+            'created': time.time(),
+            'index_pos': index_pos,
+            'result_sets': result_sets
+        }).encode('utf-8')
+        f.write(footer)
+        f.write(_OFFSET.pack(pos))
+        f.write(SPOOL_MAGIC)
+        size = f.tell()
+
+    os.replace(temp_path, path)
+    return size
+
+
+class SpooledRows(Sequence):
+    """Daftar baris yang dibaca dari file spool sesuai kebutuhan"""
+    def __init__(self, spooled, rows_start, rows_end, count, index_pos):
+        self._spooled = spooled
+        self._rows_start = rows_start
+        self._rows_end = rows_end
+        self._count = count
+        self._index_pos = index_pos
+
+    def __len__(self):
+        return self._count
+
+    def _bounds(self, i):
+        mm = self._spooled.mm
+        start = _OFFSET.unpack_from(mm, self._index_pos + i * _OFFSET.size)[0]
+        if i + 1 < self._count:
+            # Baris dipisahkan satu koma
+            end = _OFFSET.unpack_from(mm, self._index_pos + (i + 1) * _OFFSET.size)[0] - 1
+        else:
+            end = self._rows_end
+        return start, end
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError("row index out of range")
+        start, end = self._bounds(index)
+        return json.loads(self._spooled.mm[start:end])
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def json_length(self):
+        """Panjang representasi JSON array dari baris (bytes)"""
+        return self._rows_end - self._rows_start + 2
+
+    def json_chunks(self, chunk_size=CHUNK_SIZE):
+        """Hasilkan representasi JSON array dari baris per potongan, langsung dari file"""
+        mm = self._spooled.mm
+        yield b'['
+        pos = self._rows_start
+        while pos < self._rows_end:
+            end = min(pos + chunk_size, self._rows_end)
+            yield mm[pos:end]
+            pos = end
+        yield b']'
+
+
+class SpooledResultSet(Mapping):
+    """Result set dari file spool, dapat dipakai seperti dict {'headers', 'rows'}"""
+    def __init__(self, headers, rows):
+        self._data = {'headers': headers, 'rows': rows}
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SpooledResult(Sequence):
+    """Hasil query yang tersimpan di file spool (list result set)"""
+    def __init__(self, spool_id, path, on_close=None):
+        self.spool_id = spool_id
+        self.path = path
+        self._on_close = on_close
+        self._file = open(path, 'rb')
+        try:
+            self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._load_footer()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _load_footer(self):
+        mm = self.mm
+        tail = len(SPOOL_MAGIC) + _OFFSET.size
+        if mm[:len(SPOOL_MAGIC)] != SPOOL_MAGIC or mm[-len(SPOOL_MAGIC):] != SPOOL_MAGIC:
+            raise ValueError(f"Bukan file spool yang valid: {self.path}")
+        footer_pos = _OFFSET.unpack_from(mm, len(mm) - tail)[0]
+        footer = json.loads(mm[footer_pos:len(mm) - tail])
+
+        self.query = footer.get('query')
+        self.created = footer.get('created')
+        self.size = len(mm)
+        index_pos = footer['index_pos']
+        self._result_sets = []
+        for rs in footer['result_sets']:
+            rows = SpooledRows(
+                self,
+                rs['rows_start'],
+                rs['rows_end'],
+                rs['count'],
+                index_pos + rs['index_start'] * _OFFSET.size
+            )
+            self._result_sets.append(SpooledResultSet(rs['headers'], rows))
+
+    def __len__(self):
+        return len(self._result_sets)
+
+    def __getitem__(self, index):
+        return self._result_sets[index]
+
+    @property
+    def closed(self):
+        return self.mm.closed
+
+    def materialize(self):
+        """Muat seluruh hasil ke memori sebagai list of dict"""
+        return [{'headers': list(rs['headers']), 'rows': list(rs['rows'])} for rs in self]
+
+    def close(self):
+        """Tutup mmap dan file; file spool tetap ada di disk"""
+        if self.mm.closed:
+            return
+        self.mm.close()
+        self._file.close()
+        if self._on_close:
+            self._on_close(self.spool_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ResultSpool:
+    """
+    Pengelola file spool dengan batas total ukuran di disk.
+    File yang paling lama tidak diakses dihapus lebih dulu (LRU); file yang
+    sedang terbuka tidak pernah dihapus.
+    """
+    def __init__(self, directory, budget_bytes=DEFAULT_BUDGET_BYTES, threshold_rows=DEFAULT_THRESHOLD_ROWS):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.threshold_rows = threshold_rows
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # spool_id -> ukuran, urutan LRU (terlama di depan)
+        self._open_counts = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _path(self, spool_id):
+        return os.path.join(self.directory, spool_id + SPOOL_EXTENSION)
+
+    def _scan(self):
+        """Muat spool yang sudah ada di direktori, urut berdasarkan waktu akses terakhir"""
+        found = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(SPOOL_EXTENSION + '.tmp'):
+                # Sisa penulisan yang terputus
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            elif name.endswith(SPOOL_EXTENSION):
+                stat = os.stat(path)
+                found.append((stat.st_mtime, name[:-len(SPOOL_EXTENSION)], stat.st_size))
+        for _, spool_id, size in sorted(found):
+            self._entries[spool_id] = size
+        with self._lock:
+            self._evict()
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            return sum(self._entries.values())
+
+    def spool_ids(self):
+        """Daftar spool_id, terlama diakses lebih dulu"""
+        with self._lock:
+            return list(self._entries)
+
+    def should_spool(self, result):
+        """Cek apakah hasil cukup besar untuk di-spool"""
+        if not result or isinstance(result, SpooledResult):
+            return False
+        return count_rows(result) >= self.threshold_rows
+
+    def spool(self, result, query=None):
+        """
+        Tulis hasil ke file spool baru
+
+        :return: SpooledResult yang terbuka (panggil close() setelah selesai)
+        """
+        spool_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        size = write_spool_file(self._path(spool_id), result, query)
+        with self._lock:
+            self._entries[spool_id] = size
+            self._open_counts[spool_id] = self._open_counts.get(spool_id, 0) + 1
+            self._evict()
+        try:
+            return SpooledResult(spool_id, self._path(spool_id), on_close=self._release)
+        except Exception:
+            self._release(spool_id)
+            raise
+
+    def open(self, spool_id):
+        """Buka spool yang sudah ada dan tandai sebagai baru diakses"""
+        with self._lock:
+            if spool_id not in self._entries:
+                raise KeyError(spool_id)
+            self._entries.move_to_end(spool_id)
+            self._open_counts[spool_id] = self._open_counts.get(spool_id, 0) + 1
+        path = self._path(spool_id)
+        try:
+            os.utime(path)
+            return SpooledResult(spool_id, path, on_close=self._release)
+        except Exception:
+            self._release(spool_id)
+            raise
+
+    def remove(self, spool_id):
+        """Hapus spool dari disk jika tidak sedang terbuka"""
+        with self._lock:
+            if self._open_counts.get(spool_id):
+                return False
+            return self._delete(spool_id)
+
+    def _release(self, spool_id):
+        with self._lock:
+            count = self._open_counts.get(spool_id, 0) - 1
+            if count > 0:
+                self._open_counts[spool_id] = count
+            else:
+                self._open_counts.pop(spool_id, None)
+            self._evict()
+
+    def _delete(self, spool_id):
+        try:
+            os.remove(self._path(spool_id))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Di Windows file yang masih di-mmap proses lain tidak bisa dihapus
+            print(f"Gagal menghapus spool {spool_id}: {e}")
+            return False
+        self._entries.pop(spool_id, None)
+        return True
+
+    def _evict(self):
+        """Hapus spool terlama sampai total ukuran di bawah budget (lock harus dipegang)"""
+        total = sum(self._entries.values())
+        for spool_id in list(self._entries):
+            if total <= self.budget_bytes:
+                break
+            if self._open_counts.get(spool_id):
+                continue
+            size = self._entries[spool_id]
+            if self._delete(spool_id):
+                total -= size
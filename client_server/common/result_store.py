@@ -0,0 +1,464 @@
+"""
+Penyimpanan hasil query di server dalam bentuk kolumnar.
+
+Setiap result set disimpan sebagai array per kolom, bukan list of dict:
+
+- Kolom angka (integer atau desimal dengan skala tetap seperti output isql
+  "12.50") disimpan di array('q') sebagai integer berskala.
+- Kolom teks dengan sedikit nilai berbeda disimpan sebagai kamus + array kode.
+- Kolom teks lain disimpan dalam satu blob UTF-8 + array offset.
+
+Semua result set berbagi satu budget memori. Jika budget terlampaui, result set
+yang paling lama tidak diakses dipindah (spill) ke file SQLite lokal dan
+halamannya dibaca langsung dari sana. Tab dan jendela hasil hanya memegang
+ResultHandle, bukan salinan baris.
+
+Lock store hanya melindungi daftar entry dan hitungan memori. Penulisan dan
+pembacaan SQLite memakai lock tersendiri sehingga spill result besar (yang
+terjadi di thread penerima jaringan) tidak menahan akses ke result di memori.
+"""
+import os
+import json
+import sqlite3
+import threading
+import uuid
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+DICTIONARY_MAX_VALUES = 65535
+ITER_CHUNK_ROWS = 1000
+SQLITE_MAX_PARAMS = 900  # Di bawah batas default parameter SQLite (999)
+
+_NULL_TOKENS = (None, '<null>')
+
+
+def _parse_scaled(text):
+    """
+    Parse teks angka menjadi (integer berskala, skala)
+
+    :return: Tuple (nilai, skala) atau None jika bukan angka desimal biasa
+    """
+    if not isinstance(text, str):
+        if isinstance(text, int) and not isinstance(text, bool):
+            return text, 0
+        return None
+    body = text[1:] if text[:1] == '-' else text
+    whole, dot, fraction = body.partition('.')
+    if not whole.isdigit() or (dot and not fraction.isdigit()):
+        return None
+    if len(whole) > 1 and whole[0] == '0':
+        return None  # Angka dengan nol di depan (kode) disimpan sebagai teks
+    value = int(whole + fraction)
+    return (-value if text[:1] == '-' else value), len(fraction) if dot else 0
+
+
+def _format_scaled(value, scale):
+    if scale == 0:
+        return str(value)
+    sign = '-' if value < 0 else ''
+    whole, fraction = divmod(abs(value), 10 ** scale)
+    return f"{sign}{whole}.{fraction:0{scale}d}"
+
+
+class Column:
+    """Satu kolom result set dalam bentuk array"""
+    def __init__(self, values):
+        self.count = len(values)
+        self.nulls = None  # bytearray, 1 untuk NULL
+        self.null_token = None
+        self._build(values)
+
+    def _build(self, values):
+        null_tokens = set(value for value in values if value in _NULL_TOKENS)
+        if len(null_tokens) <= 1 and self._build_numeric(values, null_tokens):
+            return
+        if self._build_dictionary(values):
+            return
+        self._build_text(values)
+
+    def _mark_nulls(self, values, null_tokens):
+        if null_tokens:
+            self.null_token = next(iter(null_tokens))
+            self.nulls = bytearray(1 if value in _NULL_TOKENS else 0 for value in values)
+
+    def _build_numeric(self, values, null_tokens):
+        data = array('q')
+        scale = None
+        for value in values:
+            if value in _NULL_TOKENS:
+                data.append(0)
+                continue
+            parsed = _parse_scaled(value)
+            if parsed is None or (scale is not None and parsed[1] != scale):
+                return False
+            scale = parsed[1]
+            if not -2 ** 63 <= parsed[0] < 2 ** 63:
+                return False
+            data.append(parsed[0])
+        if scale is None:
+            return False  # Semua NULL
+        self.kind = 'number'
+        self.scale = scale
+        self.as_int = all(isinstance(value, int) for value in values if value not in _NULL_TOKENS)
+        self.data = data
+        self._mark_nulls(values, null_tokens)
+        return True
+
+    def _build_dictionary(self, values):
+        lookup = {}
+        codes = array('H')
+        limit = min(DICTIONARY_MAX_VALUES, max(16, self.count // 2))
+        for value in values:
+            key = (type(value).__name__, value)
+            code = lookup.get(key)
+            if code is None:
+                if len(lookup) >= limit:
+                    return False
+                code = lookup[key] = len(lookup)
+            codes.append(code)
+        self.kind = 'dictionary'
+        self.values = [value for _, value in lookup]
+        self.data = codes
+        return True
+
+    def _build_text(self, values):
+        blob = bytearray()
+        offsets = array('Q', [0])
+        null_tokens = set()
+        for value in values:
+            if value is None:
+                null_tokens.add(None)
+            else:
+                blob += str(value).encode('utf-8')
+            offsets.append(len(blob))
+        self.kind = 'text'
+        self.data = bytes(blob)
+        self.offsets = offsets
+        self._mark_nulls([None if value is None else '' for value in values], null_tokens)
+
+    @property
+    def nbytes(self):
+        size = len(self.nulls) if self.nulls else 0
+        if self.kind == 'number':
+            return size + len(self.data) * self.data.itemsize
+        if self.kind == 'dictionary':
+            return size + len(self.data) * self.data.itemsize + sum(len(str(v)) + 50 for v in self.values)
+        return size + len(self.data) + len(self.offsets) * self.offsets.itemsize
+
+    def __getitem__(self, index):
+        if self.nulls and self.nulls[index]:
+            return self.null_token
+        if self.kind == 'number':
+            value = self.data[index]
+            return value if self.as_int else _format_scaled(value, self.scale)
+        if self.kind == 'dictionary':
+            return self.values[self.data[index]]
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+
+class ColumnarResultSet:
+    """Result set yang disimpan per kolom"""
+    def __init__(self, headers, rows):
+        self.headers = list(headers)
+        self.count = len(rows)
+        self.columns = [Column([row.get(header) for row in rows]) for header in self.headers]
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns) + 64 * len(self.columns)
+
+    def row(self, index):
+        return {header: column[index] for header, column in zip(self.headers, self.columns)}
+
+    def rows(self, start, stop):
+        return [self.row(i) for i in range(start, stop)]
+
+
+class _Entry:
+    def __init__(self, result_id, headers, count, label):
+        self.result_id = result_id
+        self.headers = headers
+        self.count = count
+        self.label = label
+        self.data = None  # ColumnarResultSet jika di memori, None jika sudah di-spill
+        self.nbytes = 0
+        self.refs = 1
+        self.spilling = False  # Sedang ditulis ke SQLite; data masih dibaca dari memori
+
+
+class ResultStore:
+    """
+    Penyimpanan semua result set server dengan budget memori bersama.
+    Result set yang paling lama tidak diakses di-spill ke SQLite lebih dulu (LRU).
+    """
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, spill_path=None):
+        """
+        :param budget_bytes: Total ukuran result set di memori
+        :param spill_path: File SQLite untuk spill; None berarti file sementara di memori SQLite
+        """
+        self.budget_bytes = budget_bytes
+        self.spill_path = spill_path
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()  # Akses koneksi SQLite spill
+        self._entries = {}  # result_id -> _Entry
+        self._lru = OrderedDict()  # result_id yang ada di memori, terlama di depan
+        self._memory_bytes = 0
+        self._db = None
+
+    @property
+    def memory_bytes(self):
+        with self._lock:
+            return self._memory_bytes
+
+    def stats(self):
+        """Ringkasan isi store untuk log/UI"""
+        with self._lock:
+            spilled = sum(1 for entry in self._entries.values() if entry.data is None or entry.spilling)
+            return {
+                'results': len(self._entries),
+                'in_memory': len(self._entries) - spilled,
+                'spilled': spilled,
+                'memory_bytes': self._memory_bytes,
+                'budget_bytes': self.budget_bytes
+            }
+
+    def put(self, headers, rows, label=None):
+        """
+        Simpan satu result set
+
+        :param headers: Daftar kolom
+        :param rows: List dict baris
+        :return: ResultHandle
+        """
+        data = ColumnarResultSet(headers, rows)
+        result_id = uuid.uuid4().hex
+        entry = _Entry(result_id, data.headers, data.count, label)
+        entry.data = data
+        entry.nbytes = data.nbytes
+        with self._lock:
+            self._entries[result_id] = entry
+            self._lru[result_id] = True
+            self._memory_bytes += entry.nbytes
+            victims = self._evict()
+        for victim in victims:
+            self._spill(victim)
+        return ResultHandle(self, entry)
+
+    def rows(self, result_id, start, stop):
+        """Ambil baris start..stop (eksklusif) sebagai list dict"""
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is None:
+                raise KeyError(f"Result {result_id} sudah dilepas")
+            start = max(0, start)
+            stop = min(stop, entry.count)
+            if start >= stop:
+                return []
+            if entry.data is not None:
+                if result_id in self._lru:
+                    self._lru.move_to_end(result_id)
+                return entry.data.rows(start, stop)
+        with self._db_lock:
+            cursor = self._db.execute(
+                "SELECT data FROM spill_rows WHERE result_id = ? AND idx >= ? AND idx < ? ORDER BY idx",
+                (result_id, start, stop)
+            )
+            return [dict(zip(entry.headers, json.loads(data))) for (data,) in cursor]
+
+    def rows_at(self, result_id, row_ids):
+        """
+        Ambil baris dengan nomor tertentu (misalnya jendela permutasi sort)
+        sebagai list dict sesuai urutan row_ids. Result yang di-spill dibaca
+        dengan satu query SQLite per potongan, bukan satu query per baris.
+        """
+        row_ids = list(row_ids)
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is None:
+                raise KeyError(f"Result {result_id} sudah dilepas")
+            for row_id in row_ids:
+                if not 0 <= row_id < entry.count:
+                    raise IndexError("row index out of range")
+            if entry.data is not None:
+                if result_id in self._lru:
+                    self._lru.move_to_end(result_id)
+                return [entry.data.row(row_id) for row_id in row_ids]
+        found = {}
+        unique = sorted(set(row_ids))
+        with self._db_lock:
+            for start in range(0, len(unique), SQLITE_MAX_PARAMS):
+                chunk = unique[start:start + SQLITE_MAX_PARAMS]
+                cursor = self._db.execute(
+                    f"SELECT idx, data FROM spill_rows WHERE result_id = ? AND idx IN ({','.join('?' * len(chunk))})",
+                    [result_id] + chunk
+                )
+                found.update(cursor)
+        try:
+            return [dict(zip(entry.headers, json.loads(found[row_id]))) for row_id in row_ids]
+        except KeyError:
+            raise KeyError(f"Result {result_id} sudah dilepas") from None
+
+    def acquire(self, result_id):
+        """Tambah satu referensi ke result set"""
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is None:
+                raise KeyError(f"Result {result_id} sudah dilepas")
+            entry.refs += 1
+            return entry
+
+    def release(self, result_id):
+        """Lepas satu referensi; result set dihapus jika tidak ada referensi lagi"""
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self._entries[result_id]
+            if entry.spilling:
+                return  # Baris yang sudah ditulis dihapus oleh _spill
+            if entry.data is not None:
+                self._lru.pop(result_id, None)
+                self._memory_bytes -= entry.nbytes
+                return
+        self._delete_spilled(result_id)
+
+    def close(self):
+        with self._lock:
+            self._entries.clear()
+            self._lru.clear()
+            self._memory_bytes = 0
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+                if self.spill_path:
+                    try:
+                        os.remove(self.spill_path)
+                    except OSError:
+                        pass
+
+    def _open_db(self):
+        if self._db is None:
+            path = self.spill_path or ':memory:'
+            if self.spill_path:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                # Sisa spill dari sesi sebelumnya tidak dipakai lagi
+                if os.path.exists(path):
+                    os.remove(path)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode = OFF")
+            self._db.execute("PRAGMA synchronous = OFF")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS spill_rows ("
+                "result_id TEXT NOT NULL, idx INTEGER NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (result_id, idx)) WITHOUT ROWID"
+            )
+        return self._db
+
+    def _delete_spilled(self, result_id):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM spill_rows WHERE result_id = ?", (result_id,))
+                self._db.commit()
+
+    def _spill(self, entry):
+        """
+        Pindahkan satu result set ke SQLite (lock store tidak boleh dipegang).
+        Selama ditulis, baris tetap dibaca dari memori; entry beralih ke SQLite
+        setelah penulisan selesai.
+        """
+        data = entry.data
+        values = [json.dumps([column[i] for column in data.columns], ensure_ascii=False, separators=(',', ':'))
+                  for i in range(data.count)]
+        with self._db_lock:
+            with self._lock:
+                if self._entries.get(entry.result_id) is not entry:
+                    return  # Sudah dilepas atau store ditutup
+            db = self._open_db()
+            try:
+                db.executemany("INSERT INTO spill_rows (result_id, idx, data) VALUES (?, ?, ?)",
+                               ((entry.result_id, i, value) for i, value in enumerate(values)))
+                db.commit()
+            except sqlite3.Error:
+                # Spill gagal (misalnya disk penuh): result tetap di memori
+                db.execute("DELETE FROM spill_rows WHERE result_id = ?", (entry.result_id,))
+                db.commit()
+                with self._lock:
+                    entry.spilling = False
+                    if self._entries.get(entry.result_id) is entry:
+                        self._lru[entry.result_id] = True
+                        self._memory_bytes += entry.nbytes
+                return
+        with self._lock:
+            if self._entries.get(entry.result_id) is entry:
+                entry.data = None
+                entry.spilling = False
+                return
+        self._delete_spilled(entry.result_id)  # Dilepas saat sedang ditulis
+
+    def _evict(self):
+        """
+        Pilih result set terlama untuk di-spill sampai memori di bawah budget (lock harus dipegang)
+
+        :return: List entry yang harus ditulis dengan _spill setelah lock dilepas
+        """
+        victims = []
+        while self._memory_bytes > self.budget_bytes and self._lru:
+            result_id, _ = self._lru.popitem(last=False)
+            entry = self._entries[result_id]
+            entry.spilling = True
+            self._memory_bytes -= entry.nbytes
+            victims.append(entry)
+        return victims
+
+
+class ResultHandle(Sequence):
+    """
+    Referensi ke result set di ResultStore. Dapat dipakai seperti list baris
+    (len, indeks, slice, iterasi) tanpa menyalin seluruh data.
+    """
+    def __init__(self, store, entry):
+        self._store = store
+        self.result_id = entry.result_id
+        self.headers = entry.headers
+        self.label = entry.label
+        self._count = entry.count
+        self._released = False
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step == 1:
+                return self._store.rows(self.result_id, start, stop)
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError("row index out of range")
+        return self._store.rows(self.result_id, index, index + 1)[0]
+
+    def rows_at(self, row_ids):
+        """Baris dengan nomor tertentu sesuai urutan row_ids, dalam satu akses ke store"""
+        return self._store.rows_at(self.result_id, row_ids)
+
+    def __iter__(self):
+        for start in range(0, self._count, ITER_CHUNK_ROWS):
+            yield from self._store.rows(self.result_id, start, start + ITER_CHUNK_ROWS)
+
+    def share(self):
+        """Buat handle baru ke result set yang sama (misalnya untuk jendela terpisah)"""
+        return ResultHandle(self._store, self._store.acquire(self.result_id))
+
+    def release(self):
+        """Lepas handle ini; aman dipanggil lebih dari sekali"""
+        if not self._released:
+            self._released = True
+            self._store.release(self.result_id)
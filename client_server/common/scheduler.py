@@ -0,0 +1,397 @@
+"""
+Penjadwalan query monitoring.
+
+Job terjadwal adalah query bernama dengan jadwal interval ("15m", "every 1h")
+atau cron lima kolom ("*/15 6-18 * * 1-5"), ditujukan ke semua client atau
+sekumpulan client. Pengiriman ke tiap client diberi offset acak yang tetap
+per client (stagger) agar ratusan estate tidak menerima query pada detik yang
+sama. Client yang offline saat job berjalan dicatat dan mendapat satu kali
+catch-up ketika terhubung kembali. Definisi job disimpan ke file JSON.
+
+Job dengan jadwal "on change" tidak dijalankan oleh timer server, tetapi
+didaftarkan sebagai standing query di client (lihat common/standing_query.py).
+"""
+import datetime
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+TARGET_ALL = "all"
+CHANGE_TRIGGER = "on change"
+DEFAULT_STAGGER = 30.0  # detik, rentang penyebaran pengiriman ke client
+
+_INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+_INTERVAL_RE = re.compile(r'^(?:every\s+)?(\d+)\s*([smhd])$', re.IGNORECASE)
+
+
+class IntervalSchedule:
+    """Jadwal setiap N detik, sejajar dengan epoch agar fase tetap setelah restart"""
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("Interval harus lebih dari 0")
+        self.seconds = seconds
+
+    def next_after(self, timestamp):
+        return (int(timestamp) // self.seconds + 1) * self.seconds
+
+
+class ChangeTrigger:
+    """Job dijalankan client saat database berubah, bukan oleh timer server"""
+    def next_after(self, timestamp):
+        return None
+
+
+class CronSchedule:
+    """Jadwal cron lima kolom: menit jam tanggal bulan hari (0=Minggu), waktu lokal"""
+    _RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron harus 5 kolom: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self._RANGES))
+        # Seperti cron: jika tanggal dan hari sama-sama dibatasi, salah satu cukup
+        self.days_restricted = fields[2] != '*'
+        self.weekdays_restricted = fields[4] != '*'
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"Step cron tidak valid: {field}")
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(value) for value in part.split('-', 1))
+            else:
+                start = end = int(part)
+            if high == 6:
+                # Hari 7 juga berarti Minggu
+                start, end = (0 if start == 7 else start), (6 if end == 7 else end)
+            if start < low or end > high or start > end:
+                raise ValueError(f"Nilai cron di luar rentang {low}-{high}: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, timestamp):
+        moment = datetime.datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0)
+        moment += datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=366 * 4)
+        while moment < limit:
+            if moment.month not in self.months:
+                # Lompat ke awal bulan berikutnya
+                year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+                moment = moment.replace(year=year, month=month, day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + datetime.timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + datetime.timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron tidak pernah cocok: {self.expression}")
+
+
+def parse_schedule(text):
+    """
+    Parse teks jadwal
+
+    :param text: Interval ("30s", "15m", "every 2h", "1d"), cron lima kolom, atau "on change"
+    :return: IntervalSchedule, CronSchedule atau ChangeTrigger
+    :raises ValueError: Jika format tidak dikenali
+    """
+    text = (text or '').strip()
+    if text.lower() == CHANGE_TRIGGER:
+        return ChangeTrigger()
+    match = _INTERVAL_RE.match(text)
+    if match:
+        return IntervalSchedule(int(match.group(1)) * _INTERVAL_UNITS[match.group(2).lower()])
+    if len(text.split()) == 5:
+        return CronSchedule(text)
+    raise ValueError(f"Format jadwal tidak dikenali: {text}")
+
+
+def stagger_offset(job_name, client_id, window):
+    """
+    Offset pengiriman untuk satu client dalam rentang [0, window)
+
+    Offset dihitung dari hash nama job dan client_id sehingga tetap sama di
+    setiap run: tiap estate mendapat slot sendiri dan beban tersebar merata.
+    """
+    if window <= 0:
+        return 0.0
+    digest = hashlib.md5(f"{job_name}:{client_id}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64 * window
+
+
+class ScheduledJob:
+    """Definisi dan state satu job terjadwal"""
+    def __init__(self, name, query, schedule, targets=TARGET_ALL, stagger=DEFAULT_STAGGER,
+                 enabled=True, combine_aggregates=False, delta=True, key_columns=None, probe=None,
+                 min_interval=10.0):
+        """
+        :param schedule: Teks jadwal, lihat parse_schedule
+        :param targets: TARGET_ALL atau list client_id/nama client
+        :param stagger: Rentang penyebaran pengiriman ke client (detik)
+        :param delta: Client hanya mengirim baris yang berubah sejak run sebelumnya
+        :param key_columns: Kolom kunci baris untuk delta (opsional)
+        :param probe: Query murah pendeteksi perubahan untuk job "on change" (opsional)
+        :param min_interval: Jarak minimum antar run job "on change" di client (detik)
+        """
+        self.name = name
+        self.query = query
+        self.schedule_text = schedule
+        self.schedule = parse_schedule(schedule)
+        self.targets = targets if targets == TARGET_ALL else list(targets)
+        self.stagger = float(stagger)
+        self.enabled = enabled
+        self.combine_aggregates = combine_aggregates
+        self.delta = delta
+        self.key_columns = list(key_columns) if key_columns else None
+        self.probe = probe
+        self.min_interval = float(min_interval)
+        self.next_run = None
+        self.last_run = None
+        self.run_id = None  # Run terakhir, dipakai untuk mencegah run yang tumpang tindih
+        self.missed = {}  # client_id -> waktu run pertama yang terlewat
+        self.seen = []  # client_id yang pernah menerima job ini (untuk target "all" setelah restart)
+        self.skipped = 0  # Jumlah jadwal yang dilewati karena run sebelumnya belum selesai
+
+    @property
+    def standing(self):
+        """Job dijalankan sebagai standing query di client"""
+        return isinstance(self.schedule, ChangeTrigger)
+
+    def matches(self, client_id, display_name=None):
+        """Apakah client termasuk target job"""
+        if self.targets == TARGET_ALL:
+            return True
+        return client_id in self.targets or (display_name is not None and display_name in self.targets)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'query': self.query,
+            'schedule': self.schedule_text,
+            'targets': self.targets,
+            'stagger': self.stagger,
+            'enabled': self.enabled,
+            'combine_aggregates': self.combine_aggregates,
+            'delta': self.delta,
+            'key_columns': self.key_columns,
+            'probe': self.probe,
+            'min_interval': self.min_interval,
+            'next_run': self.next_run,
+            'last_run': self.last_run,
+            'missed': self.missed,
+            'seen': self.seen,
+            'skipped': self.skipped
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        job = cls(data['name'], data['query'], data['schedule'], data.get('targets', TARGET_ALL),
+                  data.get('stagger', DEFAULT_STAGGER), data.get('enabled', True),
+                  data.get('combine_aggregates', False), data.get('delta', True), data.get('key_columns'),
+                  data.get('probe'), data.get('min_interval', 10.0))
+        job.next_run = data.get('next_run')
+        job.last_run = data.get('last_run')
+        job.missed = dict(data.get('missed', {}))
+        job.seen = list(data.get('seen', []))
+        job.skipped = data.get('skipped', 0)
+        return job
+
+
+class JobScheduler:
+    """Kumpulan job terjadwal yang disimpan ke file JSON"""
+    def __init__(self, path=None):
+        self.path = path
+        self.jobs = OrderedDict()  # nama -> ScheduledJob
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Muat job dari file; jadwal yang terlewat saat server mati dijalankan sekali saat tick pertama"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        with self._lock:
+            self.jobs.clear()
+            for item in data.get('jobs', []):
+                job = ScheduledJob.from_dict(item)
+                self.jobs[job.name] = job
+
+    def save(self):
+        """Simpan job ke file (ditulis ke file sementara lalu diganti)"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {'jobs': [job.to_dict() for job in self.jobs.values()]}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def add(self, job, now=None):
+        """Tambah atau ganti job; run pertama mengikuti jadwal"""
+        job.next_run = job.schedule.next_after(now or time.time())
+        with self._lock:
+            self.jobs[job.name] = job
+        self.save()
+
+    def remove(self, name):
+        with self._lock:
+            job = self.jobs.pop(name, None)
+        if job is not None:
+            self.save()
+        return job
+
+    def get(self, name):
+        with self._lock:
+            return self.jobs.get(name)
+
+    def list(self):
+        with self._lock:
+            return list(self.jobs.values())
+
+    def due(self, now=None):
+        """
+        Job yang jadwalnya sudah tiba
+
+        Beberapa jadwal yang terlewat sekaligus (misalnya server mati) digabung
+        menjadi satu run. Jadwal berikutnya langsung dihitung.
+
+        :return: List ScheduledJob
+        """
+        now = now or time.time()
+        due = []
+        with self._lock:
+            for job in self.jobs.values():
+                if not job.enabled or job.standing:
+                    continue
+                if job.next_run is None:
+                    job.next_run = job.schedule.next_after(now)
+                elif job.next_run <= now:
+                    job.next_run = job.schedule.next_after(now)
+                    due.append(job)
+        return due
+
+    def mark_started(self, job, run_id, sent_ids, missed_ids, now=None):
+        """
+        Catat run yang baru dimulai
+
+        :param sent_ids: client_id yang menerima query pada run ini
+        :param missed_ids: client_id target yang sedang offline
+        """
+        now = now or time.time()
+        with self._lock:
+            job.run_id = run_id
+            job.last_run = now
+            for client_id in sent_ids:
+                job.missed.pop(client_id, None)
+                if client_id not in job.seen:
+                    job.seen.append(client_id)
+            for client_id in missed_ids:
+                job.missed.setdefault(client_id, now)
+        self.save()
+
+    def known_targets(self, job, clients):
+        """
+        Semua target job yang diketahui: client di registry yang cocok, client yang
+        pernah menerima job (target "all"), dan target eksplisit yang belum pernah terhubung
+
+        :param clients: Mapping client_id -> client (punya display_name)
+        :return: Set client_id/nama target
+        """
+        known = {client_id for client_id, client in clients.items() if job.matches(client_id, client.display_name)}
+        if job.targets == TARGET_ALL:
+            known.update(job.seen)
+        else:
+            names = {client.display_name for client in clients.values()}
+            known.update(target for target in job.targets if target not in clients and target not in names)
+        return known
+
+    def mark_skipped(self, job):
+        """Catat jadwal yang dilewati karena run sebelumnya masih berjalan"""
+        with self._lock:
+            job.skipped += 1
+        self.save()
+
+    def standing_jobs(self, client_id, display_name=None):
+        """Job "on change" aktif yang harus didaftarkan di client ini"""
+        with self._lock:
+            return [job for job in self.jobs.values()
+                    if job.enabled and job.standing and job.matches(client_id, display_name)]
+
+    def catch_up(self, client_id, display_name=None):
+        """
+        Job yang terlewat oleh client yang baru terhubung kembali
+
+        Setiap job hanya dijalankan sekali untuk client tersebut, berapa pun
+        jumlah jadwal yang terlewat. Client dihapus dari daftar missed.
+
+        :return: List ScheduledJob
+        """
+        jobs = []
+        with self._lock:
+            for job in self.jobs.values():
+                # Target eksplisit yang belum pernah terhubung dicatat dengan namanya
+                key = client_id if client_id in job.missed else display_name
+                if job.enabled and key in job.missed and job.matches(client_id, display_name):
+                    del job.missed[key]
+                    jobs.append(job)
+        if jobs:
+            self.save()
+        return jobs
+
+
+class DelayedQueue:
+    """Antrian callable yang dijalankan setelah delay tertentu, dipompa oleh satu thread"""
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
+
+    def push(self, delay, callback, now=None):
+        due = (now or time.time()) + max(0.0, delay)
+        with self._lock:
+            heapq.heappush(self._heap, (due, next(self._counter), callback))
+
+    def pop_due(self, now=None):
+        """Ambil semua callable yang waktunya sudah tiba, urut berdasarkan waktu"""
+        now = now or time.time()
+        ready = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                ready.append(heapq.heappop(self._heap)[2])
+        return ready
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
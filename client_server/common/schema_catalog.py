@@ -0,0 +1,244 @@
+"""
+Katalog schema (tabel dan kolom) per client dari metadata yang di-cache server.
+
+Daftar tabel dan kolom diambil sekali dari RDB$RELATIONS/RDB$RELATION_FIELDS
+(diminta ulang hanya jika schema client berubah). Client dengan schema yang
+sama berbagi satu objek Schema. Katalog dipakai untuk:
+
+- validasi query sebelum dikirim: tabel/kolom yang tidak ada di client target
+  dilaporkan beserta saran nama terdekat
+- autocomplete di editor query: nama tabel, dan nama kolom setelah 'ALIAS.'
+"""
+import bisect
+import difflib
+import re
+import threading
+from collections import namedtuple
+
+from common.sql_analyzer import Statement
+
+COLUMNS_QUERY = ("SELECT RF.RDB$RELATION_NAME, RF.RDB$FIELD_NAME FROM RDB$RELATION_FIELDS RF "
+                 "JOIN RDB$RELATIONS R ON R.RDB$RELATION_NAME = RF.RDB$RELATION_NAME "
+                 "WHERE R.RDB$SYSTEM_FLAG = 0 OR R.RDB$SYSTEM_FLAG IS NULL "
+                 "ORDER BY RF.RDB$RELATION_NAME, RF.RDB$FIELD_POSITION")
+
+ISSUE_TABLE = 'table'
+ISSUE_COLUMN = 'column'
+ISSUE_ALIAS = 'alias'
+_VALIDATED_KINDS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'MERGE')
+_PLAIN_NAME = re.compile(r'[A-Z][A-Z0-9_$]*\Z')
+_COMPLETION_CONTEXT = re.compile(r'(?:("[^"]*"|[A-Za-z_][A-Za-z0-9_$]*)\.)?("?[A-Za-z0-9_$]*)\Z')
+
+SchemaIssue = namedtuple('SchemaIssue', 'kind name client_ids suggestion')
+
+
+def parse_columns(result):
+    """Hasil query COLUMNS_QUERY menjadi {tabel: [kolom, ...]} sesuai urutan kolom"""
+    columns = {}
+    for result_set in result or []:
+        for row in result_set.get('rows', []):
+            values = list(row.values()) if isinstance(row, dict) else list(row)
+            if len(values) < 2 or values[0] is None or values[1] is None:
+                continue
+            table, column = str(values[0]).strip(), str(values[1]).strip()
+            if table and column:
+                columns.setdefault(table, []).append(column)
+    return columns
+
+
+def quote_name(name):
+    """Nama identifier untuk disisipkan ke query (pakai kutip jika bukan nama biasa)"""
+    return name if _PLAIN_NAME.match(name) else '"' + name.replace('"', '""') + '"'
+
+
+def completion_context(text):
+    """
+    Konteks autocomplete dari teks sebelum kursor
+
+    :return: (qualifier atau None, prefix) misalnya ('E', 'NA') untuk 'SELECT E.NA'
+    """
+    match = _COMPLETION_CONTEXT.search(text)
+    qualifier, prefix = match.group(1), match.group(2)
+    if qualifier is not None:
+        qualifier = qualifier[1:-1] if qualifier.startswith('"') else qualifier.upper()
+    return qualifier, prefix
+
+
+class Schema:
+    """Tabel dan kolom satu database, dengan index nama terurut untuk pencarian prefix"""
+    def __init__(self, tables):
+        """
+        :param tables: {tabel: [kolom, ...] atau None jika kolom belum diketahui}
+        """
+        self.tables = {table: tuple(columns) if columns is not None else None
+                       for table, columns in tables.items()}
+        self.has_columns = any(columns is not None for columns in self.tables.values())
+        self.column_tables = {}  # kolom -> tabel yang memilikinya
+        for table, columns in self.tables.items():
+            for column in columns or ():
+                self.column_tables.setdefault(column, []).append(table)
+        self.table_names = sorted(self.tables, key=str.upper)
+        self._table_keys = [name.upper() for name in self.table_names]
+        self.column_names = sorted(self.column_tables, key=str.upper)
+        self._column_keys = [name.upper() for name in self.column_names]
+
+    def key(self):
+        return tuple(sorted(self.tables.items()))
+
+    def columns(self, table):
+        return self.tables.get(table)
+
+    def has_column(self, table, column):
+        columns = self.tables.get(table)
+        return columns is None or column in columns
+
+    @staticmethod
+    def _prefixed(names, keys, prefix, limit):
+        prefix = prefix.upper()
+        start = bisect.bisect_left(keys, prefix)
+        found = []
+        for name, key in zip(names[start:], keys[start:]):
+            if not key.startswith(prefix) or len(found) >= limit:
+                break
+            found.append(name)
+        return found
+
+    def match_tables(self, prefix, limit=50):
+        return self._prefixed(self.table_names, self._table_keys, prefix, limit)
+
+    def match_columns(self, prefix, table=None, limit=50):
+        if table is None:
+            return self._prefixed(self.column_names, self._column_keys, prefix, limit)
+        prefix = prefix.upper()
+        return [column for column in self.tables.get(table) or () if column.upper().startswith(prefix)][:limit]
+
+
+class SchemaCatalog:
+    """Schema per client; client dengan schema identik berbagi satu objek Schema"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client_schemas = {}  # client_id -> Schema
+        self._shared = {}  # key schema -> Schema
+
+    def _store(self, client_id, tables):
+        schema = Schema(tables)
+        key = schema.key()
+        with self._lock:
+            schema = self._shared.setdefault(key, schema)
+            self._client_schemas[client_id] = schema
+            used = {id(value) for value in self._client_schemas.values()}
+            for other in [k for k, value in self._shared.items() if id(value) not in used]:
+                del self._shared[other]
+        return schema
+
+    def set_tables(self, client_id, tables):
+        """
+        Daftar tabel client (dari get_tables). Kolom yang sudah diketahui untuk
+        tabel yang masih ada dipertahankan.
+        """
+        current = self.schema(client_id)
+        previous = current.tables if current is not None else {}
+        return self._store(client_id, {table: previous.get(table) for table in tables})
+
+    def set_columns(self, client_id, result):
+        """Kolom per tabel dari hasil COLUMNS_QUERY (atau dict {tabel: [kolom]})"""
+        columns = result if isinstance(result, dict) else parse_columns(result)
+        current = self.schema(client_id)
+        tables = dict.fromkeys(current.tables) if current is not None else {}
+        tables.update(columns)
+        return self._store(client_id, tables)
+
+    def schema(self, client_id):
+        with self._lock:
+            return self._client_schemas.get(client_id)
+
+    def forget(self, client_id):
+        with self._lock:
+            self._client_schemas.pop(client_id, None)
+
+    def _schemas(self, client_ids=None):
+        with self._lock:
+            if client_ids is None:
+                return list(self._client_schemas.items())
+            return [(client_id, self._client_schemas[client_id])
+                    for client_id in client_ids if client_id in self._client_schemas]
+
+    def complete(self, prefix, client_ids=None, qualifier=None, tables=None, limit=50):
+        """
+        Saran nama untuk autocomplete
+
+        :param qualifier: Teks sebelum '.' (alias atau nama tabel); saran berupa kolom tabel itu
+        :param tables: {alias/nama: tabel} dari query yang sedang diedit
+        :return: Daftar nama unik terurut
+        """
+        names = set()
+        table = None
+        prefix = prefix.lstrip('"')
+        if qualifier is not None:
+            table = (tables or {}).get(qualifier, qualifier)
+            if table is None:
+                return []
+        for _, schema in self._schemas(client_ids):
+            if table is not None:
+                names.update(schema.match_columns(prefix, table, limit))
+            else:
+                names.update(schema.match_tables(prefix, limit))
+                names.update(schema.match_columns(prefix, None, limit))
+        return sorted(names, key=str.upper)[:limit]
+
+    def validate(self, analysis, client_ids=None):
+        """
+        Periksa tabel dan kolom query terhadap schema setiap client target
+
+        Client yang schema-nya belum diterima dilewati. Statement dengan sumber
+        yang kolomnya tidak diketahui (CTE, derived table, procedure) hanya
+        diperiksa tabelnya dan kolom dengan qualifier tabel.
+
+        :return: List SchemaIssue, satu per nama yang bermasalah
+        """
+        issues = {}
+
+        def report(kind, name, client_id, candidates, key=None):
+            issue = issues.get((kind, name))
+            if issue is None:
+                matches = difflib.get_close_matches((key or name).upper(), [c.upper() for c in candidates], n=1)
+                suggestion = next((c for c in candidates if matches and c.upper() == matches[0]), None)
+                issue = issues[(kind, name)] = SchemaIssue(kind, name, [], suggestion)
+            if client_id not in issue.client_ids:
+                issue.client_ids.append(client_id)
+
+        for client_id, schema in self._schemas(client_ids):
+            for statement in analysis.statements:
+                if statement.kind not in _VALIDATED_KINDS:
+                    continue
+                known = {}
+                for table in statement.tables:
+                    if Statement.is_system_table(table):
+                        continue
+                    if table in schema.tables:
+                        known[table] = schema.tables[table]
+                    else:
+                        report(ISSUE_TABLE, table, client_id, schema.table_names)
+                if not schema.has_columns or len(known) < len(
+                        [t for t in statement.tables if not Statement.is_system_table(t)]):
+                    continue  # Tanpa metadata kolom atau ada tabel yang hilang: kolom tidak bisa dinilai
+                system = any(Statement.is_system_table(t) for t in statement.tables)
+                for qualifier, column in statement.column_refs:
+                    if qualifier is not None:
+                        if qualifier in statement.aliases:
+                            table = statement.aliases[qualifier]
+                        elif statement.opaque:
+                            continue
+                        else:
+                            report(ISSUE_ALIAS, qualifier, client_id, list(statement.aliases))
+                            continue
+                        if table is None or table not in known or known[table] is None:
+                            continue
+                        if column not in known[table]:
+                            report(ISSUE_COLUMN, f"{qualifier}.{column}", client_id, known[table], column)
+                    elif not statement.opaque and not system and known:
+                        if any(columns is None or column in columns for columns in known.values()):
+                            continue
+                        candidates = [c for columns in known.values() for c in columns]
+                        report(ISSUE_COLUMN, column, client_id, candidates)
+        return list(issues.values())
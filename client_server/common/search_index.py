@@ -0,0 +1,159 @@
+"""
+Index pencarian untuk result set di server.
+
+Index dibangun sekali per result set saat pertama kali dicari: setiap kolom
+disimpan sebagai array teks lower-case (None menjadi ""), sehingga pencarian
+berikutnya tidak lagi memanggil str().lower() per sel. Untuk kolom teks
+dibangun index trigram (potongan 3 karakter -> nomor baris) yang menyaring
+kandidat sebelum dicek dengan substring.
+
+Pencarian bersifat inkremental: jika teks baru adalah kelanjutan teks
+sebelumnya (mengetik satu huruf lagi), hanya hasil sebelumnya yang dicek
+ulang. Build dan search bisa dibatalkan lewat threading.Event sehingga
+search-as-you-type di background thread bisa membatalkan pencarian lama.
+"""
+import threading
+from array import array
+
+CHUNK_ROWS = 5000
+NGRAM = 3
+MAX_INDEXED_CHARS = 256  # Nilai yang lebih panjang selalu menjadi kandidat
+MIN_TEXT_RATIO = 0.2     # Kolom dengan nilai non-angka sebanyak ini dianggap teks
+
+
+class SearchCancelled(Exception):
+    """Pencarian dibatalkan karena ada pencarian yang lebih baru"""
+    pass
+
+
+def _is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _check(cancel):
+    if cancel is not None and cancel.is_set():
+        raise SearchCancelled()
+
+
+class SearchIndex:
+    """Index pencarian substring untuk satu result set (list dict atau ResultHandle)"""
+    def __init__(self, headers, rows, chunk_rows=CHUNK_ROWS):
+        self.headers = list(headers)
+        self.rows = rows
+        self.chunk_rows = chunk_rows
+        self.columns = None  # kolom -> list teks lower-case per baris
+        self._grams = {}     # kolom -> dict trigram -> array nomor baris, atau None jika kolom tidak di-index
+        self._long = {}      # kolom -> array nomor baris dengan nilai lebih panjang dari MAX_INDEXED_CHARS
+        self._last = None    # (teks, kolom, hasil) pencarian terakhir yang selesai
+        self._lock = threading.Lock()
+
+    @property
+    def built(self):
+        return self.columns is not None
+
+    def build(self, cancel=None):
+        """Bangun array teks lower-case per kolom (dipanggil otomatis oleh search)"""
+        with self._lock:
+            self._build(cancel)
+
+    def _build(self, cancel):
+        if self.columns is not None:
+            return
+        columns = {header: [] for header in self.headers}
+        for start in range(0, len(self.rows), self.chunk_rows):
+            _check(cancel)
+            for row in self.rows[start:start + self.chunk_rows]:
+                for header in self.headers:
+                    value = row.get(header)
+                    columns[header].append("" if value is None else str(value).lower())
+        self.columns = columns
+
+    def _column_grams(self, header, cancel):
+        """Index trigram satu kolom; None untuk kolom angka (cukup dipindai)"""
+        if header in self._grams:
+            return self._grams[header]
+        values = self.columns[header]
+        sample = [value for value in values[:1000] if value]
+        if sample and sum(not _is_number(value) for value in sample) < len(sample) * MIN_TEXT_RATIO:
+            self._grams[header] = None
+            return None
+
+        grams, long_rows = {}, array('I')
+        for start in range(0, len(values), self.chunk_rows):
+            _check(cancel)
+            for i in range(start, min(start + self.chunk_rows, len(values))):
+                value = values[i]
+                if len(value) > MAX_INDEXED_CHARS:
+                    long_rows.append(i)
+                    value = value[:MAX_INDEXED_CHARS]
+                for gram in {value[k:k + NGRAM] for k in range(len(value) - NGRAM + 1)}:
+                    postings = grams.get(gram)
+                    if postings is None:
+                        grams[gram] = postings = array('I')
+                    postings.append(i)
+        self._grams[header] = grams
+        self._long[header] = long_rows
+        return grams
+
+    def _candidates(self, header, text, cancel):
+        """Nomor baris yang mungkin cocok di satu kolom, None jika harus dipindai semua"""
+        if len(text) < NGRAM:
+            return None
+        grams = self._column_grams(header, cancel)
+        if grams is None:
+            return None
+        postings = [grams.get(text[k:k + NGRAM]) for k in range(len(text) - NGRAM + 1)]
+        if any(posting is None for posting in postings):
+            # Ada trigram yang tidak muncul di baris mana pun: hanya nilai panjang yang mungkin cocok
+            return list(self._long[header])
+        candidates = min(postings, key=len)
+        if self._long[header]:
+            return sorted(set(candidates).union(self._long[header]))
+        return candidates
+
+    def search(self, text, column=None, cancel=None):
+        """
+        Nomor baris (urut naik) yang mengandung teks
+
+        :param column: Nama kolom, atau None untuk semua kolom
+        :param cancel: threading.Event untuk membatalkan pencarian
+        :raises SearchCancelled: Jika cancel di-set selama pencarian
+        """
+        text = text.strip().lower()
+        if not text:
+            return []
+        headers = [column] if column in self.headers else self.headers
+        with self._lock:
+            self._build(cancel)
+            last = self._last
+            narrowed = last is not None and last[1] == column and text.startswith(last[0])
+            if narrowed and last[0] == text:
+                return list(last[2])
+
+            matches = set()
+            for header in headers:
+                values = self.columns[header]
+                if narrowed:
+                    candidates = last[2]
+                else:
+                    candidates = self._candidates(header, text, cancel)
+                if candidates is None:
+                    candidates = range(len(values))
+                for start in range(0, len(candidates), self.chunk_rows * 10):
+                    _check(cancel)
+                    matches.update(i for i in candidates[start:start + self.chunk_rows * 10]
+                                   if i not in matches and text in values[i])
+            result = sorted(matches)
+            self._last = (text, column, result)
+            return list(result)
+
+    def match_columns(self, row, text):
+        """Kolom di baris row yang mengandung teks (untuk daftar hasil pencarian)"""
+        text = text.strip().lower()
+        with self._lock:
+            self._build(None)
+            return [header for header in self.headers if text in self.columns[header][row]]
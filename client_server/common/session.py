@@ -0,0 +1,106 @@
+"""
+Session client-server dan reconnect dengan exponential backoff.
+
+Saat registrasi server memberikan session token. Client yang terputus lalu
+terhubung kembali mengirim token tersebut sehingga server dapat memulihkan
+entri client (daftar tabel, schema hash, request yang masih berjalan) tanpa
+mengulang seluruh handshake. Hasil query yang selesai saat client offline
+dikirim ulang setelah session dipulihkan.
+"""
+import hashlib
+import random
+import secrets
+import threading
+
+
+def new_session_token():
+    """Buat session token baru"""
+    return secrets.token_hex(16)
+
+
+def extract_table_names(result):
+    """Ambil daftar nama tabel dari hasil query RDB$RELATIONS"""
+    tables = []
+    for result_set in result:
+        for row in result_set.get('rows', []):
+            if row and len(row) > 0:
+                try:
+                    table_name = str(list(row.values())[0]).strip()
+                    if table_name:
+                        tables.append(table_name)
+                except Exception as e:
+                    print(f"Error parsing table name: {e}, row: {row}")
+    return tables
+
+
+def schema_hash(table_names):
+    """Hash daftar tabel untuk mendeteksi perubahan schema"""
+    digest = hashlib.sha1()
+    for name in sorted(set(table_names)):
+        digest.update(name.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def backoff_delay(attempt, base_delay, max_delay, rng=random):
+    """
+    Delay sebelum percobaan berikutnya (exponential backoff dengan jitter).
+    Setengah delay tetap, setengah lagi acak agar banyak client yang terputus
+    bersamaan tidak menyerbu server pada detik yang sama.
+
+    :param attempt: Jumlah percobaan yang sudah gagal (mulai 1)
+    """
+    cap = min(max_delay, base_delay * (2 ** max(0, attempt - 1)))
+    return cap / 2 + rng.uniform(0, cap / 2)
+
+
+class ReconnectManager:
+    """
+    Pemilik tunggal proses reconnect. Hanya ada satu thread; trigger() dapat
+    dipanggil berkali-kali dari mana saja tanpa membuat thread baru.
+    """
+    def __init__(self, connect, should_reconnect, base_delay=1.0, max_delay=60.0, log=print):
+        """
+        :param connect: Callable() -> bool, satu kali percobaan koneksi
+        :param should_reconnect: Callable() -> bool, False jika sudah terhubung atau reconnect dimatikan
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt = 0
+        self._connect = connect
+        self._should_reconnect = should_reconnect
+        self._log = log
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def trigger(self):
+        """Minta reconnect (idempotent)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            self.attempt = 0
+            while not self._stop.is_set() and self._should_reconnect():
+                if self._connect():
+                    self.attempt = 0
+                    break
+                self.attempt += 1
+                delay = backoff_delay(self.attempt, self.base_delay, self.max_delay)
+                self._log(f"Reconnect gagal (percobaan {self.attempt}), mencoba lagi dalam {delay:.1f} detik")
+                if self._stop.wait(delay):
+                    break
@@ -0,0 +1,151 @@
+"""
+Sort bertipe untuk result set di server.
+
+isql mengembalikan semua nilai sebagai teks, sehingga sort langsung atas teks
+menempatkan "10" sebelum "9". SortIndex menentukan tipe setiap kolom (angka,
+tanggal atau teks) dari nilainya, menghitung kunci sort bertipe sekali per
+kolom, lalu menghasilkan permutasi nomor baris (array, bukan salinan baris)
+yang di-cache per kolom dan arah. Nilai kosong selalu di akhir.
+
+Perhitungan dimaksudkan berjalan di background thread dan bisa dibatalkan
+lewat threading.Event di antara potongan baris.
+"""
+import datetime
+import itertools
+import threading
+from array import array
+
+from common.merged_result import to_number
+
+KIND_NUMBER = 'number'
+KIND_DATE = 'date'
+KIND_TEXT = 'text'
+CHUNK_ROWS = 5000
+EMPTY_VALUES = ('', '<null>')
+
+# Format tanggal/waktu isql (dialect 3 dan dialect 1) dan format umum
+DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%d-%b-%Y %H:%M:%S',
+    '%d-%b-%Y',
+    '%d.%m.%Y %H:%M:%S',
+    '%d.%m.%Y',
+    '%d/%m/%Y',
+)
+
+
+class SortCancelled(Exception):
+    """Sort dibatalkan karena ada permintaan sort yang lebih baru"""
+    pass
+
+
+def is_empty(value):
+    return value is None or (isinstance(value, str) and value.strip() in EMPTY_VALUES)
+
+
+def parse_date(text, formats=DATE_FORMATS):
+    """datetime dari teks tanggal/waktu, None jika bukan tanggal"""
+    if isinstance(text, (datetime.datetime, datetime.date)):
+        return text if isinstance(text, datetime.datetime) else datetime.datetime.combine(text, datetime.time())
+    text = str(text).strip()
+    for fmt in formats:
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def infer_kind(values, sample=1000):
+    """Tipe kolom dari contoh nilai yang terisi: angka, tanggal atau teks"""
+    filled = list(itertools.islice((value for value in values if not is_empty(value)), sample))
+    if not filled:
+        return KIND_TEXT
+    if all(to_number(value) is not None for value in filled):
+        return KIND_NUMBER
+    if all(parse_date(value) is not None for value in filled):
+        return KIND_DATE
+    return KIND_TEXT
+
+
+def sort_keys(values, kind):
+    """
+    Kunci sort bertipe per baris (None untuk nilai kosong)
+
+    :return: Tuple (kind, list kunci). Jika ada nilai yang tidak sesuai tipe,
+             seluruh kolom diperlakukan sebagai teks.
+    """
+    keys = []
+    if kind == KIND_NUMBER:
+        convert = to_number
+    elif kind == KIND_DATE:
+        convert = parse_date
+    else:
+        convert = None
+    if convert is not None:
+        for value in values:
+            if is_empty(value):
+                keys.append(None)
+                continue
+            key = convert(value)
+            if key is None:
+                return sort_keys(values, KIND_TEXT)
+            keys.append(key)
+        return kind, keys
+    return KIND_TEXT, [None if is_empty(value) else str(value).casefold() for value in values]
+
+
+class SortIndex:
+    """Permutasi baris tersortir per kolom untuk satu result set (list dict atau ResultHandle)"""
+    def __init__(self, headers, rows, chunk_rows=CHUNK_ROWS):
+        self.headers = list(headers)
+        self.rows = rows
+        self.chunk_rows = chunk_rows
+        self.kinds = {}    # kolom -> tipe yang dipakai
+        self._keys = {}    # kolom -> list kunci
+        self._orders = {}  # (kolom, descending) -> array nomor baris
+        self._lock = threading.Lock()
+
+    def cached(self, column, descending=False):
+        """
+        Permutasi yang sudah dihitung atau None. Tidak memakai lock sehingga aman
+        dipanggil dari UI thread saat sort kolom lain berjalan di background.
+        """
+        return self._orders.get((column, descending))
+
+    def order(self, column, descending=False, cancel=None):
+        """
+        Nomor baris dalam urutan sort
+
+        :raises SortCancelled: Jika cancel di-set sebelum sort selesai
+        """
+        with self._lock:
+            cached = self._orders.get((column, descending))
+            if cached is not None:
+                return cached
+            keys = self._column_keys(column, cancel)
+            if cancel is not None and cancel.is_set():
+                raise SortCancelled()
+            filled = [i for i, key in enumerate(keys) if key is not None]
+            empty = [i for i, key in enumerate(keys) if key is None]
+            # sorted() stabil juga untuk reverse=True; nilai kosong tetap di akhir
+            order = array('I', sorted(filled, key=keys.__getitem__, reverse=descending))
+            order.extend(empty)
+            self._orders[(column, descending)] = order
+            return order
+
+    def _column_keys(self, column, cancel):
+        keys = self._keys.get(column)
+        if keys is not None:
+            return keys
+        values = []
+        for start in range(0, len(self.rows), self.chunk_rows):
+            if cancel is not None and cancel.is_set():
+                raise SortCancelled()
+            values.extend(row.get(column) for row in self.rows[start:start + self.chunk_rows])
+        kind, keys = sort_keys(values, infer_kind(values))
+        self.kinds[column] = kind
+        self._keys[column] = keys
+        return keys
@@ -0,0 +1,608 @@
+"""
+Tokenizer dan analyzer SQL ringan untuk dialect Firebird.
+
+Menggantikan pemeriksaan berbasis substring huruf besar (kolom FIRSTNAME
+terbaca sebagai FIRST, ';' di dalam string literal memecah statement).
+Query di-tokenize sekali dan hasil analisisnya di-cache per teks query:
+
+- pemisahan statement yang mengabaikan ';' di string, identifier berquote,
+  komentar dan blok PSQL (EXECUTE BLOCK, CREATE PROCEDURE/TRIGGER), dan
+  mengikuti SET TERM
+- deteksi batasan baris (FIRST/SKIP, ROWS, OFFSET/FETCH) dan jendela FIRST/SKIP
+  untuk paging cursor
+- deteksi statement yang mengubah data (DML/DDL)
+- daftar tabel yang dirujuk (FROM, JOIN, INTO, UPDATE, USING), tanpa nama CTE,
+  beserta alias tabel dan referensi kolom untuk validasi schema
+- estimasi biaya query dengan jumlah baris tabel yang di-cache dari client
+"""
+import functools
+import math
+import re
+import threading
+from collections import namedtuple
+
+WORD = 'word'          # Keyword atau identifier tanpa quote
+QUOTED = 'quoted'      # Identifier berquote "..."
+STRING = 'string'      # String literal '...' atau q'{...}'
+NUMBER = 'number'
+PARAM = 'param'        # :nama atau ?
+PUNCT = 'punct'        # Operator dan tanda baca
+
+Token = namedtuple('Token', 'kind text upper start end depth')
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<qstring>[Qq]'(?:\{.*?\}|\(.*?\)|\[.*?\]|<.*?>|(?P<qdelim>[^\s{(\[<]).*?(?P=qdelim))')
+  | (?P<string>'(?:[^']|'')*(?:'|\Z))
+  | (?P<quoted>"(?:[^"]|"")*(?:"|\Z))
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<param>:[A-Za-z_][A-Za-z0-9_$]*|\?)
+  | (?P<punct><>|!=|\^=|~=|<=|>=|\|\||\S)
+""", re.VERBOSE | re.DOTALL)
+
+# Statement yang mengubah data atau struktur database
+MODIFYING_KINDS = frozenset((
+    'INSERT', 'UPDATE', 'DELETE', 'MERGE', 'ALTER', 'DROP', 'CREATE', 'RECREATE', 'TRUNCATE',
+    'GRANT', 'REVOKE', 'EXECUTE', 'COMMENT', 'DECLARE'
+))
+# Statement dengan body PSQL: ';' di antara BEGIN ... END bukan pemisah statement
+_PSQL_OBJECTS = frozenset(('PROCEDURE', 'TRIGGER', 'FUNCTION', 'PACKAGE', 'BLOCK'))
+# Kata yang menutup daftar tabel setelah FROM
+_CLAUSE_WORDS = frozenset((
+    'WHERE', 'GROUP', 'ORDER', 'HAVING', 'UNION', 'PLAN', 'ROWS', 'FOR', 'OFFSET', 'FETCH',
+    'WINDOW', 'SET', 'VALUES', 'RETURNING', 'WHEN', 'INTO', 'ON'
+))
+# Fungsi dengan kata FROM di dalam argumennya, misalnya EXTRACT(YEAR FROM TGL)
+_FROM_FUNCTIONS = frozenset(('EXTRACT', 'SUBSTRING', 'TRIM', 'OVERLAY', 'POSITION'))
+_CONDITION_WORDS = frozenset(('IN', 'BETWEEN', 'LIKE', 'STARTING', 'CONTAINING', 'SIMILAR', 'IS'))
+_COMPARISONS = frozenset(('=', '<', '>', '<>', '!=', '^=', '~=', '<=', '>='))
+_LIMIT_VALUES = (NUMBER, PARAM)
+# Keyword Firebird yang bukan nama kolom (nama fungsi dikenali dari '(' setelahnya)
+KEYWORDS = frozenset('''
+    ACTIVE ADD AFTER ALL ALTER ALWAYS AND ANY AS ASC ASCENDING AT AUTO BEFORE BEGIN BETWEEN BIGINT
+    BLOB BLOCK BOOLEAN BOTH BY CASE CAST CHAR CHARACTER CHECK CLOSE COLLATE COLUMN COMMIT COMPUTED
+    CONSTRAINT CONTAINING CREATE CROSS CURRENT CURRENT_CONNECTION CURRENT_DATE CURRENT_ROLE
+    CURRENT_TIME CURRENT_TIMESTAMP CURRENT_TRANSACTION CURRENT_USER CURSOR DATE DAY DEC DECIMAL
+    DECLARE DEFAULT DELETE DELETING DESC DESCENDING DISTINCT DO DOUBLE DROP ELSE END ESCAPE EXCEPTION
+    EXECUTE EXISTS EXTERNAL FALSE FETCH FIRST FLOAT FOR FOREIGN FROM FULL FUNCTION GDSCODE GENERATED
+    GRANT GROUP HAVING HOUR IDENTITY IF IN INACTIVE INDEX INNER INSERT INSERTING INT INTEGER INTO IS
+    JOIN KEY LAST LATERAL LEADING LEFT LIKE LOCALTIME LOCALTIMESTAMP LOCK MATCHED MATCHING MERGE
+    MILLISECOND MINUTE MONTH NATURAL NCHAR NEXT NO NOT NULL NULLS NUMERIC OF OFFSET ON ONLY OPEN OR
+    ORDER OUTER OVER PARTITION PLAN PRECISION PRIMARY PROCEDURE RECREATE RECURSIVE REFERENCES
+    RETURNING RETURNS RIGHT ROLLBACK ROW ROWS ROW_COUNT SECOND SELECT SET SIMILAR SINGULAR SKIP
+    SMALLINT SOME SORT SQLCODE SQLSTATE STARTING SUB_TYPE SUSPEND TABLE THEN TIME TIMESTAMP TO
+    TRAILING TRIGGER TRUE TYPE UNION UNIQUE UNKNOWN UPDATE UPDATING USER USING VALUE VALUES VARCHAR
+    VARIABLE VARYING VIEW WEEK WEEKDAY WHEN WHERE WHILE WITH WITHOUT YEAR YEARDAY ZONE
+'''.split())
+# Keyword yang bisa mengakhiri ekspresi (sebelum alias kolom tanpa AS)
+_VALUE_KEYWORDS = frozenset(('END', 'NULL', 'TRUE', 'FALSE', 'CURRENT_DATE', 'CURRENT_TIME', 'CURRENT_TIMESTAMP',
+                             'CURRENT_USER', 'LOCALTIME', 'LOCALTIMESTAMP'))
+_SYSTEM_PREFIXES = ('RDB$', 'MON$', 'SEC$')
+_AGGREGATES = frozenset(('COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'LIST'))
+
+
+def tokenize(text):
+    """Token query tanpa spasi dan komentar; kurung buka/tutup diberi level di luarnya"""
+    tokens = []
+    depth = 0
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind in ('space', 'comment'):
+            continue
+        value = match.group()
+        if kind == 'qstring':
+            kind = STRING
+        elif kind == 'punct' and value == ')':
+            depth = max(depth - 1, 0)
+        tokens.append(Token(kind, value, value.upper() if kind == WORD else value,
+                            match.start(), match.end(), depth))
+        if kind == 'punct' and value == '(':
+            depth += 1
+    return tokens
+
+
+def identifier(token):
+    """Nama objek dari token identifier: tanpa quote apa adanya, berquote tanpa tanda kutip"""
+    if token.kind == QUOTED:
+        return token.text[1:-1].replace('""', '"')
+    return token.upper
+
+
+def split_statements(text, tokens=None):
+    """
+    Pisahkan query menjadi statement
+
+    :return: List (token statement, posisi awal, posisi akhir teks statement)
+    """
+    tokens = tokenize(text) if tokens is None else tokens
+    statements = []
+    terminator = ';'
+    current = []
+    skip_until = -1
+    psql = body = False  # Statement PSQL dan body-nya (setelah AS) sudah mulai
+    seen_begin = False
+    blocks = 0           # Level BEGIN/CASE ... END yang terbuka
+
+    for token in tokens:
+        if token.start < skip_until:
+            continue
+        if token.kind == PUNCT and text.startswith(terminator, token.start) and (
+                not body or (seen_begin and not blocks)):
+            if current:
+                statements.append((current, current[0].start, current[-1].end))
+            skip_until = token.start + len(terminator)
+            if [t.upper for t in current[:2]] == ['SET', 'TERM'] and len(current) > 2:
+                # SET TERM ^ ; -> terminator berikutnya '^'
+                terminator = text[current[2].start:current[-1].end].strip()
+            current = []
+            psql = body = seen_begin = False
+            blocks = 0
+            continue
+        current.append(token)
+        if token.kind != WORD:
+            continue
+        if len(current) <= 5 and not psql:
+            first = current[0].upper
+            psql = ((first == 'EXECUTE' and token.upper == 'BLOCK')
+                    or (first in ('CREATE', 'ALTER', 'RECREATE') and token.upper in _PSQL_OBJECTS))
+        elif psql and not body and token.upper == 'AS' and token.depth == 0:
+            body = True
+        elif body and token.upper in ('BEGIN', 'CASE'):
+            blocks += 1
+            seen_begin = seen_begin or token.upper == 'BEGIN'
+        elif body and token.upper == 'END' and blocks:
+            blocks -= 1
+    if current:
+        statements.append((current, current[0].start, current[-1].end))
+    return statements
+
+
+class Statement:
+    """Hasil analisis satu statement SQL"""
+    def __init__(self, tokens, text, start, end):
+        self.tokens = tokens
+        self.start = start
+        self.end = end
+        self.text = text[start:end]
+        self.kind = tokens[0].upper if tokens and tokens[0].kind == WORD else ''
+        if self.kind == 'WITH':
+            self.kind = 'SELECT'
+        self.ctes = set()
+        self.tables = []
+        self.select_token = None   # SELECT utama (level teratas)
+        self.row_limit = False     # FIRST, ROWS atau FETCH
+        self.skip = False          # SKIP atau OFFSET
+        self.distinct = False
+        self.union = False
+        self.where = False
+        self.where_conditions = 0  # Jumlah AND/OR di WHERE
+        self.where_compares = False
+        self.group_by = False
+        self.joins = 0
+        self.subqueries = 0
+        self.select_star = False
+        self.columns = 0
+        self.aliases = {}          # alias atau nama tabel -> tabel (None untuk procedure/derived table)
+        self.opaque = False        # Ada sumber yang kolomnya tidak diketahui (CTE, derived table, procedure)
+        self.column_refs = []      # (qualifier atau None, kolom)
+        self.select_aliases = set()
+        self._names = set()        # Indeks token nama tabel dan alias
+        self._analyze()
+        self._collect_column_refs()
+
+    def _analyze(self):
+        tokens = self.tokens
+        count = len(tokens)
+        if tokens and tokens[0].upper == 'WITH':
+            self._collect_ctes()
+        functions = []       # Nama fungsi per level kurung yang terbuka
+        from_depth = None    # Level daftar tabel FROM yang sedang dibaca
+        expect_table = None  # Keyword sebelum nama tabel yang ditunggu
+        in_where = False
+        in_columns = False   # Di dalam daftar kolom SELECT utama
+        select_list = None
+        for i, token in enumerate(tokens):
+            upper = token.upper
+            previous = tokens[i - 1] if i else None
+            following = tokens[i + 1] if i + 1 < count else None
+            if expect_table is not None:
+                keyword, expect_table = expect_table, None
+                # Nama diikuti '(' setelah FROM/JOIN adalah procedure selectable, setelah INTO daftar kolom
+                if token.kind in (WORD, QUOTED) and upper not in ('SELECT', 'LATERAL') and (
+                        keyword == 'INTO' or following is None or following.text != '('):
+                    name = identifier(token)
+                    if name in self.ctes:
+                        self.opaque = True
+                        self.aliases[name] = None
+                    elif name not in self.tables:
+                        self.tables.append(name)
+                    if name not in self.ctes:
+                        self.aliases[name] = name
+                    self._names.add(i)
+                    self._table_alias(i, None if name in self.ctes else name)
+                    continue
+                if keyword in ('FROM', 'JOIN', 'USING'):
+                    self.opaque = True  # Derived table atau procedure selectable
+            if token.kind == PUNCT:
+                if token.text == '(':
+                    functions.append(previous.upper if previous is not None and previous.kind == WORD else None)
+                elif token.text == ')':
+                    if functions:
+                        functions.pop()
+                    if from_depth is not None and token.depth < from_depth:
+                        from_depth = None
+                elif token.text == ',' and token.depth == from_depth:
+                    expect_table = 'FROM'
+                elif token.text == ',' and token.depth == 0 and in_columns:
+                    self.columns += 1
+                elif token.text == '*' and in_columns and (i == select_list or previous.text in (',', '.')):
+                    self.select_star = True
+                if in_where and upper in _COMPARISONS:
+                    self.where_compares = True
+                continue
+            if token.kind != WORD:
+                continue
+
+            if in_where and upper in _CONDITION_WORDS:
+                self.where_compares = True
+            if upper == 'SELECT':
+                if token.depth > 0:
+                    self.subqueries += 1
+                elif self.select_token is None and self.kind == 'SELECT':
+                    self.select_token = token
+                    select_list = self._after_select_modifiers(i + 1)
+                    in_columns = True
+                    self.columns = 1
+            elif upper in ('FROM', 'JOIN', 'INTO', 'USING', 'UPDATE'):
+                if upper == 'FROM' and ((functions and functions[-1] in _FROM_FUNCTIONS)
+                                        or (previous is not None and previous.upper == 'DISTINCT')):
+                    continue  # EXTRACT(YEAR FROM ...), A IS DISTINCT FROM B
+                if upper == 'UPDATE' and (i > 0 or (following is not None and following.upper == 'OR')):
+                    continue  # FOR UPDATE, UPDATE OR INSERT INTO
+                if upper == 'JOIN':
+                    self.joins += 1
+                expect_table = upper
+                if upper == 'FROM':
+                    from_depth = token.depth
+                    if token.depth == 0:
+                        in_columns = False
+            elif token.depth == 0:
+                if upper in _CLAUSE_WORDS:
+                    if from_depth == 0:
+                        from_depth = None
+                    in_where = upper == 'WHERE'
+                if upper == 'WHERE':
+                    self.where = True
+                elif upper == 'UNION':
+                    self.union = True
+                    in_columns = False
+                elif upper == 'GROUP' and following is not None and following.upper == 'BY':
+                    self.group_by = True
+                elif upper == 'ROWS' and self.kind == 'SELECT' and not (i > 1 and tokens[i - 2].upper == 'OFFSET'):
+                    self.row_limit = True
+                elif upper == 'FETCH' and following is not None and following.upper in ('FIRST', 'NEXT'):
+                    self.row_limit = True
+                elif upper == 'OFFSET' and following is not None and following.kind in _LIMIT_VALUES:
+                    self.skip = True
+                elif in_where and upper in ('AND', 'OR'):
+                    self.where_conditions += 1
+
+    def _table_alias(self, index, table):
+        """Catat alias setelah nama tabel pada indeks token (T A, T AS A)"""
+        tokens = self.tokens
+        index += 1
+        if index < len(tokens) and tokens[index].upper == 'AS':
+            index += 1
+        if index >= len(tokens):
+            return
+        token = tokens[index]
+        if token.kind == QUOTED or (token.kind == WORD and token.upper not in KEYWORDS):
+            self.aliases[identifier(token)] = table
+            self._names.add(index)
+
+    def _collect_column_refs(self):
+        """Referensi kolom: A.KOLOM (qualifier alias/tabel) dan nama kolom tanpa qualifier"""
+        tokens = self.tokens
+        count = len(tokens)
+        skip = set(self._names)
+        in_plan = False
+        for i, token in enumerate(tokens):
+            if i in skip or token.kind not in (WORD, QUOTED):
+                continue
+            upper = token.upper
+            previous = tokens[i - 1] if i else None
+            before = tokens[i - 2] if i > 1 else None
+            following = tokens[i + 1] if i + 1 < count else None
+            if token.kind == WORD and token.depth == 0 and upper in ('PLAN', 'ORDER', 'ROWS', 'UNION', 'FOR'):
+                in_plan = upper == 'PLAN'
+            if in_plan or (token.kind == WORD and upper in KEYWORDS) or identifier(token) in self.ctes:
+                continue
+            if following is not None and following.text == '(':
+                continue  # Fungsi atau procedure
+            if previous is not None and previous.upper == 'AS':
+                self.select_aliases.add(identifier(token))
+                continue
+            if previous is not None and (previous.text == '.' or previous.upper == 'COLLATE'):
+                continue
+            if before is not None and ((before.upper, previous.upper) in (('CHARACTER', 'SET'), ('VALUE', 'FOR'))
+                                       or (before.upper == 'GEN_ID' and previous.text == '(')):
+                continue  # CHARACTER SET WIN1252, NEXT VALUE FOR GEN, GEN_ID(GEN, 1)
+            if following is not None and following.text == '.':
+                column = tokens[i + 2] if i + 2 < count else None
+                if column is not None and column.kind in (WORD, QUOTED):
+                    self.column_refs.append((identifier(token), identifier(column)))
+                    skip.add(i + 2)
+                continue
+            if previous is not None and (following is None or following.text == ',' or following.upper == 'FROM') and (
+                    previous.kind in (NUMBER, STRING, QUOTED) or previous.text == ')'
+                    or (previous.kind == WORD and (previous.upper not in KEYWORDS or previous.upper in _VALUE_KEYWORDS))):
+                # Alias kolom tanpa AS: SELECT MAX(A) M FROM T
+                if self.select_token is not None or self.subqueries:
+                    self.select_aliases.add(identifier(token))
+                    continue
+            self.column_refs.append((None, identifier(token)))
+        self.column_refs = [(qualifier, column) for qualifier, column in self.column_refs
+                            if qualifier is not None or column not in self.select_aliases]
+
+    def _after_select_modifiers(self, index):
+        """Lewati FIRST n, SKIP n, DISTINCT/ALL setelah SELECT utama; return indeks daftar kolom"""
+        tokens = self.tokens
+        while index < len(tokens):
+            token = tokens[index]
+            following = tokens[index + 1] if index + 1 < len(tokens) else None
+            if token.upper in ('FIRST', 'SKIP') and following is not None and (
+                    following.kind in _LIMIT_VALUES or following.text == '('):
+                if token.upper == 'FIRST':
+                    self.row_limit = True
+                else:
+                    self.skip = True
+                index += 2
+                if following.text == '(':
+                    while index < len(tokens) and tokens[index].depth > token.depth:
+                        index += 1
+                    index += 1
+            elif token.upper in ('DISTINCT', 'ALL'):
+                self.distinct = self.distinct or token.upper == 'DISTINCT'
+                index += 1
+            else:
+                break
+        return index
+
+    def _collect_ctes(self):
+        """Nama CTE dari WITH [RECURSIVE] nama [(kolom)] AS (...), ..."""
+        expect_name = True
+        for token in self.tokens[1:]:
+            if token.depth > 0:
+                continue
+            if token.upper == 'SELECT':
+                break
+            if token.upper == 'RECURSIVE':
+                continue
+            if expect_name and token.kind in (WORD, QUOTED):
+                self.ctes.add(identifier(token))
+                self.opaque = True
+                expect_name = False
+            elif token.text == ',':
+                expect_name = True
+
+    @property
+    def is_select(self):
+        return self.kind == 'SELECT'
+
+    @property
+    def modifies(self):
+        return self.kind in MODIFYING_KINDS
+
+    @staticmethod
+    def is_system_table(name):
+        return name.upper().startswith(_SYSTEM_PREFIXES)
+
+    @property
+    def windowable(self):
+        """SELECT yang bisa diberi jendela FIRST/SKIP (belum memakai limit, SKIP atau UNION)"""
+        return (self.select_token is not None and not self.row_limit and not self.skip
+                and not self.union)
+
+
+class QueryAnalysis:
+    """Hasil analisis query (satu atau beberapa statement); jangan diubah, objek di-cache bersama"""
+    def __init__(self, text):
+        self.text = text
+        tokens = tokenize(text)
+        self.statements = [Statement(statement_tokens, text, start, end)
+                           for statement_tokens, start, end in split_statements(text, tokens)]
+
+    @property
+    def is_select(self):
+        """True jika semua statement adalah SELECT"""
+        return bool(self.statements) and all(statement.is_select for statement in self.statements)
+
+    @property
+    def has_row_limit(self):
+        """True jika ada SELECT yang sudah dibatasi FIRST/ROWS/FETCH"""
+        return any(statement.row_limit for statement in self.statements)
+
+    @property
+    def modifies(self):
+        """True jika ada statement yang mengubah data atau struktur (DML/DDL/EXECUTE)"""
+        return any(statement.modifies for statement in self.statements)
+
+    @property
+    def tables(self):
+        """Tabel yang dirujuk semua statement, tanpa duplikat"""
+        tables = []
+        for statement in self.statements:
+            tables.extend(table for table in statement.tables if table not in tables)
+        return tables
+
+    def page_window(self, first, skip):
+        """
+        Query SELECT tunggal dengan jendela FIRST/SKIP, None jika tidak bisa diberi jendela
+        (multi statement, bukan SELECT, sudah memakai FIRST/SKIP/ROWS/OFFSET, atau UNION)
+        """
+        if len(self.statements) != 1 or not self.statements[0].windowable:
+            return None
+        statement = self.statements[0]
+        select = statement.select_token
+        # FIRST/SKIP harus berada tepat setelah SELECT (sebelum DISTINCT)
+        return (self.text[statement.start:select.start] + f"SELECT FIRST {int(first)} SKIP {int(skip)} "
+                + self.text[select.end:statement.end].lstrip())
+
+    def stable_order(self):
+        """
+        Query SELECT tunggal dari satu tabel dengan urutan unik: RDB$DB_KEY ditambahkan
+        sebagai kunci terakhir ORDER BY. Jendela FIRST/SKIP yang dieksekusi berulang
+        hanya konsisten jika urutannya unik.
+
+        :return: Teks query, atau None jika urutan tidak bisa dibuat unik (JOIN, subquery,
+                 DISTINCT, GROUP BY, agregat, FOR UPDATE/WITH LOCK, atau tidak bisa diberi jendela)
+        """
+        if len(self.statements) != 1:
+            return None
+        statement = self.statements[0]
+        if (not statement.windowable or len(statement.tables) != 1 or statement.joins or statement.opaque
+                or statement.distinct or statement.group_by):
+            return None
+        tokens = statement.tokens
+        ordered = False
+        for i, token in enumerate(tokens):
+            if token.depth or token.kind != WORD:
+                continue
+            following = tokens[i + 1] if i + 1 < len(tokens) else None
+            if token.upper in _AGGREGATES and following is not None and following.text == '(':
+                return None
+            if token.upper == 'LOCK' or (token.upper == 'FOR' and following is not None
+                                         and following.upper == 'UPDATE'):
+                return None
+            if token.upper == 'ORDER' and following is not None and following.upper == 'BY':
+                ordered = True
+        text = self.text[statement.start:statement.end].rstrip()
+        return text + (", RDB$DB_KEY" if ordered else " ORDER BY RDB$DB_KEY")
+
+    def row_count_source(self):
+        """
+        Tabel yang jumlah barisnya bisa dibaca dari hasil query ini
+
+        :return: Tuple (tabel, 'count') untuk SELECT COUNT(*) FROM T, (tabel, 'scan') untuk
+                 SELECT tanpa WHERE/JOIN/GROUP/limit dari satu tabel, atau None
+        """
+        if len(self.statements) != 1:
+            return None
+        statement = self.statements[0]
+        if (not statement.is_select or len(statement.tables) != 1 or statement.where or statement.joins
+                or statement.group_by or statement.union or statement.row_limit or statement.skip
+                or statement.subqueries or statement.distinct or statement.ctes):
+            return None
+        texts = [token.upper for token in statement.tokens]
+        if texts[:6] == ['SELECT', 'COUNT', '(', '*', ')', 'FROM']:
+            return statement.tables[0], 'count'
+        if 'COUNT' in texts or 'SUM' in texts or 'MAX' in texts or 'MIN' in texts or 'AVG' in texts:
+            return None
+        return statement.tables[0], 'scan'
+
+
+@functools.lru_cache(maxsize=256)
+def analyze(query):
+    """Analisis query, di-cache per teks query"""
+    return QueryAnalysis(query)
+
+
+QueryCost = namedtuple('QueryCost', 'score table rows')
+
+
+def estimate_cost(analysis, row_counts=None):
+    """
+    Estimasi biaya query pada skala 1-10
+
+    :param row_counts: Callable(tabel) -> jumlah baris yang diketahui atau None
+    :return: QueryCost(score, tabel terbesar yang diketahui, jumlah barisnya)
+    """
+    largest_table, largest_rows = None, None
+    if row_counts is not None:
+        for table in analysis.tables:
+            rows = row_counts(table)
+            if rows is not None and (largest_rows is None or rows > largest_rows):
+                largest_table, largest_rows = table, rows
+
+    score = 1
+    for statement in analysis.statements:
+        if statement.kind not in ('SELECT', 'UPDATE', 'DELETE', 'MERGE'):
+            continue
+        complexity = statement.joins * 2
+
+        # Kompleksitas WHERE
+        if statement.where:
+            complexity += statement.where_conditions
+            if not statement.where_compares:
+                complexity += 3
+        elif not statement.row_limit:
+            # Tanpa WHERE dan tanpa limit seluruh tabel dibaca; tabel kecil yang diketahui tidak masalah
+            small = largest_rows is not None and largest_rows < 1000 and all(
+                row_counts(table) is not None for table in statement.tables)
+            if not small:
+                complexity += 5
+            if largest_rows:
+                complexity += min(max(int(math.log10(largest_rows)) - 3, 0), 4)
+
+        # Banyaknya kolom yang dipilih
+        if statement.select_star:
+            complexity += 3
+        elif statement.is_select:
+            complexity += min((statement.columns - 1) / 5, 2)  # Max 2 poin untuk banyak kolom
+
+        # Agregasi, grouping dan subquery
+        if statement.group_by:
+            complexity += 2
+        complexity += statement.subqueries * 2
+        score = max(score, complexity)
+
+    return QueryCost(min(max(int(round(score)), 1), 10), largest_table, largest_rows)
+
+
+class TableRowCounts:
+    """Cache jumlah baris per tabel per client, dipelajari dari hasil query"""
+    def __init__(self):
+        self._counts = {}  # tabel -> {client_id: jumlah baris}
+        self._lock = threading.Lock()
+
+    def update(self, client_id, table, rows):
+        with self._lock:
+            self._counts.setdefault(table, {})[client_id] = int(rows)
+
+    def get(self, table):
+        """Jumlah baris terbesar di antara client, None jika belum diketahui"""
+        with self._lock:
+            counts = self._counts.get(table)
+            return max(counts.values()) if counts else None
+
+    def observe(self, client_id, query, result, complete=True, total_rows=None):
+        """
+        Catat jumlah baris dari hasil query yang membaca satu tabel utuh
+
+        :param complete: False jika result hanya sebagian (halaman pertama remote cursor)
+        :param total_rows: Jumlah baris seluruh hasil jika diketahui (remote cursor)
+        :return: Tuple (tabel, jumlah baris) yang dicatat atau None
+        """
+        source = analyze(query).row_count_source()
+        if source is None or not result:
+            return None
+        table, kind = source
+        rows = result[0].get('rows') or []
+        if kind == 'count':
+            if len(rows) != 1:
+                return None
+            value = next(iter(rows[0].values()), None) if isinstance(rows[0], dict) else None
+            try:
+                count = int(str(value).strip())
+            except (TypeError, ValueError):
+                return None
+        elif total_rows is not None:
+            count = total_rows
+        elif complete:
+            count = len(rows)
+        else:
+            return None
+        self.update(client_id, table, count)
+        return table, count
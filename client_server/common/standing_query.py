@@ -0,0 +1,193 @@
+"""
+Standing query: query yang didaftarkan server di client dan dijalankan ulang
+hanya jika database berubah.
+
+Client memantau signature file .fdb (ukuran dan mtime). Jika signature
+berubah, query probe yang murah (misalnya SELECT MAX(ID)) dijalankan lebih
+dulu bila ada; query utama hanya dijalankan jika nilai probe berubah.
+Hasilnya didorong ke server tanpa diminta.
+
+Koneksi isql sendiri juga dapat mengubah header page (dan mtime) file
+database. Karena itu signature dibaca ulang setelah client menjalankan query
+dan dipakai sebagai baseline bersama, sehingga run milik client tidak memicu
+run berikutnya. max_interval memaksa refresh berkala sebagai jaring pengaman.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_POLL_INTERVAL = 2.0   # detik, interval pemeriksaan signature file
+DEFAULT_MIN_INTERVAL = 10.0   # detik, jarak minimum antar run satu standing query
+DEFAULT_MAX_INTERVAL = 900.0  # detik, refresh paksa walaupun file tidak berubah
+
+
+def file_signature(path):
+    """Signature file database (ukuran, mtime dalam ns); None jika file tidak ada"""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def probe_value(result):
+    """Nilai hasil probe yang dibandingkan antar run (baris pertama result set pertama)"""
+    for result_set in result or []:
+        rows = result_set.get('rows', [])
+        if rows:
+            return [str(value) for value in rows[0].values()]
+        return []
+    return None
+
+
+class StandingQuery:
+    """Satu standing query yang terdaftar di client"""
+    def __init__(self, query_id, query, probe=None, min_interval=DEFAULT_MIN_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL, key_columns=None, base=None):
+        """
+        :param query_id: ID dari server (nama job)
+        :param probe: Query murah untuk mendeteksi perubahan (opsional)
+        :param min_interval: Jarak minimum antar run (detik)
+        :param max_interval: Refresh paksa setelah selang ini (detik); 0 atau None untuk menonaktifkan
+        :param base: Hash hasil yang dimiliki server untuk transfer delta
+        """
+        self.query_id = query_id
+        self.query = query
+        self.probe = probe
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.key_columns = key_columns
+        self.base = base
+        self.signature = None  # Signature file saat run terakhir
+        self.last_probe = None
+        self.last_run = 0.0
+        self.runs = 0
+        self.skipped = 0  # Perubahan file yang tidak mengubah nilai probe
+
+    @classmethod
+    def from_message(cls, data):
+        return cls(data['query_id'], data['query'], data.get('probe'),
+                   data.get('min_interval', DEFAULT_MIN_INTERVAL), data.get('max_interval', DEFAULT_MAX_INTERVAL),
+                   data.get('key_columns'), data.get('base'))
+
+    def is_due(self, signature, now):
+        """Perlu diperiksa: file berubah sejak run terakhir, atau refresh paksa sudah tiba"""
+        if now - self.last_run < self.min_interval:
+            return False
+        if self.runs == 0 or signature != self.signature:
+            return True
+        return bool(self.max_interval) and now - self.last_run >= self.max_interval
+
+
+class StandingQueryWatcher:
+    """Thread pemantau file database untuk semua standing query"""
+    def __init__(self, get_db_path, execute, on_result, poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        :param get_db_path: Callable() -> path file database saat ini
+        :param execute: Callable(query) -> result; raise exception jika gagal
+        :param on_result: Callable(standing_query, result, error) dipanggil setelah query utama dijalankan
+        """
+        self.get_db_path = get_db_path
+        self.execute = execute
+        self.on_result = on_result
+        self.poll_interval = poll_interval
+        self.queries = OrderedDict()  # query_id -> StandingQuery
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._running = False
+
+    def __len__(self):
+        with self._lock:
+            return len(self.queries)
+
+    def register(self, standing_query):
+        """Daftarkan atau ganti standing query; run pertama dilakukan segera"""
+        with self._lock:
+            self.queries[standing_query.query_id] = standing_query
+        self._wake.set()
+
+    def unregister(self, query_id):
+        with self._lock:
+            return self.queries.pop(query_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.queries.clear()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+
+    def _run(self):
+        while self._running:
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error pada standing query watcher: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def check(self, now=None):
+        """
+        Satu putaran pemeriksaan: jalankan standing query yang filenya berubah
+
+        :return: Jumlah query utama yang dijalankan
+        """
+        path = self.get_db_path()
+        signature = file_signature(path)
+        if signature is None:
+            return 0
+        now = now or time.time()
+        with self._lock:
+            due = [query for query in self.queries.values() if query.is_due(signature, now)]
+        if not due:
+            return 0
+
+        executed = 0
+        checked = []
+        for standing_query in due:
+            checked.append(standing_query)
+            if standing_query.probe:
+                value = self._probe(standing_query)
+                if (standing_query.runs and value == standing_query.last_probe
+                        and not self._forced(standing_query, now)):
+                    # File berubah tetapi data yang dipantau tidak
+                    standing_query.skipped += 1
+                    continue
+                standing_query.last_probe = value
+
+            try:
+                result, error = self.execute(standing_query.query), None
+            except Exception as e:
+                result, error = None, str(e)
+            standing_query.last_run = now
+            standing_query.runs += 1
+            executed += 1
+            self.on_result(standing_query, result, error)
+
+        # Baseline bersama: perubahan file akibat run client sendiri tidak memicu run berikutnya
+        baseline = file_signature(path)
+        with self._lock:
+            for standing_query in self.queries.values():
+                if standing_query in checked or standing_query.signature == signature:
+                    standing_query.signature = baseline
+        return executed
+
+    def _probe(self, standing_query):
+        try:
+            return probe_value(self.execute(standing_query.probe))
+        except Exception as e:
+            return f"error: {e}"
+
+    @staticmethod
+    def _forced(standing_query, now):
+        return bool(standing_query.max_interval) and now - standing_query.last_run >= standing_query.max_interval
@@ -0,0 +1,293 @@
+"""
+Generator dataset Firebird sintetis untuk testing offline.
+
+File dataset yang dihasilkan bukan database Firebird asli, melainkan file JSON
+kecil berisi spesifikasi tabel (nama, bentuk, jumlah baris, seed). Baris data
+dibangkitkan secara deterministik dari spesifikasi tersebut sehingga tabel
+berukuran jutaan baris tidak perlu disimpan di disk. File ini dibaca oleh
+``fake_isql.py`` yang meniru executable isql.
+"""
+import os
+import json
+import random
+import tempfile
+import zlib
+import datetime
+
+DATASET_FORMAT = 'ifess-synthetic'
+DATASET_VERSION = 1
+DEFAULT_SEED = 42
+DEFAULT_ROWS = 1000
+DEFAULT_TABLE = 'FFBLOADINGCROP02'
+
+# Lokasi fake isql (di root client_server, sejajar dengan script test lain)
+FAKE_ISQL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'fake_isql.bat' if os.name == 'nt' else 'fake_isql.py'
+)
+
+# Lebar tampilan isql per tipe data (dialect 3)
+TYPE_WIDTHS = {
+    'SMALLINT': 6,
+    'INTEGER': 11,
+    'BIGINT': 21,
+    'DOUBLE': 22,
+    'DATE': 11,
+    'TIME': 13,
+    'TIMESTAMP': 24,
+    'BLOB': 17,
+}
+
+NUMERIC_TYPES = ('SMALLINT', 'INTEGER', 'BIGINT', 'DOUBLE')
+
+# Struktur tabel FFBLOADINGCROP (sama untuk semua tabel bernomor 01, 02, ...)
+FFBLOADINGCROP_COLUMNS = [
+    ('ID', 'INTEGER'),
+    ('SCANUSERID', 'INTEGER'),
+    ('OCID', 'INTEGER'),
+    ('VEHICLECODEID', 'VARCHAR(15)'),
+    ('FIELDID', 'INTEGER'),
+    ('BUNCHES', 'INTEGER'),
+    ('LOOSEFRUIT', 'INTEGER'),
+    ('TRANSNO', 'VARCHAR(20)'),
+    ('FFBTRANSNO', 'VARCHAR(20)'),
+    ('TRANSSTATUS', 'VARCHAR(10)'),
+    ('TRANSDATE', 'DATE'),
+    ('TRANSTIME', 'TIME'),
+    ('UPLOADDATETIME', 'TIMESTAMP'),
+    ('LASTUSER', 'VARCHAR(20)'),
+    ('LASTUPDATED', 'TIMESTAMP'),
+    ('RECORDTAG', 'VARCHAR(10)'),
+    ('DRIVERNAME', 'VARCHAR(40)'),
+    ('DRIVERID', 'VARCHAR(20)'),
+    ('HARVESTINGDATE', 'DATE'),
+    ('PROCESSFLAG', 'SMALLINT'),
+]
+
+# Baris acuan dari snapshot PTRJ_P1A yang dipakai oleh test_db_connector.py
+FFBLOADINGCROP02_ANCHOR_ROWS = {
+    1: {'SCANUSERID': 188, 'BUNCHES': 7, 'TRANSNO': '10414593'},
+    2: {'SCANUSERID': 188, 'BUNCHES': 4, 'TRANSNO': '10414591'},
+    7: {'SCANUSERID': 188, 'BUNCHES': 6, 'TRANSNO': '10414600'},
+    10: {'SCANUSERID': 188, 'BUNCHES': 11, 'TRANSNO': '10414634'},
+}
+
+_SCAN_USERS = [188, 188, 188, 192, 203, 215]
+_LAST_USERS = ['ADMIN', 'KRANI01', 'KRANI02', 'KRANI03']
+_DRIVERS = ['AHMAD', 'BUDI', 'DEDI', 'HENDRA', 'JOKO', 'RUDI', 'SAIFUL', 'YANTO']
+_STATUSES = ['POSTED', 'POSTED', 'POSTED', 'OPEN', 'VOID']
+_ROWS_PER_DAY = 400
+_START_DATE = datetime.date(2025, 1, 1)
+
+
+def parse_type(type_name):
+    """
+    Pecah nama tipe menjadi (base, length)
+
+    :param type_name: Nama tipe, misalnya 'INTEGER' atau 'VARCHAR(15)'
+    :return: Tuple (base, length), length None untuk tipe non-karakter
+    """
+    type_name = type_name.upper().strip()
+    if '(' in type_name:
+        base, length = type_name.split('(', 1)
+        return base.strip(), int(length.rstrip(')'))
+    return type_name, None
+
+
+def display_width(type_name):
+    """Lebar kolom isql untuk tipe data tertentu"""
+    base, length = parse_type(type_name)
+    if length is not None:
+        return length
+    return TYPE_WIDTHS.get(base, 20)
+
+
+def is_numeric_type(type_name):
+    """Cek apakah tipe ditampilkan rata kanan oleh isql"""
+    return parse_type(type_name)[0] in NUMERIC_TYPES
+
+
+class SyntheticTable:
+    """Tabel sintetis yang barisnya dibangkitkan sesuai kebutuhan"""
+    def __init__(self, name, shape='FFBLOADINGCROP', rows=DEFAULT_ROWS, seed=DEFAULT_SEED):
+        self.name = name.upper()
+        self.shape = shape
+        self.row_count = int(rows)
+        self.seed = int(seed)
+        self.columns = list(FFBLOADINGCROP_COLUMNS)
+        self._name_hash = zlib.crc32(self.name.encode('ascii'))
+        self._anchors = FFBLOADINGCROP02_ANCHOR_ROWS if self.name == DEFAULT_TABLE else {}
+
+    def column_names(self):
+        return [name for name, _ in self.columns]
+
+    def make_row(self, index):
+        """
+        Bangkitkan satu baris (tuple) secara deterministik
+
+        :param index: Indeks baris berbasis 0, ID = index + 1
+        :return: Tuple nilai sesuai urutan kolom
+        """
+        rng = random.Random((self.seed << 40) ^ (self._name_hash << 8) ^ index)
+        row_id = index + 1
+
+        trans_date = _START_DATE + datetime.timedelta(days=index // _ROWS_PER_DAY)
+        seconds = 6 * 3600 + rng.randint(0, 12 * 3600 - 1)
+        trans_time = datetime.time(seconds // 3600, (seconds // 60) % 60, seconds % 60)
+        trans_dt = datetime.datetime.combine(trans_date, trans_time)
+        upload_dt = trans_dt + datetime.timedelta(minutes=rng.randint(5, 240))
+
+        values = {
+            'ID': row_id,
+            'SCANUSERID': rng.choice(_SCAN_USERS),
+            'OCID': 1,
+            'VEHICLECODEID': f"BK {rng.randint(1000, 9999)} PA",
+            'FIELDID': rng.randint(1, 400),
+            'BUNCHES': rng.randint(1, 60),
+            'LOOSEFRUIT': rng.randint(0, 30),
+            'TRANSNO': str(10414590 + index * 3 + rng.randint(0, 2)),
+            'FFBTRANSNO': f"F{20250000 + index}",
+            'TRANSSTATUS': rng.choice(_STATUSES),
+            'TRANSDATE': trans_date,
+            'TRANSTIME': trans_time,
+            'UPLOADDATETIME': upload_dt,
+            'LASTUSER': rng.choice(_LAST_USERS),
+            'LASTUPDATED': upload_dt,
+            'RECORDTAG': None if rng.random() < 0.2 else rng.choice(['A', 'B', 'M']),
+            'DRIVERNAME': rng.choice(_DRIVERS),
+            'DRIVERID': f"D{rng.randint(100, 999)}",
+            'HARVESTINGDATE': trans_date - datetime.timedelta(days=rng.randint(0, 1)),
+            'PROCESSFLAG': rng.randint(0, 1),
+        }
+
+        anchor = self._anchors.get(row_id)
+        if anchor:
+            values.update(anchor)
+
+        return tuple(values[name] for name, _ in self.columns)
+
+    def iter_rows(self, start=0, stop=None):
+        """Iterasi baris dari indeks start sampai stop (eksklusif)"""
+        if stop is None or stop > self.row_count:
+            stop = self.row_count
+        for index in range(max(0, start), stop):
+            yield self.make_row(index)
+
+
+class SyntheticDataset:
+    """Kumpulan tabel sintetis yang dimuat dari file spesifikasi"""
+    def __init__(self, spec, path=None):
+        self.spec = spec
+        self.path = path
+        self.seed = int(spec.get('seed', DEFAULT_SEED))
+        self.username = spec.get('username', 'SYSDBA')
+        self.password = spec.get('password', 'masterkey')
+        self.tables = {}
+        for name, table_spec in spec.get('tables', {}).items():
+            self.tables[name.upper()] = SyntheticTable(
+                name,
+                shape=table_spec.get('shape', 'FFBLOADINGCROP'),
+                rows=table_spec.get('rows', DEFAULT_ROWS),
+                seed=table_spec.get('seed', self.seed)
+            )
+
+    def get_table(self, name):
+        return self.tables.get(name.upper())
+
+    def table_names(self):
+        return sorted(self.tables)
+
+
+def create_dataset(path, rows=DEFAULT_ROWS, tables=None, seed=DEFAULT_SEED,
+                   username='SYSDBA', password='masterkey'):
+    """
+    Buat file dataset sintetis
+
+    :param path: Path file .fdb yang akan dibuat
+    :param rows: Jumlah baris default per tabel
+    :param tables: List nama tabel atau dict nama -> jumlah baris (default: FFBLOADINGCROP02)
+    :param seed: Seed untuk pembangkitan data
+    :param username: Username yang diterima oleh fake isql
+    :param password: Password yang diterima oleh fake isql
+    :return: Path file dataset
+    """
+    if tables is None:
+        tables = [DEFAULT_TABLE]
+    if not isinstance(tables, dict):
+        tables = {name: rows for name in tables}
+
+    spec = {
+        'format': DATASET_FORMAT,
+        'version': DATASET_VERSION,
+        'seed': seed,
+        'username': username,
+        'password': password,
+        'created': datetime.datetime.now().isoformat(),
+        'tables': {
+            name.upper(): {'shape': 'FFBLOADINGCROP', 'rows': int(count)}
+            for name, count in tables.items()
+        }
+    }
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(spec, f, indent=2)
+    return path
+
+
+def load_dataset(path):
+    """
+    Muat dataset sintetis dari file
+
+    :param path: Path file dataset
+    :return: Objek SyntheticDataset
+    :raises ValueError: Jika file bukan dataset sintetis
+    """
+    with open(path, 'r') as f:
+        try:
+            spec = json.load(f)
+        except json.JSONDecodeError:
+            raise ValueError(f"Bukan file dataset sintetis: {path}")
+
+    if not isinstance(spec, dict) or spec.get('format') != DATASET_FORMAT:
+        raise ValueError(f"Bukan file dataset sintetis: {path}")
+
+    return SyntheticDataset(spec, path)
+
+
+def resolve_test_database(db_path, isql_path=None, rows=DEFAULT_ROWS):
+    """
+    Pilih database untuk test. Database asli dipakai jika ada (bisa di-override
+    dengan environment IFESS_TEST_DB / IFESS_ISQL_PATH), selain itu dibuat
+    dataset sintetis di direktori temp dan fake isql dipakai sebagai isql.
+
+    :param db_path: Path database asli
+    :param isql_path: Path isql asli (None untuk auto-detect)
+    :param rows: Jumlah baris dataset sintetis
+    :return: Tuple (db_path, isql_path)
+    """
+    db_path = os.environ.get('IFESS_TEST_DB', db_path)
+    isql_path = os.environ.get('IFESS_ISQL_PATH', isql_path)
+    if db_path and os.path.exists(db_path):
+        return db_path, isql_path
+
+    synthetic_path = os.path.join(tempfile.gettempdir(), 'ifess_synthetic', 'PTRJ_P1A.FDB')
+    create_dataset(synthetic_path, rows=rows)
+    return synthetic_path, FAKE_ISQL_PATH
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Buat dataset Firebird sintetis untuk fake isql")
+    parser.add_argument('path', help="Path file .fdb yang akan dibuat")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help="Jumlah baris per tabel")
+    parser.add_argument('--tables', default=DEFAULT_TABLE,
+                        help="Daftar tabel dipisah koma, contoh FFBLOADINGCROP01,FFBLOADINGCROP02")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    table_names = [t.strip() for t in args.tables.split(',') if t.strip()]
+    create_dataset(args.path, rows=args.rows, tables=table_names, seed=args.seed)
+    print(f"Dataset sintetis dibuat: {args.path} ({len(table_names)} tabel x {args.rows} baris)")
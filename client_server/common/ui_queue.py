@@ -0,0 +1,104 @@
+"""
+Antrian event dari worker thread ke UI thread Tk.
+
+Tk tidak thread-safe, jadi thread socket, heartbeat dan scheduler tidak
+menyentuh widget secara langsung. Mereka memasukkan callback ke UiEventQueue,
+lalu satu pump root.after di UI thread menguras antrian dengan frame rate
+tetap.
+
+Event dengan key yang sama (misalnya "daftar client berubah") digabung: selama
+event itu belum dijalankan, event berikutnya hanya mengganti argumennya.
+Pekerjaan per frame dibatasi jumlah event dan waktu; sisanya dilanjutkan pada
+frame berikutnya sehingga UI tetap responsif saat beban tinggi.
+"""
+import threading
+import time
+import traceback
+from collections import deque
+
+DEFAULT_FRAME_MS = 50            # 20 frame per detik
+DEFAULT_MAX_EVENTS = 200         # Event maksimum per frame
+DEFAULT_FRAME_BUDGET = 0.03      # detik, batas waktu kerja per frame
+
+
+class _Event:
+    __slots__ = ('key', 'due', 'callback', 'args')
+
+    def __init__(self, key, due, callback, args):
+        self.key = key
+        self.due = due
+        self.callback = callback
+        self.args = args
+
+
+class UiEventQueue:
+    """Antrian callback thread-safe yang dikuras di UI thread"""
+    def __init__(self, max_events_per_frame=DEFAULT_MAX_EVENTS, frame_budget=DEFAULT_FRAME_BUDGET):
+        self.max_events_per_frame = max_events_per_frame
+        self.frame_budget = frame_budget
+        self._events = deque()
+        self._coalesced = {}  # key -> _Event yang belum dijalankan
+        self._lock = threading.Lock()
+        self.posted = 0
+        self.coalesced = 0  # Event yang digabung ke event yang masih tertunda
+
+    def __len__(self):
+        with self._lock:
+            return len(self._events)
+
+    def post(self, callback, *args):
+        """Jalankan callback(*args) di UI thread (urutan FIFO)"""
+        with self._lock:
+            self._events.append(_Event(None, 0.0, callback, args))
+            self.posted += 1
+
+    def post_coalesced(self, key, callback, *args, delay=0.0):
+        """
+        Seperti post, tetapi event dengan key yang sama yang masih tertunda
+        diganti (posisi dan waktu jalannya tetap)
+
+        :param delay: Tunda event baru minimal selama ini (detik)
+        """
+        with self._lock:
+            self.posted += 1
+            pending = self._coalesced.get(key)
+            if pending is not None:
+                pending.callback = callback
+                pending.args = args
+                self.coalesced += 1
+                return
+            event = _Event(key, time.monotonic() + delay if delay else 0.0, callback, args)
+            self._coalesced[key] = event
+            self._events.append(event)
+
+    def drain(self, now=None):
+        """
+        Jalankan event yang sudah waktunya (dipanggil di UI thread)
+
+        :return: Jumlah event yang dijalankan
+        """
+        now = now if now is not None else time.monotonic()
+        deadline = time.perf_counter() + self.frame_budget
+        processed = 0
+        deferred = []
+        while processed < self.max_events_per_frame and time.perf_counter() < deadline:
+            with self._lock:
+                if not self._events:
+                    break
+                event = self._events.popleft()
+                if event.due > now:
+                    deferred.append(event)
+                    continue
+                if event.key is not None:
+                    self._coalesced.pop(event.key, None)
+            try:
+                event.callback(*event.args)
+            except Exception:
+                print("Error pada event UI:")
+                traceback.print_exc()
+            processed += 1
+
+        if deferred:
+            with self._lock:
+                self._events.extendleft(reversed(deferred))
+        return processed
@@ -0,0 +1,408 @@
+"""
+Grid hasil query dengan virtual scrolling untuk server.
+
+Treeview hanya berisi item sebanyak baris yang terlihat. Item tersebut dipakai
+ulang saat scroll (nilainya diganti, bukan dihapus lalu dibuat lagi), dan
+scrollbar vertikal mengatur indeks baris pertama di sumber data. Baris diambil
+dari sumber sebagai jendela: baris terlihat ditambah overscan di atas dan
+bawah, sehingga scroll kecil tidak perlu mengakses ResultStore lagi.
+
+Sumber data cukup menyediakan __len__ dan get(start, stop) yang
+mengembalikan list tuple nilai sesuai urutan kolom (None untuk baris yang
+belum tersedia, misalnya halaman remote cursor yang masih diminta).
+"""
+import threading
+import tkinter as tk
+from array import array
+from tkinter import ttk
+
+from common.result_store import ResultHandle
+
+DEFAULT_OVERSCAN = 50
+DEFAULT_ROW_HEIGHT = 20
+DEFAULT_HEADER_HEIGHT = 25
+WHEEL_LINES = 3
+PLACEHOLDER = "…"
+
+
+def column_widths(headers, sample_rows, max_width=300):
+    """
+    Lebar kolom dari judul dan beberapa baris contoh
+
+    :param sample_rows: List tuple nilai (misalnya 100 baris pertama)
+    :return: List lebar dalam piksel
+    """
+    widths = []
+    for position, header in enumerate(headers):
+        width = len(str(header)) * 10
+        for row in sample_rows:
+            if row is not None and position < len(row) and row[position] is not None:
+                width = max(width, len(str(row[position])) * 8)
+        widths.append(min(width, max_width))
+    return widths
+
+
+def scroll_window(total, first, visible, overscan):
+    """
+    Batas baris pertama yang ditampilkan dan jendela baris yang diambil
+
+    :return: Tuple (first, jumlah baris tampil, awal jendela, akhir jendela)
+    """
+    first = max(0, min(first, total - visible))
+    count = max(0, min(visible, total - first))
+    return first, count, max(0, first - overscan), min(total, first + count + overscan)
+
+
+class ListSource:
+    """
+    Sumber baris dari list dict atau ResultHandle, opsional melalui permutasi
+    urutan (hasil sort) tanpa menyalin baris
+    """
+    def __init__(self, headers, rows):
+        self.headers = list(headers)
+        self.rows = rows
+        self.order = None     # Nomor baris per posisi tampil, None untuk urutan asli
+        self._inverse = None  # Posisi tampil per nomor baris
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, start, stop):
+        if self.order is None:
+            rows = self.rows[start:stop]
+        elif isinstance(self.rows, ResultHandle):
+            rows = self.rows.rows_at(self.order[start:stop])
+        else:
+            rows = [self.rows[row_id] for row_id in self.order[start:stop]]
+        return [tuple(row.get(header) for header in self.headers) for row in rows]
+
+    def set_order(self, order):
+        self.order = order
+        self._inverse = None
+
+    def row_id(self, position):
+        """Nomor baris asli untuk posisi tampil"""
+        return position if self.order is None else self.order[position]
+
+    def position(self, row_id):
+        """Posisi tampil untuk nomor baris asli"""
+        if self.order is None:
+            return row_id
+        if self._inverse is None:
+            inverse = array('I', [0]) * len(self.order)
+            for position, original in enumerate(self.order):
+                inverse[original] = position
+            self._inverse = inverse
+        return self._inverse[row_id]
+
+
+class MergedSource:
+    """Sumber baris dari MergedResult dengan urutan view (filter/sort)"""
+    def __init__(self, merged, view):
+        self.merged = merged
+        self.view = view
+
+    def __len__(self):
+        return len(self.view)
+
+    def get(self, start, stop):
+        return self.merged.rows(self.view[start:stop])
+
+
+class RemoteCursorSource:
+    """
+    Sumber baris dari RemoteCursor. Halaman yang belum ada di cache diminta ke
+    client; baris None ditampilkan sebagai placeholder sampai halaman tiba.
+    """
+    def __init__(self, remote_cursor, headers, post):
+        """
+        :param post: Callable(callback, *args) untuk menjalankan callback di UI thread
+        """
+        self.remote_cursor = remote_cursor
+        self.headers = list(headers)
+        self.post = post
+        self.listener = None  # Callable() di UI thread saat halaman baru tiba
+        self.error = None
+        self._waiting = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        cursor = self.remote_cursor
+        if cursor.total_rows is not None:
+            return cursor.total_rows
+        return cursor.known_pages * cursor.page_size
+
+    def get(self, start, stop):
+        rows = [None] * max(0, stop - start)
+        page_size = self.remote_cursor.page_size
+        for page in range(start // page_size, (max(start, stop - 1)) // page_size + 1):
+            page_rows = self._page(page)
+            if not page_rows:
+                continue
+            offset = page * page_size
+            for i, row in enumerate(page_rows):
+                if start <= offset + i < stop:
+                    rows[offset + i - start] = tuple(row.get(header) for header in self.headers)
+        return rows
+
+    def _page(self, page):
+        """Baris satu halaman jika sudah di cache; jika belum, minta dan kembalikan None"""
+        # Halaman dicatat sebagai ditunggu sebelum diminta: callback dari thread jaringan
+        # bisa datang kapan saja setelah get_page dan harus menemukannya di _waiting
+        with self._lock:
+            if page in self._waiting:
+                return None
+            self._waiting.add(page)
+        state = {'sync': True, 'done': False, 'rows': None, 'error': None}
+        state_lock = threading.Lock()
+
+        def on_page(rows, error):
+            with state_lock:
+                if state['sync']:
+                    state.update(done=True, rows=rows, error=error)
+                    return
+            with self._lock:
+                self._waiting.discard(page)
+            self.post(self._arrived, error)
+
+        self.remote_cursor.get_page(page, on_page)
+        with state_lock:
+            state['sync'] = False
+        if not state['done']:
+            return None
+        # Halaman sudah ada di cache cursor (callback langsung dipanggil)
+        with self._lock:
+            self._waiting.discard(page)
+        if state['error']:
+            self.error = state['error']
+        return state['rows']
+
+    def _arrived(self, error):
+        if error:
+            self.error = error
+        if self.listener:
+            self.listener()
+
+
+class VirtualGrid(ttk.Frame):
+    """Treeview dengan virtual scrolling di atas sumber baris"""
+    def __init__(self, parent, columns, source, style="ISQL.Treeview", overscan=DEFAULT_OVERSCAN,
+                 widths=None, on_heading=None):
+        """
+        :param columns: Daftar kolom
+        :param source: Sumber baris (__len__ dan get(start, stop))
+        :param widths: Lebar kolom; None untuk dihitung dari 100 baris pertama
+        :param on_heading: Callable(column) saat judul kolom diklik
+        """
+        super().__init__(parent)
+        self.source = source
+        self.overscan = overscan
+        self.on_heading = on_heading
+        self.row_tags = None  # Callable(index, values) -> tuple tag, misalnya untuk highlight pencarian
+        self.first = 0
+        self.selected = None  # Indeks baris terpilih di sumber
+        self.columns = []
+        self._visible = 1
+        self._row_height = None
+        self._header_height = None
+        self._slots = []  # iid item Treeview yang dipakai ulang
+        self._attached = 0
+        self._shown = []  # (indeks, nilai, tag) per slot yang sedang tampil
+        self._window_start = 0
+        self._window = []
+        self._window_complete = False
+
+        self.hsb = ttk.Scrollbar(self, orient="horizontal")
+        self.hsb.pack(side=tk.BOTTOM, fill=tk.X)
+        body = ttk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(body, show="headings", style=style, selectmode="browse")
+        self.vsb = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.hsb.configure(command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.hsb.set)
+
+        self.tree.bind("<Configure>", lambda event: self.render())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_wheel)
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                          ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(key, lambda event, step=step: self._on_key(step))
+
+        self.set_columns(columns, widths)
+
+    def set_columns(self, columns, widths=None):
+        """Ganti daftar kolom (misalnya kolom baru dari hasil gabungan)"""
+        self.columns = list(columns)
+        self.tree.configure(columns=self.columns)
+        if widths is None:
+            widths = column_widths(self.columns, self.source.get(0, min(len(self.source), 100)))
+        for column, width in zip(self.columns, widths):
+            self.tree.heading(column, text=column, anchor=tk.W, command=lambda c=column: self._on_heading(c))
+            self.tree.column(column, width=width, stretch=True, anchor=tk.W)
+        self.refresh()
+
+    def set_heading(self, column, text):
+        self.tree.heading(column, text=text)
+
+    def set_source(self, source):
+        self.source = source
+        self.refresh()
+
+    def refresh(self):
+        """Ambil ulang baris dari sumber (data, urutan atau highlight berubah)"""
+        self._window = []
+        self._window_complete = False
+        self._shown = []
+        self.render()
+
+    def see(self, index, select=True):
+        """Scroll agar baris index terlihat"""
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self._visible:
+            self.first = index - self._visible + 1
+        if select:
+            self.selected = index
+        self.render()
+
+    def shown_rows(self):
+        """List (indeks, nilai) baris yang sedang tampil; nilai None jika belum tersedia"""
+        return [(index, values) for index, values, _ in self._shown]
+
+    def selected_values(self):
+        """Nilai baris terpilih, None jika tidak ada"""
+        if self.selected is None or self.selected >= len(self.source):
+            return None
+        rows = self.source.get(self.selected, self.selected + 1)
+        return rows[0] if rows else None
+
+    def render(self):
+        """Tampilkan baris yang terlihat dengan memakai ulang item Treeview"""
+        if not self.tree.winfo_exists():
+            return
+        self._visible = self._visible_rows()
+        total = len(self.source)
+        self.first, count, _, _ = scroll_window(total, self.first, self._visible, self.overscan)
+        rows = self._rows(total, self.first, count)
+
+        # Slot yang tidak dipakai dilepas (bukan dihapus) agar bisa dipakai lagi
+        if count < self._attached:
+            self.tree.detach(*self._slots[count:self._attached])
+        elif count > self._attached:
+            for position in range(self._attached, min(count, len(self._slots))):
+                self.tree.move(self._slots[position], "", position)
+            while len(self._slots) < count:
+                self._slots.append(self.tree.insert("", tk.END))
+        self._attached = count
+        del self._shown[count:]
+
+        for position in range(count):
+            index = self.first + position
+            values = rows[position]
+            tags = tuple(self.row_tags(index, values)) if self.row_tags and values is not None else ()
+            state = (index, values, tags)
+            if position < len(self._shown):
+                if self._shown[position] == state:
+                    continue
+                self._shown[position] = state
+            else:
+                self._shown.append(state)
+            display = ([PLACEHOLDER] * len(self.columns) if values is None
+                       else ["" if value is None else value for value in values])
+            self.tree.item(self._slots[position], values=display, tags=tags)
+
+        if self.selected is not None and self.first <= self.selected < self.first + count:
+            slot = self._slots[self.selected - self.first]
+            if self.tree.selection() != (slot,):
+                self.tree.selection_set(slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        if total:
+            self.vsb.set(self.first / total, (self.first + count) / total)
+        else:
+            self.vsb.set(0, 1)
+
+        if self._row_height is None and count:
+            # Tinggi baris baru diketahui setelah ada item yang tampil
+            self.after_idle(self._measure)
+
+    def _rows(self, total, first, count):
+        """Baris first..first+count dari jendela cache; jendela diambil ulang jika perlu"""
+        start = self._window_start
+        if not (self._window_complete and start <= first and first + count <= start + len(self._window)):
+            _, _, start, stop = scroll_window(total, first, self._visible, self.overscan)
+            self._window = self.source.get(start, stop)
+            self._window_start = start
+            self._window_complete = all(row is not None for row in self._window)
+        offset = first - self._window_start
+        return self._window[offset:offset + count]
+
+    def _visible_rows(self):
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return max(self._visible, 20)
+        row_height = self._row_height or DEFAULT_ROW_HEIGHT
+        header_height = self._header_height if self._header_height is not None else DEFAULT_HEADER_HEIGHT
+        return max(1, (height - header_height) // row_height)
+
+    def _measure(self):
+        if not self._attached or not self.tree.winfo_exists():
+            return
+        bbox = self.tree.bbox(self._slots[0])
+        if bbox:
+            self._header_height = bbox[1]
+            self._row_height = max(1, bbox[3])
+            self.render()
+
+    def _scroll_to(self, first):
+        self.first = max(0, int(first))
+        self.render()
+
+    def _on_scrollbar(self, *args):
+        total = len(self.source)
+        if args[0] == 'moveto':
+            self._scroll_to(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            self._scroll_to(self.first + (amount * self._visible if args[2] == 'pages' else amount))
+
+    def _on_wheel(self, event):
+        if getattr(event, 'num', None) == 4:
+            lines = -WHEEL_LINES
+        elif getattr(event, 'num', None) == 5:
+            lines = WHEEL_LINES
+        else:
+            lines = -int(event.delta / 120 * WHEEL_LINES) or (-1 if event.delta > 0 else 1)
+        self._scroll_to(self.first + lines)
+        return "break"
+
+    def _on_key(self, step):
+        total = len(self.source)
+        if not total:
+            return "break"
+        current = self.selected if self.selected is not None else self.first
+        if step == "home":
+            index = 0
+        elif step == "end":
+            index = total - 1
+        elif step == "page":
+            index = current + self._visible
+        elif step == "-page":
+            index = current - self._visible
+        else:
+            index = current + step
+        self.see(max(0, min(total - 1, index)))
+        return "break"
+
+    def _on_heading(self, column):
+        if self.on_heading:
+            self.on_heading(column)
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._slots[:self._attached]:
+            self.selected = self.first + self._slots.index(selection[0])
@@ -0,0 +1,3 @@
+@echo off
+rem Wrapper agar fake_isql.py bisa dipakai sebagai isql_path di Windows
+python "%~dp0fake_isql.py" %*
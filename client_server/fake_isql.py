@@ -0,0 +1,1292 @@
+#!/usr/bin/env python3
+"""
+Pengganti isql untuk testing offline.
+
+Script ini menerima opsi command line yang sama dengan isql Firebird
+(-user, -password, -i, -o, -m, -page) dan menulis output dengan format
+kolom yang sama persis dengan isql, tetapi data diambil dari dataset
+sintetis (lihat common/synthetic_db.py). Dengan begitu FirebirdConnector
+dan seluruh stack client/server bisa dijalankan di Linux tanpa Firebird:
+
+    python common/synthetic_db.py /tmp/PTRJ_P1A.FDB --rows 100000
+    FirebirdConnector(db_path="/tmp/PTRJ_P1A.FDB", isql_path="fake_isql.py")
+
+Query yang didukung adalah SELECT satu tabel dengan FIRST/SKIP/ROWS,
+DISTINCT, WHERE, GROUP BY, ORDER BY, fungsi agregat dan beberapa fungsi
+skalar sederhana. JOIN dan subquery tidak didukung.
+"""
+import os
+import re
+import sys
+import datetime
+
+# Tambahkan path untuk mengimpor dari direktori common
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.synthetic_db import (
+    load_dataset, parse_type, display_width, is_numeric_type
+)
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+
+SYSTEM_RELATIONS = [
+    'RDB$PAGES', 'RDB$DATABASE', 'RDB$FIELDS', 'RDB$INDEX_SEGMENTS',
+    'RDB$INDICES', 'RDB$RELATION_FIELDS', 'RDB$RELATIONS',
+]
+
+AGGREGATES = ('COUNT', 'SUM', 'AVG', 'MIN', 'MAX')
+SCALAR_FUNCTIONS = ('UPPER', 'LOWER', 'TRIM', 'COALESCE')
+
+ARITHMETIC_HEADERS = {'+': 'ADD', '-': 'SUBTRACT', '*': 'MULTIPLY', '/': 'DIVIDE'}
+
+
+class IsqlError(Exception):
+    """Error dengan format pesan isql"""
+    def __init__(self, sqlstate, lines):
+        super().__init__(lines[0] if lines else sqlstate)
+        self.sqlstate = sqlstate
+        self.lines = lines
+
+    def format(self):
+        text = ""
+        if self.sqlstate:
+            text += f"Statement failed, SQLSTATE = {self.sqlstate}\n"
+        return text + "\n".join(self.lines) + "\n"
+
+
+def _position(statement, offset):
+    """Hitung (line, column) berbasis 1 dari offset karakter"""
+    before = statement[:offset]
+    line = before.count('\n') + 1
+    column = offset - (before.rfind('\n') + 1) + 1
+    return line, column
+
+
+def syntax_error(statement, token):
+    line, column = _position(statement, token[2])
+    return IsqlError('42000', [
+        "Dynamic SQL Error",
+        "-SQL error code = -104",
+        f"-Token unknown - line {line}, column {column}",
+        f"-{token[1]}",
+    ])
+
+
+def unknown_object_error(statement, kind, name, offset):
+    line, column = _position(statement, offset)
+    if kind == 'table':
+        return IsqlError('42S02', [
+            "Dynamic SQL Error", "-SQL error code = -204", "-Table unknown",
+            f"-{name}", f"-At line {line}, column {column}",
+        ])
+    return IsqlError('42S22', [
+        "Dynamic SQL Error", "-SQL error code = -206", "-Column unknown",
+        f"-{name}", f"-At line {line}, column {column}",
+    ])
+
+
+# ---------------------------------------------------------------------------
+# Tokenizer dan parser SELECT
+# ---------------------------------------------------------------------------
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<qident>"(?:[^"]|"")*")
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<op><=|>=|<>|!=|\|\||[=<>(),.*+\-/])
+""", re.X | re.S)
+
+
+def tokenize(statement):
+    """Pecah statement menjadi list token (kind, value, offset)"""
+    tokens = []
+    pos = 0
+    while pos < len(statement):
+        match = TOKEN_RE.match(statement, pos)
+        if not match:
+            raise syntax_error(statement, ('op', statement[pos], pos))
+        kind = match.lastgroup
+        text = match.group()
+        if kind == 'string':
+            tokens.append(('string', text[1:-1].replace("''", "'"), pos))
+        elif kind == 'qident':
+            tokens.append(('ident', text[1:-1].replace('""', '"'), pos))
+        elif kind == 'ident':
+            tokens.append(('ident', text.upper(), pos))
+        elif kind in ('number', 'op'):
+            tokens.append((kind, text, pos))
+        pos = match.end()
+    tokens.append(('eof', '', len(statement)))
+    return tokens
+
+
+class Expr:
+    """Node ekspresi dasar"""
+    header = 'CONSTANT'
+    type_name = 'VARCHAR(1)'
+
+    def children(self):
+        return []
+
+    def bind(self, scope):
+        for child in self.children():
+            child.bind(scope)
+
+    def walk(self):
+        yield self
+        for child in self.children():
+            yield from child.walk()
+
+
+class Literal(Expr):
+    def __init__(self, value, type_name):
+        self.value = value
+        self.type_name = type_name
+
+    def eval(self, ctx):
+        return self.value
+
+
+class ContextValue(Expr):
+    """CURRENT_DATE, CURRENT_TIME, CURRENT_TIMESTAMP"""
+    def __init__(self, name):
+        self.header = name
+        self.type_name = {'CURRENT_DATE': 'DATE', 'CURRENT_TIME': 'TIME'}.get(name, 'TIMESTAMP')
+
+    def eval(self, ctx):
+        now = datetime.datetime.now().replace(microsecond=0)
+        if self.type_name == 'DATE':
+            return now.date()
+        if self.type_name == 'TIME':
+            return now.time()
+        return now
+
+
+class Column(Expr):
+    def __init__(self, name, qualifier, offset):
+        self.name = name
+        self.qualifier = qualifier
+        self.offset = offset
+        self.header = name
+        self.index = None
+
+    def bind(self, scope):
+        self.index, self.type_name = scope.resolve(self)
+
+    def eval(self, ctx):
+        return ctx[0][self.index]
+
+
+class Arithmetic(Expr):
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.header = ARITHMETIC_HEADERS.get(op, 'CONCATENATION')
+
+    def children(self):
+        return [self.left, self.right]
+
+    def bind(self, scope):
+        super().bind(scope)
+        if self.op == '||':
+            length = display_width(self.left.type_name) + display_width(self.right.type_name)
+            self.type_name = f"VARCHAR({length})"
+        elif 'DOUBLE' in (parse_type(self.left.type_name)[0], parse_type(self.right.type_name)[0]):
+            self.type_name = 'DOUBLE'
+        else:
+            self.type_name = 'BIGINT'
+
+    def eval(self, ctx):
+        left = self.left.eval(ctx)
+        right = self.right.eval(ctx)
+        if left is None or right is None:
+            return None
+        if self.op == '||':
+            return format_value(left, self.left.type_name) + format_value(right, self.right.type_name)
+        left, right = to_number(left), to_number(right)
+        if self.op == '+':
+            return left + right
+        if self.op == '-':
+            return left - right
+        if self.op == '*':
+            return left * right
+        if right == 0:
+            raise IsqlError('22012', ["arithmetic exception, numeric overflow, or string truncation",
+                                      "-Integer divide by zero.  The code attempted to divide an integer value by an integer divisor of zero."])
+        if isinstance(left, int) and isinstance(right, int):
+            quotient = abs(left) // abs(right)
+            return quotient if (left >= 0) == (right >= 0) else -quotient
+        return left / right
+
+
+class Negate(Expr):
+    header = 'SUBTRACT'
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def children(self):
+        return [self.operand]
+
+    def bind(self, scope):
+        super().bind(scope)
+        self.type_name = self.operand.type_name
+
+    def eval(self, ctx):
+        value = self.operand.eval(ctx)
+        return None if value is None else -to_number(value)
+
+
+class Function(Expr):
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.header = name
+
+    def children(self):
+        return list(self.args)
+
+    def bind(self, scope):
+        super().bind(scope)
+        self.type_name = self.args[0].type_name if self.args else 'VARCHAR(1)'
+
+    def eval(self, ctx):
+        values = [arg.eval(ctx) for arg in self.args]
+        if self.name == 'COALESCE':
+            return next((v for v in values if v is not None), None)
+        value = values[0]
+        if value is None:
+            return None
+        if self.name == 'UPPER':
+            return str(value).upper()
+        if self.name == 'LOWER':
+            return str(value).lower()
+        return str(value).strip()
+
+
+class Aggregate(Expr):
+    def __init__(self, name, arg, distinct=False):
+        self.name = name
+        self.arg = arg
+        self.distinct = distinct
+        self.header = name
+        self.slot = None
+
+    def children(self):
+        return [self.arg] if self.arg is not None else []
+
+    def bind(self, scope):
+        super().bind(scope)
+        if self.name == 'COUNT':
+            self.type_name = 'BIGINT'
+        elif self.name in ('SUM', 'AVG'):
+            self.type_name = 'DOUBLE' if parse_type(self.arg.type_name)[0] == 'DOUBLE' else 'BIGINT'
+        else:
+            self.type_name = self.arg.type_name
+
+    def new_state(self):
+        return {'count': 0, 'value': None, 'seen': set() if self.distinct else None}
+
+    def step(self, state, ctx):
+        if self.arg is None:
+            state['count'] += 1
+            return
+        value = self.arg.eval(ctx)
+        if value is None:
+            return
+        if state['seen'] is not None:
+            if value in state['seen']:
+                return
+            state['seen'].add(value)
+        state['count'] += 1
+        current = state['value']
+        if self.name in ('SUM', 'AVG'):
+            state['value'] = to_number(value) + (current or 0)
+        elif self.name == 'MIN':
+            state['value'] = value if current is None or value < current else current
+        elif self.name == 'MAX':
+            state['value'] = value if current is None or value > current else current
+
+    def final(self, state):
+        if self.name == 'COUNT':
+            return state['count']
+        if self.name == 'AVG':
+            if not state['count']:
+                return None
+            total = state['value']
+            if isinstance(total, int):
+                quotient = abs(total) // state['count']
+                return quotient if total >= 0 else -quotient
+            return total / state['count']
+        return state['value']
+
+    def eval(self, ctx):
+        return ctx[1][self.slot]
+
+
+class Compare(Expr):
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def children(self):
+        return [self.left, self.right]
+
+    def eval(self, ctx):
+        left, right = coerce_pair(self.left.eval(ctx), self.right.eval(ctx))
+        if left is None or right is None:
+            return None
+        if self.op == '=':
+            return left == right
+        if self.op in ('<>', '!='):
+            return left != right
+        if self.op == '<':
+            return left < right
+        if self.op == '<=':
+            return left <= right
+        if self.op == '>':
+            return left > right
+        return left >= right
+
+
+class Logical(Expr):
+    def __init__(self, op, items):
+        self.op = op
+        self.items = items
+
+    def children(self):
+        return list(self.items)
+
+    def eval(self, ctx):
+        unknown = False
+        for item in self.items:
+            value = item.eval(ctx)
+            if value is None:
+                unknown = True
+            elif self.op == 'AND' and not value:
+                return False
+            elif self.op == 'OR' and value:
+                return True
+        if unknown:
+            return None
+        return self.op == 'AND'
+
+
+class Not(Expr):
+    def __init__(self, operand):
+        self.operand = operand
+
+    def children(self):
+        return [self.operand]
+
+    def eval(self, ctx):
+        value = self.operand.eval(ctx)
+        return None if value is None else not value
+
+
+class Predicate(Expr):
+    """IS NULL, BETWEEN, IN, LIKE, STARTING WITH, CONTAINING"""
+    def __init__(self, kind, operand, args, negate=False):
+        self.kind = kind
+        self.operand = operand
+        self.args = args
+        self.negate = negate
+        self._regex = None
+
+    def children(self):
+        return [self.operand] + list(self.args)
+
+    def eval(self, ctx):
+        value = self.operand.eval(ctx)
+        if self.kind == 'NULL':
+            result = value is None
+            return not result if self.negate else result
+        if value is None:
+            return None
+        if self.kind == 'BETWEEN':
+            low_value, low = coerce_pair(value, self.args[0].eval(ctx))
+            high_value, high = coerce_pair(value, self.args[1].eval(ctx))
+            if low is None or high is None:
+                return None
+            result = low <= low_value and high_value <= high
+        elif self.kind == 'IN':
+            result = any(left == right for left, right in
+                         (coerce_pair(value, arg.eval(ctx)) for arg in self.args))
+        else:
+            text = format_value(value, self.operand.type_name)
+            pattern = self.args[0].eval(ctx)
+            if pattern is None:
+                return None
+            if self.kind == 'STARTING':
+                result = text.startswith(pattern)
+            elif self.kind == 'CONTAINING':
+                result = pattern.lower() in text.lower()
+            else:
+                result = like_to_regex(pattern).match(text) is not None
+        return not result if self.negate else result
+
+
+def like_to_regex(pattern):
+    regex = ''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in pattern)
+    return re.compile(regex + r'\Z', re.S)
+
+
+def to_number(value):
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value).strip()
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            raise IsqlError('22018', ["conversion error from string \"%s\"" % text])
+
+
+def parse_temporal(text, sample):
+    """Konversi literal string ke tipe tanggal/waktu seperti sample"""
+    text = text.strip()
+    upper = text.upper()
+    now = datetime.datetime.now().replace(microsecond=0)
+    if upper in ('NOW', 'TODAY', 'YESTERDAY', 'TOMORROW'):
+        offset = {'YESTERDAY': -1, 'TOMORROW': 1}.get(upper, 0)
+        value = now if upper == 'NOW' else datetime.datetime.combine(
+            now.date() + datetime.timedelta(days=offset), datetime.time())
+    else:
+        if ':' in text:
+            # Buang pecahan detik (format isql: HH:MM:SS.ffff)
+            text = re.sub(r'\.\d+$', '', text)
+        value = None
+        for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d', '%d.%m.%Y %H:%M:%S',
+                    '%d.%m.%Y', '%H:%M:%S', '%H:%M'):
+            try:
+                value = datetime.datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        if value is None:
+            raise IsqlError('22018', ["conversion error from string \"%s\"" % text])
+    if isinstance(sample, datetime.datetime):
+        return value
+    if isinstance(sample, datetime.date):
+        return value.date()
+    return value.time()
+
+
+def coerce_pair(left, right):
+    """Samakan tipe dua nilai sebelum dibandingkan (string literal vs kolom)"""
+    if left is None or right is None:
+        return left, right
+    if isinstance(left, str) and not isinstance(right, str):
+        right, left = coerce_pair(right, left)
+        return left, right
+    if isinstance(right, str) and not isinstance(left, str):
+        if isinstance(left, (datetime.date, datetime.time)):
+            return left, parse_temporal(right, left)
+        return left, to_number(right)
+    if isinstance(left, str) and isinstance(right, str):
+        return left.rstrip(), right.rstrip()
+    return left, right
+
+
+class SelectStatement:
+    def __init__(self):
+        self.first = None
+        self.skip = None
+        self.distinct = False
+        self.items = []  # list of (expr, alias)
+        self.star = None  # None, '*', atau qualifier
+        self.table = None
+        self.table_offset = 0
+        self.alias = None
+        self.where = None
+        self.group_by = []
+        self.order_by = []  # list of (expr atau posisi, descending)
+        self.rows = None  # (start, end)
+
+
+class Parser:
+    """Recursive descent parser untuk subset SELECT Firebird"""
+    def __init__(self, statement):
+        self.statement = statement
+        self.tokens = tokenize(statement)
+        self.pos = 0
+
+    def peek(self, ahead=0):
+        return self.tokens[min(self.pos + ahead, len(self.tokens) - 1)]
+
+    def next(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def at_keyword(self, *words):
+        token = self.peek()
+        return token[0] == 'ident' and token[1] in words
+
+    def accept_keyword(self, *words):
+        if self.at_keyword(*words):
+            return self.next()[1]
+        return None
+
+    def expect_keyword(self, word):
+        if not self.accept_keyword(word):
+            raise syntax_error(self.statement, self.peek())
+
+    def accept_op(self, op):
+        token = self.peek()
+        if token[0] == 'op' and token[1] == op:
+            self.pos += 1
+            return True
+        return False
+
+    def expect_op(self, op):
+        if not self.accept_op(op):
+            raise syntax_error(self.statement, self.peek())
+
+    def expect_int(self):
+        token = self.next()
+        if token[0] != 'number' or '.' in token[1]:
+            raise syntax_error(self.statement, token)
+        return int(token[1])
+
+    def parse_select(self):
+        stmt = SelectStatement()
+        self.expect_keyword('SELECT')
+        if self.accept_keyword('FIRST'):
+            stmt.first = self.expect_int()
+        if self.accept_keyword('SKIP'):
+            stmt.skip = self.expect_int()
+        if self.accept_keyword('DISTINCT'):
+            stmt.distinct = True
+        else:
+            self.accept_keyword('ALL')
+
+        if self.accept_op('*'):
+            stmt.star = '*'
+        elif (self.peek()[0] == 'ident' and self.peek(1)[:2] == ('op', '.')
+              and self.peek(2)[:2] == ('op', '*')):
+            stmt.star = self.next()[1]
+            self.pos += 2
+        else:
+            while True:
+                expr = self.parse_expr()
+                alias = None
+                if self.accept_keyword('AS'):
+                    alias = self.next()[1]
+                elif self.peek()[0] == 'ident' and not self.at_keyword('FROM'):
+                    alias = self.next()[1]
+                stmt.items.append((expr, alias))
+                if not self.accept_op(','):
+                    break
+
+        self.expect_keyword('FROM')
+        table_token = self.next()
+        if table_token[0] != 'ident':
+            raise syntax_error(self.statement, table_token)
+        stmt.table = table_token[1]
+        stmt.table_offset = table_token[2]
+        if self.accept_keyword('AS'):
+            stmt.alias = self.next()[1]
+        elif self.peek()[0] == 'ident' and not self.at_keyword(
+                'WHERE', 'GROUP', 'ORDER', 'ROWS', 'JOIN', 'LEFT', 'INNER', 'PLAN', 'HAVING'):
+            stmt.alias = self.next()[1]
+
+        if self.at_keyword('JOIN', 'LEFT', 'INNER', 'RIGHT', 'FULL') or self.peek()[:2] == ('op', ','):
+            raise IsqlError('0A000', ["feature is not supported",
+                                      "-fake isql hanya mendukung query satu tabel"])
+
+        if self.accept_keyword('WHERE'):
+            stmt.where = self.parse_expr()
+        if self.accept_keyword('GROUP'):
+            self.expect_keyword('BY')
+            stmt.group_by.append(self.parse_expr())
+            while self.accept_op(','):
+                stmt.group_by.append(self.parse_expr())
+        if self.accept_keyword('ORDER'):
+            self.expect_keyword('BY')
+            while True:
+                expr = self.parse_expr()
+                descending = self.accept_keyword('ASC', 'ASCENDING', 'DESC', 'DESCENDING') in ('DESC', 'DESCENDING')
+                stmt.order_by.append((expr, descending))
+                if not self.accept_op(','):
+                    break
+        if self.accept_keyword('ROWS'):
+            start = self.expect_int()
+            end = start
+            if self.accept_keyword('TO'):
+                end = self.expect_int()
+            stmt.rows = (start, end)
+
+        if self.peek()[0] != 'eof':
+            raise syntax_error(self.statement, self.peek())
+        return stmt
+
+    def parse_expr(self):
+        items = [self.parse_and()]
+        while self.accept_keyword('OR'):
+            items.append(self.parse_and())
+        return items[0] if len(items) == 1 else Logical('OR', items)
+
+    def parse_and(self):
+        items = [self.parse_not()]
+        while self.accept_keyword('AND'):
+            items.append(self.parse_not())
+        return items[0] if len(items) == 1 else Logical('AND', items)
+
+    def parse_not(self):
+        if self.accept_keyword('NOT'):
+            return Not(self.parse_not())
+        return self.parse_predicate()
+
+    def parse_predicate(self):
+        left = self.parse_additive()
+        token = self.peek()
+        if token[0] == 'op' and token[1] in ('=', '<>', '!=', '<', '<=', '>', '>='):
+            self.pos += 1
+            return Compare(token[1], left, self.parse_additive())
+
+        if self.accept_keyword('IS'):
+            negate = bool(self.accept_keyword('NOT'))
+            self.expect_keyword('NULL')
+            return Predicate('NULL', left, [], negate)
+
+        negate = bool(self.accept_keyword('NOT'))
+        if self.accept_keyword('BETWEEN'):
+            low = self.parse_additive()
+            self.expect_keyword('AND')
+            return Predicate('BETWEEN', left, [low, self.parse_additive()], negate)
+        if self.accept_keyword('IN'):
+            self.expect_op('(')
+            args = [self.parse_additive()]
+            while self.accept_op(','):
+                args.append(self.parse_additive())
+            self.expect_op(')')
+            return Predicate('IN', left, args, negate)
+        if self.accept_keyword('LIKE'):
+            return Predicate('LIKE', left, [self.parse_additive()], negate)
+        if self.accept_keyword('STARTING'):
+            self.accept_keyword('WITH')
+            return Predicate('STARTING', left, [self.parse_additive()], negate)
+        if self.accept_keyword('CONTAINING'):
+            return Predicate('CONTAINING', left, [self.parse_additive()], negate)
+        if negate:
+            raise syntax_error(self.statement, self.peek())
+        return left
+
+    def parse_additive(self):
+        left = self.parse_term()
+        while True:
+            token = self.peek()
+            if token[0] == 'op' and token[1] in ('+', '-', '||'):
+                self.pos += 1
+                left = Arithmetic(token[1], left, self.parse_term())
+            else:
+                return left
+
+    def parse_term(self):
+        left = self.parse_unary()
+        while True:
+            token = self.peek()
+            if token[0] == 'op' and token[1] in ('*', '/'):
+                self.pos += 1
+                left = Arithmetic(token[1], left, self.parse_unary())
+            else:
+                return left
+
+    def parse_unary(self):
+        if self.accept_op('-'):
+            return Negate(self.parse_unary())
+        self.accept_op('+')
+        return self.parse_primary()
+
+    def parse_primary(self):
+        token = self.next()
+        kind, value, offset = token
+        if kind == 'number':
+            if '.' in value:
+                return Literal(float(value), 'DOUBLE')
+            return Literal(int(value), 'INTEGER')
+        if kind == 'string':
+            return Literal(value, f"CHAR({max(len(value), 1)})")
+        if kind == 'op' and value == '(':
+            expr = self.parse_expr()
+            self.expect_op(')')
+            return expr
+        if kind != 'ident':
+            raise syntax_error(self.statement, token)
+
+        if value == 'NULL':
+            return Literal(None, 'CHAR(1)')
+        if value in ('CURRENT_DATE', 'CURRENT_TIME', 'CURRENT_TIMESTAMP'):
+            return ContextValue(value)
+        if value == 'SELECT':
+            raise IsqlError('0A000', ["feature is not supported",
+                                      "-fake isql tidak mendukung subquery"])
+
+        if self.peek()[1] == '(' and self.peek()[0] == 'op':
+            if value in AGGREGATES:
+                self.pos += 1
+                if value == 'COUNT' and self.accept_op('*'):
+                    self.expect_op(')')
+                    return Aggregate('COUNT', None)
+                distinct = bool(self.accept_keyword('DISTINCT'))
+                self.accept_keyword('ALL')
+                arg = self.parse_expr()
+                self.expect_op(')')
+                return Aggregate(value, arg, distinct)
+            if value in SCALAR_FUNCTIONS:
+                self.pos += 1
+                args = [self.parse_expr()]
+                while self.accept_op(','):
+                    args.append(self.parse_expr())
+                self.expect_op(')')
+                return Function(value, args)
+            raise IsqlError('39000', ["Dynamic SQL Error", "-SQL error code = -804",
+                                      "-Function unknown", f"-{value}"])
+
+        if self.peek()[0] == 'op' and self.peek()[1] == '.':
+            self.pos += 1
+            column = self.next()
+            if column[0] != 'ident':
+                raise syntax_error(self.statement, column)
+            return Column(column[1], value, column[2])
+        return Column(value, None, offset)
+
+
+# ---------------------------------------------------------------------------
+# Tabel: sintetis dan sistem (RDB$)
+# ---------------------------------------------------------------------------
+
+class StaticTable:
+    """Tabel kecil dengan baris tetap (untuk relasi sistem)"""
+    has_key_order = False
+
+    def __init__(self, name, columns, rows):
+        self.name = name
+        self.columns = columns
+        self.rows = rows
+        self.row_count = len(rows)
+
+    def iter_rows(self, start=0, stop=None):
+        return iter(self.rows[start:stop])
+
+
+def _char(value, length=31):
+    return value.ljust(length)
+
+
+def system_table(name, dataset):
+    """Bangun relasi sistem RDB$ dari isi dataset"""
+    if name == 'RDB$DATABASE':
+        return StaticTable(name, [
+            ('RDB$DESCRIPTION', 'BLOB'),
+            ('RDB$RELATION_ID', 'SMALLINT'),
+            ('RDB$SECURITY_CLASS', 'CHAR(31)'),
+            ('RDB$CHARACTER_SET_NAME', 'CHAR(31)'),
+        ], [(None, 128, _char('SQL$362'), _char('NONE'))])
+
+    if name == 'RDB$RELATIONS':
+        rows = [(_char(rel), rel_id, 1) for rel_id, rel in enumerate(SYSTEM_RELATIONS)]
+        for offset, table_name in enumerate(dataset.table_names()):
+            rows.append((_char(table_name), 128 + offset, 0))
+        return StaticTable(name, [
+            ('RDB$RELATION_NAME', 'CHAR(31)'),
+            ('RDB$RELATION_ID', 'SMALLINT'),
+            ('RDB$SYSTEM_FLAG', 'SMALLINT'),
+        ], rows)
+
+    if name == 'RDB$RELATION_FIELDS':
+        rows = []
+        for table_name in dataset.table_names():
+            table = dataset.get_table(table_name)
+            for position, (column_name, type_name) in enumerate(table.columns):
+                rows.append((_char(column_name), _char(table_name), position,
+                             _char(type_name), 1 if column_name == 'ID' else None))
+        return StaticTable(name, [
+            ('RDB$FIELD_NAME', 'CHAR(31)'),
+            ('RDB$RELATION_NAME', 'CHAR(31)'),
+            ('RDB$FIELD_POSITION', 'SMALLINT'),
+            ('RDB$FIELD_SOURCE', 'CHAR(31)'),
+            ('RDB$NULL_FLAG', 'SMALLINT'),
+        ], rows)
+
+    return None
+
+
+class Scope:
+    """Resolusi nama kolom terhadap tabel di klausa FROM"""
+    def __init__(self, statement, stmt, table):
+        self.statement = statement
+        self.names = {stmt.table, stmt.alias} - {None}
+        self.columns = {name: (index, type_name) for index, (name, type_name) in enumerate(table.columns)}
+
+    def resolve(self, column):
+        if column.qualifier and column.qualifier not in self.names:
+            raise unknown_object_error(self.statement, 'column',
+                                       f"{column.qualifier}.{column.name}", column.offset)
+        if column.name not in self.columns:
+            raise unknown_object_error(self.statement, 'column', column.name, column.offset)
+        return self.columns[column.name]
+
+
+def key_range(where):
+    """
+    Cari rentang ID dari kondisi WHERE (konjungsi teratas) agar tabel
+    sintetis tidak perlu dibangkitkan seluruhnya.
+
+    :return: Tuple (start_index, stop_index) atau None
+    """
+    if where is None:
+        return None
+    conjuncts = where.items if isinstance(where, Logical) and where.op == 'AND' else [where]
+    low, high = 1, None
+    for item in conjuncts:
+        if isinstance(item, Compare):
+            column, literal, op = item.left, item.right, item.op
+            if isinstance(column, Literal) and isinstance(literal, Column):
+                column, literal = literal, column
+                op = {'<': '>', '<=': '>=', '>': '<', '>=': '<='}.get(op, op)
+            if not (isinstance(column, Column) and column.name == 'ID'
+                    and isinstance(literal, Literal) and isinstance(literal.value, int)):
+                continue
+            value = literal.value
+            if op == '=':
+                low, high = max(low, value), value if high is None else min(high, value)
+            elif op == '<':
+                high = value - 1 if high is None else min(high, value - 1)
+            elif op == '<=':
+                high = value if high is None else min(high, value)
+            elif op == '>':
+                low = max(low, value + 1)
+            elif op == '>=':
+                low = max(low, value)
+        elif (isinstance(item, Predicate) and item.kind == 'BETWEEN' and not item.negate
+              and isinstance(item.operand, Column) and item.operand.name == 'ID'
+              and all(isinstance(a, Literal) and isinstance(a.value, int) for a in item.args)):
+            low = max(low, item.args[0].value)
+            high = item.args[1].value if high is None else min(high, item.args[1].value)
+    if low == 1 and high is None:
+        return None
+    return low - 1, (max(high, low - 1) if high is not None else None)
+
+
+# ---------------------------------------------------------------------------
+# Format output
+# ---------------------------------------------------------------------------
+
+def format_value(value, type_name):
+    """Format satu nilai seperti isql"""
+    if value is None:
+        return '<null>'
+    if isinstance(value, datetime.datetime):
+        return f"{value.strftime('%Y-%m-%d %H:%M:%S')}.{value.microsecond // 100:04d}"
+    if isinstance(value, datetime.date):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, datetime.time):
+        return f"{value.strftime('%H:%M:%S')}.{value.microsecond // 100:04d}"
+    if isinstance(value, float):
+        return f"{value:.15g}"
+    return str(value)
+
+
+class OutputColumn:
+    def __init__(self, header, type_name, width_override=None):
+        self.header = header
+        self.type_name = type_name
+        self.numeric = is_numeric_type(type_name)
+        base, length = parse_type(type_name)
+        if width_override is not None and length is not None:
+            self.width = width_override
+        else:
+            self.width = max(display_width(type_name), len(header))
+
+    def cell(self, value):
+        text = format_value(value, self.type_name)[:self.width]
+        return text.rjust(self.width) if self.numeric else text.ljust(self.width)
+
+    def header_cell(self):
+        text = self.header[:self.width]
+        return text.rjust(self.width) if self.numeric else text.ljust(self.width)
+
+
+# ---------------------------------------------------------------------------
+# Sesi isql
+# ---------------------------------------------------------------------------
+
+class IsqlSession:
+    """Menjalankan statement script isql terhadap dataset sintetis"""
+    def __init__(self, out, err, page_length=0):
+        self.out = out
+        self.err = err
+        self.page_length = page_length
+        self.dataset = None
+        self.heading = True
+        self.list_mode = False
+        self.plan_only = False
+        self.widths = {}
+        self.terminator = ';'
+        self.failed = False
+
+    def connect(self, database, user, password):
+        path = database
+        match = re.match(r'^[^:\\/]{2,}(?:/\d+)?:(.+)$', database)
+        if match:
+            path = match.group(1)
+        if not os.path.exists(path):
+            raise IsqlError('08001', [
+                f'I/O error during "open" operation for file "{path}"',
+                "-Error while trying to open file",
+                "-No such file or directory",
+            ])
+        try:
+            dataset = load_dataset(path)
+        except ValueError:
+            raise IsqlError('HY000', [
+                f"file {path} is not a valid database",
+            ])
+        if (user or '').upper() != dataset.username.upper() or password != dataset.password:
+            raise IsqlError('28000', [
+                "Your user name and password are not defined. "
+                "Ask your database administrator to set up a Firebird login.",
+            ])
+        self.dataset = dataset
+
+    def report(self, error):
+        self.failed = True
+        self.err.write(error.format())
+
+    def run_script(self, script):
+        for statement in split_statements(script, self):
+            try:
+                if self.execute(statement) is False:
+                    break
+            except IsqlError as e:
+                self.report(e)
+
+    def execute(self, statement):
+        """Jalankan satu statement, kembalikan False untuk EXIT/QUIT"""
+        words = statement.split()
+        keyword = words[0].upper() if words else ''
+
+        if keyword in ('EXIT', 'QUIT'):
+            return False
+        if keyword in ('COMMIT', 'ROLLBACK'):
+            return True
+        if keyword == 'CONNECT':
+            match = re.match(r"""CONNECT\s+(['"])(.*?)\1(?:\s+USER\s+['"]?([^'"\s]+)['"]?)?"""
+                             r"""(?:\s+PASSWORD\s+['"]?([^'"\s]+)['"]?)?""", statement, re.I | re.S)
+            if not match:
+                raise syntax_error(statement, ('ident', words[1] if len(words) > 1 else '', 8))
+            self.connect(match.group(2), match.group(3), match.group(4))
+            self.out.write(f"Database:  {match.group(2)}, User: {(match.group(3) or '').upper()}\n")
+            return True
+        if keyword == 'SET':
+            self.execute_set(words[1:])
+            return True
+        if keyword == 'SELECT':
+            if self.dataset is None:
+                self.failed = True
+                self.err.write("Use CONNECT or CREATE DATABASE to specify a database\n")
+                return True
+            self.execute_select(statement)
+            return True
+        if keyword in ('INSERT', 'UPDATE', 'DELETE', 'MERGE', 'CREATE', 'ALTER', 'DROP',
+                       'EXECUTE', 'GRANT', 'REVOKE'):
+            raise IsqlError('42000', ["attempted update on read-only database"])
+        if not keyword:
+            return True
+        raise syntax_error(statement, ('ident', words[0], 0))
+
+    def execute_set(self, args):
+        if not args:
+            return
+        option = args[0].upper()
+        value = args[1].upper() if len(args) > 1 else ''
+        if option == 'HEADING':
+            self.heading = value != 'OFF'
+        elif option == 'LIST':
+            self.list_mode = value == 'ON'
+        elif option == 'PLANONLY':
+            self.plan_only = value == 'ON'
+        elif option == 'WIDTH' and len(args) >= 2:
+            if len(args) >= 3:
+                self.widths[args[1].upper()] = int(args[2])
+            else:
+                self.widths.pop(args[1].upper(), None)
+        elif option == 'TERM' and len(args) >= 2:
+            self.terminator = args[1]
+
+    def resolve_table(self, stmt, statement):
+        table = self.dataset.get_table(stmt.table)
+        if table is None:
+            table = system_table(stmt.table, self.dataset)
+        if table is None:
+            raise unknown_object_error(statement, 'table', stmt.table, stmt.table_offset)
+        return table
+
+    def execute_select(self, statement):
+        stmt = Parser(statement).parse_select()
+        table = self.resolve_table(stmt, statement)
+        scope = Scope(statement, stmt, table)
+
+        if stmt.star:
+            if stmt.star != '*' and stmt.star not in scope.names:
+                raise unknown_object_error(statement, 'table', stmt.star, stmt.table_offset)
+            stmt.items = [(Column(name, None, 0), None) for name, _ in table.columns]
+
+        for expr, _ in stmt.items:
+            expr.bind(scope)
+        if stmt.where is not None:
+            stmt.where.bind(scope)
+        for expr in stmt.group_by:
+            expr.bind(scope)
+
+        aliases = {alias: index for index, (_, alias) in enumerate(stmt.items) if alias}
+        order_keys = []
+        for expr, descending in stmt.order_by:
+            if isinstance(expr, Literal) and isinstance(expr.value, int):
+                order_keys.append((expr.value - 1, descending))
+            elif isinstance(expr, Column) and expr.qualifier is None and expr.name in aliases:
+                order_keys.append((aliases[expr.name], descending))
+            elif isinstance(expr, Column) and expr.name == 'RDB$DB_KEY':
+                continue  # Urutan fisik = urutan baris dataset (sort di bawah stabil)
+            else:
+                expr.bind(scope)
+                order_keys.append((expr, descending))
+
+        key = key_range(stmt.where) if getattr(table, 'has_key_order', True) else None
+
+        if self.plan_only:
+            name = stmt.alias or stmt.table
+            access = "INDEX (RDB$PRIMARY1)" if key else "NATURAL"
+            if order_keys and not key:
+                self.out.write(f"\nPLAN SORT ({name} {access})\n")
+            else:
+                self.out.write(f"\nPLAN ({name} {access})\n")
+            return
+
+        columns = [OutputColumn(alias or expr.header, expr.type_name, self.widths.get(alias or expr.header))
+                   for expr, alias in stmt.items]
+
+        aggregates = []
+        for expr, _ in stmt.items:
+            aggregates.extend(node for node in expr.walk() if isinstance(node, Aggregate))
+        for expr, _ in order_keys:
+            if isinstance(expr, Expr):
+                aggregates.extend(node for node in expr.walk() if isinstance(node, Aggregate))
+        for slot, node in enumerate(aggregates):
+            node.slot = slot
+
+        start, stop = key if key else (0, None)
+        source = ((row, None) for row in table.iter_rows(start, stop))
+        if stmt.where is not None:
+            where = stmt.where
+            source = (ctx for ctx in source if where.eval(ctx))
+
+        if aggregates or stmt.group_by:
+            source = self.group(source, stmt.group_by, aggregates)
+
+        skip = stmt.skip or 0
+        limit = stmt.first
+        if stmt.rows:
+            skip = max(stmt.rows[0] - 1, 0)
+            limit = max(stmt.rows[1] - stmt.rows[0] + 1, 0)
+
+        def project(ctx):
+            return tuple(expr.eval(ctx) for expr, _ in stmt.items)
+
+        if order_keys:
+            decorated = []
+            for ctx in source:
+                values = project(ctx)
+                keys = [values[k] if isinstance(k, int) else k.eval(ctx) for k, _ in order_keys]
+                decorated.append((keys, values))
+            # Sort stabil per kunci dari belakang; NULL di awal untuk ASC
+            for position in range(len(order_keys) - 1, -1, -1):
+                descending = order_keys[position][1]
+                decorated.sort(key=lambda item, p=position: sort_key(item[0][p]), reverse=descending)
+            rows = (values for _, values in decorated)
+        else:
+            rows = (project(ctx) for ctx in source)
+
+        if stmt.distinct:
+            rows = unique(rows)
+
+        self.write_rows(columns, limited(rows, skip, limit))
+
+    def group(self, source, group_by, aggregates):
+        groups = {}
+        for ctx in source:
+            group_key = tuple(expr.eval(ctx) for expr in group_by)
+            entry = groups.get(group_key)
+            if entry is None:
+                entry = groups[group_key] = (ctx[0], [agg.new_state() for agg in aggregates])
+            for agg, state in zip(aggregates, entry[1]):
+                agg.step(state, ctx)
+        if not groups and not group_by:
+            groups[()] = (None, [agg.new_state() for agg in aggregates])
+        for row, states in groups.values():
+            yield (row, [agg.final(state) for agg, state in zip(aggregates, states)])
+
+    def write_rows(self, columns, rows):
+        write = self.out.write
+        header = ''.join(column.header_cell() + ' ' for column in columns)
+        separator = ''.join('=' * column.width + ' ' for column in columns)
+        label_width = max(len(column.header) for column in columns) if columns else 0
+
+        count = 0
+        for values in rows:
+            if self.list_mode:
+                write('\n')
+                for column, value in zip(columns, values):
+                    write(f"{column.header.ljust(label_width)} {format_value(value, column.type_name)}\n")
+                count += 1
+                continue
+            if count == 0 or (self.page_length and count % self.page_length == 0):
+                write('\n')
+                if self.heading:
+                    write(header + '\n')
+                    write(separator + '\n')
+            write(''.join(column.cell(value) + ' ' for column, value in zip(columns, values)) + '\n')
+            count += 1
+        if count:
+            write('\n')
+
+
+def sort_key(value):
+    return (False, 0) if value is None else (True, value)
+
+
+def unique(rows):
+    seen = set()
+    for row in rows:
+        if row not in seen:
+            seen.add(row)
+            yield row
+
+
+def limited(rows, skip, limit):
+    for index, row in enumerate(rows):
+        if index < skip:
+            continue
+        if limit is not None and index >= skip + limit:
+            break
+        yield row
+
+
+def split_statements(script, session):
+    """Pecah script menjadi statement, memperhatikan string literal dan SET TERM"""
+    statement = []
+    in_string = None
+    i = 0
+    while i < len(script):
+        char = script[i]
+        if in_string:
+            statement.append(char)
+            if char == in_string:
+                in_string = None
+            i += 1
+            continue
+        if char in ("'", '"'):
+            in_string = char
+            statement.append(char)
+            i += 1
+            continue
+        if script.startswith('--', i):
+            end = script.find('\n', i)
+            i = len(script) if end < 0 else end
+            continue
+        terminator = session.terminator
+        if script.startswith(terminator, i):
+            text = ''.join(statement).strip()
+            statement = []
+            i += len(terminator)
+            if text:
+                yield text
+            continue
+        statement.append(char)
+        i += 1
+    text = ''.join(statement).strip()
+    if text:
+        yield text
+
+
+def parse_args(argv):
+    """
+    Parse argumen gaya isql. Switch boleh disingkat seperti isql asli
+    (-u, -us, -user), parameter tanpa '-' dianggap sebagai database.
+    """
+    switches = {'user': 'user', 'password': 'password', 'input': 'input', 'output': 'output',
+                'merge_stderr': 'merge', 'page': 'page', 'quiet': 'quiet', 'echo': 'echo'}
+    takes_value = ('user', 'password', 'input', 'output', 'page')
+    options = {'merge': False, 'page': 0, 'database': None}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg.startswith('-') and len(arg) > 1:
+            name = arg[1:].lower()
+            if name in switches:
+                matches = [switches[name]]
+            elif name == 'm':
+                matches = ['merge']
+            else:
+                matches = [value for key, value in switches.items() if key.startswith(name)]
+            if len(matches) != 1:
+                raise ValueError(f"invalid switch {arg}")
+            option = matches[0]
+            if option in takes_value:
+                i += 1
+                if i >= len(argv):
+                    raise ValueError(f"missing argument for switch {arg}")
+                options[option] = int(argv[i]) if option == 'page' else argv[i]
+            else:
+                options[option] = True
+        else:
+            options['database'] = arg
+        i += 1
+    return options
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        options = parse_args(argv)
+    except ValueError as e:
+        sys.stderr.write(f"{e}\n")
+        return EXIT_ERROR
+
+    out = open(options['output'], 'w') if options.get('output') else sys.stdout
+    try:
+        err = out if options['merge'] else sys.stderr
+        session = IsqlSession(out, err, page_length=options['page'])
+
+        if options['database']:
+            try:
+                session.connect(options['database'], options.get('user'), options.get('password'))
+            except IsqlError as e:
+                session.report(e)
+
+        if options.get('input'):
+            with open(options['input'], 'r') as f:
+                script = f.read()
+        else:
+            script = sys.stdin.read()
+
+        session.run_script(script)
+        return EXIT_ERROR if session.failed else EXIT_OK
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+@echo off
+rem Menjalankan client tanpa UI (mode service).
+rem Dapat didaftarkan sebagai service (misalnya dengan NSSM atau Task Scheduler "At startup").
+cd /d %~dp0
+python client\client.py --headless %*
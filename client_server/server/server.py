@@ -7,6 +7,11 @@ import time
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, simpledialog
 import datetime
+import uuid
+import functools
+import bisect
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Tambahkan path untuk mengimpor dari direktori common
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,6 +19,29 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
 from common.network import NetworkMessage, send_message, receive_message, DEFAULT_PORT
+from common.remote_cursor import RemoteCursor, DEFAULT_PAGE_SIZE
+from common.session import new_session_token, extract_table_names, schema_hash
+from common.query_run import QueryRun, dispatch, send_to_client, STATUS_DONE
+from common.merged_result import MergedResult, CLIENT_COLUMN
+from common.aggregate import plan_aggregate
+from common.result_store import ResultStore, ResultHandle
+from common.client_registry import ClientRegistry, InstrumentedLock, format_lock_stats
+from common.delta import DeltaCache, DeltaError, MODE_DELTA
+from common.scheduler import JobScheduler, ScheduledJob, DelayedQueue, stagger_offset, TARGET_ALL
+from common.metric_store import MetricStore, extract_metrics
+from common.downsample import lttb, plot_coords
+from common.ui_queue import UiEventQueue, DEFAULT_FRAME_MS
+from common.client_view import ClientIndex
+from common.virtual_grid import VirtualGrid, ListSource, MergedSource, RemoteCursorSource
+from common.search_index import SearchIndex, SearchCancelled
+from common.sort_index import SortIndex, SortCancelled
+from common.exporter import export_rows, source_chunks, remote_chunks, format_for, ExportCancelled
+from common.sql_analyzer import analyze, estimate_cost, TableRowCounts
+from common.schema_catalog import (SchemaCatalog, COLUMNS_QUERY, completion_context, quote_name,
+                                   ISSUE_TABLE, ISSUE_COLUMN, ISSUE_ALIAS)
+from common.query_plan import (PlanCache, natural_scans, large_scans, plan_rows,
+                               CHECK_MODES, CHECK_OFF, CHECK_BLOCK, DEFAULT_SCAN_THRESHOLD)
+from common.query_history import QueryHistory, format_size, STATUSES, STATUS_SUCCESS, STATUS_ERROR, STATUS_PARTIAL
 
 class FirebirdClient:
     """Representasi dari client yang terhubung"""
@@ -26,6 +54,31 @@ class FirebirdClient:
         self.is_connected = True
         self.db_info = {}
         self.tables = []
+        self.session_token = None
+        self.schema_hash = None
+        self.pending_requests = {}  # request_id -> info query yang belum dijawab
+        self.lock = threading.Lock()  # State client ini (pending_requests, tables, socket)
+        self.send_lock = threading.Lock()  # Satu pesan pada satu waktu per socket
+    
+    def send(self, message, timeout=None):
+        """
+        Kirim pesan ke client. Pengiriman dari beberapa thread (query, ping, fetch)
+        diantrikan per client agar frame tidak bercampur.
+        """
+        with self.send_lock:
+            sock = self.socket
+            if timeout is None:
+                return send_message(sock, message)
+            previous_timeout = sock.gettimeout()
+            sock.settimeout(timeout)
+            try:
+                return send_message(sock, message)
+            finally:
+                # Kembalikan timeout ke nilai sebelumnya
+                try:
+                    sock.settimeout(previous_timeout)
+                except OSError:
+                    pass
 
 class ServerApp:
     """Aplikasi server untuk mengelola koneksi client dan mengirim query SQL"""
@@ -33,17 +86,73 @@ class ServerApp:
         self.host = host
         self.port = port
         self.server_socket = None
-        self.clients = {}  # client_id -> FirebirdClient
-        self.lock = threading.Lock()
+        self.registry = ClientRegistry()  # client_id -> FirebirdClient, dibaca lewat snapshot
+        self.lock = InstrumentedLock("server_state")  # Cursor, query run, hasil gabungan; bukan untuk I/O
+        self.lock_stats_interval = 60  # detik
         self.running = False
         self.accept_thread = None
         self.heartbeat_thread = None
-        self.query_history = []
-        self.max_result_rows = 10000  # Batasan maksimum jumlah baris yang akan ditampilkan (diubah menjadi lebih kecil)
+        # History query persisten (SQLite + FTS), satu entri per run dengan key run_id
+        self.query_history = QueryHistory(os.path.join(current_dir, "history", "history.sqlite"))
+        self.history_runs = set()  # run_id yang dicatat di history dan belum selesai
+        self.table_rows = TableRowCounts()  # Jumlah baris tabel dari hasil query client, untuk estimasi biaya
+        self.schema_catalog = SchemaCatalog()  # Tabel dan kolom per client untuk validasi dan autocomplete
+        # Pre-flight plan query (SET PLANONLY) di client, di-cache per (schema hash, query)
+        self.plan_cache = PlanCache()
+        self.plan_waiters = {}  # request_id -> {'event', 'plans', 'error'} untuk pre-flight yang ditunggu
+        self.plan_check_timeout = 15.0  # detik
+        self.plan_scan_threshold = DEFAULT_SCAN_THRESHOLD  # baris; NATURAL di atas ini diperingatkan
+        self.page_size = DEFAULT_PAGE_SIZE  # Jumlah baris per halaman remote cursor
+        self.remote_cursors = {}  # cursor_id -> RemoteCursor
+        self.pending_request_ttl = 3600  # detik, request tanpa jawaban dibuang setelah ini
         self.default_socket_timeout = 60.0  # Timeout socket default yang lebih besar
+        self.query_runs = OrderedDict()  # run_id -> QueryRun, terbaru di belakang
+        self.max_query_runs = 20
+        self.run_send_timeout = 10.0  # detik, deadline pengiriman query per client
+        self.run_response_timeout = 300.0  # detik, deadline jawaban per client
+        self.fanout_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="fanout")
+        self.merged_results = {}  # run_id -> MergedResult untuk query ke banyak client
+        self.merged_views = {}  # run_id -> fungsi refresh tab gabungan (UI thread)
+        self.aggregate_plans = {}  # run_id -> AggregatePlan untuk query agregat lintas client
+        self.aggregate_lock = threading.Lock()  # Penggabungan agregat dilakukan satu per satu
+        # Hasil query disimpan kolumnar dengan budget memori bersama, sisanya di-spill ke SQLite
+        self.result_memory_budget = 256 * 1024 * 1024
+        self.result_store = ResultStore(self.result_memory_budget,
+                                        spill_path=os.path.join(current_dir, "result_store", "spill.sqlite"))
+        self.delta_cache = DeltaCache()  # Salinan hasil terakhir per (client, delta key) untuk transfer delta
+        # Job monitoring terjadwal, disimpan ke file agar bertahan setelah restart
+        self.scheduler = JobScheduler(os.path.join(current_dir, "scheduled_jobs.json"))
+        self.dispatch_queue = DelayedQueue()  # Pengiriman job yang ditunda (stagger)
+        self.scheduler_tick = 1.0  # detik
+        self.scheduler_thread = None
+        self.job_tabs = {}  # nama job -> tab hasil run terakhir
+        self.standing_views = {}  # nama job "on change" -> (QueryRun, MergedResult) tab hasil
+        self.run_jobs = {}  # run_id -> nama job, untuk mencatat metrik hasil job
+        # Metrik numerik dari hasil job disimpan sebagai time-series (SQLite WAL dengan rollup)
+        self.metric_store = MetricStore(os.path.join(current_dir, "metrics", "metrics.sqlite"))
+        # Worker thread tidak menyentuh Tk: update UI dikirim lewat antrian yang dikuras UI thread
+        self.ui_queue = UiEventQueue()
+        self.ui_frame_ms = DEFAULT_FRAME_MS
+        self.log_buffer = deque()  # Baris log yang belum ditampilkan
+        self.log_lines_per_frame = 500
+        self.log_max_lines = 10000  # Baris log lama dibuang agar widget tetap ringan
+        self.client_index = ClientIndex()  # Baris panel client per client_id dan label pemilih target
+        self.shown_target_labels = None
         
         # Inisialisasi UI
         self.init_ui()
+        
+        try:
+            self.scheduler.load()
+            if self.scheduler.jobs:
+                self.log(f"{len(self.scheduler.jobs)} job terjadwal dimuat")
+        except (OSError, ValueError, KeyError) as e:
+            self.log(f"Gagal memuat job terjadwal: {e}")
+    
+    @property
+    def clients(self):
+        """Snapshot read-only daftar client (tanpa lock)"""
+        return self.registry.snapshot()
     
     def init_ui(self):
         """Inisialisasi antarmuka pengguna"""
@@ -64,6 +173,13 @@ class ServerApp:
         query_menu.add_command(label="Query History", command=self.show_history)
         menubar.add_cascade(label="Query", menu=query_menu)
         
+        jobs_menu = tk.Menu(menubar, tearoff=0)
+        jobs_menu.add_command(label="Scheduled Jobs", command=self.show_scheduled_jobs)
+        jobs_menu.add_command(label="Schedule Current Query", command=lambda: self.edit_scheduled_job())
+        jobs_menu.add_separator()
+        jobs_menu.add_command(label="Stored Metrics", command=self.show_metrics)
+        menubar.add_cascade(label="Jobs", menu=jobs_menu)
+        
         self.root.config(menu=menubar)
         
         # Paned window untuk membagi UI
@@ -111,16 +227,32 @@ class ServerApp:
         self.toggle_clients_btn.pack(side=tk.LEFT, padx=2)
         
         ttk.Label(clients_toolbar, text="Client List").pack(side=tk.LEFT, padx=5)
+        self.client_count_label = ttk.Label(clients_toolbar, text="0/0")
+        self.client_count_label.pack(side=tk.RIGHT, padx=5)
+        
+        # Filter nama, database/estate atau status (misalnya "pge connected")
+        filter_frame = ttk.Frame(clients_frame)
+        filter_frame.pack(fill=tk.X, side=tk.TOP, padx=2, pady=2)
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT, padx=2)
+        self.client_filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.client_filter_var)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2)
+        self.client_filter_var.trace_add("write", lambda *args: self.apply_client_filter())
         
         # Frame untuk treeview dan scrollbar
         self.client_tree_frame = ttk.Frame(clients_frame)
         self.client_tree_frame.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
         
-        self.client_tree = ttk.Treeview(self.client_tree_frame, columns=("Name", "Status"), show="headings")
+        # Item treeview memakai client_id sebagai iid
+        self.client_tree = ttk.Treeview(self.client_tree_frame, columns=("Name", "Status", "Database"), show="headings")
         self.client_tree.heading("Name", text="Client Name")
         self.client_tree.heading("Status", text="Status")
-        self.client_tree.column("Name", width=180)
-        self.client_tree.column("Status", width=100)
+        self.client_tree.heading("Database", text="Database")
+        self.client_tree.column("Name", width=150)
+        self.client_tree.column("Status", width=90)
+        self.client_tree.column("Database", width=120)
+        self.client_tree.tag_configure("connected", foreground="green")
+        self.client_tree.tag_configure("disconnected", foreground="red")
         
         # Menambahkan scrollbar vertikal
         client_vsb = ttk.Scrollbar(self.client_tree_frame, orient="vertical", command=self.client_tree.yview)
@@ -175,6 +307,7 @@ class ServerApp:
         
         self.query_text = scrolledtext.ScrolledText(query_frame, height=10, font=("Consolas", 10))
         self.query_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.setup_autocomplete(self.query_text)
         
         # Target selection
         target_frame = ttk.Frame(right_frame)
@@ -190,6 +323,21 @@ class ServerApp:
         self.send_button = ttk.Button(target_frame, text="Send Query", command=self.send_query)
         self.send_button.pack(side=tk.RIGHT, padx=5)
         
+        # Query agregat ke semua client digabung di server (hanya agregat parsial yang dikirim client)
+        self.combine_aggregates_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(target_frame, text="Combine aggregates",
+                        variable=self.combine_aggregates_var).pack(side=tk.RIGHT, padx=5)
+        
+        # Pre-flight plan: full scan (NATURAL) pada tabel besar diperingatkan atau ditahan
+        self.plan_check_var = tk.StringVar(value=CHECK_OFF)
+        ttk.Combobox(target_frame, textvariable=self.plan_check_var, values=CHECK_MODES,
+                     state="readonly", width=6).pack(side=tk.RIGHT)
+        ttk.Label(target_frame, text="Plan check:").pack(side=tk.RIGHT, padx=(5, 2))
+        
+        # Progres query run terakhir (N dari M client)
+        self.run_status_label = ttk.Label(target_frame, text="")
+        self.run_status_label.pack(side=tk.RIGHT, padx=5)
+        
         # Results
         results_frame = ttk.LabelFrame(right_frame, text="Results")
         results_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -237,6 +385,7 @@ class ServerApp:
         
         # Update UI setiap 1 detik
         self.update_ui()
+        self.pump_ui_events()
     
     def configure_mssql_style(self):
         """Konfigurasi style untuk tampilan mirip MSSQL"""
@@ -297,9 +446,18 @@ class ServerApp:
     
     def update_ui(self):
         """Update UI secara periodik"""
-        self.update_client_list()
+        self.request_client_list_update()
         self.root.after(1000, self.update_ui)
     
+    def pump_ui_events(self):
+        """Kuras antrian event UI dengan frame rate tetap (UI thread)"""
+        self.ui_queue.drain()
+        self.root.after(self.ui_frame_ms, self.pump_ui_events)
+    
+    def request_client_list_update(self):
+        """Minta refresh daftar client; aman dipanggil dari thread mana pun, beberapa permintaan digabung"""
+        self.ui_queue.post_coalesced('client_list', self.update_client_list)
+    
     def toggle_clients_panel(self):
         """Toggle tampilan panel client list"""
         self.client_collapsed.set(not self.client_collapsed.get())
@@ -314,59 +472,81 @@ class ServerApp:
             self.toggle_clients_btn.config(text="▼")
     
     def update_client_list(self):
-        """Update daftar client di UI"""
-        # Clear treeview
-        for item in self.client_tree.get_children():
-            self.client_tree.delete(item)
-        
-        # Tambahkan client yang terhubung
-        with self.lock:
-            for client_id, client in self.clients.items():
-                status = "Connected" if client.is_connected else "Disconnected"
-                
-                # Set tag for Connected status to display in green
-                if client.is_connected:
-                    tag = "connected"
-                else:
-                    tag = "disconnected"
-                
-                self.client_tree.insert("", tk.END, values=(
-                    client.display_name, 
-                    status
-                ), tags=(tag,))
+        """Perbarui hanya baris client yang berubah (UI thread)"""
+        added, changed, removed = self.client_index.update(self.clients)
+        if not (added or changed or removed):
+            return
         
-        # Configure tag colors
-        self.client_tree.tag_configure("connected", foreground="green")
-        self.client_tree.tag_configure("disconnected", foreground="red")
+        for client_id in removed:
+            if self.client_tree.exists(client_id):
+                self.client_tree.delete(client_id)
+        for client_id in added + changed:
+            row = self.client_index.rows[client_id]
+            tags = ("connected" if row.connected else "disconnected",)
+            if self.client_tree.exists(client_id):
+                self.client_tree.item(client_id, values=row.values, tags=tags)
+            else:
+                self.client_tree.insert("", tk.END, iid=client_id, values=row.values, tags=tags)
         
-        # Update dropdown target
+        self.apply_client_filter()
         self.update_target_dropdown()
     
+    def apply_client_filter(self):
+        """Tampilkan client yang cocok dengan filter, urut nama; item lain dilepas dari tree"""
+        visible = self.client_index.filter(self.client_filter_var.get())
+        current = self.client_tree.get_children()
+        if tuple(visible) != current:
+            hidden = set(current) - set(visible)
+            if hidden:
+                self.client_tree.detach(*hidden)
+            for index, client_id in enumerate(visible):
+                self.client_tree.move(client_id, "", index)
+        self.client_count_label.config(text=f"{len(visible)}/{len(self.client_index)}")
+    
     def update_target_dropdown(self):
         """Update dropdown untuk pilihan target client"""
-        values = ["All Clients"]
-        with self.lock:
-            for client_id, client in self.clients.items():
-                if client.is_connected:
-                    values.append(f"{client.display_name} ({client_id})")
-        
-        self.target_dropdown['values'] = values
+        labels = self.client_index.target_labels()
+        if labels is not self.shown_target_labels:
+            self.shown_target_labels = labels
+            self.target_dropdown['values'] = labels
+    
+    def selected_client(self):
+        """Client yang dipilih di panel client (iid item adalah client_id)"""
+        selected = self.client_tree.selection()
+        return self.registry.get(selected[0]) if selected else None
     
     def log(self, message):
-        """Tambahkan pesan ke log"""
+        """Tambahkan pesan ke log; aman dipanggil dari thread mana pun"""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_message = f"[{timestamp}] {message}\n"
         
+        self.log_buffer.append(log_message)
+        self.ui_queue.post_coalesced('log', self.flush_log)
+        
+        print(log_message, end="")
+    
+    def flush_log(self):
+        """Tampilkan baris log yang tertunda dalam satu insert (UI thread)"""
+        lines = []
+        while self.log_buffer and len(lines) < self.log_lines_per_frame:
+            lines.append(self.log_buffer.popleft())
+        if self.log_buffer:
+            # Sisanya di frame berikutnya
+            self.ui_queue.post_coalesced('log', self.flush_log)
+        if not lines:
+            return
+        
         self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, log_message)
+        self.log_text.insert(tk.END, "".join(lines))
+        excess = int(self.log_text.index('end-1c').split('.')[0]) - self.log_max_lines
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         
         # Auto-scroll jika diaktifkan
         if self.autoscroll_var.get():
             self.log_text.see(tk.END)
             
         self.log_text.config(state=tk.DISABLED)
-        
-        print(log_message, end="")
     
     def start_server(self):
         """Mulai server socket untuk menerima koneksi"""
@@ -398,6 +578,11 @@ class ServerApp:
             self.heartbeat_thread.daemon = True
             self.heartbeat_thread.start()
             
+            # Mulai thread untuk job terjadwal
+            self.scheduler_thread = threading.Thread(target=self.run_scheduler)
+            self.scheduler_thread.daemon = True
+            self.scheduler_thread.start()
+            
         except Exception as e:
             self.log(f"Error memulai server: {e}")
             messagebox.showerror("Server Error", f"Tidak dapat memulai server: {e}")
@@ -409,15 +594,14 @@ class ServerApp:
             return
         
         self.running = False
+        self.dispatch_queue.clear()
         
-        # Tutup semua koneksi client
-        with self.lock:
-            for client_id, client in self.clients.items():
-                try:
-                    client.socket.close()
-                except:
-                    pass
-            self.clients.clear()
+        # Tutup semua koneksi client (di luar lock registry)
+        for client in self.registry.clear():
+            try:
+                client.socket.close()
+            except:
+                pass
         
         # Tutup server socket
         if self.server_socket:
@@ -489,31 +673,70 @@ class ServerApp:
             display_name = client_info.get('display_name', f"Client {client_id}")
             db_info = client_info.get('db_info', {})
             
-            # Buat objek client
-            client = FirebirdClient(client_id, display_name, client_socket, client_address)
-            client.db_info = db_info
+            session_token = client_info.get('session_token')
+            
+            # Lanjutkan session lama jika token cocok, selain itu buat entri client baru
+            replaced_sockets = []
+            
+            def resume(existing):
+                if not session_token or existing.session_token != session_token:
+                    replaced_sockets.append(existing.socket)
+                    return False
+                with existing.lock:
+                    replaced_sockets.append(existing.socket)
+                    existing.socket = client_socket
+                    existing.address = client_address
+                    existing.display_name = display_name
+                    existing.db_info = db_info
+                    existing.last_seen = time.time()
+                    existing.is_connected = True
+                return True
             
-            # Simpan client
-            with self.lock:
-                self.clients[client_id] = client
+            def create():
+                new_client = FirebirdClient(client_id, display_name, client_socket, client_address)
+                new_client.db_info = db_info
+                new_client.session_token = new_session_token()
+                return new_client
             
-            self.log(f"Client {display_name} ({client_id}) terhubung dari {client_address[0]}:{client_address[1]}")
+            client, resumed = self.registry.register(client_id, resume, create)
+            old_socket = replaced_sockets[0] if replaced_sockets else None
             
-            # Minta daftar tabel dari client
-            try:
-                tables_message = NetworkMessage(NetworkMessage.TYPE_QUERY, {
-                    'query': "SELECT RDB$RELATION_NAME FROM RDB$RELATIONS WHERE RDB$SYSTEM_FLAG = 0 OR RDB$SYSTEM_FLAG IS NULL",
-                    'description': 'get_tables'
-                }, client_id)
-                
-                success = send_message(client_socket, tables_message)
-                if not success:
-                    self.log(f"Gagal mengirim permintaan tabel ke {display_name}")
-            except Exception as e:
-                self.log(f"Error saat meminta tabel dari {display_name}: {e}")
+            if old_socket is not None and old_socket is not client_socket:
+                # Socket lama mungkin belum terdeteksi putus; tutup agar thread lamanya berhenti
+                try:
+                    old_socket.close()
+                except:
+                    pass
+            
+            if resumed:
+                self.log(f"Client {display_name} ({client_id}) melanjutkan session dari {client_address[0]}:{client_address[1]}"
+                         f" ({len(client.pending_requests)} request tertunda)")
+            else:
+                self.log(f"Client {display_name} ({client_id}) terhubung dari {client_address[0]}:{client_address[1]}")
+                # Cursor session lama tidak dikenal lagi oleh client
+                self.close_client_cursors(client_id, "Session client baru, cursor lama tidak berlaku")
+            
+            # Balas registrasi dengan session token
+            reply = NetworkMessage(NetworkMessage.TYPE_REGISTER, {
+                'session_token': client.session_token,
+                'resumed': resumed,
+                'pending_requests': list(client.pending_requests)
+            }, client_id)
+            if not client.send(reply):
+                self.log(f"Gagal mengirim balasan registrasi ke {display_name}")
+            
+            # Daftar tabel tidak perlu diminta ulang jika schema tidak berubah
+            if resumed and client.tables and client_info.get('schema_hash') == client.schema_hash:
+                self.log(f"Schema {display_name} tidak berubah, daftar tabel dipakai ulang")
+            else:
+                self.request_tables(client)
+            
+            # Jalankan job terjadwal yang terlewat selama client offline
+            self.catch_up_jobs(client)
+            self.register_standing_queries(client)
             
             # Loop utama untuk client ini
-            while self.running and client.is_connected:
+            while self.running and client.is_connected and client.socket is client_socket:
                 try:
                     # Set timeout untuk socket
                     client_socket.settimeout(10.0)  # Tingkatkan timeout
@@ -538,6 +761,10 @@ class ServerApp:
                     if message.msg_type == NetworkMessage.TYPE_PONG:
                         # Heartbeat response, tidak perlu diproses lebih lanjut
                         pass
+                    elif message.data.get('standing_query') and message.msg_type in (
+                            NetworkMessage.TYPE_RESULT, NetworkMessage.TYPE_ERROR):
+                        # Hasil standing query didorong client tanpa request
+                        self.handle_standing_result(client, message.msg_type, message.data)
                     elif message.msg_type == NetworkMessage.TYPE_RESULT:
                         # Detail debug untuk hasil query
                         result_data = message.data
@@ -563,12 +790,22 @@ class ServerApp:
                         
                         self.log(f"Menerima hasil query dari {display_name}: {len(result)} result sets")
                         
+                        # Hasil yang dikirim ulang setelah reconnect bisa saja sudah pernah diterima
+                        if not self.complete_request(client, result_data, message.size):
+                            continue
+                        
                         # Hasil query
                         self.process_query_result(client, message.data)
                     elif message.msg_type == NetworkMessage.TYPE_ERROR:
                         # Error dari client
                         error = message.data.get('error', 'Unknown error')
+                        if not self.complete_request(client, message.data, message.size):
+                            continue
                         self.log(f"Error dari {client.display_name}: {error}")
+                        if message.data.get('cursor'):
+                            self.fail_cursor_page(message.data['cursor'], error)
+                        if message.data.get('description') == 'get_plan':
+                            self.resolve_plan(message.data)
                 except socket.timeout:
                     # Log timeout tapi jangan langsung putuskan koneksi
                     self.log(f"Timeout saat berkomunikasi dengan {display_name}, menunggu heartbeat...")
@@ -584,12 +821,21 @@ class ServerApp:
                     self.log(f"Error saat berkomunikasi dengan {client.display_name}: {e}")
                     break
             
-            # Client disconnected
-            with self.lock:
-                if client_id in self.clients:
-                    self.clients[client_id].is_connected = False
-            
-            self.log(f"Client {display_name} terputus")
+            # Client disconnected (kecuali session sudah dilanjutkan lewat koneksi baru)
+            current = self.registry.get(client_id)
+            superseded = current is None or current.socket is not client_socket
+            if not superseded:
+                with current.lock:
+                    superseded = current.socket is not client_socket
+                    if not superseded:
+                        current.is_connected = False
+            
+            if superseded:
+                self.log(f"Koneksi lama {display_name} ditutup, session dilanjutkan lewat koneksi baru")
+            else:
+                # Cursor tetap dipegang agar hasil yang dikirim ulang setelah resume bisa di-paging
+                self.suspend_client_cursors(client_id, "Client terputus")
+                self.log(f"Client {display_name} terputus")
             
         except Exception as e:
             print(f"[SERVER] Error dalam handle_client: {e}")
@@ -603,15 +849,15 @@ class ServerApp:
                 pass
             
             # Update client list di UI
-            self.update_client_list()
+            self.request_client_list_update()
     
     def heartbeat_clients(self):
         """Thread untuk ping client secara berkala"""
+        last_lock_report = time.time()
         while self.running:
             try:
-                with self.lock:
-                    # Copy client list untuk iterasi
-                    clients_copy = list(self.clients.items())
+                # Snapshot daftar client, tanpa lock
+                clients_copy = list(self.clients.items())
                 
                 # Check setiap client
                 for client_id, client in clients_copy:
@@ -631,7 +877,7 @@ class ServerApp:
                         
                         # Kirim ping
                         ping_message = NetworkMessage(NetworkMessage.TYPE_PING, {}, client_id)
-                        if not send_message(client.socket, ping_message):
+                        if not client.send(ping_message):
                             self.log(f"Gagal mengirim ping ke {client.display_name}")
                             client.is_connected = False
                             try:
@@ -646,8 +892,16 @@ class ServerApp:
                         except:
                             pass
                 
+                # Tandai client yang melewati deadline query run
+                self.expire_query_runs()
+                
+                # Laporkan contention lock secara berkala
+                if time.time() - last_lock_report >= self.lock_stats_interval:
+                    last_lock_report = time.time()
+                    self.report_lock_stats()
+                
                 # Update client list di UI
-                self.update_client_list()
+                self.request_client_list_update()
                 
             except Exception as e:
                 self.log(f"Error in heartbeat thread: {e}")
@@ -662,6 +916,13 @@ class ServerApp:
         result = result_data.get('result', [])
         error = result_data.get('error')
         
+        # Halaman remote cursor: simpan ke cache cursor, tab sudah ada
+        remote_cursor = None
+        if result_data.get('cursor'):
+            remote_cursor = self.receive_cursor_page(result_data['cursor'], result)
+            if description == 'cursor_page':
+                return
+        
         # Debug info detail
         print("="*50)
         print(f"[SERVER] PROCESS_QUERY_RESULT dari {client.display_name}")
@@ -695,31 +956,553 @@ class ServerApp:
                 self.log(f"  First row keys: {list(rows[0].keys()) if isinstance(rows[0], dict) else 'not a dict'}")
         
         # Proses berdasarkan description
+        if description == 'get_plan':
+            self.resolve_plan(result_data)
+            return
+        
         if description == 'get_tables' and not error:
             # Process daftar tabel
-            tables = []
-            for result_set in result:
-                for row in result_set.get('rows', []):
-                    if row and len(row) > 0:
-                        try:
-                            table_name = list(row.values())[0].strip()
-                            if table_name:
-                                tables.append(table_name)
-                        except Exception as e:
-                            print(f"[SERVER] Error parsing table name: {e}, row: {row}")
+            tables = extract_table_names(result)
             
-            with self.lock:
+            with client.lock:
                 client.tables = tables
+                client.schema_hash = schema_hash(tables)
+            self.schema_catalog.set_tables(client.client_id, tables)
             
             self.log(f"Menerima {len(tables)} tabel dari {client.display_name}")
             return
         
+        if description == 'get_columns' and not error:
+            schema = self.schema_catalog.set_columns(client.client_id, result)
+            self.log(f"Menerima {len(schema.column_tables)} nama kolom dari {client.display_name}")
+            return
+        
+        if not error:
+            self.observe_table_rows(client, query, result, remote_cursor)
+        
+        # Query ke banyak client: hasil digabung ke satu tab, bukan satu tab per client
+        with self.lock:
+            merged = self.merged_results.get(result_data.get('run_id'))
+        if merged is not None:
+            self.append_merged_result(result_data['run_id'], merged, client, result, error, remote_cursor)
+            return
+        
         print(f"[SERVER] Membuat tab baru untuk hasil query dari {client.display_name}")
         
+        # Konversi ke penyimpanan kolumnar di thread jaringan, tab hanya memegang handle
+        if not error and result:
+            result = self.store_result(client, result)
+        
         # Create result tab on the UI thread
-        self.root.after(0, self._create_result_tab, client, query, description, result, error)
+        self.ui_queue.post(self._create_result_tab, client, query, description, result, error, remote_cursor)
+    
+    def observe_table_rows(self, client, query, result, remote_cursor=None):
+        """Catat jumlah baris tabel dari hasil COUNT(*) atau SELECT satu tabel tanpa filter"""
+        observed = self.table_rows.observe(
+            client.client_id, query, result, complete=remote_cursor is None,
+            total_rows=remote_cursor.total_rows if remote_cursor is not None else None)
+        if observed:
+            self.log(f"Jumlah baris {observed[0]} di {client.display_name}: {observed[1]}")
+    
+    def store_result(self, client, result):
+        """Simpan result set ke ResultStore dan ganti baris dengan ResultHandle"""
+        stored = []
+        for result_set in result:
+            headers = list(result_set.get('headers', []))
+            handle = self.result_store.put(headers, result_set.get('rows', []), label=client.display_name)
+            stored.append({'headers': headers, 'rows': handle})
+        
+        stats = self.result_store.stats()
+        if stats['spilled']:
+            self.log(f"Result store: {stats['in_memory']} result di memori "
+                     f"({stats['memory_bytes'] // (1024 * 1024)} MB), {stats['spilled']} di disk")
+        return stored
+    
+    def request_tables(self, client):
+        """Minta daftar tabel dan kolom dari client"""
+        try:
+            tables_message = NetworkMessage(NetworkMessage.TYPE_QUERY, {
+                'query': "SELECT RDB$RELATION_NAME FROM RDB$RELATIONS WHERE RDB$SYSTEM_FLAG = 0 OR RDB$SYSTEM_FLAG IS NULL",
+                'description': 'get_tables',
+                'record_history': False  # Metadata dari server, bukan query user
+            }, client.client_id)
+            
+            success = client.send(tables_message)
+            if not success:
+                self.log(f"Gagal mengirim permintaan tabel ke {client.display_name}")
+                return
+            
+            # Kolom per tabel untuk validasi query dan autocomplete
+            columns_message = NetworkMessage(NetworkMessage.TYPE_QUERY, {
+                'query': COLUMNS_QUERY,
+                'description': 'get_columns',
+                'record_history': False
+            }, client.client_id)
+            if not client.send(columns_message):
+                self.log(f"Gagal mengirim permintaan kolom ke {client.display_name}")
+        except Exception as e:
+            self.log(f"Error saat meminta tabel dari {client.display_name}: {e}")
+    
+    def track_request(self, client, query_data, run_id=None):
+        """Beri request_id pada query agar hasilnya bisa dicocokkan (juga setelah reconnect)"""
+        request_id = uuid.uuid4().hex
+        query_data['request_id'] = request_id
+        now = time.time()
+        with client.lock:
+            # Buang request lama yang tidak pernah dijawab
+            for old_id, info in list(client.pending_requests.items()):
+                if now - info['sent'] > self.pending_request_ttl:
+                    del client.pending_requests[old_id]
+            client.pending_requests[request_id] = {
+                'query': query_data.get('query', ''),
+                'sent': now,
+                'run_id': run_id,
+                'delta': query_data.get('delta')
+            }
+        return request_id
+    
+    def complete_request(self, client, data, size=None):
+        """
+        Tandai request selesai. Return False jika hasil ini duplikat
+        (request sudah dijawab sebelumnya, misalnya dikirim ulang setelah reconnect).
+
+        :param size: Ukuran pesan jawaban (byte) untuk statistik history
+        """
+        request_id = data.get('request_id')
+        if not request_id:
+            return True
+        
+        with client.lock:
+            request = client.pending_requests.pop(request_id, None)
+        if request is None:
+            self.log(f"Hasil duplikat untuk request {request_id} dari {client.display_name} diabaikan")
+            return False
+        
+        data['run_id'] = request.get('run_id')
+        if data.get('delta') and not data.get('error') and not self.apply_delta(client, data, request):
+            return False
+        with self.lock:
+            run = self.query_runs.get(data['run_id'])
+            in_history = data['run_id'] in self.history_runs
+        if in_history:
+            rows = 0 if data.get('error') else sum(len(result_set.get('rows') or [])
+                                                   for result_set in data.get('result', []))
+            try:
+                self.query_history.add_stats(data['run_id'], rows, size)
+            except Exception as e:
+                self.log(f"Gagal mencatat history query: {e}")
+        if run is not None:
+            if data.get('error'):
+                run.add_error(client.client_id, data['error'])
+            else:
+                run.add_result(client.client_id, data.get('result', []))
+        with self.lock:
+            job_name = self.run_jobs.get(data['run_id'])
+        if job_name is not None and not data.get('error'):
+            self.record_metrics(client, job_name, data.get('result', []))
+        return True
+    
+    def record_metrics(self, client, job_name, result):
+        """Catat metrik numerik hasil job ke time-series store"""
+        metrics = extract_metrics(job_name, result)
+        if metrics:
+            try:
+                self.metric_store.record(client.display_name, metrics)
+            except Exception as e:
+                self.log(f"Gagal mencatat metrik job {job_name}: {e}")
+    
+    def apply_delta(self, client, data, request):
+        """
+        Ganti hasil delta dari client dengan hasil lengkap dari salinan server.
+        Return False jika delta tidak cocok; query dikirim ulang untuk hasil penuh.
+        """
+        info = data['delta']
+        try:
+            data['result'], sent_rows = self.delta_cache.receive(client.client_id, info, data.get('result', []))
+        except DeltaError as e:
+            self.delta_cache.discard(client.client_id, info.get('key'))
+            self.log(f"Delta dari {client.display_name} ditolak ({e}), meminta hasil penuh")
+            self.fanout_executor.submit(self.resend_full_result, client, request)
+            return False
+        
+        if info.get('mode') == MODE_DELTA:
+            total = sum(len(result_set.get('rows', [])) for result_set in data['result'])
+            self.log(f"Delta dari {client.display_name}: {sent_rows} baris baru/berubah, "
+                     f"{len(info.get('deleted', []))} dihapus, total {total} baris")
+        return True
+    
+    def resend_full_result(self, client, request):
+        """Kirim ulang query tanpa base delta agar client mengirim hasil penuh"""
+        delta = {'key': request['delta'].get('key'), 'key_columns': request['delta'].get('key_columns')}
+        try:
+            self.send_query_to_client(client, request['query'], request.get('run_id'), delta=delta)
+        except ConnectionError as e:
+            with self.lock:
+                run = self.query_runs.get(request.get('run_id'))
+            if run is not None:
+                run.add_error(client.client_id, str(e))
+    
+    def record_history(self, query, target, run=None, error=None):
+        """Catat query ke history; entri run diselesaikan saat semua client menjawab"""
+        try:
+            if run is None:
+                self.query_history.add(query, target, status=STATUS_ERROR, error=error)
+                return
+            with self.lock:
+                self.history_runs.add(run.run_id)
+            self.query_history.add(query, target, request_id=run.run_id, ts=run.created)
+        except Exception as e:
+            self.log(f"Gagal mencatat history query: {e}")
+    
+    def finish_history(self, run):
+        """Tandai entri history run selesai dengan status dan durasi"""
+        with self.lock:
+            if run.run_id not in self.history_runs:
+                return
+            self.history_runs.discard(run.run_id)
+        counts = run.counts()
+        failed = len(run) - counts[STATUS_DONE]
+        status = STATUS_SUCCESS if not failed else STATUS_ERROR if failed == len(run) else STATUS_PARTIAL
+        errors = [entry.error for entry in run.clients.values() if entry.error]
+        try:
+            self.query_history.finish(run.run_id, status, duration=time.time() - run.created,
+                                      error=errors[0] if errors else None)
+        except Exception as e:
+            self.log(f"Gagal mencatat history query: {e}")
+    
+    def create_query_run(self, query, clients, keep_results=False):
+        """
+        Buat QueryRun untuk daftar client dan simpan (hanya beberapa run terakhir)
+
+        :param keep_results: Run menyimpan hasil setiap client (hanya untuk agregat lintas client)
+        """
+        run = QueryRun(
+            query,
+            [(client.client_id, client.display_name) for client in clients],
+            send_timeout=self.run_send_timeout,
+            response_timeout=self.run_response_timeout,
+            on_update=self.post_run_status,
+            keep_results=keep_results
+        )
+        with self.lock:
+            self.query_runs[run.run_id] = run
+            while len(self.query_runs) > self.max_query_runs:
+                old_id, _ = self.query_runs.popitem(last=False)
+                self.merged_results.pop(old_id, None)
+                self.aggregate_plans.pop(old_id, None)
+                self.run_jobs.pop(old_id, None)
+                self.history_runs.discard(old_id)
+        return run
+    
+    def report_lock_stats(self):
+        """Catat statistik contention lock registry dan state server ke log"""
+        for lock in (self.registry.lock, self.lock):
+            stats = lock.stats(reset=True)
+            if stats['contended'] or stats['slow_holds']:
+                self.log(f"Lock {format_lock_stats(stats)}")
+    
+    def expire_query_runs(self):
+        """Tandai client yang tidak menjawab sebelum deadline sebagai timeout"""
+        with self.lock:
+            runs = [run for run in self.query_runs.values() if not run.finished]
+        for run in runs:
+            for entry in run.expire():
+                self.log(f"Run {run.run_id}: {entry.display_name} tidak menjawab sebelum deadline")
+    
+    def post_run_status(self, run):
+        """Callback progres QueryRun dari thread mana pun; update beruntun digabung per run"""
+        if run.finished:
+            self.finish_history(run)
+        self.ui_queue.post_coalesced(('run_status', run.run_id), self.update_run_status, run)
+    
+    def update_run_status(self, run):
+        """Tampilkan progres query run terakhir"""
+        if run.run_id in self.merged_views:
+            self.schedule_merged_refresh(run.run_id)
+        
+        with self.lock:
+            latest = next(reversed(self.query_runs), None)
+        if run.run_id != latest:
+            return
+        
+        returned, total = run.progress()
+        text = f"Run {run.run_id}: {run.progress_label()}"
+        if returned == total:
+            text += " - selesai"
+        self.run_status_label.config(text=text)
+        if returned == total and total > 1:
+            self.log(f"Run {run.run_id} selesai: {run.progress_label()}")
+    
+    def open_remote_cursor(self, client, query):
+        """Buat remote cursor untuk query yang akan dikirim ke client"""
+        cursor_id = f"{client.client_id}:{uuid.uuid4().hex[:8]}"
+        remote_cursor = RemoteCursor(
+            cursor_id,
+            client.client_id,
+            query,
+            lambda cid, page: self.request_cursor_page(client, cid, page),
+            page_size=self.page_size
+        )
+        with self.lock:
+            self.remote_cursors[cursor_id] = remote_cursor
+        return remote_cursor
+    
+    def request_cursor_page(self, client, cursor_id, page):
+        """Minta halaman remote cursor ke client tanpa memblokir UI"""
+        if not client.is_connected:
+            return False
+        
+        fetch_message = NetworkMessage(NetworkMessage.TYPE_FETCH, {
+            'cursor_id': cursor_id,
+            'page': page
+        }, client.client_id)
+        
+        def send_fetch():
+            if not client.send(fetch_message):
+                self.fail_cursor_page({'cursor_id': cursor_id, 'page': page},
+                                      f"Gagal meminta halaman dari {client.display_name}")
+        
+        threading.Thread(target=send_fetch, daemon=True).start()
+        return True
+    
+    def receive_cursor_page(self, cursor_info, result):
+        """Simpan halaman hasil dari client ke remote cursor"""
+        with self.lock:
+            remote_cursor = self.remote_cursors.get(cursor_info.get('cursor_id'))
+        if remote_cursor is None:
+            return None
+        
+        result_set = result[0] if result else {}
+        remote_cursor.add_page(
+            cursor_info.get('page', 0),
+            result_set.get('headers', []),
+            result_set.get('rows', []),
+            cursor_info.get('has_more', False),
+            cursor_info.get('total_rows')
+        )
+        return remote_cursor
+    
+    def fail_cursor_page(self, cursor_info, error):
+        """
+        Teruskan error dari client ke remote cursor yang menunggu. Tanpa nomor halaman
+        berarti query awal gagal: cursor tidak pernah terbuka dan langsung dibuang.
+        """
+        page = cursor_info.get('page')
+        with self.lock:
+            if page is None:
+                remote_cursor = self.remote_cursors.pop(cursor_info.get('cursor_id'), None)
+            else:
+                remote_cursor = self.remote_cursors.get(cursor_info.get('cursor_id'))
+        if remote_cursor:
+            remote_cursor.fail(page, error)
+    
+    def close_remote_cursor(self, remote_cursor):
+        """Tutup remote cursor dan beri tahu client"""
+        with self.lock:
+            self.remote_cursors.pop(remote_cursor.cursor_id, None)
+        client = self.registry.get(remote_cursor.client_id)
+        remote_cursor.close()
+        
+        if client and client.is_connected:
+            close_message = NetworkMessage(NetworkMessage.TYPE_CLOSE_CURSOR, {
+                'cursor_id': remote_cursor.cursor_id
+            }, client.client_id)
+            threading.Thread(target=client.send, args=(close_message,), daemon=True).start()
+    
+    def suspend_client_cursors(self, client_id, reason):
+        """Gagalkan permintaan halaman yang tertunda; cursor tetap dipakai jika session dilanjutkan"""
+        with self.lock:
+            cursors = [c for c in self.remote_cursors.values() if c.client_id == client_id]
+        for remote_cursor in cursors:
+            remote_cursor.fail_pending(reason)
+    
+    def close_client_cursors(self, client_id, reason):
+        """Tutup semua remote cursor milik client (misalnya saat client terputus)"""
+        with self.lock:
+            cursors = [c for c in self.remote_cursors.values() if c.client_id == client_id]
+            for remote_cursor in cursors:
+                del self.remote_cursors[remote_cursor.cursor_id]
+        for remote_cursor in cursors:
+            remote_cursor.fail(None, reason)
+        
+    def append_merged_result(self, run_id, merged, client, result, error, remote_cursor=None):
+        """Tambahkan hasil satu client ke hasil gabungan"""
+        with self.lock:
+            plan = self.aggregate_plans.get(run_id)
+            run = self.query_runs.get(run_id)
+        if plan is not None and run is not None:
+            # Gabungkan ulang agregat parsial dari semua client yang sudah menjawab
+            with self.aggregate_lock:
+                partials = run.results()
+                combined = plan.combine(partials.values())[0]
+                merged.replace(f"Semua ({len(partials)} client)", combined['headers'], combined['rows'])
+            if error:
+                self.log(f"Run {run_id}: error dari {client.display_name}: {error}")
+            self.schedule_merged_refresh(run_id)
+            return
+        
+        if error:
+            self.log(f"Run {run_id}: error dari {client.display_name}: {error}")
+        else:
+            for result_set in result:
+                merged.append(client.display_name, result_set.get('headers', []), result_set.get('rows', []))
+            if merged.truncated:
+                self.log(f"Run {run_id}: hasil gabungan mencapai batas {merged.max_rows} baris")
+        self.schedule_merged_refresh(run_id)
+        
+        # Halaman berikutnya dari remote cursor diambil berurutan sampai habis
+        if remote_cursor is not None:
+            self.fetch_merged_pages(run_id, merged, client, remote_cursor, 1)
+    
+    def fetch_merged_pages(self, run_id, merged, client, remote_cursor, page):
+        """Ambil halaman remote cursor satu per satu dan tambahkan ke hasil gabungan"""
+        with self.lock:
+            active = self.merged_results.get(run_id) is merged
+        if not active or merged.truncated or page >= remote_cursor.page_count():
+            self.close_remote_cursor(remote_cursor)
+            return
+        
+        def on_page(rows, error):
+            if error:
+                self.log(f"Run {run_id}: gagal mengambil halaman {page + 1} dari {client.display_name}: {error}")
+                self.close_remote_cursor(remote_cursor)
+                return
+            merged.append(client.display_name, remote_cursor.headers, rows)
+            self.schedule_merged_refresh(run_id)
+            self.fetch_merged_pages(run_id, merged, client, remote_cursor, page + 1)
+        
+        remote_cursor.get_page(page, on_page)
+    
+    def schedule_merged_refresh(self, run_id):
+        """Refresh tab gabungan, beberapa hasil yang datang berdekatan digabung jadi satu refresh"""
+        def refresh():
+            view = self.merged_views.get(run_id)
+            if view:
+                view()
+        
+        self.ui_queue.post_coalesced(('merged', run_id), refresh, delay=0.25)
+    
+    def _create_merged_tab(self, run, merged, title=None, select=True):
+        """Buat tab hasil gabungan untuk query run ke banyak client (UI thread)"""
+        result_frame = ttk.Frame(self.results_notebook)
+        self.results_notebook.add(result_frame, text=title or f"Merged - Run {run.run_id}")
+        if select:
+            self.results_notebook.select(result_frame)
+        result_frame.merged_run_id = run.run_id
+        result_frame.merged = merged
+        result_frame.query_info = {
+            'client': f"{len(run)} clients",
+            'database': 'Multiple',
+            'query': run.query,
+            'executed': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        
+        # Toolbar: filter
+        controls_frame = ttk.Frame(result_frame)
+        controls_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        filter_frame = ttk.LabelFrame(controls_frame, text="Filter")
+        filter_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        filter_var = tk.StringVar()
+        filter_column_var = tk.StringVar(value="All Columns")
+        filter_entry = ttk.Entry(filter_frame, textvariable=filter_var, width=30)
+        filter_entry.pack(side=tk.LEFT, padx=5, pady=2)
+        filter_column_box = ttk.Combobox(filter_frame, textvariable=filter_column_var, width=15)
+        filter_column_box.pack(side=tk.LEFT, padx=5, pady=2)
+        
+        state = {'sort': None, 'desc': False, 'columns': [], 'view': [], 'totals': {}, 'key': None, 'pending': None}
+        
+        # Grid hanya membuat item untuk baris yang terlihat
+        grid = VirtualGrid(result_frame, [], MergedSource(merged, []), widths=[],
+                           on_heading=lambda column: sort_by(column))
+        grid.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Status dan total
+        status_frame = ttk.Frame(result_frame)
+        status_frame.pack(fill=tk.X, padx=5, pady=(2, 5))
+        status_label = ttk.Label(status_frame, text="Menunggu hasil...")
+        status_label.pack(side=tk.LEFT, padx=5)
+        totals_label = ttk.Label(result_frame, text="", anchor=tk.W)
+        totals_label.pack(fill=tk.X, padx=10, pady=(0, 5))
+        
+        def current_key():
+            column = filter_column_var.get()
+            return (merged.version, filter_var.get().strip(), column, state['sort'], state['desc'])
+        
+        def compute(key):
+            # Background thread: filter/sort dan total atas seluruh baris gabungan
+            try:
+                view = merged.view(key[1] or None, None if key[2] == "All Columns" else key[2], key[3], key[4])
+                totals = merged.totals(view)
+            except Exception as e:
+                self.ui_queue.post(self.log, f"Run {run.run_id}: error menghitung tampilan gabungan: {e}")
+                view, totals = [], {}
+            self.ui_queue.post(computed, key, view, totals)
+        
+        def computed(key, view, totals):
+            # Urutan dan total di-cache per key; key yang berubah selama dihitung memicu hitung ulang
+            state.update(key=key, view=view, totals=totals, pending=None)
+            refresh()
+        
+        def sort_by(column):
+            if state['sort'] == column:
+                state['desc'] = not state['desc']
+            else:
+                state['sort'], state['desc'] = column, False
+            grid.first = 0
+            refresh()
         
-    def _create_result_tab(self, client, query, description, result, error):
+        def refresh():
+            if not grid.winfo_exists():
+                return
+            # Urutan baris hanya dihitung ulang jika data, filter, atau sort berubah; selama
+            # dihitung grid tetap menampilkan urutan sebelumnya
+            key = current_key()
+            if key != state['key'] and state['pending'] is None:
+                state['pending'] = key
+                threading.Thread(target=compute, args=(key,), daemon=True).start()
+            view = state['view']
+            grid.source.view = view
+            columns = merged.columns
+            if columns != state['columns']:
+                # Kolom baru muncul dari client yang baru menjawab
+                state['columns'] = columns
+                grid.set_columns(columns, [150 if column == CLIENT_COLUMN else 120 for column in columns])
+                filter_column_box.configure(values=["All Columns"] + columns)
+            else:
+                grid.refresh()
+            
+            for column in columns:
+                arrow = (" ▼" if state['desc'] else " ▲") if column == state['sort'] else ""
+                grid.set_heading(column, column + arrow)
+            
+            text = f"{len(view)} rows dari {len(merged.client_counts())} client | Run {run.run_id}: {run.progress_label()}"
+            if merged.truncated:
+                text += f" | dibatasi {merged.max_rows} baris"
+            if state['pending'] is not None:
+                text += " | menghitung..."
+            status_label.config(text=text)
+            
+            totals = state['totals']
+            totals_label.config(text="Total: " + ", ".join(f"{column}={value:,.2f}".rstrip('0').rstrip('.')
+                                                         for column, value in totals.items()) if totals else "")
+        
+        def apply_filter():
+            grid.first = 0
+            refresh()
+        
+        ttk.Button(filter_frame, text="Apply", command=apply_filter).pack(side=tk.LEFT, padx=5, pady=2)
+        ttk.Button(filter_frame, text="Clear",
+                   command=lambda: [filter_var.set(""), filter_column_var.set("All Columns"), apply_filter()]
+                   ).pack(side=tk.LEFT, padx=5, pady=2)
+        filter_entry.bind("<Return>", lambda event: apply_filter())
+        
+        self.merged_views[run.run_id] = refresh
+        refresh()
+        return result_frame
+    
+    def _create_result_tab(self, client, query, description, result, error, remote_cursor=None):
         """Create result tab in UI thread"""
         try:
             print(f"[SERVER] Creating result tab in UI thread")
@@ -740,6 +1523,11 @@ class ServerApp:
             self.results_notebook.add(result_frame, text=tab_title)
             self.results_notebook.select(result_frame)  # Aktifkan tab baru
             
+            # Remote cursor dan handle hasil dilepas bersama tab
+            result_frame.remote_cursor = remote_cursor
+            result_frame.result_handles = [rs['rows'] for rs in result or []
+                                           if isinstance(rs.get('rows'), ResultHandle)]
+            
             # Simpan query info sebagai atribut tab (tidak ditampilkan)
             result_frame.query_info = {
                 'client': client.display_name,
@@ -767,16 +1555,11 @@ class ServerApp:
                 self.log(f"Query tidak mengembalikan hasil dari {client.display_name}")
             else:
                 # Tampilkan hasil
-                total_rows = 0
-                truncated = False
-                
                 for i, result_set in enumerate(result):
                     # Verifikasi data result set valid
                     headers = result_set.get('headers', [])
                     rows = result_set.get('rows', [])
                     
-                    total_rows += len(rows)
-                    
                     print(f"[SERVER] Processing result set {i+1}: {len(rows)} rows, headers: {headers}")
                     
                     if not headers:
@@ -803,59 +1586,21 @@ class ServerApp:
                     search_column_var = tk.StringVar(value="All Columns")
                     search_status_var = tk.StringVar()
                     
-                    ttk.Entry(search_frame, textvariable=search_var, width=30).pack(side=tk.LEFT, padx=5, pady=2)
+                    search_entry = ttk.Entry(search_frame, textvariable=search_var, width=30)
+                    search_entry.pack(side=tk.LEFT, padx=5, pady=2)
                     
                     # Column selector
                     search_columns = ["All Columns"] + headers
                     ttk.Combobox(search_frame, textvariable=search_column_var, values=search_columns, width=15).pack(side=tk.LEFT, padx=5, pady=2)
                     
                     # Search button
-                    ttk.Button(search_frame, text="Search", command=lambda: search_tree()).pack(side=tk.LEFT, padx=5, pady=2)
+                    search_button = ttk.Button(search_frame, text="Search")
+                    search_button.pack(side=tk.LEFT, padx=5, pady=2)
                     
                     # Search status
                     ttk.Label(search_frame, textvariable=search_status_var).pack(side=tk.LEFT, padx=5, pady=2)
                     
-                    # Pagination setup
-                    if len(rows) > 100:
-                        page_size = 100
-                        truncated = True
-                        
-                        page_var = tk.IntVar(value=1)
-                        total_pages = (len(rows) + page_size - 1) // page_size
-                        
-                        paging_frame = ttk.Frame(search_frame)
-                        paging_frame.pack(side=tk.RIGHT, padx=10)
-                        
-                        ttk.Label(paging_frame, text="Page:").pack(side=tk.LEFT)
-                        
-                        # Prev button
-                        ttk.Button(paging_frame, text="◀", width=2, 
-                                  command=lambda: page_var.set(max(1, page_var.get() - 1)) or show_page()).pack(side=tk.LEFT)
-                        
-                        # Page indicator
-                        page_label = ttk.Label(paging_frame, text=f"1/{total_pages}")
-                        page_label.pack(side=tk.LEFT, padx=5)
-                        
-                        # Next button
-                        ttk.Button(paging_frame, text="▶", width=2,
-                                  command=lambda: page_var.set(min(total_pages, page_var.get() + 1)) or show_page()).pack(side=tk.LEFT)
-                        
-                        # Go to page
-                        ttk.Button(paging_frame, text="Go", width=3,
-                                  command=lambda: show_go_page_dialog()).pack(side=tk.LEFT, padx=5)
-                        
-                        # Function to show specific page dialog
-                        def show_go_page_dialog():
-                            page = simpledialog.askinteger("Go to Page", f"Enter page number (1-{total_pages}):", 
-                                                         minvalue=1, maxvalue=total_pages)
-                            if page:
-                                page_var.set(page)
-                                show_page()
-                    else:
-                        page_size = len(rows)
-                        paging_frame = None
-                    
-                    # Buat frame untuk menampung treeview dan status
+                    # Frame untuk grid dan status
                     tree_container = ttk.Frame(result_frame_inner)
                     tree_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
                     
@@ -864,175 +1609,60 @@ class ServerApp:
                         continue
                     
                     # Log debug info
-                    print(f"[SERVER] Rendering result set {i+1} to treeview")
+                    print(f"[SERVER] Rendering result set {i+1} to grid")
                     self.log(f"Rendering result set {i+1}: {len(rows)} rows with columns: {', '.join(headers)}")
                     
                     try:
-                        # Buat treeview dengan scrollbar
-                        treeview_frame = ttk.Frame(tree_container)
-                        treeview_frame.pack(fill=tk.BOTH, expand=True)
-                        
-                        # Buat treeview untuk hasil dengan style mirip MSSQL
-                        tree = ttk.Treeview(treeview_frame, columns=headers, show="headings", style="ISQL.Treeview")
-                        
-                        # Tambahkan scrollbar vertikal
-                        vsb = ttk.Scrollbar(treeview_frame, orient="vertical", command=tree.yview)
-                        tree.configure(yscrollcommand=vsb.set)
-                        vsb.pack(side=tk.RIGHT, fill=tk.Y)
-                        
-                        # Tambahkan scrollbar horizontal
-                        hsb = ttk.Scrollbar(tree_container, orient="horizontal", command=tree.xview)
-                        tree.configure(xscrollcommand=hsb.set)
-                        hsb.pack(side=tk.BOTTOM, fill=tk.X)
-                        
-                        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-                        
-                        # Set header
-                        for header in headers:
-                            tree.heading(header, text=header, anchor=tk.W)
-                            # Set lebar kolom berdasarkan konten
-                            max_width = len(str(header)) * 10
-                            for row_idx, row in enumerate(rows):
-                                if row_idx >= 100:  # Hanya cek 100 baris pertama untuk efisiensi
-                                    break
-                                val = str(row.get(header, ""))
-                                width = len(val) * 8
-                                if width > max_width:
-                                    max_width = width
-                            tree.column(header, width=min(max_width, 300), stretch=True, anchor=tk.W)
-                        
-                        # Sekarang kita dapat mengatur tombol open in new window
-                        open_window_button.config(command=lambda t=tree, h=headers, r=rows: self.open_result_in_new_window(t, h, r))
-                        
-                        # Fungsi untuk menampilkan halaman tertentu
-                        def show_page():
-                            # Hapus semua baris yang ada
-                            for item in tree.get_children():
-                                tree.delete(item)
-                            
-                            # Hitung rentang data untuk halaman ini
-                            current_page = page_var.get()
-                            start_idx = (current_page - 1) * page_size
-                            end_idx = min(start_idx + page_size, len(rows))
-                            
-                            # Update label halaman
-                            if paging_frame:
-                                page_label.config(text=f"{current_page}/{total_pages}")
-                            
-                            # Tambahkan data untuk halaman ini
-                            row_ids = []
-                            for idx in range(start_idx, end_idx):
-                                row = rows[idx]
-                                values = []
-                                for header in headers:
-                                    values.append(row.get(header, ""))
-                                row_id = tree.insert("", tk.END, values=values)
-                                row_ids.append(row_id)
-                            
-                            # Reset search jika pencarian aktif
-                            if search_var.get():
-                                # Panggil fungsi search untuk meng-highlight hasil
-                                search_tree()
-                            
-                            return row_ids
-                        
-                        # Menampilkan data awal
-                        row_ids = show_page()
-                        
-                        # Fungsi pencarian
-                        def search_tree():
-                            # Reset semua pengaturan sebelumnya
-                            for row_id in tree.get_children():
-                                tree.item(row_id, tags=())
-                            
-                            search_text = search_var.get().strip().lower()
-                            if not search_text:
-                                search_status_var.set("")
-                                return
-                            
-                            search_col = search_column_var.get()
-                            found_count = 0
-                            
-                            for row_id in tree.get_children():
-                                values = tree.item(row_id)['values']
-                                found = False
-                                
-                                if search_col == "All Columns":
-                                    # Cari di semua kolom
-                                    for value in values:
-                                        if str(value).lower().find(search_text) >= 0:
-                                            found = True
-                                            break
-                                else:
-                                    # Cari di kolom spesifik
-                                    col_idx = headers.index(search_col)
-                                    if str(values[col_idx]).lower().find(search_text) >= 0:
-                                        found = True
-                                
-                                if found:
-                                    tree.item(row_id, tags=('found',))
-                                    found_count += 1
-                            
-                            if found_count > 0:
-                                search_status_var.set(f"Found: {found_count} rows")
-                                tree.tag_configure('found', background='#FFFFCC')
-                                
-                                # Auto-scroll ke hasil pertama
-                                for row_id in tree.get_children():
-                                    if 'found' in tree.item(row_id)['tags']:
-                                        tree.see(row_id)
-                                        break
-                            else:
-                                search_status_var.set("Not found")
-                                
-                                # Jika tidak ditemukan di halaman saat ini, tanyakan untuk mencari di seluruh halaman
-                                if paging_frame and len(rows) > page_size:
-                                    if messagebox.askyesno("Search", "Pencarian tidak ditemukan di halaman ini. Cari di semua halaman?"):
-                                        self.search_all_pages(tree, rows, headers, search_text, search_col)
-                        
-                        # Tombol pencarian
-                        ttk.Button(search_frame, text="Search", command=search_tree).pack(side=tk.LEFT, padx=5)
-                        ttk.Button(search_frame, text="Clear", 
-                                command=lambda: [search_var.set(""), search_status_var.set(""), 
-                                              [tree.item(row_id, tags=()) for row_id in tree.get_children()]]
-                                ).pack(side=tk.LEFT, padx=5)
-                        
-                        # Pastikan search_entry tersedia sebelum binding
-                        for child in search_frame.winfo_children():
-                            if isinstance(child, ttk.Entry):
-                                search_entry = child
-                                search_entry.bind("<Return>", lambda event: search_tree())
-                                break
-                        
-                        # Tambahkan scrollbar vertikal
-                        vsb = ttk.Scrollbar(tree_container, orient="vertical", command=tree.yview)
-                        tree.configure(yscrollcommand=vsb.set)
-                        vsb.pack(side=tk.RIGHT, fill=tk.Y)
+                        # Grid hanya membuat item untuk baris yang terlihat; dengan remote cursor,
+                        # halaman berikutnya diminta ke client saat di-scroll
+                        paged_remotely = remote_cursor is not None and i == 0 and remote_cursor.page_count() > 1
+                        if paged_remotely:
+                            source = RemoteCursorSource(remote_cursor, headers, self.ui_queue.post)
+                        else:
+                            source = ListSource(headers, rows)
+                        grid = VirtualGrid(tree_container, headers, source)
+                        grid.pack(fill=tk.BOTH, expand=True)
                         
-                        # Tambahkan scrollbar horizontal
-                        hsb = ttk.Scrollbar(tree_container, orient="horizontal", command=tree.xview)
-                        tree.configure(xscrollcommand=hsb.set)
-                        hsb.pack(side=tk.BOTTOM, fill=tk.X)
+                        open_window_button.config(command=lambda g=grid, h=headers, r=rows: self.open_result_in_new_window(g, h, r))
                         
-                        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+                        search_tree, clear_search = self._bind_grid_search(
+                            grid, headers, None if paged_remotely else rows,
+                            search_frame, search_var, search_column_var, search_status_var
+                        )
+                        search_button.config(command=search_tree)
+                        if not paged_remotely:
+                            # Sort butuh semua baris; hasil remote cursor hanya sebagian ada di server
+                            self._bind_grid_sort(grid, headers, rows, search_status_var)
+                        search_entry.bind("<Return>", lambda event, search=search_tree: search())
+                        ttk.Button(search_frame, text="Clear", command=clear_search).pack(side=tk.LEFT, padx=5)
                         
                         # Tambahkan status bar di bawah
                         status_frame = ttk.Frame(result_frame_inner)
                         status_frame.pack(fill=tk.X, padx=5, pady=(2, 5))
                         
-                        # Total rows message
-                        total_msg = f"{len(rows)} rows"
-                        if truncated:
-                            total_msg += f" (showing {page_size} per page)"
-                        
                         # Tambahkan label status dengan informasi client dan jumlah baris
                         status_label = ttk.Label(
                             status_frame, 
-                            text=f"{total_msg} | Database: {client.db_info.get('name', 'Unknown')} | {client.display_name}",
+                            text=f"{remote_cursor.row_count_label() if paged_remotely else len(rows)} rows"
+                                 f" | Database: {client.db_info.get('name', 'Unknown')} | {client.display_name}",
                             anchor=tk.W
                         )
                         status_label.pack(side=tk.LEFT, padx=5)
                         
+                        if paged_remotely:
+                            # Halaman remote tiba: tampilkan ulang baris dan perbarui jumlah baris
+                            def on_remote_page(grid=grid, source=source, status_label=status_label,
+                                               status_var=search_status_var):
+                                if not grid.winfo_exists():
+                                    return
+                                grid.refresh()
+                                status_label.config(text=f"{remote_cursor.row_count_label()} rows"
+                                                         f" | Database: {client.db_info.get('name', 'Unknown')} | {client.display_name}")
+                                if source.error:
+                                    status_var.set(f"Error: {source.error}")
+                            
+                            source.listener = on_remote_page
+                        
                         # Tambahkan timestamp dan link untuk view query
                         time_label = ttk.Label(
                             status_frame,
@@ -1050,25 +1680,17 @@ class ServerApp:
                         view_query_button.pack(side=tk.RIGHT, padx=5)
                         
                     except Exception as e:
-                        print(f"[SERVER] ERROR saat membuat treeview: {e}")
+                        print(f"[SERVER] ERROR saat membuat grid: {e}")
                         import traceback
                         traceback.print_exc()
                         
-                        # Jika gagal membuat treeview, tampilkan pesan error
+                        # Jika gagal membuat grid, tampilkan pesan error
                         error_label = ttk.Label(
                             tree_container, 
                             text=f"Error displaying results: {e}"
                         )
                         error_label.pack(pady=20)
                 
-                # Tampilkan peringatan jika hasil melebihi batas yang aman
-                if total_rows > 50000:
-                    messagebox.showwarning(
-                        "Large Result Set", 
-                        f"Hasil query berisi {total_rows} baris yang bisa mempengaruhi performa aplikasi.\n\n"
-                        f"Pertimbangkan untuk menambahkan batasan FIRST atau WHERE untuk mengurangi jumlah hasil."
-                    )
-                
                 print(f"[SERVER] Hasil query berhasil ditampilkan dari {client.display_name}")
                 self.log(f"Hasil query ditampilkan dari {client.display_name}")
                 
@@ -1078,31 +1700,211 @@ class ServerApp:
             traceback.print_exc()
             self.log(f"Error saat membuat tab hasil: {e}")
     
-    def search_all_pages(self, tree, rows, headers, search_text, search_column):
-        """Mencari teks di semua halaman dan menampilkan hasil yang ditemukan"""
-        found_indices = []
-        search_text = search_text.lower()
-        
-        # Cari di semua baris
-        for i, row in enumerate(rows):
-            found = False
+    def _bind_grid_search(self, grid, headers, rows, search_frame, search_var, search_column_var, status_var):
+        """
+        Pencarian di grid hasil. Jika rows tersedia lengkap, pencarian memakai
+        SearchIndex di background thread (search-as-you-type, pencarian lama
+        dibatalkan) dan tombol ◀/▶ melompat ke baris yang cocok. Untuk hasil
+        remote cursor hanya baris yang tampil yang di-highlight.
+        
+        :return: Tuple (fungsi search, fungsi clear)
+        """
+        grid.tree.tag_configure('found', background='#FFFFCC')
+        state = {'index': None, 'generation': 0, 'cancel': None, 'matches': [], 'match_set': set(),
+                 'positions': None, 'positions_order': None, 'current': -1, 'text': "", 'column': None,
+                 'after': None}
+        
+        def search_visible(search_text, search_col):
+            position = headers.index(search_col) if search_col in headers else None
+            
+            def matches(values):
+                candidates = values if position is None else (values[position],)
+                return any(search_text in ("" if value is None else str(value)).lower() for value in candidates)
+            
+            grid.row_tags = lambda index, values: ('found',) if matches(values) else ()
+            grid.refresh()
+            found = [index for index, values in grid.shown_rows() if values is not None and matches(values)]
+            status_var.set(f"Found: {len(found)} visible rows" if found else "Not found")
+        
+        def search():
+            if state['after']:
+                grid.after_cancel(state['after'])
+                state['after'] = None
+            search_text = search_var.get().strip().lower()
+            search_col = search_column_var.get()
+            if rows is not None and state['matches'] and (search_text, search_col) == (state['text'], state['column']):
+                # Teks tidak berubah (Enter/Search lagi): lanjut ke baris cocok berikutnya
+                step(1)
+                return
+            if state['cancel']:
+                state['cancel'].set()
+            if not search_text:
+                clear_highlight()
+                return
+            if rows is None:
+                search_visible(search_text, search_col)
+                return
             
-            if search_column == "All Columns":
-                for header in headers:
-                    value = str(row.get(header, "")).lower()
-                    if search_text in value:
-                        found = True
-                        break
+            # Index dibangun sekali per result set, lalu dipakai semua pencarian berikutnya
+            if state['index'] is None:
+                state['index'] = SearchIndex(headers, rows)
+                status_var.set("Indexing...")
+            else:
+                status_var.set("Searching...")
+            state['generation'] += 1
+            generation = state['generation']
+            cancel = state['cancel'] = threading.Event()
+            index = state['index']
+            
+            def run():
+                try:
+                    matches = index.search(search_text, search_col, cancel)
+                except SearchCancelled:
+                    return
+                except Exception as e:
+                    self.ui_queue.post(status_var.set, f"Search error: {e}")
+                    return
+                self.ui_queue.post(show_matches, generation, search_text, search_col, matches)
+            
+            threading.Thread(target=run, daemon=True).start()
+        
+        def show_matches(generation, search_text, search_col, matches):
+            if generation != state['generation'] or not grid.winfo_exists():
+                return  # Sudah ada pencarian yang lebih baru
+            state.update(matches=matches, match_set=set(matches), positions=None, text=search_text,
+                         column=search_col, current=-1)
+            grid.row_tags = lambda index, values: ('found',) if grid.source.row_id(index) in state['match_set'] else ()
+            grid.refresh()
+            if matches:
+                # Lompat ke baris cocok pertama mulai dari posisi scroll saat ini
+                step(1, start=grid.first)
             else:
-                value = str(row.get(search_column, "")).lower()
-                if search_text in value:
-                    found = True
+                status_var.set("Not found")
+        
+        def match_positions():
+            # Hasil pencarian berupa nomor baris asli; setelah sort, posisi tampilnya dihitung ulang
+            source = grid.source
+            if state['positions'] is None or state['positions_order'] is not source.order:
+                state['positions'] = sorted(source.position(row_id) for row_id in state['matches'])
+                state['positions_order'] = source.order
+            return state['positions']
+        
+        def step(delta, start=None):
+            if not state['matches']:
+                return
+            positions = match_positions()
+            if start is not None:
+                current = bisect.bisect_left(positions, start) % len(positions)
+            else:
+                current = (state['current'] + delta) % len(positions)
+            state['current'] = current
+            grid.see(positions[current])
+            status_var.set(f"Match {current + 1}/{len(positions)}")
+        
+        def clear_highlight():
+            state.update(matches=[], match_set=set(), positions=None, current=-1)
+            status_var.set("")
+            grid.row_tags = None
+            grid.refresh()
+        
+        def clear():
+            search_var.set("")
+            search()
+        
+        def on_type(*args):
+            # Search-as-you-type: tunggu jeda ketik singkat sebelum mencari
+            if state['after']:
+                grid.after_cancel(state['after'])
+            state['after'] = grid.after(200, search)
+        
+        search_var.trace_add('write', on_type)
+        if rows is not None:
+            ttk.Button(search_frame, text="◀", width=2, command=lambda: step(-1)).pack(side=tk.LEFT, padx=(5, 0))
+            ttk.Button(search_frame, text="▶", width=2, command=lambda: step(1)).pack(side=tk.LEFT)
+            ttk.Button(search_frame, text="List", width=5,
+                       command=lambda: self.show_search_matches(grid, rows, state['index'], state['matches'],
+                                                                state['text'], state['column'])
+                       ).pack(side=tk.LEFT, padx=5)
+        return search, clear
+    
+    def _bind_grid_sort(self, grid, headers, rows, status_var):
+        """
+        Klik judul kolom untuk sort: naik, turun, lalu kembali ke urutan asli.
+        Permutasi dihitung SortIndex (tipe kolom ditebak dari nilainya) di
+        background thread dan di-cache per kolom dan arah; grid menampilkan
+        baris melalui permutasi tanpa menyalin baris.
+        """
+        state = {'index': None, 'column': None, 'desc': False, 'generation': 0, 'cancel': None}
+        
+        def show_headings(pending=None):
+            for column in headers:
+                if column == pending:
+                    text = column + " …"
+                elif column == state['column']:
+                    text = column + (" ▼" if state['desc'] else " ▲")
+                else:
+                    text = column
+                grid.set_heading(column, text)
+        
+        def apply(generation, column, descending, order):
+            if generation != state['generation'] or not grid.winfo_exists():
+                return  # Sudah ada permintaan sort yang lebih baru
+            state.update(column=column, desc=descending)
+            grid.source.set_order(order)
+            grid.first = 0
+            grid.selected = None
+            grid.refresh()
+            show_headings()
+            if column:
+                status_var.set(f"Sorted by {column} ({state['index'].kinds.get(column, 'text')})")
+            else:
+                status_var.set("")
+        
+        def sort_by(column):
+            if column != state['column']:
+                descending = False
+            elif not state['desc']:
+                descending = True
+            else:
+                column, descending = None, False
+            if state['cancel']:
+                state['cancel'].set()
+            state['generation'] += 1
+            generation = state['generation']
+            if column is None:
+                apply(generation, None, False, None)
+                return
+            
+            if state['index'] is None:
+                state['index'] = SortIndex(headers, rows)
+            index = state['index']
+            order = index.cached(column, descending)
+            if order is not None:
+                apply(generation, column, descending, order)
+                return
+            
+            cancel = state['cancel'] = threading.Event()
+            show_headings(pending=column)
+            status_var.set(f"Sorting by {column}...")
+            
+            def run():
+                try:
+                    order = index.order(column, descending, cancel)
+                except SortCancelled:
+                    return
+                except Exception as e:
+                    self.ui_queue.post(status_var.set, f"Sort error: {e}")
+                    return
+                self.ui_queue.post(apply, generation, column, descending, order)
             
-            if found:
-                found_indices.append(i)
+            threading.Thread(target=run, daemon=True).start()
         
-        if not found_indices:
-            messagebox.showinfo("Search Results", "No matches found in any page.")
+        grid.on_heading = sort_by
+    
+    def show_search_matches(self, grid, rows, index, matches, search_text, search_column, limit=1000):
+        """Tampilkan daftar baris yang cocok; memilih baris melompat ke baris tersebut di grid"""
+        if not matches:
+            messagebox.showinfo("Search Results", "No matches found.")
             return
         
         # Tampilkan dialog hasil pencarian
@@ -1110,16 +1912,15 @@ class ServerApp:
         result_dialog.title(f"Search Results: '{search_text}'")
         result_dialog.geometry("600x400")
         
-        ttk.Label(result_dialog, text=f"Found {len(found_indices)} matches across all pages:").pack(padx=10, pady=5)
+        shown = f" (showing first {limit})" if len(matches) > limit else ""
+        ttk.Label(result_dialog, text=f"Found {len(matches)} matches{shown}:").pack(padx=10, pady=5)
         
         # Treeview untuk hasil
-        result_tree = ttk.Treeview(result_dialog, columns=("Page", "Row", "Content"), show="headings")
-        result_tree.heading("Page", text="Page")
+        result_tree = ttk.Treeview(result_dialog, columns=("Row", "Content"), show="headings")
         result_tree.heading("Row", text="Row")
         result_tree.heading("Content", text="Content")
-        result_tree.column("Page", width=50)
-        result_tree.column("Row", width=50)
-        result_tree.column("Content", width=450)
+        result_tree.column("Row", width=70)
+        result_tree.column("Content", width=480)
         
         # Scrollbar
         scrollbar = ttk.Scrollbar(result_dialog, orient=tk.VERTICAL, command=result_tree.yview)
@@ -1127,44 +1928,23 @@ class ServerApp:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         result_tree.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
         
-        # Tambahkan hasil
-        page_size = 5000
-        for idx in found_indices:
-            page_num = idx // page_size + 1
-            row_num = idx % page_size + 1
-            
-            # Ambil nilai yang cocok untuk ditampilkan
+        # Tambahkan hasil; kolom yang cocok diambil dari index, bukan dari str().lower() per sel
+        for idx in matches[:limit]:
             row_data = rows[idx]
-            if search_column == "All Columns":
-                # Cari kolom mana yang mengandung teks pencarian
-                matching_content = []
-                for header in headers:
-                    value = str(row_data.get(header, ""))
-                    if search_text in value.lower():
-                        matching_content.append(f"{header}: {value}")
-                content = " | ".join(matching_content)
-            else:
-                content = str(row_data.get(search_column, ""))
-            
-            result_tree.insert("", tk.END, values=(page_num, row_num, content))
+            columns = [search_column] if search_column in index.headers else index.match_columns(idx, search_text)
+            content = " | ".join(f"{header}: {row_data.get(header, '')}" for header in columns)
+            result_tree.insert("", tk.END, iid=str(idx), values=(idx + 1, content))
         
-        # Tombol untuk menuju ke halaman yang berisi hasil
+        # Scroll grid ke baris yang dipilih
         def go_to_result():
             selected = result_tree.selection()
             if not selected:
                 return
-            
-            values = result_tree.item(selected[0])["values"]
-            page_num = int(values[0])
-            
-            # Set halaman di treeview utama dan highlight baris yang dipilih
-            # Ini perlu diimplementasikan dengan callback ke fungsi pergantian halaman
-            
             result_dialog.destroy()
-            
-            # Tampilkan pesan
-            messagebox.showinfo("Navigation", f"Please go to page {page_num} to see this result.")
+            if grid.winfo_exists():
+                grid.see(grid.source.position(int(selected[0])))
         
+        result_tree.bind("<Double-1>", lambda event: go_to_result())
         ttk.Button(result_dialog, text="Go to Result", command=go_to_result).pack(side=tk.LEFT, padx=10, pady=10)
         ttk.Button(result_dialog, text="Close", command=result_dialog.destroy).pack(side=tk.RIGHT, padx=10, pady=10)
     
@@ -1176,12 +1956,18 @@ class ServerApp:
             messagebox.showwarning("Query Empty", "Please enter a SQL query")
             return
         
+        # Query dianalisis sekali (di-cache per teks query)
+        analysis = analyze(query)
+        
         # Periksa apakah query terlalu kompleks
-        estimated_complexity = self.estimate_query_complexity(query)
-        if estimated_complexity > 5:  # Skala 1-10 untuk kompleksitas
+        cost = estimate_cost(analysis, self.table_rows.get)
+        if cost.score > 5:  # Skala 1-10 untuk kompleksitas
             # Tampilkan dialog konfirmasi dengan peringatan lebih jelas
+            size_note = (f"Tabel {cost.table} berisi sekitar {cost.rows:,} baris.\n\n"
+                         if cost.table else "")
             if not messagebox.askyesno("Complex Query Warning", 
                              "Query ini terdeteksi kompleks dan mungkin mengembalikan dataset besar.\n\n"
+                             + size_note +
                              "Periksa query Anda untuk memastikan:\n"
                              "1. Tambahkan klausa WHERE untuk membatasi hasil\n"
                              "2. Hanya pilih kolom yang benar-benar diperlukan\n"
@@ -1190,71 +1976,426 @@ class ServerApp:
                              icon="warning"):
                 return
         
-        # Tambahkan batasan FIRST/ROWS jika belum ada
-        if not self.has_row_limit(query) and query.strip().upper().startswith("SELECT"):
-            result = messagebox.askyesnocancel(
-                "Row Limit", 
-                f"Query tidak memiliki batasan jumlah baris. Tambahkan batasan {self.max_result_rows} baris?\n\n"
-                f"Ya = Tambahkan batasan\nTidak = Kirim tanpa batasan (risiko koneksi terputus)\nBatal = Batalkan query",
-                icon="warning"
-            )
-            
-            if result is None:  # Cancel was clicked
-                return
-            elif result:  # Yes was clicked
-                query = self.add_row_limit(query, self.max_result_rows)
-                self.query_text.delete("1.0", tk.END)
-                self.query_text.insert("1.0", query)
+        # SELECT tanpa FIRST/ROWS tidak perlu dibatasi lagi: hasilnya dibaca per halaman (remote cursor)
         
         target = self.target_var.get()
+        try:
+            target_id = self.client_index.resolve_target(target)
+        except KeyError:
+            messagebox.showwarning("Client Not Available", f"Client {target} tidak ditemukan")
+            return
         
-        # Tampilkan dialog konfirmasi untuk query yang mungkin berbahaya
-        if self.is_potentially_dangerous(query):
+        # Tabel/kolom yang tidak ada di schema client target (dari metadata yang di-cache)
+        target_ids = [target_id] if target_id is not None else [c.client_id for c in self.registry.connected()]
+        issues = self.schema_catalog.validate(analysis, target_ids)
+        if issues and not self.confirm_schema_issues(issues, len(target_ids)):
+            return
+        
+        # Tampilkan dialog konfirmasi untuk query yang mungkin berbahaya
+        if analysis.modifies:
             if not messagebox.askyesno("Warning", 
                                      "Query ini berpotensi mengubah data (INSERT/UPDATE/DELETE).\n\nApakah Anda yakin ingin melanjutkan?",
                                      icon="warning"):
                 return
         
-        # Tambahkan ke history
-        self.query_history.append({
-            'query': query,
-            'target': target,
-            'timestamp': datetime.datetime.now().isoformat()
-        })
+        combine_aggregates = self.combine_aggregates_var.get()
         
-        # Tampilkan indikator loading
-        self.show_loading_indicator("Mengirim dan menunggu hasil query...")
+        def start():
+            # Tampilkan indikator loading
+            self.show_loading_indicator("Mengirim dan menunggu hasil query...")
+            
+            # Kirim ke client yang dipilih dalam thread terpisah untuk mencegah UI freeze
+            threading.Thread(target=self._send_query_thread,
+                             args=(query, target_id, combine_aggregates, target), daemon=True).start()
         
-        # Kirim ke client yang dipilih dalam thread terpisah untuk mencegah UI freeze
-        threading.Thread(target=self._send_query_thread, args=(query, target), daemon=True).start()
+        # Pre-flight plan di client target sebelum query dijalankan
+        mode = self.plan_check_var.get()
+        if mode != CHECK_OFF and analysis.is_select:
+            self.show_loading_indicator("Memeriksa plan query...")
+            threading.Thread(target=self._plan_check_thread,
+                             args=(query, target_id, mode, start), daemon=True).start()
+            return
+        start()
+    
+    def confirm_schema_issues(self, issues, target_count, max_lines=15):
+        """Tampilkan tabel/kolom yang tidak dikenal; True jika query tetap dikirim"""
+        labels = {ISSUE_TABLE: "Tabel", ISSUE_COLUMN: "Kolom", ISSUE_ALIAS: "Alias"}
+        lines = []
+        for issue in issues[:max_lines]:
+            if target_count > 1 and len(issue.client_ids) == target_count:
+                where = "semua client target"
+            else:
+                names = []
+                for client_id in issue.client_ids[:5]:
+                    client = self.registry.get(client_id)
+                    names.append(client.display_name if client else client_id)
+                where = ", ".join(names) + (f" dan {len(issue.client_ids) - 5} lainnya"
+                                            if len(issue.client_ids) > 5 else "")
+            hint = f" (mungkin {issue.suggestion})" if issue.suggestion else ""
+            lines.append(f"- {labels[issue.kind]} {issue.name} tidak ditemukan di {where}{hint}")
+        if len(issues) > max_lines:
+            lines.append(f"- ... dan {len(issues) - max_lines} lainnya")
+        self.log("Validasi schema: " + "; ".join(line[2:] for line in lines))
+        return messagebox.askyesno("Schema Warning",
+                                   "Query merujuk nama yang tidak ada di schema client:\n\n"
+                                   + "\n".join(lines) + "\n\nTetap kirim query?",
+                                   icon="warning")
     
-    def _send_query_thread(self, query, target):
-        """Mengirim query dalam thread terpisah untuk mencegah UI freeze"""
+    def request_plan(self, client, query):
+        """Minta plan query dari client (tanpa eksekusi). Return waiter atau None jika gagal dikirim"""
+        query_data = {'query': query, 'description': 'get_plan', 'plan_only': True}
+        request_id = self.track_request(client, query_data)
+        waiter = {'event': threading.Event(), 'plans': None, 'error': None}
+        with self.lock:
+            self.plan_waiters[request_id] = waiter
+        message = NetworkMessage(NetworkMessage.TYPE_QUERY, query_data, client.client_id)
         try:
-            if target == "All Clients":
-                # Kirim ke semua client
+            sent = client.send(message, timeout=self.run_send_timeout)
+        except Exception as e:
+            self.log(f"Error saat meminta plan dari {client.display_name}: {e}")
+            sent = False
+        if not sent:
+            with self.lock:
+                self.plan_waiters.pop(request_id, None)
+            return None
+        waiter['request_id'] = request_id
+        return waiter
+    
+    def resolve_plan(self, data):
+        """Jawaban pre-flight plan dari client (hasil atau error)"""
+        with self.lock:
+            waiter = self.plan_waiters.pop(data.get('request_id'), None)
+        if waiter is None:
+            return  # Sudah timeout
+        waiter['error'] = data.get('error')
+        waiter['plans'] = plan_rows(data.get('result'))
+        waiter['event'].set()
+    
+    def check_query_plans(self, query, clients):
+        """
+        Plan query di setiap client: dari cache jika schema dan query sama, selain itu
+        pre-flight ke client secara paralel.
+
+        :return: List (client, plans, error)
+        """
+        checks, waiting = [], []
+        for client in clients:
+            plans = self.plan_cache.get(client.schema_hash, query)
+            if plans is not None:
+                checks.append((client, plans, None))
+                continue
+            waiter = self.request_plan(client, query)
+            if waiter is None:
+                checks.append((client, (), "permintaan plan gagal dikirim"))
+            else:
+                waiting.append((client, waiter))
+        
+        deadline = time.time() + self.plan_check_timeout
+        for client, waiter in waiting:
+            if not waiter['event'].wait(max(0.0, deadline - time.time())):
                 with self.lock:
-                    for client_id, client in self.clients.items():
-                        if client.is_connected:
-                            self.send_query_to_client(client, query)
+                    self.plan_waiters.pop(waiter['request_id'], None)
+                checks.append((client, (), "plan tidak diterima (timeout)"))
+                continue
+            if waiter['error']:
+                checks.append((client, (), waiter['error']))
+                continue
+            self.plan_cache.put(client.schema_hash, query, waiter['plans'])
+            checks.append((client, waiter['plans'], None))
+        
+        self.log(f"Plan cache: {len(self.plan_cache)} entri, {self.plan_cache.hits} hit, {self.plan_cache.misses} miss")
+        return checks
+    
+    def _plan_check_thread(self, query, target_id, mode, proceed):
+        """Pre-flight plan di thread terpisah, keputusan kirim/tahan di UI thread"""
+        if target_id is None:
+            clients = self.registry.connected()
+        else:
+            client = self.registry.get(target_id)
+            clients = [client] if client and client.is_connected else []
+        try:
+            checks = self.check_query_plans(query, clients)
+        except Exception as e:
+            self.log(f"Pemeriksaan plan gagal: {e}")
+            checks = []
+        self.ui_queue.post(self._confirm_query_plan, query, checks, mode, proceed)
+    
+    def _confirm_query_plan(self, query, checks, mode, proceed):
+        """Peringatkan atau tahan query yang membaca tabel besar tanpa index"""
+        self.hide_loading_indicator()
+        analysis = analyze(query)
+        heavy, failed = [], []
+        for client, plans, error in checks:
+            if error:
+                failed.append(f"- {client.display_name}: {error}")
+                continue
+            self.log(f"Plan {client.display_name}: {' | '.join(plans) or '-'}")
+            scans = natural_scans(plans, analysis, self.table_rows.get)
+            for scan in large_scans(scans, self.plan_scan_threshold, analysis.has_row_limit):
+                heavy.append(f"- {client.display_name}: {scan.table} NATURAL, sekitar {scan.rows:,} baris")
+        
+        if heavy and mode == CHECK_BLOCK:
+            self.log(f"Query ditahan: full scan pada tabel besar di {len(heavy)} stream")
+            messagebox.showerror("Query Plan",
+                                 "Query ditahan karena membaca tabel besar tanpa index (NATURAL):\n\n"
+                                 + "\n".join(heavy[:15]) +
+                                 "\n\nTambahkan filter pada kolom ber-index atau batasi baris dengan FIRST/ROWS.")
+            return
+        if heavy or failed:
+            message = ""
+            if heavy:
+                message += "Query membaca tabel besar tanpa index (NATURAL):\n\n" + "\n".join(heavy[:15]) + "\n\n"
+            if failed:
+                message += "Plan tidak bisa diambil dari:\n" + "\n".join(failed[:10]) + "\n\n"
+            if not messagebox.askyesno("Query Plan Warning", message + "Tetap kirim query?", icon="warning"):
+                return
+        proceed()
+    
+    def _send_query_thread(self, query, target_id, combine_aggregates=False, target_label=""):
+        """
+        Mengirim query dalam thread terpisah untuk mencegah UI freeze
+
+        :param target_id: client_id tujuan, None untuk semua client
+        :param target_label: Label target untuk history
+        """
+        try:
+            # Snapshot daftar client (tanpa lock); pengiriman tidak pernah memegang lock registry
+            if target_id is None:
+                clients = self.registry.connected()
+                missing = None
             else:
-                # Extract client_id dari target
-                client_id = target.split("(")[-1].split(")")[0]
-                
+                client = self.registry.get(target_id)
+                clients = [client] if client and client.is_connected else []
+                missing = None if clients else (client.display_name if client else target_id)
+            
+            if missing is not None:
+                self.record_history(query, target_label, error=f"Client {missing} tidak ditemukan atau tidak terhubung")
+                self.ui_queue.post(lambda: messagebox.showwarning("Client Not Available",
+                                                              f"Client {missing} tidak ditemukan atau tidak terhubung"))
+                return
+            if not clients:
+                self.record_history(query, target_label, error="Tidak ada client yang terhubung")
+                self.log("Tidak ada client yang terhubung")
+                return
+            
+            # Agregat lintas client: client hanya menghitung agregat parsial
+            plan = plan_aggregate(query) if combine_aggregates and len(clients) > 1 else None
+            # Kirim ke semua target secara paralel, masing-masing dengan deadline sendiri
+            run = self.create_query_run(query, clients, keep_results=plan is not None)
+            self.record_history(query, target_label, run=run)
+            client_query = query
+            if len(clients) > 1:
+                merged = MergedResult(query, store=self.result_store)
                 with self.lock:
-                    if client_id in self.clients:
-                        client = self.clients[client_id]
-                        if client.is_connected:
-                            self.send_query_to_client(client, query)
-                        else:
-                            self.root.after(0, lambda: messagebox.showwarning("Client Disconnected", 
-                                                                          f"Client {client.display_name} tidak terhubung"))
-                    else:
-                        self.root.after(0, lambda: messagebox.showwarning("Client Not Found", 
-                                                                      f"Client {client_id} tidak ditemukan"))
+                    self.merged_results[run.run_id] = merged
+                    if plan is not None:
+                        self.aggregate_plans[run.run_id] = plan
+                if plan is not None:
+                    client_query = plan.client_query
+                    self.log(f"Run {run.run_id}: agregat parsial dikirim ke client: {client_query}")
+                self.ui_queue.post(self._create_merged_tab, run, merged)
+            by_id = {client.client_id: client for client in clients}
+            self.log(f"Run {run.run_id}: query dikirim ke {len(clients)} client")
+            dispatch(run, lambda client_id, timeout: self.send_query_to_client(
+                by_id[client_id], client_query, run.run_id, timeout, use_cursor=plan is None),
+                self.fanout_executor)
         finally:
             # Sembunyikan indikator loading
-            self.root.after(0, self.hide_loading_indicator)
+            self.ui_queue.post(self.hide_loading_indicator)
+    
+    def run_scheduler(self):
+        """Thread untuk menjalankan job terjadwal dan pengiriman yang ditunda"""
+        while self.running:
+            try:
+                now = time.time()
+                for job in self.scheduler.due(now):
+                    self.start_scheduled_job(job)
+                
+                # Pengiriman yang sudah tiba waktunya diteruskan ke executor fan-out
+                for callback in self.dispatch_queue.pop_due(now):
+                    self.fanout_executor.submit(callback)
+                
+                self.metric_store.maintain(now)
+            except Exception as e:
+                self.log(f"Error pada scheduler: {e}")
+            
+            time.sleep(self.scheduler_tick)
+    
+    def start_scheduled_job(self, job):
+        """Jalankan satu job terjadwal ke client target yang terhubung"""
+        # Run sebelumnya yang belum selesai tidak ditumpuk dengan run baru
+        with self.lock:
+            previous = self.query_runs.get(job.run_id) if job.run_id else None
+        if previous is not None and not previous.finished:
+            self.scheduler.mark_skipped(job)
+            self.log(f"Job {job.name}: jadwal dilewati, run {previous.run_id} belum selesai ({previous.progress_label()})")
+            return None
+        
+        snapshot = self.clients
+        clients = [client for client in snapshot.values()
+                   if client.is_connected and job.matches(client.client_id, client.display_name)]
+        connected = {client.client_id for client in clients} | {client.display_name for client in clients}
+        missed = [target for target in self.scheduler.known_targets(job, snapshot) if target not in connected]
+        
+        if not clients:
+            self.scheduler.mark_started(job, None, [], missed)
+            self.log(f"Job {job.name}: tidak ada client target yang terhubung ({len(missed)} menunggu catch-up)")
+            return None
+        
+        run = self.start_job_run(job, clients)
+        self.scheduler.mark_started(job, run.run_id, [client.client_id for client in clients], missed)
+        self.log(f"Job {job.name}: run {run.run_id} ke {len(clients)} client, disebar dalam {job.stagger:.0f} detik"
+                 + (f", {len(missed)} client offline" if missed else ""))
+        return run
+    
+    def start_job_run(self, job, clients):
+        """Buat run dan tab hasil untuk job, lalu jadwalkan pengiriman per client"""
+        plan = plan_aggregate(job.query) if job.combine_aggregates else None
+        run = self.create_query_run(job.query, clients, keep_results=plan is not None)
+        merged = MergedResult(job.query, store=self.result_store)
+        with self.lock:
+            self.merged_results[run.run_id] = merged
+            if plan is not None:
+                self.aggregate_plans[run.run_id] = plan
+            self.run_jobs[run.run_id] = job.name
+        self.ui_queue.post(self._show_job_tab, job.name, run, merged)
+        self.queue_job_sends(job, run, clients)
+        return run
+    
+    def queue_job_sends(self, job, run, clients, stagger=True):
+        """Jadwalkan pengiriman query job ke tiap client dengan offset stagger"""
+        with self.lock:
+            plan = self.aggregate_plans.get(run.run_id)
+        client_query = plan.client_query if plan is not None else job.query
+        by_id = {client.client_id: client for client in clients}
+        
+        delta = {'key': f"job:{job.name}", 'key_columns': job.key_columns} if job.delta else None
+        
+        def send(client_id, timeout):
+            return self.send_query_to_client(by_id[client_id], client_query, run.run_id, timeout,
+                                             use_cursor=plan is None, delta=delta)
+        
+        for client in clients:
+            delay = stagger_offset(job.name, client.client_id, job.stagger) if stagger else 0
+            self.dispatch_queue.push(delay, functools.partial(send_to_client, run, send, client.client_id))
+    
+    def catch_up_jobs(self, client):
+        """Kirim job yang terlewat ke client yang baru terhubung kembali"""
+        for job in self.scheduler.catch_up(client.client_id, client.display_name):
+            with self.lock:
+                run = self.query_runs.get(job.run_id) if job.run_id else None
+                merged = self.merged_results.get(job.run_id) if run is not None else None
+            
+            if merged is not None and run.add_target(client.client_id, client.display_name):
+                # Tab hasil run terakhir masih ada: hasil catch-up ditambahkan ke sana
+                self.queue_job_sends(job, run, [client], stagger=False)
+                self.log(f"Job {job.name}: catch-up {client.display_name} ditambahkan ke run {run.run_id}")
+            else:
+                run = self.start_job_run(job, [client])
+                self.scheduler.mark_started(job, run.run_id, [client.client_id], [])
+                self.log(f"Job {job.name}: catch-up {client.display_name} sebagai run {run.run_id}")
+    
+    def register_standing_queries(self, client, jobs=None):
+        """Daftarkan job "on change" sebagai standing query di client"""
+        if jobs is None:
+            jobs = self.scheduler.standing_jobs(client.client_id, client.display_name)
+        for job in jobs:
+            key = f"standing:{job.name}"
+            message = NetworkMessage(NetworkMessage.TYPE_STANDING_QUERY, {
+                'action': 'register',
+                'query_id': job.name,
+                'query': job.query,
+                'probe': job.probe,
+                'min_interval': job.min_interval,
+                'key_columns': job.key_columns,
+                # Client mengirim delta terhadap salinan server (None: hasil penuh)
+                'base': self.delta_cache.base_hash(client.client_id, key) if job.delta else None
+            }, client.client_id)
+            if client.send(message):
+                self.log(f"Standing query {job.name} didaftarkan di {client.display_name}")
+            else:
+                self.log(f"Gagal mendaftarkan standing query {job.name} di {client.display_name}")
+    
+    def sync_standing_job(self, job, remove=False, previous=None):
+        """
+        Daftarkan ulang atau hapus standing query di semua client target yang terhubung
+
+        :param previous: Definisi job sebelum diedit (target lama juga dihapus jika tidak lagi cocok)
+        """
+        for client in self.registry.connected():
+            matches = job.matches(client.client_id, client.display_name)
+            register = matches and not remove and job.enabled and job.standing
+            was_registered = matches or (previous is not None and previous.standing
+                                         and previous.matches(client.client_id, client.display_name))
+            if register:
+                # Pendaftaran dengan nama yang sama menggantikan definisi lama di client
+                self.fanout_executor.submit(self.register_standing_queries, client, [job])
+            elif was_registered:
+                message = NetworkMessage(NetworkMessage.TYPE_STANDING_QUERY,
+                                         {'action': 'unregister', 'query_id': job.name}, client.client_id)
+                self.fanout_executor.submit(client.send, message)
+    
+    def handle_standing_result(self, client, msg_type, data):
+        """Tampilkan hasil standing query yang didorong client"""
+        job = self.scheduler.get(data.get('standing_query'))
+        if job is None or not job.standing:
+            self.log(f"Hasil standing query {data.get('standing_query')} dari {client.display_name} tidak dikenal")
+            return
+        
+        if msg_type == NetworkMessage.TYPE_ERROR:
+            self.log(f"Standing query {job.name}: error dari {client.display_name}: {data.get('error')}")
+            result, sent_rows = [], 0
+        elif data.get('delta'):
+            try:
+                result, sent_rows = self.delta_cache.receive(client.client_id, data['delta'], data.get('result', []))
+            except DeltaError as e:
+                # Salinan server tidak cocok: daftarkan ulang tanpa base agar client mengirim hasil penuh
+                self.delta_cache.discard(client.client_id, data['delta'].get('key'))
+                self.log(f"Delta standing query {job.name} dari {client.display_name} ditolak ({e})")
+                self.fanout_executor.submit(self.register_standing_queries, client, [job])
+                return
+        else:
+            result = data.get('result', [])
+            sent_rows = sum(len(result_set.get('rows', [])) for result_set in result)
+        
+        run, merged = self.standing_view(job)
+        run.add_target(client.client_id, client.display_name)
+        if msg_type == NetworkMessage.TYPE_ERROR:
+            run.add_error(client.client_id, data.get('error'))
+        else:
+            # Baris hanya disimpan di hasil gabungan (dan salinan delta); run mencatat jumlah baris
+            rows = 0
+            for result_set in result[:1]:
+                rows = len(result_set.get('rows', []))
+                merged.replace_client(client.display_name, result_set.get('headers', []), result_set.get('rows', []))
+            run.add_result(client.client_id, rows=rows)
+            self.record_metrics(client, job.name, result)
+            self.log(f"Standing query {job.name}: data {client.display_name} berubah ({sent_rows} baris dikirim)")
+        self.schedule_merged_refresh(run.run_id)
+    
+    def standing_view(self, job):
+        """Run dan hasil gabungan tab standing query; dibuat ulang jika tab sudah ditutup"""
+        with self.lock:
+            view = self.standing_views.get(job.name)
+            if view is not None and self.merged_results.get(view[0].run_id) is view[1]:
+                return view
+            run = QueryRun(job.query, [], send_timeout=self.run_send_timeout,
+                           response_timeout=self.run_response_timeout,
+                           on_update=self.post_run_status)
+            merged = MergedResult(job.query, store=self.result_store)
+            self.merged_results[run.run_id] = merged
+            view = self.standing_views[job.name] = (run, merged)
+        self.ui_queue.post(self._show_job_tab, job.name, run, merged, f"Standing {job.name}")
+        return view
+    
+    def _show_job_tab(self, job_name, run, merged, title=None):
+        """Ganti tab hasil job dengan run terbaru (UI thread)"""
+        old_tab = self.job_tabs.pop(job_name, None)
+        if old_tab is not None and str(old_tab) in self.results_notebook.tabs():
+            self.close_tab_cursor(str(old_tab))
+            self.results_notebook.forget(old_tab)
+        self.job_tabs[job_name] = self._create_merged_tab(run, merged, title=title or f"Job {job_name} - Run {run.run_id}",
+                                                          select=False)
     
     def show_loading_indicator(self, message="Loading..."):
         """Tampilkan indikator loading"""
@@ -1309,81 +2450,51 @@ class ServerApp:
         except Exception as e:
             print(f"Error hiding loading indicator: {e}")
     
-    def estimate_query_complexity(self, query):
-        """Estimasi kompleksitas query untuk mendeteksi query yang mungkin berat"""
-        query = query.upper()
-        complexity = 0
-        
-        # 1. Jumlah tabel yang terlibat (joins)
-        complexity += query.count(" JOIN ") * 2
+    def send_query_to_client(self, client, query, run_id=None, timeout=None, use_cursor=True, delta=None):
+        """
+        Kirim query ke client tertentu
+
+        :param delta: Dict {'key', 'key_columns'} untuk transfer delta (query yang diulang)
+        :return: request_id query yang terkirim
+        :raises ConnectionError: Jika query gagal dikirim
+        """
+        query_data = {
+            'query': query,
+            'description': 'user_query'
+        }
+        if delta:
+            # Client hanya mengirim perubahan terhadap salinan yang dimiliki server
+            query_data['delta'] = dict(delta, base=self.delta_cache.base_hash(client.client_id, delta['key']))
+        
+        # SELECT tanpa batasan baris dibaca per halaman melalui remote cursor
+        remote_cursor = None
+        analysis = analyze(query)
+        if use_cursor and not delta and analysis.is_select and not analysis.has_row_limit:
+            remote_cursor = self.open_remote_cursor(client, query)
+            query_data['cursor'] = {
+                'cursor_id': remote_cursor.cursor_id,
+                'page_size': remote_cursor.page_size
+            }
         
-        # 2. Kompleksitas WHERE
-        if " WHERE " in query:
-            where_clause = query.split(" WHERE ")[1].split(" ORDER BY ")[0].split(" GROUP BY ")[0]
-            complexity += where_clause.count(" AND ") + where_clause.count(" OR ")
-            
-            # Jika tidak ada kondisi pembatas yang cukup ketat
-            if " = " not in where_clause and " < " not in where_clause and " > " not in where_clause:
-                complexity += 3
-        else:
-            # Query tanpa WHERE lebih berbahaya
-            complexity += 5
+        request_id = self.track_request(client, query_data, run_id)
+        query_message = NetworkMessage(NetworkMessage.TYPE_QUERY, query_data, client.client_id)
         
-        # 3. Banyaknya kolom yang dipilih
-        if "SELECT * " in query:
-            # Memilih semua kolom
-            complexity += 3
-        else:
-            # Hitung jumlah kolom
-            select_clause = query.split("SELECT ")[1].split(" FROM ")[0]
-            complexity += min(select_clause.count(",") / 5, 2)  # Max 2 poin untuk banyak kolom
+        # Deadline pengiriman per client agar socket yang macet tidak menahan pengiriman lain
+        sent = client.send(query_message, timeout or self.default_socket_timeout)
         
-        # 4. Agregasi dan grouping
-        if " GROUP BY " in query:
-            complexity += 2
-        
-        # 5. Subquery dan kompleksitas lainnya
-        complexity += query.count("(SELECT") * 2
+        if not sent:
+            with client.lock:
+                client.pending_requests.pop(request_id, None)
+            if remote_cursor:
+                # Client belum tahu cursor ini, cukup dibuang di server
+                with self.lock:
+                    self.remote_cursors.pop(remote_cursor.cursor_id, None)
+                remote_cursor.close()
+            self.log(f"Error saat mengirim query ke {client.display_name}")
+            raise ConnectionError(f"Gagal mengirim query ke {client.display_name}")
         
-        # Normalisasi ke skala 1-10
-        return min(max(complexity, 1), 10)
-    
-    def send_query_to_client(self, client, query):
-        """Kirim query ke client tertentu"""
-        try:
-            # Mendeteksi apakah query adalah SELECT tanpa batasan baris
-            if not self.has_row_limit(query) and query.strip().upper().startswith("SELECT"):
-                # Auto-batasi query dengan FIRST untuk menghindari dataset terlalu besar
-                original_query = query
-                query = self.add_row_limit(query, self.max_result_rows)
-                self.log(f"Query otomatis dibatasi menjadi {self.max_result_rows} baris")
-                
-                # Simpan versi asli dan batasan untuk referensi
-                query_message = NetworkMessage(NetworkMessage.TYPE_QUERY, {
-                    'query': query,
-                    'description': 'user_query',
-                    'original_query': original_query,
-                    'row_limit': self.max_result_rows
-                }, client.client_id)
-            else:
-                query_message = NetworkMessage(NetworkMessage.TYPE_QUERY, {
-                    'query': query,
-                    'description': 'user_query'
-                }, client.client_id)
-            
-            # Tingkatkan timeout socket hanya untuk pengiriman query yang mungkin besar
-            previous_timeout = client.socket.gettimeout()
-            client.socket.settimeout(self.default_socket_timeout)
-            
-            try:
-                send_message(client.socket, query_message)
-                self.log(f"Query dikirim ke {client.display_name}")
-            finally:
-                # Kembalikan timeout ke nilai sebelumnya
-                client.socket.settimeout(previous_timeout)
-        except Exception as e:
-            self.log(f"Error saat mengirim query ke {client.display_name}: {e}")
-            messagebox.showerror("Send Error", f"Gagal mengirim query ke {client.display_name}: {e}")
+        self.log(f"Query dikirim ke {client.display_name}")
+        return request_id
     
     def send_query_ui(self):
         """Dialog untuk mengirim query"""
@@ -1439,44 +2550,464 @@ class ServerApp:
                 messagebox.showerror("Save Error", f"Gagal menyimpan query: {e}")
     
     def show_history(self):
-        """Tampilkan history query"""
+        """Tampilkan history query (persisten) dengan pencarian teks dan filter target/status"""
         history_window = tk.Toplevel(self.root)
         history_window.title("Query History")
-        history_window.geometry("600x400")
-        
-        # Treeview untuk history
-        tree = ttk.Treeview(history_window, columns=("Timestamp", "Target", "Query"), show="headings")
-        tree.heading("Timestamp", text="Timestamp")
-        tree.heading("Target", text="Target")
-        tree.heading("Query", text="Query")
-        tree.column("Timestamp", width=150)
-        tree.column("Target", width=100)
-        tree.column("Query", width=350)
-        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        history_window.geometry("900x450")
+        
+        filter_frame = ttk.Frame(history_window)
+        filter_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+        ttk.Label(filter_frame, text="Cari:").pack(side=tk.LEFT)
+        search_var = tk.StringVar()
+        search_entry = ttk.Entry(filter_frame, textvariable=search_var, width=40)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="Target:").pack(side=tk.LEFT, padx=(10, 0))
+        target_var = tk.StringVar(value="(semua)")
+        target_combo = ttk.Combobox(filter_frame, textvariable=target_var, state="readonly", width=20,
+                                    values=["(semua)"] + self.query_history.targets())
+        target_combo.pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="Status:").pack(side=tk.LEFT, padx=(10, 0))
+        status_var = tk.StringVar(value="(semua)")
+        status_combo = ttk.Combobox(filter_frame, textvariable=status_var, state="readonly", width=10,
+                                    values=["(semua)"] + list(STATUSES))
+        status_combo.pack(side=tk.LEFT, padx=5)
+        count_label = ttk.Label(filter_frame, text="")
+        count_label.pack(side=tk.RIGHT)
+        
+        # Treeview untuk history; iid = request_id sehingga query lengkap diambil per key
+        columns = ("Timestamp", "Target", "Status", "Duration", "Rows", "Bytes", "Query")
+        tree_frame = ttk.Frame(history_window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
+        widths = {"Timestamp": 140, "Target": 110, "Status": 70, "Duration": 70, "Rows": 70, "Bytes": 80, "Query": 340}
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, width=widths[column], stretch=column == "Query")
+        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=vsb.set)
+        vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        # Tambahkan data
-        for entry in reversed(self.query_history):
-            timestamp = datetime.datetime.fromisoformat(entry['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
-            tree.insert("", tk.END, values=(timestamp, entry['target'], entry['query']))
+        def load():
+            target = target_var.get()
+            status = status_var.get()
+            try:
+                entries = self.query_history.search(search_var.get(),
+                                                    target=None if target == "(semua)" else target,
+                                                    status=None if status == "(semua)" else status)
+            except Exception as e:
+                count_label.config(text=f"Pencarian gagal: {e}")
+                return
+            tree.delete(*tree.get_children())
+            for entry in entries:
+                timestamp = datetime.datetime.fromtimestamp(entry['ts']).strftime("%Y-%m-%d %H:%M:%S")
+                duration = f"{entry['duration']:.2f}s" if entry['duration'] is not None else ""
+                tree.insert("", tk.END, iid=entry['request_id'], values=(
+                    timestamp, entry['target'], entry['status'], duration, entry['rows'],
+                    format_size(entry['bytes']), " ".join(entry['query'].split())[:300]))
+            count_label.config(text=f"{len(entries)} entri")
+        
+        # Pencarian ditunda sebentar selama mengetik
+        pending = [None]
+        
+        def schedule_load(*args):
+            if pending[0] is not None:
+                history_window.after_cancel(pending[0])
+            pending[0] = history_window.after(200, load)
+        
+        search_var.trace_add("write", schedule_load)
+        target_combo.bind("<<ComboboxSelected>>", schedule_load)
+        status_combo.bind("<<ComboboxSelected>>", schedule_load)
+        load()
+        search_entry.focus_set()
         
         # Button untuk menggunakan query yang dipilih
-        def use_selected_query():
+        def use_selected_query(event=None):
             selected = tree.selection()
             if selected:
-                item = tree.item(selected[0])
-                values = item['values']
-                query = values[2]
+                entry = self.query_history.get(selected[0])
+                if entry is None:
+                    return
                 
                 self.query_text.delete("1.0", tk.END)
-                self.query_text.insert("1.0", query)
+                self.query_text.insert("1.0", entry['query'])
                 
                 history_window.destroy()
         
+        tree.bind("<Double-1>", use_selected_query)
+        
         button_frame = ttk.Frame(history_window)
         button_frame.pack(fill=tk.X, padx=10, pady=5)
         
         ttk.Button(button_frame, text="Use Selected Query", command=use_selected_query).pack(side=tk.RIGHT)
     
+    def show_scheduled_jobs(self):
+        """Tampilkan daftar job terjadwal"""
+        jobs_window = tk.Toplevel(self.root)
+        jobs_window.title("Scheduled Jobs")
+        jobs_window.geometry("850x400")
+        
+        columns = ("Name", "Schedule", "Targets", "Next Run", "Last Run", "Missed", "Skipped", "Enabled")
+        tree = ttk.Treeview(jobs_window, columns=columns, show="headings")
+        for column, width in zip(columns, (140, 120, 150, 130, 130, 60, 60, 60)):
+            tree.heading(column, text=column)
+            tree.column(column, width=width)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        def format_time(timestamp):
+            return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else "-"
+        
+        def refresh():
+            if not tree.winfo_exists():
+                return
+            for item in tree.get_children():
+                tree.delete(item)
+            for job in self.scheduler.list():
+                targets = "All Clients" if job.targets == TARGET_ALL else ", ".join(job.targets)
+                tree.insert("", tk.END, iid=job.name, values=(
+                    job.name, job.schedule_text, targets, format_time(job.next_run), format_time(job.last_run),
+                    len(job.missed), job.skipped, "Yes" if job.enabled else "No"
+                ))
+        
+        def selected_job():
+            selected = tree.selection()
+            return self.scheduler.get(selected[0]) if selected else None
+        
+        def edit_job():
+            job = selected_job()
+            if job:
+                self.edit_scheduled_job(job, on_saved=refresh)
+        
+        def toggle_job():
+            job = selected_job()
+            if job:
+                job.enabled = not job.enabled
+                self.scheduler.save()
+                if job.standing:
+                    self.sync_standing_job(job)
+                refresh()
+        
+        def run_now():
+            job = selected_job()
+            if job and job.standing:
+                # Pendaftaran ulang membuat client langsung menjalankan query
+                self.sync_standing_job(job)
+            elif job:
+                threading.Thread(target=self.start_scheduled_job, args=(job,), daemon=True).start()
+                jobs_window.after(500, refresh)
+        
+        def remove_job():
+            job = selected_job()
+            if job and messagebox.askyesno("Remove Job", f"Hapus job {job.name}?", parent=jobs_window):
+                self.scheduler.remove(job.name)
+                if job.standing:
+                    self.sync_standing_job(job, remove=True)
+                refresh()
+        
+        button_frame = ttk.Frame(jobs_window)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Button(button_frame, text="Add", command=lambda: self.edit_scheduled_job(on_saved=refresh)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Edit", command=edit_job).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Enable/Disable", command=toggle_job).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Run Now", command=run_now).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Remove", command=remove_job).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Refresh", command=refresh).pack(side=tk.RIGHT, padx=2)
+        
+        refresh()
+    
+    def show_metrics(self):
+        """Tampilkan daftar seri metrik yang tersimpan"""
+        metrics_window = tk.Toplevel(self.root)
+        metrics_window.title("Stored Metrics")
+        metrics_window.geometry("800x400")
+        
+        columns = ("Metric", "Client", "Last Value", "Last Update", "Since")
+        tree = ttk.Treeview(metrics_window, columns=columns, show="headings")
+        for column, width in zip(columns, (220, 150, 110, 140, 140)):
+            tree.heading(column, text=column)
+            tree.column(column, width=width)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        def format_time(timestamp):
+            return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else "-"
+        
+        def refresh():
+            for item in tree.get_children():
+                tree.delete(item)
+            for series in self.metric_store.series():
+                tree.insert("", tk.END, values=(
+                    series['metric'], series['client'], f"{series['last_value']:g}" if series['last_value'] is not None else "-",
+                    format_time(series['last_ts']), format_time(series['first_ts'])
+                ))
+        
+        def show_selected_trend(event=None):
+            selected = [tree.item(item, 'values') for item in tree.selection()]
+            if selected:
+                self.show_trend([(values[1], values[0]) for values in selected])
+        
+        tree.bind("<Double-1>", show_selected_trend)
+        
+        button_frame = ttk.Frame(metrics_window)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Button(button_frame, text="Trend", command=show_selected_trend).pack(side=tk.LEFT, padx=2)
+        ttk.Button(button_frame, text="Refresh", command=refresh).pack(side=tk.RIGHT, padx=2)
+        
+        refresh()
+    
+    def show_trend(self, series_list):
+        """
+        Grafik tren untuk satu atau beberapa seri (client, metrik).
+        
+        Data diambil dan di-downsample (LTTB, kira-kira satu titik per piksel) di
+        thread terpisah; UI thread hanya menggambar titik yang sudah dikurangi.
+        Zoom (scroll) dan geser (drag) langsung menggambar ulang data yang ada,
+        lalu data dengan resolusi lebih rinci untuk rentang yang terlihat diambil ulang.
+        """
+        trend_window = tk.Toplevel(self.root)
+        trend_window.title("Trend - " + ", ".join(f"{metric} ({client})" for client, metric in series_list))
+        trend_window.geometry("900x500")
+        
+        colors = ("#1f77b4", "#d62728", "#2ca02c", "#ff7f0e", "#9467bd", "#8c564b", "#e377c2", "#17becf")
+        margin = 40
+        now = time.time()
+        wanted = set(series_list)
+        first = [series['first_ts'] for series in self.metric_store.series()
+                 if (series['client'], series['metric']) in wanted and series['first_ts']]
+        state = {
+            'range': (now - 86400, now),
+            'history_start': min(first) if first else now - 86400,
+            'generation': 0,
+            'data': [],  # list (label, titik hasil downsample)
+            'fetch_after': None,
+            'drag_x': None
+        }
+        
+        toolbar = ttk.Frame(trend_window)
+        toolbar.pack(fill=tk.X, padx=10, pady=5)
+        status_var = tk.StringVar(value="Memuat...")
+        canvas = tk.Canvas(trend_window, background="white", highlightthickness=0)
+        canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        def fetch(generation, start, end, width):
+            # Thread terpisah: query store (resolusi dipilih dari rentang) dan downsample
+            data = []
+            resolutions = set()
+            total = 0
+            for client, metric in series_list:
+                resolution, rows = self.metric_store.query(client, metric, start, end, max_points=width * 4)
+                resolutions.add(resolution)
+                total += len(rows)
+                data.append((f"{metric} ({client})", lttb([(row[0], row[1]) for row in rows], width)))
+            info = f"{total} titik, resolusi {'/'.join(sorted(resolutions))}"
+            self.ui_queue.post(apply_data, generation, data, info)
+        
+        def apply_data(generation, data, info):
+            if generation != state['generation'] or not canvas.winfo_exists():
+                return  # Hasil untuk rentang lama
+            state['data'] = data
+            state['info'] = info
+            draw()
+        
+        def request_data(delay=150):
+            # Debounce: zoom/geser beruntun hanya memicu satu pengambilan data
+            if state['fetch_after'] is not None:
+                trend_window.after_cancel(state['fetch_after'])
+            
+            def start_fetch():
+                state['fetch_after'] = None
+                state['generation'] += 1
+                # Setengah rentang di kiri dan kanan ikut diambil agar geser langsung menampilkan data
+                start, end = state['range']
+                padding = (end - start) / 2
+                width = max(canvas.winfo_width() - 2 * margin, 10) * 2
+                threading.Thread(target=fetch, args=(state['generation'], start - padding, end + padding, width),
+                                 daemon=True).start()
+            
+            state['fetch_after'] = trend_window.after(delay, start_fetch)
+        
+        def format_tick(timestamp, span):
+            fmt = "%H:%M:%S" if span <= 3600 else "%d-%m %H:%M" if span <= 7 * 86400 else "%Y-%m-%d"
+            return datetime.datetime.fromtimestamp(timestamp).strftime(fmt)
+        
+        def draw():
+            started = time.perf_counter()
+            canvas.delete("all")
+            width, height = canvas.winfo_width(), canvas.winfo_height()
+            start, end = state['range']
+            values = [y for _, points in state['data'] for x, y in points if start <= x <= end]
+            y_min, y_max = (min(values), max(values)) if values else (0, 1)
+            if y_min == y_max:
+                y_min, y_max = y_min - 1, y_max + 1
+            
+            for index, (label, points) in enumerate(state['data']):
+                color = colors[index % len(colors)]
+                coords = plot_coords(points, (start, end), (y_min, y_max), width, height, margin)
+                if len(points) >= 2:
+                    canvas.create_line(*coords, fill=color, width=1.5)
+                elif points:
+                    canvas.create_oval(coords[0] - 2, coords[1] - 2, coords[0] + 2, coords[1] + 2, fill=color, outline=color)
+            
+            # Bagian garis di luar area plot ditutup, lalu sumbu, label dan legenda
+            background = canvas.cget("background")
+            canvas.create_rectangle(0, 0, margin - 1, height, fill=background, outline=background)
+            canvas.create_rectangle(width - margin + 1, 0, width, height, fill=background, outline=background)
+            canvas.create_rectangle(0, 0, width, margin - 1, fill=background, outline=background)
+            canvas.create_rectangle(0, height - margin + 1, width, height, fill=background, outline=background)
+            canvas.create_rectangle(margin, margin, width - margin, height - margin, outline="#cccccc")
+            for i in range(5):
+                y = y_min + (y_max - y_min) * i / 4
+                canvas_y = height - margin - (height - 2 * margin) * i / 4
+                canvas.create_text(margin - 4, canvas_y, text=f"{y:.4g}", anchor=tk.E, font=("Arial", 8))
+                x = start + (end - start) * i / 4
+                canvas_x = margin + (width - 2 * margin) * i / 4
+                canvas.create_text(canvas_x, height - margin + 12, text=format_tick(x, end - start), font=("Arial", 8))
+            for index, (label, _) in enumerate(state['data']):
+                canvas.create_text(margin + 5, margin + 5 + index * 14, text=label, fill=colors[index % len(colors)],
+                                   anchor=tk.NW, font=("Arial", 8, "bold"))
+            
+            elapsed = (time.perf_counter() - started) * 1000
+            status_var.set(f"{datetime.datetime.fromtimestamp(start):%Y-%m-%d %H:%M} - "
+                           f"{datetime.datetime.fromtimestamp(end):%Y-%m-%d %H:%M} | "
+                           f"{state.get('info', '')} | digambar dalam {elapsed:.0f} ms")
+        
+        def set_range(seconds):
+            end = time.time()
+            start = state['history_start'] if seconds is None else end - seconds
+            state['range'] = (start, end)
+            draw()
+            request_data(0)
+        
+        def zoom(event, factor):
+            start, end = state['range']
+            width = max(canvas.winfo_width() - 2 * margin, 1)
+            center = start + (end - start) * min(max((event.x - margin) / width, 0), 1)
+            span = max((end - start) * factor, 60)
+            ratio = (center - start) / ((end - start) or 1)
+            state['range'] = (center - span * ratio, center + span * (1 - ratio))
+            draw()
+            request_data()
+        
+        def on_mousewheel(event):
+            zoom(event, 0.5 if getattr(event, 'delta', 0) > 0 or getattr(event, 'num', None) == 4 else 2)
+        
+        def on_press(event):
+            state['drag_x'] = event.x
+        
+        def on_drag(event):
+            if state['drag_x'] is None:
+                return
+            start, end = state['range']
+            width = max(canvas.winfo_width() - 2 * margin, 1)
+            shift = (state['drag_x'] - event.x) * (end - start) / width
+            state['drag_x'] = event.x
+            state['range'] = (start + shift, end + shift)
+            draw()
+        
+        def on_release(event):
+            if state['drag_x'] is not None:
+                state['drag_x'] = None
+                request_data()
+        
+        for label, seconds in (("1 Hour", 3600), ("1 Day", 86400), ("7 Days", 7 * 86400),
+                               ("30 Days", 30 * 86400), ("1 Year", 365 * 86400), ("All", None)):
+            ttk.Button(toolbar, text=label, command=lambda seconds=seconds: set_range(seconds)).pack(side=tk.LEFT, padx=2)
+        ttk.Label(toolbar, text="Scroll: zoom, drag: geser").pack(side=tk.RIGHT, padx=5)
+        ttk.Label(trend_window, textvariable=status_var).pack(fill=tk.X, padx=10, pady=(0, 5))
+        
+        canvas.bind("<MouseWheel>", on_mousewheel)
+        canvas.bind("<Button-4>", on_mousewheel)
+        canvas.bind("<Button-5>", on_mousewheel)
+        canvas.bind("<ButtonPress-1>", on_press)
+        canvas.bind("<B1-Motion>", on_drag)
+        canvas.bind("<ButtonRelease-1>", on_release)
+        canvas.bind("<Configure>", lambda event: (draw(), request_data()))
+    
+    def edit_scheduled_job(self, job=None, on_saved=None):
+        """Dialog untuk membuat atau mengubah job terjadwal"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Edit Job" if job else "New Scheduled Job")
+        dialog.geometry("600x450")
+        dialog.transient(self.root)
+        
+        form = ttk.Frame(dialog)
+        form.pack(fill=tk.X, padx=10, pady=10)
+        
+        name_var = tk.StringVar(value=job.name if job else "")
+        schedule_var = tk.StringVar(value=job.schedule_text if job else "15m")
+        targets_var = tk.StringVar(value=("" if job.targets == TARGET_ALL else ", ".join(job.targets)) if job else "")
+        stagger_var = tk.StringVar(value=f"{job.stagger:g}" if job else "30")
+        combine_var = tk.BooleanVar(value=job.combine_aggregates if job else self.combine_aggregates_var.get())
+        delta_var = tk.BooleanVar(value=job.delta if job else True)
+        key_columns_var = tk.StringVar(value=", ".join(job.key_columns or []) if job else "")
+        probe_var = tk.StringVar(value=(job.probe or "") if job else "")
+        
+        fields = (
+            ("Name:", name_var),
+            ("Schedule (15m / 1h / cron / on change):", schedule_var),
+            ("Targets (kosong = All Clients):", targets_var),
+            ("Stagger (detik):", stagger_var),
+            ("Key columns (delta, opsional):", key_columns_var),
+            ("Probe (on change, opsional):", probe_var)
+        )
+        entries = []
+        for row, (label, variable) in enumerate(fields):
+            ttk.Label(form, text=label).grid(row=row, column=0, sticky=tk.W, pady=2)
+            entry = ttk.Entry(form, textvariable=variable, width=50)
+            entry.grid(row=row, column=1, sticky=tk.EW, pady=2)
+            entries.append(entry)
+        options_frame = ttk.Frame(form)
+        options_frame.grid(row=len(fields), column=1, sticky=tk.W)
+        ttk.Checkbutton(options_frame, text="Combine aggregates", variable=combine_var).pack(side=tk.LEFT)
+        ttk.Checkbutton(options_frame, text="Delta transfer", variable=delta_var).pack(side=tk.LEFT, padx=10)
+        form.columnconfigure(1, weight=1)
+        if job:
+            # Nama adalah kunci job
+            entries[0].config(state=tk.DISABLED)
+        
+        query_text = scrolledtext.ScrolledText(dialog, height=10, font=("Consolas", 10))
+        query_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        query_text.insert("1.0", job.query if job else self.query_text.get("1.0", tk.END).strip())
+        
+        def save():
+            name = name_var.get().strip()
+            query = query_text.get("1.0", tk.END).strip()
+            targets = [target.strip() for target in targets_var.get().split(",") if target.strip()]
+            key_columns = [column.strip().upper() for column in key_columns_var.get().split(",") if column.strip()]
+            if not name or not query:
+                messagebox.showwarning("Scheduled Job", "Nama dan query harus diisi", parent=dialog)
+                return
+            if not job and self.scheduler.get(name):
+                messagebox.showwarning("Scheduled Job", f"Job {name} sudah ada", parent=dialog)
+                return
+            try:
+                new_job = ScheduledJob(name, query, schedule_var.get().strip(), targets or TARGET_ALL,
+                                       float(stagger_var.get() or 0), job.enabled if job else True,
+                                       combine_var.get(), delta_var.get(), key_columns,
+                                       probe_var.get().strip() or None, job.min_interval if job else 10.0)
+            except ValueError as e:
+                messagebox.showerror("Scheduled Job", f"Jadwal tidak valid: {e}", parent=dialog)
+                return
+            if job:
+                # State run (catch-up, client yang pernah menerima) tetap dipertahankan
+                new_job.run_id, new_job.last_run = job.run_id, job.last_run
+                new_job.missed, new_job.seen, new_job.skipped = job.missed, job.seen, job.skipped
+            self.scheduler.add(new_job)
+            if new_job.standing or (job and job.standing):
+                self.sync_standing_job(new_job, previous=job)
+            if new_job.standing:
+                self.log(f"Job {name} disimpan, dijalankan client saat database berubah")
+            else:
+                self.log(f"Job {name} disimpan, run berikutnya "
+                         f"{datetime.datetime.fromtimestamp(new_job.next_run).strftime('%Y-%m-%d %H:%M:%S')}")
+            dialog.destroy()
+            if on_saved:
+                on_saved()
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Button(button_frame, text="Save", command=save).pack(side=tk.RIGHT, padx=2)
+        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT, padx=2)
+    
     def show_client_menu(self, event):
         """Tampilkan menu context untuk client"""
         item = self.client_tree.identify_row(event.y)
@@ -1486,21 +3017,14 @@ class ServerApp:
     
     def show_selected_client_details(self):
         """Tampilkan detail client yang dipilih dari tombol detail"""
-        selected = self.client_tree.selection()
-        if not selected:
+        if not self.client_tree.selection():
             messagebox.showinfo("No Selection", "Please select a client first")
             return
         
-        selected_item = selected[0]
-        item_data = self.client_tree.item(selected_item)
-        client_name = item_data['values'][0]
-        
-        # Cari client berdasarkan nama
-        with self.lock:
-            for client_id, client in self.clients.items():
-                if client.display_name == client_name:
-                    self.show_client_details_window(client)
-                    return
+        client = self.selected_client()
+        if client:
+            self.show_client_details_window(client)
+            return
         
         messagebox.showinfo("Not Found", "Client not found")
     
@@ -1554,96 +3078,56 @@ class ServerApp:
         if not item:
             return
         
-        item_data = self.client_tree.item(item)
-        client_name = item_data['values'][0]
-        
-        # Cari client berdasarkan nama
-        with self.lock:
-            for client_id, client in self.clients.items():
-                if client.display_name == client_name:
-                    self.show_client_details_window(client)
-                    return
+        client = self.registry.get(item)
+        if client:
+            self.show_client_details_window(client)
     
     def refresh_client_tables(self):
         """Refresh daftar tabel untuk client yang dipilih"""
-        selected = self.client_tree.selection()
-        if not selected:
+        client = self.selected_client()
+        if client is None:
             return
         
-        item_data = self.client_tree.item(selected[0])
-        client_id = item_data['values'][0]
+        if not client.is_connected:
+            messagebox.showwarning("Client Disconnected", f"Client {client.display_name} tidak terhubung")
+            return
         
-        with self.lock:
-            if client_id not in self.clients:
-                return
-            
-            client = self.clients[client_id]
-            
-            if not client.is_connected:
-                messagebox.showwarning("Client Disconnected", f"Client {client.display_name} tidak terhubung")
-                return
-            
-            # Kirim query untuk mendapatkan daftar tabel
-            try:
-                tables_message = NetworkMessage(NetworkMessage.TYPE_QUERY, {
-                    'query': "SELECT RDB$RELATION_NAME FROM RDB$RELATIONS WHERE RDB$SYSTEM_FLAG = 0 OR RDB$SYSTEM_FLAG IS NULL",
-                    'description': 'get_tables'
-                }, client_id)
-                
-                send_message(client.socket, tables_message)
-                self.log(f"Refresh daftar tabel untuk {client.display_name}")
-            except Exception as e:
-                self.log(f"Error saat refresh tabel untuk {client.display_name}: {e}")
-                messagebox.showerror("Refresh Error", f"Gagal refresh tabel: {e}")
+        # Kirim query untuk mendapatkan daftar tabel tanpa memblokir UI
+        self.log(f"Refresh daftar tabel untuk {client.display_name}")
+        threading.Thread(target=self.request_tables, args=(client,), daemon=True).start()
     
     def disconnect_client(self):
         """Putuskan koneksi dengan client yang dipilih"""
-        selected = self.client_tree.selection()
-        if not selected:
+        client = self.selected_client()
+        if client is None:
             return
         
-        item_data = self.client_tree.item(selected[0])
-        client_id = item_data['values'][0]
-        
-        with self.lock:
-            if client_id not in self.clients:
-                return
-            
-            client = self.clients[client_id]
-            
-            try:
-                client.socket.close()
-            except:
-                pass
-            
+        with client.lock:
             client.is_connected = False
-            self.log(f"Client {client.display_name} diputuskan")
+        try:
+            client.socket.close()
+        except:
+            pass
+        self.log(f"Client {client.display_name} diputuskan")
     
     def rename_client(self):
         """Rename client yang dipilih"""
-        selected = self.client_tree.selection()
-        if not selected:
+        client = self.selected_client()
+        if client is None:
             return
         
-        item_data = self.client_tree.item(selected[0])
-        client_id = item_data['values'][0]
+        # Dialog tidak pernah dibuka selama lock dipegang
+        new_name = simpledialog.askstring(
+            "Rename Client", 
+            "Enter new name:",
+            initialvalue=client.display_name
+        )
         
-        with self.lock:
-            if client_id not in self.clients:
-                return
-            
-            client = self.clients[client_id]
-            
-            new_name = simpledialog.askstring(
-                "Rename Client", 
-                "Enter new name:",
-                initialvalue=client.display_name
-            )
-            
-            if new_name:
+        if new_name:
+            with client.lock:
                 client.display_name = new_name
-                self.log(f"Client {client_id} diganti namanya menjadi {new_name}")
-                self.update_client_list()
+            self.log(f"Client {client.client_id} diganti namanya menjadi {new_name}")
+            self.update_client_list()
     
     def exit_app(self):
         """Keluar dari aplikasi"""
@@ -1651,6 +3135,10 @@ class ServerApp:
             # Berhenti server jika berjalan
             if self.running:
                 self.stop_server()
+            self.fanout_executor.shutdown(wait=False)
+            self.result_store.close()
+            self.metric_store.close()
+            self.query_history.close()
             
             self.root.destroy()
             sys.exit(0)
@@ -1683,73 +3171,260 @@ class ServerApp:
         """Masukkan template query ke editor"""
         self.query_text.insert(tk.INSERT, template)
     
+    def setup_autocomplete(self, editor):
+        """
+        Autocomplete nama tabel dan kolom di editor dari schema client target.
+        Muncul otomatis setelah 2 huruf atau setelah 'ALIAS.', atau dengan Ctrl+Space.
+        """
+        state = {'popup': None, 'listbox': None, 'after': None, 'prefix': ''}
+        navigation = ('Up', 'Down', 'Return', 'Tab', 'Escape')
+        
+        def target_ids():
+            try:
+                target_id = self.client_index.resolve_target(self.target_var.get())
+            except KeyError:
+                return None
+            return None if target_id is None else [target_id]
+        
+        def hide(event=None):
+            if state['popup'] is not None:
+                state['popup'].destroy()
+                state['popup'] = state['listbox'] = None
+        
+        def show(explicit=False):
+            state['after'] = None
+            qualifier, prefix = completion_context(editor.get("insert linestart", "insert"))
+            if qualifier is None and len(prefix) < 2 and not explicit:
+                hide()
+                return
+            aliases = None
+            if qualifier is not None:
+                aliases = {}
+                for statement in analyze(editor.get("1.0", "end-1c")).statements:
+                    aliases.update(statement.aliases)
+            names = self.schema_catalog.complete(prefix, target_ids(), qualifier, aliases)
+            if not names or (len(names) == 1 and names[0].upper() == prefix.lstrip('"').upper()):
+                hide()
+                return
+            state['prefix'] = prefix
+            if state['popup'] is None:
+                popup = tk.Toplevel(editor)
+                popup.wm_overrideredirect(True)
+                listbox = tk.Listbox(popup, height=8, font=("Consolas", 10), exportselection=False)
+                listbox.pack(fill=tk.BOTH, expand=True)
+                listbox.bind("<Double-Button-1>", lambda e: accept())
+                state['popup'], state['listbox'] = popup, listbox
+            listbox = state['listbox']
+            listbox.delete(0, tk.END)
+            for name in names:
+                listbox.insert(tk.END, name)
+            select(0)
+            bbox = editor.bbox("insert")
+            if bbox:
+                x, y, _, height = bbox
+                state['popup'].wm_geometry(f"+{editor.winfo_rootx() + x}+{editor.winfo_rooty() + y + height}")
+        
+        def select(index):
+            listbox = state['listbox']
+            index = max(0, min(listbox.size() - 1, index))
+            listbox.selection_clear(0, tk.END)
+            listbox.selection_set(index)
+            listbox.activate(index)
+            listbox.see(index)
+        
+        def accept():
+            listbox = state['listbox']
+            selection = listbox.curselection() if listbox is not None else ()
+            if selection:
+                editor.delete(f"insert-{len(state['prefix'])}c", "insert")
+                editor.insert("insert", quote_name(listbox.get(selection[0])))
+            hide()
+            editor.focus_set()
+        
+        def on_key(event):
+            if state['popup'] is None or event.keysym not in navigation:
+                return None
+            if event.keysym in ('Up', 'Down'):
+                current = state['listbox'].curselection()
+                select((current[0] if current else 0) + (-1 if event.keysym == 'Up' else 1))
+            elif event.keysym == 'Escape':
+                hide()
+            else:
+                accept()
+            return "break"
+        
+        def on_release(event):
+            if event.keysym in navigation or event.state & 0x4:  # Navigasi popup atau kombinasi Ctrl
+                return
+            if state['after'] is not None:
+                editor.after_cancel(state['after'])
+                state['after'] = None
+            if event.keysym == 'BackSpace' or (event.char and (event.char.isalnum() or event.char in '_$."')):
+                state['after'] = editor.after(150, show)  # Debounce selama mengetik
+            elif event.char:
+                hide()
+        
+        def hide_unfocused():
+            # Klik pada popup memindahkan fokus ke listbox; popup tetap terbuka
+            if state['listbox'] is not None and editor.focus_get() is not state['listbox']:
+                hide()
+        
+        def on_explicit(event):
+            if state['after'] is not None:
+                editor.after_cancel(state['after'])
+            show(explicit=True)
+            return "break"
+        
+        editor.bind("<KeyPress>", on_key, add="+")
+        editor.bind("<KeyRelease>", on_release, add="+")
+        editor.bind("<Control-space>", on_explicit)
+        editor.bind("<Button-1>", hide, add="+")
+        editor.bind("<FocusOut>", lambda e: editor.after(150, hide_unfocused))
+    
     def close_current_tab(self):
         """Tutup tab hasil yang aktif"""
         current = self.results_notebook.select()
         if current:
+            self.close_tab_cursor(current)
             self.results_notebook.forget(current)
     
     def close_all_tabs(self):
         """Tutup semua tab hasil"""
         for tab_id in self.results_notebook.tabs():
+            self.close_tab_cursor(tab_id)
             self.results_notebook.forget(tab_id)
     
+    def close_tab_cursor(self, tab_id):
+        """Tutup remote cursor, hasil gabungan, dan handle hasil milik tab"""
+        try:
+            tab = self.results_notebook.nametowidget(tab_id)
+        except (KeyError, tk.TclError):
+            return
+        
+        # Hasil gabungan: hentikan pengambilan halaman dan lepaskan barisnya
+        run_id = getattr(tab, 'merged_run_id', None)
+        if run_id:
+            with self.lock:
+                self.merged_results.pop(run_id, None)
+                self.aggregate_plans.pop(run_id, None)
+            self.merged_views.pop(run_id, None)
+        merged = getattr(tab, 'merged', None)
+        if merged is not None:
+            merged.release()
+        
+        for handle in getattr(tab, 'result_handles', []):
+            handle.release()
+        
+        remote_cursor = getattr(tab, 'remote_cursor', None)
+        if remote_cursor:
+            self.close_remote_cursor(remote_cursor)
+    
     def export_results(self):
-        """Export hasil query ke file"""
+        """Export seluruh hasil di tab aktif ke file (CSV, JSON Lines atau XLSX) di background thread"""
         current = self.results_notebook.select()
         if not current:
             messagebox.showinfo("Export", "Tidak ada tab hasil yang aktif")
             return
         
+        # Cari grid hasil dalam tab; jika ada beberapa result set, pakai yang sedang fokus
+        result_frame = self.results_notebook.nametowidget(current)
+        grids = []
+        def find_grids(widget):
+            for child in widget.winfo_children():
+                if isinstance(child, VirtualGrid):
+                    grids.append(child)
+                else:
+                    find_grids(child)
+        
+        find_grids(result_frame)
+        
+        if not grids:
+            messagebox.showinfo("Export", "Tidak ada data yang bisa diekspor")
+            return
+        
+        focus = self.root.focus_get()
+        grid = next((g for g in grids if focus is g.tree), grids[0])
+        
         import tkinter.filedialog as filedialog
         
         filename = filedialog.asksaveasfilename(
             title="Export Results",
-            filetypes=[("CSV files", "*.csv"), ("Text files", "*.txt"), ("All files", "*.*")],
+            filetypes=[("CSV files", "*.csv"), ("JSON Lines", "*.jsonl"), ("Excel Workbook", "*.xlsx"),
+                       ("All files", "*.*")],
             defaultextension=".csv"
         )
         
         if not filename:
             return
         
-        try:
-            # Simpan hasil yang ada di tab aktif ke file
-            # Ini adalah implementasi sederhana, bisa disesuaikan untuk format CSV yang lebih baik
-            with open(filename, 'w') as f:
-                # Temukan treeview di tab aktif
-                result_frame = self.results_notebook.nametowidget(current)
-                
-                # Cari treeview dalam frame
-                treeviews = []
-                def find_treeviews(widget):
-                    for child in widget.winfo_children():
-                        if isinstance(child, ttk.Treeview):
-                            treeviews.append(child)
-                        find_treeviews(child)
-                
-                find_treeviews(result_frame)
-                
-                if not treeviews:
-                    messagebox.showinfo("Export", "Tidak ada data yang bisa diekspor")
-                    return
-                
-                # Ambil treeview pertama yang ditemukan
-                tree = treeviews[0]
-                
-                # Tulis header
-                headers = [tree.heading(col)["text"] for col in tree["columns"]]
-                f.write(",".join(headers) + "\n")
-                
-                # Tulis data
-                for item_id in tree.get_children():
-                    values = tree.item(item_id)["values"]
-                    f.write(",".join([str(v) for v in values]) + "\n")
-            
-            self.log(f"Hasil berhasil diekspor ke {filename}")
-            messagebox.showinfo("Export", f"Hasil berhasil diekspor ke {filename}")
-        except Exception as e:
-            self.log(f"Error saat mengekspor hasil: {e}")
-            messagebox.showerror("Export Error", f"Gagal mengekspor hasil: {e}")
+        # Sumber baris untuk thread export: snapshot urutan yang tampil, handle hasil sendiri
+        headers = list(grid.columns)
+        source = grid.source
+        release = None
+        if isinstance(source, RemoteCursorSource):
+            chunks = remote_chunks(source.remote_cursor, source.headers)
+            total = source.remote_cursor.total_rows
+        else:
+            if isinstance(source, ListSource):
+                rows = source.rows
+                if isinstance(rows, ResultHandle):
+                    rows = rows.share()
+                    release = rows.release
+                snapshot = ListSource(source.headers, rows)
+                snapshot.set_order(source.order)
+            else:
+                snapshot = MergedSource(source.merged, list(source.view))
+            chunks = source_chunks(snapshot)
+            total = len(snapshot)
+        
+        # Dialog progress
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Export")
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+        ttk.Label(dialog, text=f"Mengekspor ke {os.path.basename(filename)}...").pack(padx=10, pady=(10, 5))
+        progress = ttk.Progressbar(dialog, length=350, mode='determinate' if total else 'indeterminate',
+                                   maximum=max(total or 1, 1))
+        progress.pack(padx=10, pady=5)
+        count_label = ttk.Label(dialog, text="")
+        count_label.pack(padx=10)
+        cancel = threading.Event()
+        ttk.Button(dialog, text="Cancel", command=cancel.set).pack(pady=10)
+        dialog.protocol("WM_DELETE_WINDOW", cancel.set)
+        if not total:
+            progress.start(50)
+        
+        def update(written):
+            if dialog.winfo_exists():
+                progress['value'] = written
+                count_label.config(text=f"{written:,} / {total:,} rows" if total else f"{written:,} rows")
+        
+        def finish(written, error):
+            if dialog.winfo_exists():
+                dialog.destroy()
+            if error is None:
+                self.log(f"{written} baris berhasil diekspor ke {filename}")
+                messagebox.showinfo("Export", f"{written} baris berhasil diekspor ke {filename}")
+            elif isinstance(error, ExportCancelled):
+                self.log(f"Export ke {filename} dibatalkan")
+            else:
+                self.log(f"Error saat mengekspor hasil: {error}")
+                messagebox.showerror("Export Error", f"Gagal mengekspor hasil: {error}")
+        
+        def run():
+            written, error = 0, None
+            try:
+                written = export_rows(filename, format_for(filename), headers, chunks,
+                                      lambda count: self.ui_queue.post_coalesced(('export', filename), update, count),
+                                      cancel)
+            except Exception as e:
+                error = e
+            finally:
+                if release:
+                    release()
+            self.ui_queue.post(finish, written, error)
+        
+        threading.Thread(target=run, daemon=True).start()
     
     def clear_log(self):
         """Bersihkan log"""
@@ -1813,126 +3488,32 @@ class ServerApp:
         # Tombol close
         ttk.Button(button_frame, text="Close", command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
 
-    def has_row_limit(self, query):
-        """Cek apakah query sudah memiliki batasan jumlah baris"""
-        # Deteksi pola FIRST X atau ROWS X
-        upper_query = query.upper()
-        return " FIRST " in upper_query or " ROWS " in upper_query or " LIMIT " in upper_query or " TOP " in upper_query
-    
-    def add_row_limit(self, query, limit):
-        """Tambahkan batasan jumlah baris ke query"""
-        # Mengasumsikan format Firebird SQL
-        query = query.strip()
-        
-        # Jaga-jaga untuk query yang mengandung multiple statements
-        if ";" in query:
-            parts = query.split(";")
-            parts = [self.add_row_limit(part.strip(), limit) for part in parts if part.strip()]
-            return ";".join(parts)
-        
-        # Penanganan untuk SELECT DISTINCT dan kasus lainnya
-        if query.upper().startswith("SELECT "):
-            parts = query.split(" ", 1)
-            rest = parts[1]
-            
-            if rest.upper().startswith("DISTINCT "):
-                # Format: SELECT DISTINCT -> SELECT FIRST X DISTINCT
-                rest_parts = rest.split(" ", 1)
-                return f"SELECT FIRST {limit} {rest_parts[0]} {rest_parts[1]}"
-            else:
-                # Format: SELECT ... -> SELECT FIRST X ...
-                return f"SELECT FIRST {limit} {rest}"
-            
-        return query  # Return query asli jika bukan SELECT
-    
-    def is_potentially_dangerous(self, query):
-        """Cek apakah query berpotensi mengubah data"""
-        upper_query = query.upper().strip()
-        
-        # Cek multiple statements
-        if ";" in upper_query:
-            # Jika ada satu statement yang berbahaya, seluruh query dianggap berbahaya
-            return any(self.is_potentially_dangerous(part) for part in upper_query.split(";") if part.strip())
-        
-        # DML dan DDL statements yang berbahaya
-        dangerous_keywords = [
-            "INSERT ", "UPDATE ", "DELETE ", "ALTER ", "DROP ", "CREATE ", 
-            "TRUNCATE ", "GRANT ", "REVOKE ", "EXECUTE BLOCK", "EXECUTE PROCEDURE"
-        ]
-        
-        for keyword in dangerous_keywords:
-            if upper_query.startswith(keyword) or f" {keyword}" in upper_query:
-                return True
-        
-        return False
-
-    def open_result_in_new_window(self, parent_tree, headers, all_rows, page_size=100):
+    def open_result_in_new_window(self, parent_grid, headers, all_rows):
         """Buka hasil query di jendela baru dengan lebih banyak ruang"""
         window = tk.Toplevel(self.root)
         window.title("Query Results")
         window.geometry("1000x600")
         
+        # Jendela memegang handle sendiri agar hasil tetap ada walaupun tab ditutup
+        if isinstance(all_rows, ResultHandle):
+            all_rows = all_rows.share()
+            window.bind("<Destroy>", lambda event, h=all_rows: h.release() if event.widget is window else None)
+        
         # Buat frame utama
         main_frame = ttk.Frame(window)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Buat frame untuk treeview
-        tree_frame = ttk.Frame(main_frame)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Buat frame untuk scrollbar
-        scroll_frame = ttk.Frame(tree_frame)
-        scroll_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Buat treeview dengan scrollbar
-        tree = ttk.Treeview(scroll_frame, columns=headers, show="headings", style="ISQL.Treeview")
-        
-        # Tambahkan scrollbar vertikal
-        v_scrollbar = ttk.Scrollbar(scroll_frame, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=v_scrollbar.set)
-        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Tambahkan scrollbar horizontal
-        h_scrollbar = ttk.Scrollbar(tree_frame, orient="horizontal", command=tree.xview)
-        tree.configure(xscrollcommand=h_scrollbar.set)
-        h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
-        
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # Set header dan kolom
-        try:
-            for header in headers:
-                tree.heading(header, text=header, anchor=tk.W)
-                # Gunakan lebar kolom dari tree asal jika tersedia
-                if parent_tree:
-                    width = parent_tree.column(header, "width")
-                    tree.column(header, width=width, stretch=tk.YES, anchor=tk.W)
-                else:
-                    # Default jika parent_tree tidak tersedia
-                    max_width = len(str(header)) * 10
-                    for row_idx, row in enumerate(all_rows):
-                        if row_idx >= 100:  # Hanya cek 100 baris pertama untuk efisiensi
-                            break
-                        val = str(row.get(header, ""))
-                        width = len(val) * 8
-                        if width > max_width:
-                            max_width = width
-                    tree.column(header, width=min(max_width, 300), stretch=tk.YES, anchor=tk.W)
-        except Exception as e:
-            print(f"Error setting column width: {e}")
-            # Fallback ke lebar default
-            for header in headers:
-                tree.column(header, width=150, stretch=tk.YES, anchor=tk.W)
-        
-        # Paging
-        total_rows = len(all_rows)
-        total_pages = (total_rows + page_size - 1) // page_size
-        page_var = tk.IntVar(value=1)
-        
         # Controls frame
         controls_frame = ttk.Frame(main_frame)
         controls_frame.pack(fill=tk.X, padx=5, pady=5)
         
+        # Grid dengan lebar kolom dari grid asal jika tersedia
+        widths = None
+        if parent_grid is not None and parent_grid.winfo_exists():
+            widths = [parent_grid.tree.column(header, "width") for header in headers]
+        grid = VirtualGrid(main_frame, headers, ListSource(headers, all_rows), widths=widths)
+        grid.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
         # Search frame
         search_frame = ttk.LabelFrame(controls_frame, text="Search")
         search_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
@@ -1948,128 +3529,28 @@ class ServerApp:
         search_column_dropdown.pack(side=tk.LEFT, padx=5, pady=5)
         
         # Status variable untuk hasil pencarian
-        status_var = tk.StringVar(value=f"Total rows: {total_rows}")
+        search_status_var = tk.StringVar()
+        search_in_window, clear_search = self._bind_grid_search(
+            grid, headers, all_rows, search_frame, search_var, search_column_var, search_status_var
+        )
         
-        # Search button dan fungsi pencarian
-        def search_in_window():
-            search_text = search_var.get().strip().lower()
-            if not search_text:
-                status_var.set(f"Total rows: {total_rows}")
-                return
-            
-            search_col = search_column_var.get()
-            found_count = 0
-            
-            # Reset semua highlight
-            for row_id in tree.get_children():
-                tree.item(row_id, tags=())
-            
-            # Cari di semua baris yang ditampilkan
-            for row_id in tree.get_children():
-                values = tree.item(row_id, "values")
-                
-                found = False
-                if search_col == "All Columns":
-                    # Cari di semua kolom
-                    for val in values:
-                        if search_text in str(val).lower():
-                            found = True
-                            found_count += 1
-                            break
-                else:
-                    # Cari di kolom tertentu
-                    col_idx = headers.index(search_col)
-                    if col_idx < len(values) and search_text in str(values[col_idx]).lower():
-                        found = True
-                        found_count += 1
-                
-                if found:
-                    tree.item(row_id, tags=("found",))
-            
-            # Set style untuk highlight hasil pencarian
-            tree.tag_configure("found", background="#ffffcc")
-            
-            # Update status
-            status_var.set(f"Total rows: {total_rows} | Found: {found_count} matches")
+        self._bind_grid_sort(grid, headers, all_rows, search_status_var)
         
         search_button = ttk.Button(search_frame, text="Search", command=search_in_window)
         search_button.pack(side=tk.LEFT, padx=5, pady=5)
         
         # Clear button
-        clear_button = ttk.Button(search_frame, text="Clear", 
-                            command=lambda: [search_var.set(""), status_var.set(f"Total rows: {total_rows}"), 
-                                          [tree.item(row_id, tags=()) for row_id in tree.get_children()]])
+        clear_button = ttk.Button(search_frame, text="Clear", command=clear_search)
         clear_button.pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Label(search_frame, textvariable=search_status_var).pack(side=tk.LEFT, padx=5, pady=5)
         
         # Bind enter key pada search entry
         search_entry.bind("<Return>", lambda e: search_in_window())
         
-        # Paging frame
-        paging_frame = ttk.LabelFrame(controls_frame, text="Page Navigation")
-        paging_frame.pack(side=tk.RIGHT, padx=5)
-        
-        # Fungsi untuk menampilkan halaman
-        def show_page():
-            # Hapus semua baris yang ada
-            for item in tree.get_children():
-                tree.delete(item)
-            
-            # Hitung rentang data untuk halaman ini
-            current_page = page_var.get()
-            start_idx = (current_page - 1) * page_size
-            end_idx = min(start_idx + page_size, total_rows)
-            
-            # Update label halaman
-            page_label.config(text=f"{current_page}/{total_pages}")
-            
-            # Tambahkan data untuk halaman ini
-            for idx in range(start_idx, end_idx):
-                row = all_rows[idx]
-                values = []
-                for header in headers:
-                    values.append(row.get(header, ""))
-                tree.insert("", tk.END, values=values)
-            
-            # Update status
-            status_var.set(f"Total rows: {total_rows} | Showing rows {start_idx+1}-{end_idx}")
-        
-        # Dialog untuk menuju ke halaman tertentu
-        def show_go_page_dialog():
-            page = simpledialog.askinteger("Go to Page", f"Enter page number (1-{total_pages}):", 
-                                         minvalue=1, maxvalue=total_pages)
-            if page:
-                page_var.set(page)
-                show_page()
-        
-        # Navigation buttons
-        ttk.Button(paging_frame, text="◀◀", width=3, 
-                 command=lambda: page_var.set(1) or show_page()).pack(side=tk.LEFT, padx=2)
-        
-        ttk.Button(paging_frame, text="◀", width=2, 
-                 command=lambda: page_var.set(max(1, page_var.get() - 1)) or show_page()).pack(side=tk.LEFT, padx=2)
-        
-        # Page indicator
-        page_label = ttk.Label(paging_frame, text=f"1/{total_pages}")
-        page_label.pack(side=tk.LEFT, padx=5)
-        
-        # Next buttons
-        ttk.Button(paging_frame, text="▶", width=2,
-                 command=lambda: page_var.set(min(total_pages, page_var.get() + 1)) or show_page()).pack(side=tk.LEFT, padx=2)
-        
-        ttk.Button(paging_frame, text="▶▶", width=3,
-                 command=lambda: page_var.set(total_pages) or show_page()).pack(side=tk.LEFT, padx=2)
-        
-        # Go to page
-        ttk.Button(paging_frame, text="Go", width=3,
-                 command=lambda: show_go_page_dialog()).pack(side=tk.LEFT, padx=5)
-        
         # Status bar
-        status_bar = ttk.Label(main_frame, textvariable=status_var, anchor=tk.W)
+        status_bar = ttk.Label(main_frame, text=f"Total rows: {len(all_rows)}", anchor=tk.W)
         status_bar.pack(fill=tk.X, padx=5, pady=5)
         
-        # Tampilkan halaman pertama
-        show_page()
-        
         # Fokus ke jendela baru
         window.focus_force()
         
@@ -0,0 +1,92 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.aggregate import plan_aggregate
+from common.db_utils import FirebirdConnector
+from common.synthetic_db import create_dataset, FAKE_ISQL_PATH
+
+
+class TestPlanAggregate(unittest.TestCase):
+    """Test penulisan ulang query agregat"""
+
+    def test_rewrite(self):
+        plan = plan_aggregate("SELECT TRANSDATE, SUM(BUNCHES) AS BUNCHES, AVG(LOOSEFRUIT) "
+                              "FROM FFBLOADINGCROP02 WHERE FIELDID > 10 GROUP BY TRANSDATE ORDER BY 2 DESC;")
+        self.assertEqual(plan.client_query,
+                         "SELECT TRANSDATE AS G0, SUM(BUNCHES) AS A1, SUM(LOOSEFRUIT) AS A2_SUM, "
+                         "COUNT(LOOSEFRUIT) AS A2_CNT FROM FFBLOADINGCROP02 WHERE FIELDID > 10 GROUP BY TRANSDATE")
+        self.assertEqual(plan.headers, ["TRANSDATE", "BUNCHES", "AVG"])
+        self.assertEqual(plan.order_by, [(1, True)])
+
+    def test_not_rewritable(self):
+        for query in ("SELECT * FROM T",
+                      "SELECT A FROM T",
+                      "SELECT COUNT(DISTINCT A) FROM T",
+                      "SELECT A, COUNT(*) FROM T GROUP BY A HAVING COUNT(*) > 1",
+                      "SELECT FIRST 10 A, COUNT(*) FROM T GROUP BY A",
+                      "SELECT A, B, COUNT(*) FROM T GROUP BY A",
+                      "SELECT SUM(A) + SUM(B) FROM T",
+                      "UPDATE T SET A = 1"):
+            self.assertIsNone(plan_aggregate(query), query)
+
+    def test_combine_partials(self):
+        plan = plan_aggregate("SELECT D, SUM(X), COUNT(*), MIN(X), MAX(X), AVG(X) FROM T GROUP BY D")
+        partial_a = [{'headers': [], 'rows': [
+            {'G0': '2025-01-01', 'A1': '10', 'A2': '2', 'A3': '4', 'A4': '6', 'A5_SUM': '10', 'A5_CNT': '2'}]}]
+        partial_b = [{'headers': [], 'rows': [
+            {'G0': '2025-01-01', 'A1': '5', 'A2': '1', 'A3': '5', 'A4': '5', 'A5_SUM': '5', 'A5_CNT': '1'},
+            {'G0': '2025-01-02', 'A1': '<null>', 'A2': '0', 'A3': '<null>', 'A4': '<null>',
+             'A5_SUM': '<null>', 'A5_CNT': '0'}]}]
+        rows = plan.combine([partial_a, partial_b])[0]['rows']
+        self.assertEqual(rows[0], {'D': '2025-01-01', 'SUM': 15, 'COUNT': 3, 'MIN': 4, 'MAX': 6, 'AVG': 5.0})
+        self.assertEqual(rows[1], {'D': '2025-01-02', 'SUM': None, 'COUNT': 0, 'MIN': None, 'MAX': None, 'AVG': None})
+
+
+class TestAggregatePushdown(unittest.TestCase):
+    """Hasil gabungan agregat parsial sama dengan agregat atas seluruh baris"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.connectors = []
+        for seed in (1, 2, 3):
+            db_path = os.path.join(self.temp_dir, f"ESTATE{seed}.FDB")
+            create_dataset(db_path, rows=1200, seed=seed)
+            self.connectors.append(FirebirdConnector(db_path=db_path, isql_path=FAKE_ISQL_PATH))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_matches_raw_rows(self):
+        plan = plan_aggregate("SELECT TRANSDATE, SUM(BUNCHES) AS BUNCHES, SUM(LOOSEFRUIT) AS LOOSEFRUIT, "
+                              "AVG(BUNCHES) AS AVG_BUNCHES, MAX(FIELDID) FROM FFBLOADINGCROP02 "
+                              "GROUP BY TRANSDATE ORDER BY TRANSDATE")
+        combined = plan.combine([c.execute_query(plan.client_query) for c in self.connectors])[0]['rows']
+
+        expected = {}
+        for connector in self.connectors:
+            raw = connector.execute_query("SELECT TRANSDATE, BUNCHES, LOOSEFRUIT, FIELDID FROM FFBLOADINGCROP02")
+            for row in raw[0]['rows']:
+                entry = expected.setdefault(row['TRANSDATE'], [0, 0, 0, 0])
+                entry[0] += int(row['BUNCHES'])
+                entry[1] += int(row['LOOSEFRUIT'])
+                entry[2] += 1
+                entry[3] = max(entry[3], int(row['FIELDID']))
+
+        self.assertEqual([row['TRANSDATE'] for row in combined], sorted(expected))
+        for row in combined:
+            bunches, loosefruit, count, max_field = expected[row['TRANSDATE']]
+            self.assertEqual(row['BUNCHES'], bunches)
+            self.assertEqual(row['LOOSEFRUIT'], loosefruit)
+            self.assertAlmostEqual(row['AVG_BUNCHES'], bunches / count)
+            self.assertEqual(row['MAX'], max_field)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import threading
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from client.client import ClientApp
+from common.remote_cursor import CursorRegistry
+
+
+class DummyVar:
+    """Pengganti tk.StringVar tanpa display"""
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class TestClientApp(unittest.TestCase):
+    """Test identitas client di mode GUI dan headless"""
+
+    def make_app(self, headless):
+        app = ClientApp.__new__(ClientApp)
+        app.headless = headless
+        app.client_id = "client-1"
+        app.display_name = "Estate A"
+        return app
+
+    def test_headless_identity(self):
+        app = self.make_app(headless=True)
+        self.assertEqual((app.get_client_id(), app.get_display_name()), ("client-1", "Estate A"))
+
+    def test_gui_identity_from_ui(self):
+        app = self.make_app(headless=False)
+        app.client_id_var = DummyVar("client-1")
+        app.display_name_var = DummyVar("Estate A (diubah)")
+        self.assertEqual((app.get_client_id(), app.get_display_name()), ("client-1", "Estate A (diubah)"))
+        # Field kosong memakai nilai tersimpan
+        app.display_name_var = DummyVar("")
+        self.assertEqual(app.get_display_name(), "Estate A")
+
+    def test_cursors_survive_resume(self):
+        app = self.make_app(headless=True)
+        app.cursors = CursorRegistry()
+        app.offline_lock = threading.Lock()
+        app.offline_results = []
+        app.log = lambda message: None
+        app.cursors.open("c1", "SELECT ID FROM T", lambda query: [])
+        # Session dilanjutkan: cursor dari sebelum putus masih bisa di-paging
+        app.handle_register_reply({'session_token': "s1", 'resumed': True})
+        self.assertEqual(len(app.cursors), 1)
+        # Session baru: server tidak mengenal cursor lama
+        app.handle_register_reply({'session_token': "s2", 'resumed': False})
+        self.assertEqual(len(app.cursors), 0)
+
+    def test_metadata_query_not_in_history(self):
+        app = self.make_app(headless=True)
+        app.cursors = CursorRegistry()
+        app.log = lambda message: None
+        app.db_connector = type('Connector', (), {
+            'db_path': __file__,
+            'execute_query': staticmethod(lambda query: [{'headers': ["NAME"], 'rows': [{"NAME": "EMP"}]}])
+        })()
+        history = []
+        app.add_history_item = lambda request_id, query: history.append(('add', query))
+        app.update_history_status = lambda request_id, status, **kwargs: history.append((status, request_id))
+        app.spool_result = lambda result, query: result
+        app.send_query_result = lambda *args: 0
+        app.set_last_result = app.update_result_display = lambda result: None
+
+        app.execute_query({'query': "SELECT RDB$RELATION_NAME FROM RDB$RELATIONS", 'description': 'get_tables',
+                           'record_history': False})
+        self.assertEqual(history, [])
+        app.execute_query({'query': "SELECT NAME FROM EMP", 'description': 'user_query', 'request_id': "r1"})
+        self.assertEqual(history, [('add', "SELECT NAME FROM EMP"), ('success', "r1")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.client_registry import ClientRegistry, InstrumentedLock, format_lock_stats
+
+
+class DummyClient:
+    def __init__(self, client_id, display_name, session_token=None):
+        self.client_id = client_id
+        self.display_name = display_name
+        self.session_token = session_token
+        self.is_connected = True
+
+
+class TestClientRegistry(unittest.TestCase):
+    """Test registry client copy-on-write"""
+
+    def test_snapshot_is_immutable(self):
+        registry = ClientRegistry()
+        registry.add(DummyClient("c1", "Estate A"))
+        snapshot = registry.snapshot()
+
+        registry.add(DummyClient("c2", "Estate B"))
+        registry.remove("c1")
+
+        # Snapshot lama tidak berubah, snapshot baru mencerminkan perubahan
+        self.assertEqual(list(snapshot), ["c1"])
+        self.assertEqual(list(registry.snapshot()), ["c2"])
+        with self.assertRaises(TypeError):
+            snapshot["c3"] = DummyClient("c3", "Estate C")
+
+    def test_lookup(self):
+        registry = ClientRegistry()
+        registry.add(DummyClient("c1", "Estate A"))
+        offline = DummyClient("c2", "Estate B")
+        offline.is_connected = False
+        registry.add(offline)
+
+        self.assertEqual(len(registry), 2)
+        self.assertIn("c2", registry)
+        self.assertEqual(registry.find_by_name("Estate B"), offline)
+        self.assertIsNone(registry.find_by_name("Estate Z"))
+        self.assertEqual([client.client_id for client in registry.connected()], ["c1"])
+        self.assertIsNone(registry.remove("missing"))
+
+    def test_register_resume_or_create(self):
+        registry = ClientRegistry()
+        first, resumed = registry.register("c1", lambda existing: True,
+                                           lambda: DummyClient("c1", "Estate A", "token"))
+        self.assertFalse(resumed)
+
+        # Token cocok: entri lama dipakai ulang
+        same, resumed = registry.register("c1", lambda existing: existing.session_token == "token",
+                                          lambda: DummyClient("c1", "Estate A", "other"))
+        self.assertTrue(resumed)
+        self.assertIs(same, first)
+
+        # Token tidak cocok: entri baru menggantikan
+        replaced, resumed = registry.register("c1", lambda existing: False,
+                                              lambda: DummyClient("c1", "Estate A", "new"))
+        self.assertFalse(resumed)
+        self.assertIsNot(replaced, first)
+        self.assertIs(registry.get("c1"), replaced)
+
+    def test_clear_returns_clients(self):
+        registry = ClientRegistry()
+        registry.add(DummyClient("c1", "Estate A"))
+        registry.add(DummyClient("c2", "Estate B"))
+        cleared = registry.clear()
+        self.assertEqual(sorted(client.client_id for client in cleared), ["c1", "c2"])
+        self.assertEqual(len(registry), 0)
+
+
+class TestInstrumentedLock(unittest.TestCase):
+    """Test statistik contention lock"""
+
+    def test_contention_stats(self):
+        lock = InstrumentedLock("test", slow_hold=0.01)
+        holding = threading.Event()
+
+        def holder():
+            with lock:
+                holding.set()
+                time.sleep(0.05)
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        holding.wait()
+        with lock:
+            pass
+        thread.join()
+
+        stats = lock.stats(reset=True)
+        self.assertEqual(stats['acquisitions'], 2)
+        self.assertEqual(stats['contended'], 1)
+        self.assertGreater(stats['wait_max'], 0.02)
+        self.assertEqual(stats['slow_holds'], 1)
+        self.assertIn("test: 2 acquire, 1 menunggu", format_lock_stats(stats))
+
+        # Setelah reset statistik dimulai dari nol
+        self.assertEqual(lock.stats()['acquisitions'], 0)
+
+    def test_non_blocking_acquire(self):
+        lock = InstrumentedLock("test")
+        self.assertTrue(lock.acquire())
+        self.assertTrue(lock.locked())
+        self.assertFalse(lock.acquire(blocking=False))
+        lock.release()
+        self.assertFalse(lock.locked())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.client_view import ClientIndex, ALL_CLIENTS_LABEL
+
+
+class FakeClient:
+    def __init__(self, client_id, display_name, database, is_connected=True):
+        self.client_id = client_id
+        self.display_name = display_name
+        self.db_info = {'name': database}
+        self.is_connected = is_connected
+
+
+def make_clients(count):
+    return {f"id{i}": FakeClient(f"id{i}", f"Estate {i:03d}", f"PTRJ_E{i:03d}.FDB") for i in range(count)}
+
+
+class TestClientIndex(unittest.TestCase):
+    """Test index daftar client"""
+
+    def test_incremental_update(self):
+        index = ClientIndex()
+        clients = make_clients(300)
+        added, changed, removed = index.update(clients)
+        self.assertEqual((len(added), changed, removed), (300, [], []))
+
+        # Heartbeat tanpa perubahan: tidak ada baris yang disentuh
+        self.assertEqual(index.update(clients), ([], [], []))
+
+        clients['id7'].is_connected = False
+        clients['id8'].display_name = "Estate Baru"
+        del clients['id9']
+        clients['new'] = FakeClient('new', "Estate Z", "Z.FDB")
+        added, changed, removed = index.update(clients)
+        self.assertEqual(added, ['new'])
+        self.assertEqual(sorted(changed), ['id7', 'id8'])
+        self.assertEqual(removed, ['id9'])
+        self.assertEqual(index.rows['id7'].values, ("Estate 007", "Disconnected", "PTRJ_E007.FDB"))
+
+    def test_filter(self):
+        index = ClientIndex()
+        clients = make_clients(20)
+        clients['id3'].is_connected = False
+        index.update(clients)
+        self.assertEqual(len(index.filter("")), 20)
+        self.assertEqual(index.filter("E012.fdb"), ['id12'])
+        self.assertEqual(index.filter("disconnected"), ['id3'])
+        # "01" juga cocok dengan database PTRJ_E001.FDB milik id1
+        self.assertEqual(index.filter("estate 01 connected"), ['id1'] + [f"id{i}" for i in range(10, 20)])
+        self.assertEqual(index.filter("E00 connected"), [f"id{i}" for i in range(10) if i != 3])
+        # Urut nama
+        self.assertEqual(index.filter("estate")[:3], ['id0', 'id1', 'id2'])
+
+    def test_target_labels(self):
+        index = ClientIndex()
+        clients = {
+            'a': FakeClient('a', "Kebun (Lama)", "A.FDB"),
+            'b': FakeClient('b', "Kebun B", "B.FDB", is_connected=False),
+        }
+        index.update(clients)
+        labels = index.target_labels()
+        self.assertEqual(labels, [ALL_CLIENTS_LABEL, "Kebun (Lama) (a)"])
+        # Cache: list yang sama selama tidak ada perubahan
+        self.assertIs(index.target_labels(), labels)
+
+        # Nama dengan tanda kurung tetap dipetakan ke client_id yang benar
+        self.assertEqual(index.resolve_target("Kebun (Lama) (a)"), 'a')
+        self.assertIsNone(index.resolve_target(ALL_CLIENTS_LABEL))
+        self.assertEqual(index.resolve_target("b"), 'b')
+        self.assertEqual(index.resolve_target("Kebun B"), 'b')
+        with self.assertRaises(KeyError):
+            index.resolve_target("tidak ada")
+
+        clients['b'].is_connected = True
+        index.update(clients)
+        self.assertIsNot(index.target_labels(), labels)
+        self.assertIn("Kebun B (b)", index.target_labels())
+
+
+if __name__ == '__main__':
+    unittest.main()
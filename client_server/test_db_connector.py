@@ -8,6 +8,10 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from common.db_utils import FirebirdConnector
+from common.synthetic_db import resolve_test_database
+
+# Database snapshot di mesin developer; jika tidak ada dipakai dataset sintetis + fake isql
+DB_PATH = r"D:\Gawean Rebinmas\Monitoring Database\ifess\PTRJ_P1A_08042025\PTRJ_P1A.FDB"
 
 class TestFirebirdConnector(unittest.TestCase):
     """Test kelas FirebirdConnector"""
@@ -15,11 +19,12 @@ class TestFirebirdConnector(unittest.TestCase):
     def setUp(self):
         """Set up test case - inisialisasi koneksi database"""
         # Database path yang akan diuji
-        self.db_path = r"D:\Gawean Rebinmas\Monitoring Database\ifess\PTRJ_P1A_08042025\PTRJ_P1A.FDB"
+        self.db_path, self.isql_path = resolve_test_database(DB_PATH)
         
         # Buat instance FirebirdConnector
         try:
-            self.connector = FirebirdConnector(db_path=self.db_path, username='SYSDBA', password='masterkey')
+            self.connector = FirebirdConnector(db_path=self.db_path, username='SYSDBA', password='masterkey',
+                                               isql_path=self.isql_path)
             print(f"Connected to database: {self.db_path}")
         except Exception as e:
             self.fail(f"Setup failed: {e}")
@@ -101,11 +106,12 @@ class TestFirebirdConnector(unittest.TestCase):
 
 def run_direct_test():
     """Run test secara langsung tanpa unittest framework"""
-    db_path = r"D:\Gawean Rebinmas\Monitoring Database\ifess\PTRJ_P1A_08042025\PTRJ_P1A.FDB"
+    db_path, isql_path = resolve_test_database(DB_PATH)
     
     try:
         print(f"Creating FirebirdConnector with database: {db_path}")
-        connector = FirebirdConnector(db_path=db_path, username='SYSDBA', password='masterkey')
+        connector = FirebirdConnector(db_path=db_path, username='SYSDBA', password='masterkey',
+                                      isql_path=isql_path)
         
         print("Testing connection...")
         if connector.test_connection():
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.delta import DeltaTracker, DeltaCache, DeltaError, MODE_FULL, MODE_DELTA
+
+HEADERS = ["BLOCK", "TONNAGE"]
+
+
+def result_of(rows):
+    return [{'headers': list(HEADERS), 'rows': [dict(row) for row in rows]}]
+
+
+def row_values(result):
+    return [(row['BLOCK'], row['TONNAGE']) for row in result[0]['rows']]
+
+
+class TestDeltaTransfer(unittest.TestCase):
+    """Test transfer delta antara tracker client dan cache server"""
+
+    def setUp(self):
+        self.tracker = DeltaTracker()
+        self.cache = DeltaCache()
+
+    def transfer(self, rows, key="job:stock", key_columns=None):
+        """Satu run: client menyiapkan hasil, server menerapkannya"""
+        base = self.cache.base_hash("c1", key)
+        sent, info = self.tracker.prepare(key, base, result_of(rows), key_columns)
+        # Lewat JSON seperti pesan jaringan
+        sent, info = json.loads(json.dumps(sent)), json.loads(json.dumps(info))
+        full, sent_rows = self.cache.receive("c1", info, sent)
+        return info, full, sent_rows
+
+    def test_keyless_delta(self):
+        rows = [{"BLOCK": f"B{i:03d}", "TONNAGE": str(i)} for i in range(1000)]
+        info, full, sent_rows = self.transfer(rows)
+        self.assertEqual(info['mode'], MODE_FULL)
+        self.assertEqual(sent_rows, 1000)
+
+        # Satu baris berubah, satu dihapus, satu baru: hanya perubahan yang dikirim
+        rows[5] = {"BLOCK": "B005", "TONNAGE": "999"}
+        del rows[10]
+        rows.append({"BLOCK": "B999", "TONNAGE": "1"})
+        info, full, sent_rows = self.transfer(rows)
+        self.assertEqual(info['mode'], MODE_DELTA)
+        self.assertEqual(sent_rows, 2)
+        self.assertEqual(len(info['deleted']), 2)
+        self.assertEqual(row_values(full), row_values(result_of(rows)))
+
+        # Tidak ada perubahan: tidak ada baris yang dikirim
+        info, full, sent_rows = self.transfer(rows)
+        self.assertEqual((sent_rows, info['deleted']), (0, []))
+        self.assertEqual(info['order'], [[0, 1000]])
+        self.assertEqual(row_values(full), row_values(result_of(rows)))
+
+    def test_row_order_preserved(self):
+        rows = [{"BLOCK": name, "TONNAGE": "1"} for name in "ABCD"]
+        self.transfer(rows)
+        # Baris baru dan baris yang berubah di tengah hasil tetap pada posisinya
+        rows = [{"BLOCK": "A", "TONNAGE": "1"}, {"BLOCK": "X", "TONNAGE": "9"},
+                {"BLOCK": "C", "TONNAGE": "1"}, {"BLOCK": "B", "TONNAGE": "2"}, {"BLOCK": "D", "TONNAGE": "1"}]
+        info, full, sent_rows = self.transfer(rows)
+        self.assertEqual(info['mode'], MODE_DELTA)
+        self.assertEqual(sent_rows, 2)
+        self.assertEqual(row_values(full), row_values(result_of(rows)))
+
+        # Urutan berubah tanpa perubahan isi (ORDER BY nilai yang berubah)
+        info, full, sent_rows = self.transfer(rows[::-1])
+        self.assertEqual(sent_rows, 0)
+        self.assertEqual(row_values(full), row_values(result_of(rows[::-1])))
+
+        keyed = [{"BLOCK": name, "TONNAGE": "1"} for name in "ABCD"]
+        self.transfer(keyed, key="job:keyed", key_columns=["BLOCK"])
+        keyed = [{"BLOCK": "D", "TONNAGE": "1"}, {"BLOCK": "B", "TONNAGE": "7"}, {"BLOCK": "A", "TONNAGE": "1"}]
+        info, full, sent_rows = self.transfer(keyed, key="job:keyed", key_columns=["BLOCK"])
+        self.assertEqual((info['mode'], sent_rows), (MODE_DELTA, 1))
+        self.assertEqual(row_values(full), row_values(result_of(keyed)))
+
+    def test_duplicate_rows(self):
+        rows = [{"BLOCK": "A", "TONNAGE": "1"}] * 3
+        self.transfer(rows)
+        info, full, sent_rows = self.transfer(rows[:1] + [{"BLOCK": "B", "TONNAGE": "2"}])
+        self.assertEqual(info['mode'], MODE_DELTA)
+        self.assertEqual(len(info['deleted']), 2)
+        self.assertEqual(row_values(full), [("A", "1"), ("B", "2")])
+
+    def test_key_columns_update(self):
+        rows = [{"BLOCK": "A", "TONNAGE": "1"}, {"BLOCK": "B", "TONNAGE": "2"}]
+        self.transfer(rows, key_columns=["BLOCK"])
+        info, full, sent_rows = self.transfer([{"BLOCK": "A", "TONNAGE": "5"}], key_columns=["BLOCK"])
+        # Baris A dikirim sebagai update, B dihapus
+        self.assertEqual(sent_rows, 1)
+        self.assertEqual(len(info['deleted']), 1)
+        self.assertEqual(row_values(full), [("A", "5")])
+
+        # Kunci tidak unik: kembali ke identitas isi baris, dikirim penuh
+        info, full, _ = self.transfer([{"BLOCK": "A", "TONNAGE": "5"}, {"BLOCK": "A", "TONNAGE": "6"}],
+                                      key_columns=["BLOCK"])
+        self.assertEqual(info['mode'], MODE_FULL)
+        self.assertIsNone(info['key_columns'])
+
+    def test_base_mismatch(self):
+        rows = [{"BLOCK": "A", "TONNAGE": "1"}]
+        self.transfer(rows)
+        base = self.cache.base_hash("c1", "job:stock")
+        sent, info = self.tracker.prepare("job:stock", base, result_of(rows + [{"BLOCK": "B", "TONNAGE": "2"}]))
+        self.assertEqual(info['mode'], MODE_DELTA)
+
+        # Server kehilangan salinannya (misalnya restart): delta ditolak
+        self.cache.discard("c1", "job:stock")
+        with self.assertRaises(DeltaError):
+            self.cache.receive("c1", info, sent)
+
+        # Permintaan ulang tanpa base menghasilkan hasil penuh
+        info, full, sent_rows = self.transfer(rows)
+        self.assertEqual(info['mode'], MODE_FULL)
+        self.assertEqual(sent_rows, 1)
+
+    def test_header_change_and_multiple_sets(self):
+        self.transfer([{"BLOCK": "A", "TONNAGE": "1"}])
+        base = self.cache.base_hash("c1", "job:stock")
+        sent, info = self.tracker.prepare("job:stock", base, [{'headers': ["BLOCK"], 'rows': [{"BLOCK": "A"}]}])
+        self.assertEqual(info['mode'], MODE_FULL)
+
+        result = result_of([]) * 2
+        sent, info = self.tracker.prepare("job:stock", base, result)
+        self.assertIs(sent, result)
+        self.assertIsNone(info)
+
+    def test_full_hash_mismatch_not_cached(self):
+        sent, info = self.tracker.prepare("job:stock", None, result_of([{"BLOCK": "A", "TONNAGE": "1"}]))
+        info['hash'] = "0" * 32
+        full, _ = self.cache.receive("c1", info, sent)
+        self.assertEqual(full, sent)
+        self.assertIsNone(self.cache.base_hash("c1", "job:stock"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import math
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.downsample import lttb, plot_coords
+
+
+class TestLttb(unittest.TestCase):
+    """Test downsampling LTTB"""
+
+    def test_keeps_endpoints_and_size(self):
+        points = [(i, math.sin(i / 50.0)) for i in range(10000)]
+        sampled = lttb(points, 200)
+        self.assertEqual(len(sampled), 200)
+        self.assertEqual(sampled[0], points[0])
+        self.assertEqual(sampled[-1], points[-1])
+        xs = [x for x, _ in sampled]
+        self.assertEqual(xs, sorted(xs))
+
+    def test_preserves_spike(self):
+        points = [(i, 0.0) for i in range(5000)]
+        points[2345] = (2345, 100.0)
+        points[4000] = (4000, -50.0)
+        sampled = lttb(points, 50)
+        self.assertIn((2345, 100.0), sampled)
+        self.assertIn((4000, -50.0), sampled)
+
+    def test_small_input_unchanged(self):
+        points = [(0, 1), (1, 2), (2, 3)]
+        self.assertEqual(lttb(points, 10), points)
+        self.assertEqual(lttb(points, 2), points)
+        self.assertEqual(lttb([], 10), [])
+
+
+class TestPlotCoords(unittest.TestCase):
+    """Test konversi titik ke koordinat canvas"""
+
+    def test_scaling(self):
+        coords = plot_coords([(0, 0), (10, 5)], (0, 10), (0, 5), 120, 70, margin=10)
+        self.assertEqual(coords, [10, 60, 110, 10])
+
+
+if __name__ == '__main__':
+    unittest.main()
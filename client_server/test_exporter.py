@@ -0,0 +1,135 @@
+import os
+import sys
+import csv
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.exporter import (export_rows, source_chunks, remote_chunks, format_for, ExportCancelled,
+                             XlsxWriter)
+from common.virtual_grid import ListSource, MergedSource
+from common.merged_result import MergedResult
+from common.remote_cursor import RemoteCursor
+
+NS = {'s': "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+ROWS = [{'KODE': "001", 'NAMA': 'Budi, "Kepala"', 'QTY': "12.5"},
+        {'KODE': "002", 'NAMA': "Baris\nbaru", 'QTY': None},
+        {'KODE': "003", 'NAMA': "<&>", 'QTY': "-3"}]
+
+
+def read_sheet(path, number=1):
+    with zipfile.ZipFile(path) as archive:
+        root = ET.fromstring(archive.read(f"xl/worksheets/sheet{number}.xml"))
+    rows = []
+    for row in root.iter(f"{{{NS['s']}}}row"):
+        values = []
+        for cell in row:
+            text = cell.find('s:v', NS)
+            inline = cell.find('s:is/s:t', NS)
+            values.append(text.text if text is not None else inline.text if inline is not None else None)
+        rows.append(values)
+    return rows
+
+
+class TestExporter(unittest.TestCase):
+    """Test export streaming"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.temp_dir, name)
+
+    def test_format_for(self):
+        self.assertEqual(format_for("a.CSV"), 'csv')
+        self.assertEqual(format_for("a.jsonl"), 'jsonl')
+        self.assertEqual(format_for("a.xlsx"), 'xlsx')
+        self.assertEqual(format_for("a.txt"), 'csv')
+
+    def test_csv_quoting_and_order(self):
+        source = ListSource(['KODE', 'NAMA', 'QTY'], ROWS)
+        source.set_order([2, 0, 1])
+        path = self.path("out.csv")
+        progress = []
+        written = export_rows(path, 'csv', source.headers, source_chunks(source, chunk_rows=2), progress.append)
+        self.assertEqual(written, 3)
+        self.assertEqual(progress, [2, 3])
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['KODE', 'NAMA', 'QTY'])
+        self.assertEqual(rows[1], ['003', '<&>', '-3'])
+        self.assertEqual(rows[2], ['001', 'Budi, "Kepala"', '12.5'])
+        self.assertEqual(rows[3], ['002', 'Baris\nbaru', ''])
+        self.assertFalse(os.path.exists(path + ".part"))
+
+    def test_jsonl_merged(self):
+        merged = MergedResult("SELECT")
+        merged.append("Estate A", ['KODE'], [{'KODE': "1"}])
+        merged.append("Estate B", ['KODE'], [{'KODE': "2"}])
+        source = MergedSource(merged, merged.view())
+        path = self.path("out.jsonl")
+        export_rows(path, 'jsonl', merged.columns, source_chunks(source))
+        with open(path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines, [{'CLIENT': "Estate A", 'KODE': "1"}, {'CLIENT': "Estate B", 'KODE': "2"}])
+
+    def test_xlsx(self):
+        source = ListSource(['KODE', 'NAMA', 'QTY'], ROWS)
+        path = self.path("out.xlsx")
+        export_rows(path, 'xlsx', source.headers, source_chunks(source))
+        rows = read_sheet(path)
+        self.assertEqual(rows[0], ['KODE', 'NAMA', 'QTY'])
+        # Kode dengan nol di depan tetap teks, angka menjadi angka
+        self.assertEqual(rows[1], ['001', 'Budi, "Kepala"', '12.5'])
+        self.assertEqual(rows[3], ['003', '<&>', '-3'])
+        with zipfile.ZipFile(path) as archive:
+            self.assertIn("xl/workbook.xml", archive.namelist())
+
+    def test_xlsx_rolls_over_to_new_sheet(self):
+        path = self.path("big.xlsx")
+        writer = XlsxWriter(path, ['N'], max_rows=4)
+        writer.write_rows([(i,) for i in range(7)])
+        writer.close()
+        self.assertEqual(read_sheet(path, 1), [['N'], ['0'], ['1'], ['2']])
+        self.assertEqual(read_sheet(path, 2), [['N'], ['3'], ['4'], ['5']])
+        self.assertEqual(read_sheet(path, 3), [['N'], ['6']])
+
+    def test_cancel_removes_partial_file(self):
+        cancel = threading.Event()
+        path = self.path("cancel.csv")
+
+        def chunks():
+            yield [("1",)]
+            cancel.set()
+            yield [("2",)]
+
+        with self.assertRaises(ExportCancelled):
+            export_rows(path, 'csv', ['N'], chunks(), cancel=cancel)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(path + ".part"))
+
+    def test_remote_chunks(self):
+        def request_page(cursor_id, page):
+            # Client menjawab dari thread lain
+            rows = [{'ID': page * 2 + i} for i in range(2)] if page < 2 else [{'ID': 4}]
+            threading.Timer(0.01, cursor.add_page, (page, ['ID'], rows, page < 2)).start()
+            return True
+
+        cursor = RemoteCursor("c1", "client", "SELECT", request_page, page_size=2, prefetch=0)
+        chunks = list(remote_chunks(cursor, ['ID'], timeout=5))
+        self.assertEqual(chunks, [[(0,), (1,)], [(2,), (3,)], [(4,)]])
+
+
+if __name__ == '__main__':
+    unittest.main()
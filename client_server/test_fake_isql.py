@@ -0,0 +1,63 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.db_utils import FirebirdConnector
+from common.synthetic_db import create_dataset, FAKE_ISQL_PATH
+
+
+class TestFakeIsql(unittest.TestCase):
+    """Test fake isql melalui FirebirdConnector"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "SYNTH.FDB")
+        create_dataset(self.db_path, rows=2500, tables=["FFBLOADINGCROP01", "FFBLOADINGCROP02"])
+        self.connector = FirebirdConnector(db_path=self.db_path, isql_path=FAKE_ISQL_PATH)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_get_tables(self):
+        self.assertEqual(self.connector.get_tables(), ["FFBLOADINGCROP01", "FFBLOADINGCROP02"])
+
+    def test_get_plan(self):
+        self.assertEqual(self.connector.get_plan("SELECT * FROM FFBLOADINGCROP01 F ORDER BY TRANSDATE"),
+                         ["PLAN SORT (F NATURAL)"])
+        self.assertEqual(self.connector.get_plan("SELECT * FROM FFBLOADINGCROP01 WHERE ID = 5"),
+                         ["PLAN (FFBLOADINGCROP01 INDEX (RDB$PRIMARY1))"])
+        with self.assertRaises(Exception):
+            self.connector.get_plan("SELECT * FROM TIDAK_ADA")
+
+    def test_first_skip_order(self):
+        result = self.connector.execute_query(
+            "SELECT FIRST 5 SKIP 10 ID, TRANSDATE FROM FFBLOADINGCROP01 ORDER BY ID DESC")
+        rows = result[0]["rows"]
+        self.assertEqual([row["ID"] for row in rows], ["2490", "2489", "2488", "2487", "2486"])
+
+    def test_aggregate_group_by(self):
+        result = self.connector.execute_query(
+            "SELECT TRANSDATE, COUNT(*) AS TOTAL FROM FFBLOADINGCROP02 GROUP BY TRANSDATE ORDER BY TRANSDATE")
+        rows = result[0]["rows"]
+        self.assertEqual(result[0]["headers"], ["TRANSDATE", "TOTAL"])
+        self.assertEqual(rows[0], {"TRANSDATE": "2025-01-01", "TOTAL": "400"})
+        self.assertEqual(sum(int(row["TOTAL"]) for row in rows), 2500)
+
+    def test_deterministic_rows(self):
+        query = "SELECT * FROM FFBLOADINGCROP02 WHERE ID BETWEEN 100 AND 110"
+        self.assertEqual(self.connector.execute_query(query), self.connector.execute_query(query))
+
+    def test_unknown_table(self):
+        with self.assertRaises(Exception) as ctx:
+            self.connector.execute_query("SELECT * FROM NOT_A_TABLE")
+        self.assertIn("Error executing query", str(ctx.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.merged_result import MergedResult, CLIENT_COLUMN
+from common.result_store import ResultStore
+
+
+class TestMergedResult(unittest.TestCase):
+    """Test hasil gabungan lintas client"""
+
+    def setUp(self):
+        self.merged = MergedResult("SELECT DIVISION, TONNAGE FROM T")
+        self.merged.append("Estate A", ["DIVISION", "TONNAGE"],
+                           [{"DIVISION": "D1", "TONNAGE": "10.5"}, {"DIVISION": "D2", "TONNAGE": "2"}])
+        self.merged.append("Estate B", ["DIVISION", "TONNAGE", "NOTE"],
+                           [{"DIVISION": "D1", "TONNAGE": "100", "NOTE": "late"}])
+
+    def test_columns_and_rows(self):
+        self.assertEqual(self.merged.columns, [CLIENT_COLUMN, "DIVISION", "TONNAGE", "NOTE"])
+        self.assertEqual(len(self.merged), 3)
+        # Kolom yang baru muncul diisi None untuk baris lama
+        self.assertEqual(self.merged.row(0), ("Estate A", "D1", "10.5", None))
+        self.assertEqual(self.merged.row(2), ("Estate B", "D1", "100", "late"))
+        self.assertEqual(self.merged.client_counts(), {"Estate A": 2, "Estate B": 1})
+
+    def test_typed_sort(self):
+        # Sort numerik, bukan leksikografis ("100" > "2")
+        self.assertEqual(self.merged.view(sort_column="TONNAGE"), [1, 0, 2])
+        self.assertEqual(self.merged.view(sort_column="TONNAGE", descending=True), [2, 0, 1])
+
+    def test_filter_and_totals(self):
+        view = self.merged.view(filter_text="d1")
+        self.assertEqual(view, [0, 2])
+        self.assertEqual(self.merged.view(filter_text="estate b", filter_column=CLIENT_COLUMN), [2])
+        self.assertEqual(self.merged.totals(view), {"TONNAGE": 110.5})
+        self.assertEqual(self.merged.totals(), {"TONNAGE": 112.5})
+
+    def test_replace(self):
+        version = self.merged.version
+        self.merged.replace("Semua (2 client)", ["TONNAGE"], [{"TONNAGE": 112.5}])
+        self.assertEqual(self.merged.columns, [CLIENT_COLUMN, "TONNAGE"])
+        self.assertEqual(self.merged.row(0), ("Semua (2 client)", 112.5))
+        self.assertGreater(self.merged.version, version)
+
+    def test_max_rows(self):
+        merged = MergedResult("SELECT 1", max_rows=3)
+        self.assertEqual(merged.append("A", ["X"], [{"X": 1}, {"X": 2}]), 2)
+        self.assertEqual(merged.append("B", ["X"], [{"X": 3}, {"X": 4}]), 1)
+        self.assertTrue(merged.truncated)
+        self.assertEqual(len(merged), 3)
+
+    def test_replace_client(self):
+        version = self.merged.version
+        self.merged.replace_client("Estate A", ["DIVISION", "TONNAGE"], [{"DIVISION": "D9", "TONNAGE": "1"}])
+        self.assertEqual(self.merged.client_counts(), {"Estate B": 1, "Estate A": 1})
+        self.assertEqual(self.merged.row(0), ("Estate B", "D1", "100", "late"))
+        self.assertEqual(self.merged.row(1), ("Estate A", "D9", "1", None))
+        self.assertGreater(self.merged.version, version)
+
+        # Hasil kosong menghapus baris client tersebut
+        self.merged.replace_client("Estate B", ["DIVISION", "TONNAGE"], [])
+        self.assertEqual(len(self.merged), 1)
+        # View lama yang masih ditampilkan selama view baru dihitung: baris yang hilang menjadi placeholder
+        self.assertEqual(self.merged.rows([0, 1]), [("Estate A", "D9", "1", None), None])
+
+
+    def test_rows_in_result_store(self):
+        # Baris gabungan ikut budget ResultStore: dengan budget kecil segmen di-spill ke SQLite
+        store = ResultStore(budget_bytes=0)
+        merged = MergedResult("SELECT KODE, QTY FROM T", store=store)
+        for client in range(3):
+            merged.append(f"Estate {client}", ["KODE", "QTY"],
+                          [{"KODE": f"K{client}-{i}", "QTY": str(i)} for i in range(2000)])
+        self.assertEqual(store.stats()['results'], 3)
+        self.assertEqual(store.stats()['spilled'], 3)
+
+        self.assertEqual(len(merged), 6000)
+        self.assertEqual(merged.row(2001), ("Estate 1", "K1-1", "1"))
+        self.assertEqual(merged.rows([5999, 0]), [("Estate 2", "K2-1999", "1999"), ("Estate 0", "K0-0", "0")])
+        view = merged.view(filter_text="k1-", sort_column="QTY", descending=True)
+        self.assertEqual(view[:2], [3999, 3998])
+        self.assertEqual(merged.totals(view), {"QTY": sum(range(2000))})
+
+        # Tab ditutup: semua segmen dilepas dari store
+        merged.release()
+        self.assertEqual(store.stats()['results'], 0)
+        self.assertEqual(merged.append("Estate 3", ["KODE"], [{"KODE": "X"}]), 0)
+        self.assertEqual(store.stats()['results'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
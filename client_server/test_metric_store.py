@@ -0,0 +1,111 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.metric_store import MetricStore, extract_metrics, RESOLUTION_RAW
+
+DAY = 86400
+
+
+class TestExtractMetrics(unittest.TestCase):
+    """Test pengambilan metrik dari hasil query"""
+
+    def test_rows_and_numeric_columns(self):
+        result = [{'headers': ['ESTATE', 'TONNAGE', 'CODE'],
+                   'rows': [{'ESTATE': 'PGE', 'TONNAGE': '12.50', 'CODE': 'A1'},
+                            {'ESTATE': 'PGE', 'TONNAGE': '<null>', 'CODE': 'B2'},
+                            {'ESTATE': 'PGE', 'TONNAGE': '7.5', 'CODE': 'C3'}]}]
+        metrics = extract_metrics('panen', result)
+        self.assertEqual(metrics, {'panen.rows': 3.0, 'panen.TONNAGE': 20.0})
+
+    def test_empty_result(self):
+        self.assertEqual(extract_metrics('job', []), {})
+        self.assertEqual(extract_metrics('job', [{'headers': ['A'], 'rows': []}]), {'job.rows': 0.0})
+
+
+class TestMetricStore(unittest.TestCase):
+    """Test penyimpanan, rollup, query rentang dan retensi"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "metrics", "metrics.sqlite")
+        self.store = MetricStore(self.path, raw_days=2, batch_size=100)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_wal_and_batching(self):
+        mode = self.store._db.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), 'wal')
+
+        self.store.record('PGE', {'job.rows': 1}, ts=1000)
+        # Masih di buffer sampai batch penuh
+        self.assertEqual(self.store._db.execute("SELECT COUNT(*) FROM points").fetchone()[0], 0)
+        for i in range(60):
+            self.store.record('PGE', {'job.rows': i, 'job.TONNAGE': i * 2}, ts=1000 + i)
+        # Batch penuh (100 titik) ditulis sekaligus, sisanya menunggu flush berikutnya
+        self.assertEqual(self.store._db.execute("SELECT COUNT(*) FROM points").fetchone()[0], 101)
+        self.store.flush()
+        self.assertEqual(self.store._db.execute("SELECT COUNT(*) FROM points").fetchone()[0], 121)
+
+    def test_rollups(self):
+        base = 1_700_000_000 - 1_700_000_000 % DAY
+        for i in range(180):  # satu titik per menit selama 3 jam
+            self.store.record('PGE', {'job.rows': i}, ts=base + i * 60)
+        self.store.record('KTE', {'job.rows': 1000}, ts=base)
+
+        resolution, points = self.store.query('PGE', 'job.rows', base, base + 3 * 3600, resolution='hour')
+        self.assertEqual(resolution, 'hour')
+        self.assertEqual([point[0] for point in points], [base, base + 3600, base + 7200])
+        ts, average, minimum, maximum, count = points[1]
+        self.assertEqual((minimum, maximum, count), (60, 119, 60))
+        self.assertAlmostEqual(average, 89.5)
+
+        _, days = self.store.query('PGE', 'job.rows', base, base + DAY, resolution='day')
+        self.assertEqual(days, [(base, 89.5, 0, 179, 180)])
+
+        _, raw = self.store.query('PGE', 'job.rows', base + 60, base + 180, resolution=RESOLUTION_RAW)
+        self.assertEqual([point[1] for point in raw], [1, 2, 3])
+        self.assertEqual(self.store.query('PGE', 'unknown', base, base + DAY, resolution='day'), ('day', []))
+
+    def test_series_and_persistence(self):
+        self.store.record('PGE', {'job.rows': 5}, ts=2000)
+        self.store.record('PGE', {'job.rows': 7}, ts=3000)
+        self.store.record('PGE', {'job.rows': 6}, ts=2500)
+        self.store.close()
+
+        self.store = MetricStore(self.path)
+        series = self.store.series()
+        self.assertEqual(len(series), 1)
+        self.assertEqual((series[0]['first_ts'], series[0]['last_ts'], series[0]['last_value']), (2000, 3000, 7))
+        self.store.record('PGE', {'job.rows': 9}, ts=4000)
+        _, points = self.store.query('PGE', 'job.rows', 0, 5000, resolution=RESOLUTION_RAW)
+        self.assertEqual(len(points), 4)
+
+    def test_choose_resolution(self):
+        now = 100 * DAY
+        self.assertEqual(self.store.choose_resolution(now - 3600, now, now=now), RESOLUTION_RAW)
+        self.assertEqual(self.store.choose_resolution(now - 5 * DAY, now, now=now), 'hour')
+        self.assertEqual(self.store.choose_resolution(now - 90 * DAY, now, now=now), 'day')
+
+    def test_prune(self):
+        now = 100 * DAY
+        self.store.record('PGE', {'job.rows': 1}, ts=now - 10 * DAY)
+        self.store.record('PGE', {'job.rows': 2}, ts=now - 3600)
+        self.store.prune(now)
+        _, raw = self.store.query('PGE', 'job.rows', 0, now, resolution=RESOLUTION_RAW)
+        self.assertEqual([point[1] for point in raw], [2])
+        # Rollup harian tetap ada setelah titik mentah dibuang
+        _, days = self.store.query('PGE', 'job.rows', 0, now, resolution='day')
+        self.assertEqual(len(days), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
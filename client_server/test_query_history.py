@@ -0,0 +1,99 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.query_history import QueryHistory, fts_query, format_size, STATUS_RUNNING, STATUS_SUCCESS, STATUS_ERROR
+
+
+class TestQueryHistory(unittest.TestCase):
+    """Test history query persisten"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "history", "history.sqlite")
+        self.history = QueryHistory(self.path)
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_lifecycle_by_request_id(self):
+        request_id = self.history.add("SELECT * FROM EMP", "Estate A", request_id="r1", ts=100.0)
+        self.assertEqual(request_id, "r1")
+        self.assertEqual(self.history.get("r1")['status'], STATUS_RUNNING)
+
+        self.history.add_stats("r1", rows=10, size=2048)
+        self.history.add_stats("r1", rows=5, size=1024)
+        self.history.finish("r1", STATUS_SUCCESS, duration=1.5)
+        entry = self.history.get("r1")
+        self.assertEqual((entry['status'], entry['duration'], entry['rows'], entry['bytes']),
+                         (STATUS_SUCCESS, 1.5, 15, 3072))
+
+        # Request_id yang sama tidak menggandakan entri
+        self.history.add("SELECT * FROM EMP", "Estate A", request_id="r1", ts=101.0)
+        self.assertEqual(len(self.history), 1)
+        self.assertIsNone(self.history.get("tidak-ada"))
+
+    def test_persists_across_restart(self):
+        self.history.add("SELECT 1 FROM RDB$DATABASE", "ALL", request_id="r1")
+        self.history.finish("r1", STATUS_ERROR, error="koneksi putus")
+        self.history.close()
+
+        self.history = QueryHistory(self.path)
+        self.assertEqual(len(self.history), 1)
+        entry = self.history.get("r1")
+        self.assertEqual((entry['status'], entry['error']), (STATUS_ERROR, "koneksi putus"))
+
+    def test_search_filters(self):
+        self.history.add("SELECT NAMA FROM EMPLOYEE", "Estate A", request_id="r1", ts=100.0)
+        self.history.add("SELECT * FROM GWSCANNERDATA07", "Estate B", request_id="r2", ts=200.0)
+        self.history.add("UPDATE EMPLOYEE SET X = 1", "Estate B", request_id="r3", ts=300.0)
+        self.history.finish("r3", STATUS_ERROR)
+
+        ids = lambda entries: [entry['request_id'] for entry in entries]
+        self.assertEqual(ids(self.history.search()), ["r3", "r2", "r1"])
+        self.assertEqual(ids(self.history.search("employee")), ["r3", "r1"])
+        self.assertEqual(ids(self.history.search("GWSCANNER")), ["r2"])  # prefix
+        self.assertEqual(ids(self.history.search("employee nama")), ["r1"])
+        self.assertEqual(ids(self.history.search(target="Estate B")), ["r3", "r2"])
+        self.assertEqual(ids(self.history.search(status=STATUS_ERROR)), ["r3"])
+        self.assertEqual(ids(self.history.search(since=150.0, until=250.0)), ["r2"])
+        self.assertEqual(ids(self.history.search(limit=1)), ["r3"])
+        self.assertEqual(ids(self.history.search('"quote')), [])
+        self.assertEqual(self.history.targets(), ["Estate A", "Estate B"])
+
+    def test_like_fallback(self):
+        self.history.fts = False
+        self.history.add("SELECT KODE_50 FROM T", "A", request_id="r1")
+        self.history.add("SELECT KODE50 FROM T", "A", request_id="r2")
+        self.assertEqual([entry['request_id'] for entry in self.history.search("kode_")], ["r1"])
+
+    def test_prune_and_clear(self):
+        history = QueryHistory(":memory:", max_entries=3)
+        for i in range(5):
+            history.add(f"SELECT {i}", "A", request_id=f"r{i}", ts=float(i))
+        self.assertEqual(len(history), 3)
+        self.assertEqual([entry['request_id'] for entry in history.search()], ["r4", "r3", "r2"])
+        self.assertEqual(history.search("0"), [])
+        history.clear()
+        self.assertEqual(len(history), 0)
+        history.close()
+
+    def test_fts_query(self):
+        self.assertEqual(fts_query('emp "x'), '"emp"* """x"*')
+
+    def test_format_size(self):
+        self.assertEqual(format_size(0), "")
+        self.assertEqual(format_size(512), "512 B")
+        self.assertEqual(format_size(1536), "1.5 KB")
+        self.assertEqual(format_size(3 * 1024 ** 3), "3.0 GB")
+
+
+if __name__ == '__main__':
+    unittest.main()
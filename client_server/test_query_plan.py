@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.sql_analyzer import analyze
+from common.query_plan import (PlanCache, parse_plan, plan_result, plan_rows, normalize_query,
+                               natural_scans, large_scans, PlanScan)
+
+
+class TestQueryPlan(unittest.TestCase):
+    """Test pre-flight plan query Firebird"""
+
+    def test_parse_plan(self):
+        output = ("Database:  localhost:C:/DB/X.FDB, User: SYSDBA\n\n"
+                  "PLAN JOIN (E NATURAL, D INDEX (RDB$PRIMARY1))\n\nPLAN (T ORDER IDX_T)\n")
+        plans = parse_plan(output)
+        self.assertEqual(plans, ["PLAN JOIN (E NATURAL, D INDEX (RDB$PRIMARY1))", "PLAN (T ORDER IDX_T)"])
+        self.assertEqual(plan_rows(plan_result(plans)), plans)
+
+    def test_natural_scans(self):
+        analysis = analyze("SELECT * FROM EMPLOYEE E JOIN DEPT D ON D.ID = E.DEPT_ID ORDER BY E.NAMA")
+        counts = {'EMPLOYEE': 250000, 'DEPT': 40}
+        scans = natural_scans(["PLAN SORT (JOIN (E NATURAL, D INDEX (RDB$PRIMARY1, IDX_X)))",
+                               'PLAN (V "Mixed" NATURAL)'], analysis, counts.get)
+        self.assertEqual(scans, [PlanScan('EMPLOYEE', 'E', 250000, True), PlanScan('Mixed', 'V Mixed', None, False)])
+
+    def test_large_scans(self):
+        scans = [PlanScan('BIG', 'BIG', 500000, False), PlanScan('SMALL', 'SMALL', 10, False),
+                 PlanScan('UNKNOWN', 'UNKNOWN', None, False), PlanScan('SORTED', 'SORTED', 500000, True)]
+        self.assertEqual([scan.table for scan in large_scans(scans, 100000)], ['BIG', 'SORTED'])
+        # FIRST/ROWS tanpa SORT berhenti lebih awal
+        self.assertEqual([scan.table for scan in large_scans(scans, 100000, has_row_limit=True)], ['SORTED'])
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("select  *\n from emp -- komentar\n where a = 'x';"),
+                         "SELECT * FROM EMP WHERE A = 'x'")
+
+    def test_cache(self):
+        cache = PlanCache(max_entries=2)
+        cache.put("h1", "SELECT * FROM EMP", ["PLAN (EMP NATURAL)"])
+        self.assertEqual(cache.get("h1", "select *  from emp;"), ("PLAN (EMP NATURAL)",))
+        self.assertIsNone(cache.get("h2", "SELECT * FROM EMP"))  # Schema lain
+        cache.put(None, "SELECT 1 FROM RDB$DATABASE", ["PLAN (RDB$DATABASE NATURAL)"])
+        self.assertIsNone(cache.get(None, "SELECT 1 FROM RDB$DATABASE"))
+        cache.put("h1", "SELECT A FROM T", [])
+        cache.put("h1", "SELECT B FROM T", [])
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("h1", "SELECT * FROM EMP"))  # Entri terlama dibuang
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.query_run import QueryRun, dispatch, send_to_client, STATUS_PENDING, STATUS_SENT, STATUS_DONE, STATUS_ERROR, STATUS_TIMEOUT
+
+
+class TestQueryRun(unittest.TestCase):
+    """Test fan-out query ke banyak client"""
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=8)
+        self.targets = [(f"c{i}", f"Estate {i}") for i in range(5)]
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def test_stuck_client_does_not_block_others(self):
+        release = threading.Event()
+
+        def send(client_id, timeout):
+            if client_id == "c0":
+                release.wait(timeout)
+                raise TimeoutError("socket macet")
+            return f"req-{client_id}"
+
+        run = QueryRun("SELECT 1 FROM RDB$DATABASE", self.targets, send_timeout=0.5)
+        start = time.time()
+        dispatch(run, send, self.executor)
+        self.assertLess(time.time() - start, 1.5)
+
+        counts = run.counts()
+        self.assertEqual(counts[STATUS_SENT], 4)
+        self.assertEqual(counts[STATUS_ERROR], 1)
+        self.assertEqual(run.clients["c1"].request_id, "req-c1")
+
+    def test_progress_and_partial_results(self):
+        updates = []
+        run = QueryRun("SELECT 1", self.targets, on_update=lambda r: updates.append(r.progress()))
+        dispatch(run, lambda client_id, timeout: client_id, self.executor)
+
+        run.add_result("c1", [{'headers': ['A'], 'rows': [{'A': 1}]}])
+        run.add_error("c2", "table unknown")
+        self.assertEqual(run.progress(), (2, 5))
+        self.assertEqual(run.progress_label(), "2 dari 5 client (1 error)")
+        self.assertEqual(list(run.results()), ["c1"])
+        self.assertFalse(run.finished)
+        self.assertEqual(updates[-1], (2, 5))
+
+        # Status final tidak berubah oleh hasil duplikat
+        self.assertFalse(run.add_result("c2", []))
+        self.assertEqual(run.clients["c2"].status, STATUS_ERROR)
+
+    def test_results_kept_only_for_aggregate_runs(self):
+        result = [{'headers': ['A'], 'rows': [{'A': 1}, {'A': 2}]}]
+        run = QueryRun("SELECT A FROM T", self.targets)
+        run.add_result("c0", result)
+        run.add_result("c1", rows=7)
+        # Run biasa hanya mencatat jumlah baris; baris ada di ResultStore/cursor
+        self.assertEqual((run.clients["c0"].rows, run.clients["c1"].rows), (2, 7))
+        self.assertEqual(run.results(), {"c0": None, "c1": None})
+
+        aggregate = QueryRun("SELECT COUNT(*) FROM T", self.targets, keep_results=True)
+        aggregate.add_result("c0", result)
+        self.assertEqual(aggregate.results(), {"c0": result})
+
+    def test_deadline(self):
+        run = QueryRun("SELECT 1", self.targets, response_timeout=10)
+        dispatch(run, lambda client_id, timeout: client_id, self.executor)
+        for client_id in ("c0", "c1", "c2"):
+            run.add_result(client_id, [])
+
+        expired = run.expire(now=time.time() + 11)
+        self.assertEqual(sorted(entry.client_id for entry in expired), ["c3", "c4"])
+        self.assertTrue(run.finished)
+        self.assertEqual(run.clients["c3"].status, STATUS_TIMEOUT)
+        self.assertEqual(run.clients["c0"].status, STATUS_DONE)
+        self.assertEqual(run.progress_label(), "5 dari 5 client (2 timeout)")
+
+    def test_add_target_to_finished_run(self):
+        run = QueryRun("SELECT 1", self.targets[:1])
+        send_to_client(run, lambda client_id, timeout: "req-1", "c0")
+        run.add_result("c0", [])
+        self.assertTrue(run.finished)
+
+        # Client catch-up membuat run berjalan lagi sampai client tersebut menjawab
+        self.assertTrue(run.add_target("c9", "Estate 9"))
+        self.assertFalse(run.add_target("c9", "Estate 9"))
+        self.assertEqual(run.clients["c9"].status, STATUS_PENDING)
+        self.assertEqual(run.progress_label(), "1 dari 2 client")
+        send_to_client(run, lambda client_id, timeout: "req-9", "c9")
+        self.assertEqual(run.clients["c9"].request_id, "req-9")
+        run.add_result("c9", [])
+        self.assertTrue(run.finished)
+
+
+if __name__ == '__main__':
+    unittest.main()
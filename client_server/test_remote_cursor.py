@@ -0,0 +1,143 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.db_utils import FirebirdConnector
+from common.remote_cursor import add_page_window, ClientCursor, CursorRegistry, CursorError, RemoteCursor
+from common.synthetic_db import create_dataset, FAKE_ISQL_PATH
+
+
+class TestPageWindow(unittest.TestCase):
+    """Test penambahan FIRST/SKIP ke query"""
+
+    def test_add_window(self):
+        self.assertEqual(add_page_window("SELECT * FROM T;", 101, 200), "SELECT FIRST 101 SKIP 200 * FROM T")
+        self.assertEqual(add_page_window("select distinct A from T", 11, 0), "SELECT FIRST 11 SKIP 0 distinct A from T")
+
+    def test_no_window(self):
+        self.assertIsNone(add_page_window("SELECT FIRST 10 * FROM T", 11, 0))
+        self.assertIsNone(add_page_window("SELECT A FROM T UNION SELECT A FROM U", 11, 0))
+        self.assertIsNone(add_page_window("SELECT 1 FROM T; SELECT 2 FROM T", 11, 0))
+        self.assertIsNone(add_page_window("UPDATE T SET A = 1", 11, 0))
+
+
+class TestClientCursor(unittest.TestCase):
+    """Test cursor client terhadap fake isql"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(self.temp_dir, "SYNTH.FDB")
+        create_dataset(db_path, rows=250)
+        self.connector = FirebirdConnector(db_path=db_path, isql_path=FAKE_ISQL_PATH)
+        self.executed = []
+        self.registry = CursorRegistry(ttl=60)
+
+    def tearDown(self):
+        self.registry.close_all()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def execute(self, query):
+        self.executed.append(query)
+        return self.connector.execute_query(query)
+
+    def test_windowed_pages(self):
+        cursor = self.registry.open("c1", "SELECT ID FROM FFBLOADINGCROP02 ORDER BY ID", self.execute, page_size=100)
+        result, info = cursor.fetch(0)
+        self.assertEqual(len(result[0]["rows"]), 100)
+        self.assertTrue(info["has_more"])
+        self.assertIn("FIRST 101 SKIP 0", self.executed[0])
+        # Urutan unik agar jendela yang dieksekusi ulang tidak tumpang tindih
+        self.assertTrue(self.executed[0].endswith("ORDER BY ID, RDB$DB_KEY"))
+
+        result, info = self.registry.get("c1").fetch(2)
+        self.assertEqual([row["ID"] for row in result[0]["rows"]], [str(i) for i in range(201, 251)])
+        self.assertFalse(info["has_more"])
+
+    def test_materialized_pages(self):
+        cursor = self.registry.open("c2", "SELECT FIRST 150 ID FROM FFBLOADINGCROP02", self.execute, page_size=100)
+        result, info = cursor.fetch(1)
+        self.assertEqual(len(result[0]["rows"]), 50)
+        self.assertEqual(info["total_rows"], 150)
+        cursor.fetch(0)
+        self.assertEqual(len(self.executed), 1)
+
+    def test_far_page_materializes(self):
+        cursor = ClientCursor("c4", "SELECT ID FROM FFBLOADINGCROP02", self.execute, page_size=100,
+                              max_window_skip=100)
+        result, info = cursor.fetch(1)
+        self.assertIn("FIRST 101 SKIP 100", self.executed[-1])
+        self.assertEqual(result[0]["rows"][0]["ID"], "101")
+        # Halaman jauh: hasil lengkap (urutan sama) diambil sekali lalu dipotong
+        result, info = cursor.fetch(2)
+        self.assertEqual(self.executed[-1], "SELECT ID FROM FFBLOADINGCROP02 ORDER BY RDB$DB_KEY")
+        self.assertEqual([row["ID"] for row in result[0]["rows"]][:2], ["201", "202"])
+        self.assertEqual(info["total_rows"], 250)
+        cursor.fetch(0)
+        self.assertEqual(len(self.executed), 2)
+
+    def test_unstable_order_materializes(self):
+        cursor = ClientCursor("c5", "SELECT DISTINCT TRANSDATE FROM FFBLOADINGCROP02", self.execute)
+        self.assertFalse(cursor.windowed)
+
+    def test_expired_cursor(self):
+        cursor = self.registry.open("c3", "SELECT ID FROM FFBLOADINGCROP02", self.execute)
+        self.registry.expire(now=cursor.last_access + 61)
+        with self.assertRaises(CursorError):
+            self.registry.get("c3")
+
+
+class TestRemoteCursor(unittest.TestCase):
+    """Test cache dan prefetch remote cursor di server"""
+
+    def setUp(self):
+        self.requests = []
+        self.cursor = RemoteCursor("c1", "client_1", "SELECT ...", self.request, page_size=10)
+        self.cursor.add_page(0, ["ID"], [{"ID": str(i)} for i in range(10)], True)
+
+    def request(self, cursor_id, page):
+        self.requests.append(page)
+        return True
+
+    def test_prefetch_next_page(self):
+        received = []
+        self.cursor.get_page(0, lambda rows, error: received.append(rows))
+        self.assertEqual(len(received[0]), 10)
+        self.assertEqual(self.requests, [1])
+
+        # Halaman yang sedang diminta tidak diminta ulang
+        self.cursor.get_page(1, lambda rows, error: received.append(rows))
+        self.assertEqual(self.requests, [1])
+        self.cursor.add_page(1, ["ID"], [{"ID": "10"}], False)
+        self.assertEqual(received[1], [{"ID": "10"}])
+        self.assertEqual(self.cursor.page_count_label(), "2")
+        self.assertEqual(self.cursor.row_count_label(), "11")
+
+    def test_fail_pending_keeps_cursor(self):
+        errors = []
+        self.cursor.get_page(1, lambda rows, error: errors.append(error))
+        self.cursor.fail_pending("Client terputus")
+        self.assertEqual(errors, ["Client terputus"])
+        # Setelah resume halaman yang sama bisa diminta lagi
+        received = []
+        self.cursor.get_page(1, lambda rows, error: received.append(rows))
+        self.assertEqual(self.requests, [1, 1])
+        self.cursor.add_page(1, ["ID"], [{"ID": "10"}], False)
+        self.assertEqual(received, [[{"ID": "10"}]])
+
+    def test_error_and_close(self):
+        errors = []
+        self.cursor.get_page(3, lambda rows, error: errors.append(error))
+        self.cursor.fail(3, "Cursor kedaluwarsa")
+        self.cursor.close()
+        self.cursor.get_page(0, lambda rows, error: errors.append(error))
+        self.assertEqual(errors, ["Cursor kedaluwarsa", "Cursor sudah ditutup"])
+
+
+if __name__ == "__main__":
+    unittest.main()
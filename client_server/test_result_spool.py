@@ -0,0 +1,91 @@
+import os
+import sys
+import shutil
+import socket
+import tempfile
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.network import NetworkMessage, send_message, receive_message
+from common.result_spool import ResultSpool, SpooledResult
+
+
+def make_result(count, start=0):
+    headers = ["ID", "NAME"]
+    rows = [{"ID": str(i), "NAME": f"Baris {i} é"} for i in range(start, start + count)]
+    return [{"headers": headers, "rows": rows}]
+
+
+class TestResultSpool(unittest.TestCase):
+    """Test spool hasil query berbasis mmap"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.spool = ResultSpool(self.temp_dir, budget_bytes=10 * 1024 * 1024, threshold_rows=100)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_threshold(self):
+        self.assertFalse(self.spool.should_spool(make_result(99)))
+        self.assertTrue(self.spool.should_spool(make_result(100)))
+
+    def test_roundtrip(self):
+        result = make_result(500) + [{"headers": ["X"], "rows": []}] + make_result(3, start=900)
+        with self.spool.spool(result, "SELECT 1") as spooled:
+            self.assertIsInstance(spooled, SpooledResult)
+            self.assertEqual(spooled.query, "SELECT 1")
+            self.assertEqual(len(spooled), 3)
+            self.assertEqual(spooled.materialize(), result)
+            rows = spooled[0]["rows"]
+            self.assertEqual(rows[-1], {"ID": "499", "NAME": "Baris 499 é"})
+            self.assertEqual(rows[10:12], result[0]["rows"][10:12])
+            self.assertEqual(spooled[2].get("rows")[0]["ID"], "900")
+
+    def test_send_from_spool(self):
+        result = make_result(2000)
+        server_sock, client_sock = socket.socketpair()
+        try:
+            with self.spool.spool(result) as spooled:
+                message = NetworkMessage(NetworkMessage.TYPE_RESULT, {"query": "q", "result": spooled}, "c1")
+                self.assertTrue(send_message(client_sock, message))
+            received = receive_message(server_sock)
+        finally:
+            server_sock.close()
+            client_sock.close()
+        self.assertEqual(received.data["result"], result)
+        self.assertEqual(received.client_id, "c1")
+
+    def test_lru_eviction(self):
+        # Budget cukup untuk dua spool
+        probe = ResultSpool(os.path.join(self.temp_dir, "probe"), threshold_rows=1).spool(make_result(1000))
+        budget = probe.size * 2 + probe.size // 2
+        probe.close()
+        spool = ResultSpool(self.temp_dir, budget_bytes=budget, threshold_rows=1)
+        ids = []
+        for i in range(4):
+            spooled = spool.spool(make_result(1000))
+            ids.append(spooled.spool_id)
+            spooled.close()
+            # Akses ulang spool pertama supaya menjadi yang terbaru
+            spool.open(ids[0]).close()
+        remaining = spool.spool_ids()
+        self.assertIn(ids[0], remaining)
+        self.assertIn(ids[-1], remaining)
+        self.assertNotIn(ids[1], remaining)
+        self.assertLessEqual(spool.total_bytes, budget)
+
+    def test_open_spool_not_evicted(self):
+        spool = ResultSpool(self.temp_dir, budget_bytes=1, threshold_rows=1)
+        spooled = spool.spool(make_result(10))
+        self.assertTrue(os.path.exists(spooled.path))
+        self.assertEqual(spooled[0]["rows"][0]["ID"], "0")
+        spooled.close()
+        self.assertFalse(os.path.exists(spooled.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
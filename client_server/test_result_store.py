@@ -0,0 +1,140 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.result_store import ResultStore, ColumnarResultSet
+
+
+def make_rows(count, offset=0):
+    return [{'ID': str(offset + i), 'TONNAGE': f"{i % 97}.{i % 100:02d}", 'STATUS': ['OK', 'PENDING'][i % 2],
+             'NOTE': None if i % 5 == 0 else f"note {offset + i}", 'CODE': f"00{i % 7}"}
+            for i in range(count)]
+
+
+class TestColumnarResultSet(unittest.TestCase):
+    """Test penyimpanan kolumnar"""
+
+    def test_round_trip(self):
+        rows = make_rows(500)
+        rows[3]['TONNAGE'] = '<null>'
+        data = ColumnarResultSet(['ID', 'TONNAGE', 'STATUS', 'NOTE', 'CODE'], rows)
+        self.assertEqual(data.rows(0, 500), rows)
+        kinds = [column.kind for column in data.columns]
+        self.assertEqual(kinds, ['number', 'number', 'dictionary', 'text', 'dictionary'])
+        # Jauh lebih kecil dari list of dict
+        self.assertLess(data.nbytes, 500 * 100)
+
+    def test_mixed_scale_is_text(self):
+        rows = [{'A': '1.5'}, {'A': '2.25'}, {'A': '-0.50'}, {'A': 'x'}]
+        data = ColumnarResultSet(['A'], rows)
+        self.assertEqual(data.rows(0, 4), rows)
+
+
+class TestResultStore(unittest.TestCase):
+    """Test budget memori, spill ke SQLite dan handle"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.spill_path = os.path.join(self.temp_dir, "spill.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_spill_lru(self):
+        probe = ColumnarResultSet(['ID', 'TONNAGE', 'STATUS', 'NOTE', 'CODE'], make_rows(2000, offset=10000)).nbytes
+        store = ResultStore(budget_bytes=int(probe * 3.5), spill_path=self.spill_path)
+        headers = ['ID', 'TONNAGE', 'STATUS', 'NOTE', 'CODE']
+        handles = [store.put(headers, make_rows(2000, offset=n * 10000)) for n in range(3)]
+        self.assertEqual(store.stats()['spilled'], 0)
+
+        # Akses handle pertama agar handle kedua menjadi yang terlama
+        handles[0][10]
+        handle = store.put(headers, make_rows(2000, offset=30000))
+        self.assertEqual(store.stats()['spilled'], 1)
+        self.assertLessEqual(store.memory_bytes, store.budget_bytes)
+
+        # Result yang di-spill tetap bisa dibaca per halaman dari SQLite
+        self.assertEqual(handles[1][100:103], make_rows(2000, offset=10000)[100:103])
+        self.assertEqual(list(handles[1]), make_rows(2000, offset=10000))
+        self.assertEqual(handle[-1]['ID'], '31999')
+        store.close()
+
+    def test_rows_at(self):
+        headers = ['ID', 'TONNAGE', 'STATUS', 'NOTE', 'CODE']
+        rows = make_rows(2000)
+        store = ResultStore(budget_bytes=0, spill_path=self.spill_path)
+        spilled = store.put(headers, rows)
+        self.assertEqual(store.stats()['spilled'], 1)
+        in_memory = ResultStore().put(headers, rows)
+        # Urutan row_ids dipertahankan, termasuk duplikat, untuk result di SQLite dan di memori
+        row_ids = [1999, 3, 1000, 3] + list(range(1500, 500, -1))
+        for handle in (spilled, in_memory):
+            self.assertEqual(handle.rows_at(row_ids), [rows[i] for i in row_ids])
+            self.assertEqual(handle.rows_at([]), [])
+            with self.assertRaises(IndexError):
+                handle.rows_at([2000])
+        store.close()
+
+    def test_spill_outside_store_lock(self):
+        headers = ['ID', 'TONNAGE', 'STATUS', 'NOTE', 'CODE']
+        store = ResultStore(budget_bytes=1, spill_path=self.spill_path)
+        store._open_db()
+        rows = make_rows(2000)
+        handles = []
+
+        # Penulisan SQLite tertahan: put di thread penerima menunggu di _spill
+        with store._db_lock:
+            thread = threading.Thread(target=lambda: handles.append(store.put(headers, rows)))
+            thread.start()
+            deadline = time.time() + 5
+            while not any(entry.spilling for entry in store._entries.values()) and time.time() < deadline:
+                time.sleep(0.01)
+            # Lock store bebas dan baris yang sedang di-spill masih dibaca dari memori
+            self.assertTrue(store._lock.acquire(timeout=1))
+            store._lock.release()
+            entry = next(iter(store._entries.values()))
+            self.assertEqual(store.rows(entry.result_id, 5, 7), rows[5:7])
+            self.assertEqual(store.stats()['spilled'], 1)
+        thread.join(5)
+        self.assertEqual(handles[0][1990:], rows[1990:])
+        self.assertEqual(store.stats()['in_memory'], 0)
+
+        # Dilepas saat sedang ditulis: baris SQLite ikut dihapus
+        with store._db_lock:
+            thread = threading.Thread(target=store.put, args=(headers, rows))
+            thread.start()
+            deadline = time.time() + 5
+            while not any(entry.spilling for entry in store._entries.values()) and time.time() < deadline:
+                time.sleep(0.01)
+            spilling = next(entry for entry in store._entries.values() if entry.spilling)
+            store.release(spilling.result_id)
+        thread.join(5)
+        count = store._db.execute("SELECT COUNT(*) FROM spill_rows WHERE result_id = ?",
+                                  (spilling.result_id,)).fetchone()[0]
+        self.assertEqual(count, 0)
+        store.close()
+
+    def test_release_and_share(self):
+        store = ResultStore(spill_path=self.spill_path)
+        handle = store.put(['ID'], [{'ID': '1'}, {'ID': '2'}])
+        window_handle = handle.share()
+        handle.release()
+        handle.release()
+        self.assertEqual(window_handle[1], {'ID': '2'})
+        window_handle.release()
+        self.assertEqual(store.stats()['results'], 0)
+        self.assertEqual(store.memory_bytes, 0)
+        with self.assertRaises(KeyError):
+            window_handle[0]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.scheduler import (parse_schedule, IntervalSchedule, CronSchedule, stagger_offset,
+                              ScheduledJob, JobScheduler, DelayedQueue, TARGET_ALL)
+
+
+def local_ts(*args):
+    return datetime.datetime(*args).timestamp()
+
+
+class DummyClient:
+    def __init__(self, display_name):
+        self.display_name = display_name
+
+
+class TestSchedule(unittest.TestCase):
+    """Test parsing jadwal interval dan cron"""
+
+    def test_parse(self):
+        self.assertEqual(parse_schedule("15m").seconds, 900)
+        self.assertEqual(parse_schedule("every 2h").seconds, 7200)
+        self.assertIsInstance(parse_schedule("*/5 * * * *"), CronSchedule)
+        for text in ("", "sometimes", "0m", "61 * * * *", "* * * *"):
+            with self.assertRaises(ValueError):
+                parse_schedule(text)
+
+    def test_interval_aligned(self):
+        schedule = IntervalSchedule(300)
+        self.assertEqual(schedule.next_after(1000), 1200)
+        self.assertEqual(schedule.next_after(1200), 1500)
+
+    def test_cron_next(self):
+        schedule = CronSchedule("*/15 6-18 * * 1-5")
+        # Jumat 18:50 -> Senin 06:00
+        self.assertEqual(schedule.next_after(local_ts(2024, 3, 1, 18, 50)), local_ts(2024, 3, 4, 6, 0))
+        self.assertEqual(schedule.next_after(local_ts(2024, 3, 4, 6, 0)), local_ts(2024, 3, 4, 6, 15))
+
+        # Tanggal ATAU hari jika keduanya dibatasi
+        schedule = CronSchedule("0 0 1 * 0")
+        self.assertEqual(schedule.next_after(local_ts(2024, 3, 1, 12, 0)), local_ts(2024, 3, 3, 0, 0))
+        self.assertEqual(CronSchedule("30 7 29 2 *").next_after(local_ts(2024, 3, 1)), local_ts(2028, 2, 29, 7, 30))
+
+
+class TestStagger(unittest.TestCase):
+    """Test offset pengiriman per client"""
+
+    def test_offsets_stable_and_spread(self):
+        offsets = [stagger_offset("stock", f"client-{i}", 60) for i in range(100)]
+        self.assertEqual(offsets, [stagger_offset("stock", f"client-{i}", 60) for i in range(100)])
+        self.assertTrue(all(0 <= offset < 60 for offset in offsets))
+        # Tidak ada detik yang menerima lebih dari sebagian kecil client
+        per_second = {}
+        for offset in offsets:
+            per_second[int(offset)] = per_second.get(int(offset), 0) + 1
+        self.assertLessEqual(max(per_second.values()), 8)
+        self.assertEqual(stagger_offset("stock", "client-1", 0), 0.0)
+
+
+class TestJobScheduler(unittest.TestCase):
+    """Test job terjadwal, catch-up dan persistensi"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "jobs.json")
+        self.scheduler = JobScheduler(self.path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_due_collapses_missed_runs(self):
+        job = ScheduledJob("stock", "SELECT 1 FROM RDB$DATABASE", "1m")
+        self.scheduler.add(job, now=1000)
+        self.assertEqual(job.next_run, 1020)
+        self.assertEqual(self.scheduler.due(now=1010), [])
+        # Lima jadwal terlewat tetap jadi satu run
+        self.assertEqual(self.scheduler.due(now=1300), [job])
+        self.assertEqual(job.next_run, 1320)
+        self.assertEqual(self.scheduler.due(now=1301), [])
+
+        job.enabled = False
+        self.assertEqual(self.scheduler.due(now=2000), [])
+
+    def test_catch_up_once(self):
+        job = ScheduledJob("stock", "SELECT 1 FROM RDB$DATABASE", "5m")
+        self.scheduler.add(job)
+        self.scheduler.mark_started(job, "run1", ["c1"], ["c2"], now=100)
+        self.scheduler.mark_started(job, "run2", ["c1"], ["c2"], now=400)
+        self.assertEqual(job.missed, {"c2": 100})
+
+        self.assertEqual(self.scheduler.catch_up("c2"), [job])
+        self.assertEqual(self.scheduler.catch_up("c2"), [])
+        self.assertEqual(self.scheduler.catch_up("c1"), [])
+
+    def test_known_targets(self):
+        job = ScheduledJob("stock", "SELECT 1 FROM RDB$DATABASE", "5m")
+        job.seen = ["old"]
+        clients = {"c1": DummyClient("Estate A")}
+        self.assertEqual(self.scheduler.known_targets(job, clients), {"c1", "old"})
+
+        # Target eksplisit yang belum pernah terhubung dicatat dengan namanya
+        job = ScheduledJob("mill", "SELECT 1 FROM RDB$DATABASE", "5m", targets=["Estate A", "Estate B"])
+        clients = {"c1": DummyClient("Estate A"), "c9": DummyClient("Estate Z")}
+        self.assertEqual(self.scheduler.known_targets(job, clients), {"c1", "Estate B"})
+        self.scheduler.add(job)
+        self.scheduler.mark_started(job, None, [], ["Estate B"])
+        self.assertEqual(self.scheduler.catch_up("c2", "Estate B"), [job])
+
+    def test_persistence(self):
+        job = ScheduledJob("mill", "SELECT COUNT(*) FROM T", "0 7 * * *", targets=["c1"], stagger=10,
+                           combine_aggregates=True)
+        self.scheduler.add(job)
+        self.scheduler.mark_started(job, "run1", [], ["c1"], now=50)
+        self.scheduler.mark_skipped(job)
+
+        loaded = JobScheduler(self.path)
+        loaded.load()
+        restored = loaded.get("mill")
+        self.assertEqual(restored.targets, ["c1"])
+        self.assertEqual(restored.stagger, 10)
+        self.assertTrue(restored.combine_aggregates)
+        self.assertEqual(restored.next_run, job.next_run)
+        self.assertEqual(restored.missed, {"c1": 50})
+        self.assertEqual(restored.skipped, 1)
+        self.assertIsNone(restored.run_id)
+
+        loaded.remove("mill")
+        reloaded = JobScheduler(self.path)
+        reloaded.load()
+        self.assertEqual(reloaded.list(), [])
+
+    def test_change_trigger_jobs(self):
+        job = ScheduledJob("stock", "SELECT ID FROM T", "on change", probe="SELECT MAX(ID) FROM T")
+        self.assertTrue(job.standing)
+        self.scheduler.add(job, now=1000)
+        self.assertIsNone(job.next_run)
+        # Job "on change" tidak dijalankan timer server
+        self.assertEqual(self.scheduler.due(now=10 ** 10), [])
+        self.assertEqual(self.scheduler.standing_jobs("c1"), [job])
+
+        job.enabled = False
+        self.assertEqual(self.scheduler.standing_jobs("c1"), [])
+
+        loaded = JobScheduler(self.path)
+        loaded.load()
+        self.assertTrue(loaded.get("stock").standing)
+        self.assertEqual(loaded.get("stock").probe, "SELECT MAX(ID) FROM T")
+
+    def test_matches(self):
+        self.assertTrue(ScheduledJob("a", "Q", "1m").matches("any"))
+        job = ScheduledJob("b", "Q", "1m", targets=["c1", "Estate B"])
+        self.assertTrue(job.matches("c1"))
+        self.assertTrue(job.matches("c2", "Estate B"))
+        self.assertFalse(job.matches("c3", "Estate C"))
+        self.assertEqual(ScheduledJob("c", "Q", "1m", targets=TARGET_ALL).targets, TARGET_ALL)
+
+
+class TestDelayedQueue(unittest.TestCase):
+    """Test antrian pengiriman yang ditunda"""
+
+    def test_pop_due_in_order(self):
+        queue = DelayedQueue()
+        queue.push(5, "late", now=100)
+        queue.push(1, "early", now=100)
+        queue.push(-3, "now", now=100)
+        self.assertEqual(queue.pop_due(now=100), ["now"])
+        self.assertEqual(queue.pop_due(now=106), ["early", "late"])
+        self.assertEqual(len(queue), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.sql_analyzer import analyze
+from common.schema_catalog import (SchemaCatalog, parse_columns, completion_context, quote_name,
+                                   ISSUE_TABLE, ISSUE_COLUMN, ISSUE_ALIAS)
+
+
+COLUMNS = {'EMPLOYEE': ['ID', 'NAMA', 'DEPT_ID'], 'DEPT': ['ID', 'NAME']}
+
+
+class TestSchemaCatalog(unittest.TestCase):
+    """Test katalog schema untuk validasi query dan autocomplete"""
+
+    def setUp(self):
+        self.catalog = SchemaCatalog()
+        self.catalog.set_tables("c1", ["EMPLOYEE", "DEPT"])
+        self.catalog.set_columns("c1", [{'headers': ['RDB$RELATION_NAME', 'RDB$FIELD_NAME'], 'rows': [
+            {'RDB$RELATION_NAME': 'EMPLOYEE   ', 'RDB$FIELD_NAME': 'ID   '},
+            {'RDB$RELATION_NAME': 'EMPLOYEE', 'RDB$FIELD_NAME': 'NAMA'},
+            {'RDB$RELATION_NAME': 'EMPLOYEE', 'RDB$FIELD_NAME': 'DEPT_ID'},
+            {'RDB$RELATION_NAME': 'DEPT', 'RDB$FIELD_NAME': 'ID'},
+            {'RDB$RELATION_NAME': 'DEPT', 'RDB$FIELD_NAME': 'NAME'},
+        ]}])
+        self.catalog.set_columns("c2", COLUMNS)
+
+    def issues(self, query, client_ids=None):
+        return {(issue.kind, issue.name): (sorted(issue.client_ids), issue.suggestion)
+                for issue in self.catalog.validate(analyze(query), client_ids)}
+
+    def test_shared_schema(self):
+        self.assertIs(self.catalog.schema("c1"), self.catalog.schema("c2"))
+        self.catalog.set_tables("c2", ["EMPLOYEE"])
+        self.assertEqual(self.catalog.schema("c2").tables, {'EMPLOYEE': ('ID', 'NAMA', 'DEPT_ID')})
+        self.assertIsNot(self.catalog.schema("c1"), self.catalog.schema("c2"))
+
+    def test_parse_columns(self):
+        self.assertEqual(parse_columns([{'rows': [('T', 'A'), ('T', 'B'), ('U', None)]}]), {'T': ['A', 'B']})
+
+    def test_valid_query(self):
+        self.assertEqual(self.issues(
+            "SELECT E.NAMA, D.NAME AS DEPT_NAME, COUNT(*) JUMLAH FROM EMPLOYEE E JOIN DEPT D ON D.ID = E.DEPT_ID "
+            "WHERE EXTRACT(YEAR FROM CURRENT_DATE) > 2020 AND E.ID IS DISTINCT FROM 0 "
+            "GROUP BY E.NAMA, D.NAME ORDER BY DEPT_NAME"), {})
+        self.assertEqual(self.issues("UPDATE EMPLOYEE SET NAMA = :nama WHERE ID = ?"), {})
+        self.assertEqual(self.issues("INSERT INTO DEPT (ID, NAME) VALUES (GEN_ID(G_DEPT, 1), 'x')"), {})
+        self.assertEqual(self.issues("SELECT RDB$RELATION_NAME FROM RDB$RELATIONS"), {})
+
+    def test_unknown_names(self):
+        issues = self.issues("SELECT E.NAMAA, XYZ, Z.ID FROM EMPLOYEE E; SELECT * FROM EMPLOYE")
+        self.assertEqual(issues[(ISSUE_COLUMN, 'E.NAMAA')], (['c1', 'c2'], 'NAMA'))
+        self.assertEqual(issues[(ISSUE_COLUMN, 'XYZ')], (['c1', 'c2'], None))
+        self.assertEqual(issues[(ISSUE_ALIAS, 'Z')][0], ['c1', 'c2'])
+        self.assertEqual(issues[(ISSUE_TABLE, 'EMPLOYE')], (['c1', 'c2'], 'EMPLOYEE'))
+        # Hanya client target yang diperiksa
+        self.catalog.set_tables("c3", ["EMPLOYEE"])
+        self.assertEqual(self.issues("SELECT NAME FROM DEPT", ["c2", "c3"]),
+                         {(ISSUE_TABLE, 'DEPT'): (['c3'], None)})
+
+    def test_opaque_sources(self):
+        # Kolom dari CTE/derived table tidak diketahui: hanya tabel yang diperiksa
+        self.assertEqual(self.issues("WITH X AS (SELECT ID FROM DEPT) SELECT X.ID, APA FROM X"), {})
+        self.assertEqual(self.issues("SELECT D.TOTAL FROM (SELECT COUNT(*) TOTAL FROM DEPTS) D"),
+                         {(ISSUE_TABLE, 'DEPTS'): (['c1', 'c2'], 'DEPT')})
+
+    def test_complete(self):
+        self.assertEqual(self.catalog.complete("na"), ['NAMA', 'NAME'])
+        self.assertEqual(self.catalog.complete("DE"), ['DEPT', 'DEPT_ID'])
+        self.assertEqual(self.catalog.complete("", qualifier="E", tables={'E': 'EMPLOYEE'}),
+                         ['DEPT_ID', 'ID', 'NAMA'])
+        self.assertEqual(self.catalog.complete("N", qualifier="DEPT"), ['NAME'])
+        self.assertEqual(self.catalog.complete("N", client_ids=["tidak-ada"]), [])
+
+    def test_completion_context(self):
+        self.assertEqual(completion_context("SELECT e.NA"), ('E', 'NA'))
+        self.assertEqual(completion_context('SELECT * FROM "Mixed".'), ('Mixed', ''))
+        self.assertEqual(completion_context("SELECT * FROM EMP"), (None, 'EMP'))
+        self.assertEqual(quote_name("NAMA"), "NAMA")
+        self.assertEqual(quote_name("Nama Kolom"), '"Nama Kolom"')
+
+
+if __name__ == '__main__':
+    unittest.main()
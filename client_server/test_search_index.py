@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.search_index import SearchIndex, SearchCancelled, MAX_INDEXED_CHARS
+
+
+def make_rows(count):
+    return [{'ID': i, 'NAME': f"Karyawan {i:05d}", 'ESTATE': "PGE" if i % 3 else "IJL", 'NOTE': None}
+            for i in range(count)]
+
+
+def brute_force(rows, headers, text):
+    text = text.lower()
+    return [i for i, row in enumerate(rows)
+            if any(text in ("" if row.get(h) is None else str(row.get(h))).lower() for h in headers)]
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test index pencarian result set"""
+
+    def test_matches_brute_force(self):
+        rows = make_rows(3000)
+        headers = ['ID', 'NAME', 'ESTATE', 'NOTE']
+        index = SearchIndex(headers, rows, chunk_rows=500)
+        self.assertFalse(index.built)
+        for text in ["ijl", "karyawan 0012", "12", "1", "xyz", "none", "Karyawan 02999"]:
+            self.assertEqual(index.search(text), brute_force(rows, headers, text), text)
+        self.assertTrue(index.built)
+
+    def test_column_and_incremental(self):
+        rows = make_rows(1000)
+        index = SearchIndex(['ID', 'NAME', 'ESTATE', 'NOTE'], rows)
+        self.assertEqual(index.search("pge", 'NAME'), [])
+        self.assertEqual(len(index.search("pge", 'ESTATE')), 666)
+        # Mengetik lanjut: hanya hasil sebelumnya yang dicek ulang
+        self.assertEqual(index.search("karyawan 000", 'NAME'), list(range(100)))
+        self.assertEqual(index.search("karyawan 0001", 'NAME'), list(range(10, 20)))
+        self.assertEqual(index.search("Karyawan 00015", 'NAME'), [15])
+        # Menghapus huruf: pencarian penuh lagi
+        self.assertEqual(len(index.search("karyawan 0", 'NAME')), 1000)
+        self.assertEqual(index.match_columns(15, "00015"), ['NAME'])
+
+    def test_long_values_are_not_missed(self):
+        rows = [{'TEXT': "a" * (MAX_INDEXED_CHARS + 10) + "needle"}, {'TEXT': "needle"}, {'TEXT': "other"}]
+        index = SearchIndex(['TEXT'], rows)
+        self.assertEqual(index.search("needle"), [0, 1])
+        self.assertEqual(index.search("needlx"), [])
+
+    def test_cancel(self):
+        index = SearchIndex(['ID', 'NAME'], make_rows(2000), chunk_rows=100)
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(SearchCancelled):
+            index.search("karyawan", cancel=cancel)
+        self.assertFalse(index.built)
+        self.assertEqual(len(index.search("karyawan")), 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
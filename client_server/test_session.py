@@ -0,0 +1,74 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.session import backoff_delay, schema_hash, extract_table_names, new_session_token, ReconnectManager
+
+
+class TestBackoff(unittest.TestCase):
+    """Test perhitungan delay reconnect"""
+
+    def test_bounds(self):
+        for attempt in range(1, 12):
+            cap = min(60, 2 ** (attempt - 1))
+            for _ in range(20):
+                delay = backoff_delay(attempt, 1, 60)
+                self.assertGreaterEqual(delay, cap / 2)
+                self.assertLessEqual(delay, cap)
+
+    def test_capped(self):
+        self.assertLessEqual(backoff_delay(50, 1, 60), 60)
+
+
+class TestSchemaHash(unittest.TestCase):
+    """Test schema hash dan parsing nama tabel"""
+
+    def test_order_independent(self):
+        self.assertEqual(schema_hash(['B', 'A']), schema_hash(['A', 'B', 'A']))
+        self.assertNotEqual(schema_hash(['A']), schema_hash(['A', 'B']))
+
+    def test_extract_table_names(self):
+        result = [{'headers': ['NAME'], 'rows': [{'NAME': 'EMP   '}, {'NAME': ''}, {'NAME': 'DEPT'}]}]
+        self.assertEqual(extract_table_names(result), ['EMP', 'DEPT'])
+
+    def test_token(self):
+        self.assertNotEqual(new_session_token(), new_session_token())
+
+
+class TestReconnectManager(unittest.TestCase):
+    """Test pemilik tunggal proses reconnect"""
+
+    def test_single_thread_until_connected(self):
+        state = {'connected': False, 'attempts': 0}
+        threads = set()
+
+        def connect():
+            threads.add(threading.get_ident())
+            state['attempts'] += 1
+            if state['attempts'] >= 3:
+                state['connected'] = True
+            return state['connected']
+
+        manager = ReconnectManager(connect, lambda: not state['connected'],
+                                   base_delay=0.01, max_delay=0.02, log=lambda msg: None)
+        for _ in range(5):
+            manager.trigger()
+
+        deadline = time.time() + 5
+        while not state['connected'] and time.time() < deadline:
+            time.sleep(0.01)
+        manager.stop()
+
+        self.assertTrue(state['connected'])
+        self.assertEqual(state['attempts'], 3)
+        self.assertEqual(len(threads), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.sort_index import (SortIndex, SortCancelled, infer_kind, sort_keys, parse_date,
+                               KIND_NUMBER, KIND_DATE, KIND_TEXT)
+from common.virtual_grid import ListSource
+
+
+class TestSortIndex(unittest.TestCase):
+    """Test sort bertipe untuk result set"""
+
+    def test_infer_kind(self):
+        self.assertEqual(infer_kind(["10", " 9 ", "1.5", "", None, "<null>"]), KIND_NUMBER)
+        self.assertEqual(infer_kind(["2024-01-16", "2023-12-31 10:11:12.0000", "16-JAN-2024"]), KIND_DATE)
+        self.assertEqual(infer_kind(["PGE", "10"]), KIND_TEXT)
+        self.assertEqual(infer_kind([None, ""]), KIND_TEXT)
+        self.assertEqual(parse_date("16-JAN-2024").month, 1)
+
+    def test_mismatch_falls_back_to_text(self):
+        # Nilai di luar contoh yang bukan angka membuat kolom diperlakukan sebagai teks
+        values = [str(i) for i in range(1500)] + ["N/A"]
+        kind, keys = sort_keys(values, infer_kind(values))
+        self.assertEqual(kind, KIND_TEXT)
+        self.assertEqual(keys[-1], "n/a")
+
+    def test_typed_order(self):
+        rows = [{'QTY': "9", 'TGL': "2024-02-01", 'NAMA': "beta"},
+                {'QTY': "10", 'TGL': "2023-12-31", 'NAMA': "Alpha"},
+                {'QTY': None, 'TGL': "", 'NAMA': None},
+                {'QTY': "-1.5", 'TGL': "2024-01-15", 'NAMA': "alpha"}]
+        index = SortIndex(['QTY', 'TGL', 'NAMA'], rows)
+        self.assertEqual(list(index.order('QTY')), [3, 0, 1, 2])
+        self.assertEqual(list(index.order('QTY', descending=True)), [1, 0, 3, 2])
+        self.assertEqual(list(index.order('TGL')), [1, 3, 0, 2])
+        # Teks case-insensitive dan stabil; kosong tetap di akhir
+        self.assertEqual(list(index.order('NAMA')), [1, 3, 0, 2])
+        self.assertEqual(list(index.order('NAMA', descending=True)), [0, 1, 3, 2])
+        self.assertEqual(index.kinds, {'QTY': KIND_NUMBER, 'TGL': KIND_DATE, 'NAMA': KIND_TEXT})
+
+        # Cache per kolom dan arah
+        self.assertIs(index.cached('QTY', True), index.order('QTY', descending=True))
+        self.assertIs(index.order('QTY'), index.order('QTY'))
+
+        # Permutasi yang sudah di-cache dapat dibaca saat sort lain memegang lock
+        with index._lock:
+            self.assertEqual(list(index.cached('TGL')), [1, 3, 0, 2])
+
+    def test_cancel(self):
+        rows = [{'ID': str(i)} for i in range(1000)]
+        index = SortIndex(['ID'], rows, chunk_rows=100)
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(SortCancelled):
+            index.order('ID', cancel=cancel)
+        self.assertIsNone(index.cached('ID'))
+        self.assertEqual(index.order('ID', descending=True)[0], 999)
+
+    def test_source_renders_through_permutation(self):
+        rows = [{'ID': str(i)} for i in range(100)]
+        source = ListSource(['ID'], rows)
+        source.set_order(SortIndex(['ID'], rows).order('ID', descending=True))
+        self.assertEqual(source.get(0, 3), [("99",), ("98",), ("97",)])
+        self.assertEqual(source.row_id(0), 99)
+        self.assertEqual(source.position(97), 2)
+        source.set_order(None)
+        self.assertEqual(source.position(97), 97)
+
+
+if __name__ == '__main__':
+    unittest.main()
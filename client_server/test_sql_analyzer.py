@@ -0,0 +1,121 @@
+import os
+import sys
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.sql_analyzer import (analyze, tokenize, split_statements, estimate_cost, TableRowCounts,
+                                 QueryAnalysis, STRING, QUOTED)
+
+
+class TestSqlAnalyzer(unittest.TestCase):
+    """Test tokenizer dan analyzer SQL Firebird"""
+
+    def test_tokenize(self):
+        tokens = tokenize("SELECT 'a;b' AS \"X y\", q'{it's}' FROM T -- komentar ; FIRST\n/* ROWS */")
+        self.assertEqual([t.text for t in tokens],
+                         ["SELECT", "'a;b'", "AS", '"X y"', ",", "q'{it's}'", "FROM", "T"])
+        self.assertEqual(tokens[1].kind, STRING)
+        self.assertEqual(tokens[3].kind, QUOTED)
+        self.assertEqual(tokens[5].kind, STRING)
+        self.assertEqual([t.depth for t in tokenize("A ( B ( C ) ) D")], [0, 0, 1, 1, 2, 1, 0, 0])
+
+    def test_split_statements(self):
+        text = "SELECT * FROM T WHERE A = 'x;y'; DELETE FROM U;"
+        self.assertEqual([text[start:end] for _, start, end in split_statements(text)],
+                         ["SELECT * FROM T WHERE A = 'x;y'", "DELETE FROM U"])
+        block = ("EXECUTE BLOCK AS DECLARE X INT; BEGIN X = CASE WHEN 1 = 1 THEN 1 END; "
+                 "IF (X = 1) THEN BEGIN X = 2; END END; SELECT 1 FROM RDB$DATABASE")
+        self.assertEqual([a.kind for a in analyze(block).statements], ['EXECUTE', 'SELECT'])
+        script = "SET TERM ^ ;\nCREATE PROCEDURE P AS BEGIN UPDATE T SET A = 1; END^\nSET TERM ; ^\nSELECT 1 FROM T; SELECT 2 FROM T"
+        self.assertEqual([a.kind for a in analyze(script).statements], ['SET', 'CREATE', 'SET', 'SELECT', 'SELECT'])
+        self.assertEqual(len(analyze("EXECUTE PROCEDURE P; SELECT 1 FROM RDB$DATABASE").statements), 2)
+
+    def test_row_limit(self):
+        self.assertFalse(analyze("SELECT FIRSTNAME, ROWSTAMP FROM EMP").has_row_limit)
+        self.assertFalse(analyze("SELECT A FROM T WHERE B = 'FIRST 10 ROWS'").has_row_limit)
+        self.assertFalse(analyze("SELECT FIRST FROM T").has_row_limit)  # kolom bernama FIRST
+        self.assertTrue(analyze("SELECT FIRST 10 * FROM EMP").has_row_limit)
+        self.assertTrue(analyze("select first (:n) skip 5 distinct a from t").has_row_limit)
+        self.assertTrue(analyze("SELECT * FROM EMP ORDER BY ID ROWS 1 TO 10").has_row_limit)
+        self.assertTrue(analyze("SELECT * FROM EMP OFFSET 5 ROWS FETCH NEXT 10 ROWS ONLY").has_row_limit)
+        self.assertFalse(analyze("SELECT * FROM EMP ORDER BY ID OFFSET 5 ROWS").has_row_limit)
+        # Limit di subquery tidak membatasi query utama
+        self.assertFalse(analyze("SELECT * FROM EMP WHERE ID IN (SELECT FIRST 5 ID FROM X)").has_row_limit)
+
+    def test_page_window(self):
+        self.assertEqual(analyze("WITH C AS (SELECT FIRST 5 A FROM T) SELECT * FROM C").page_window(11, 0),
+                         "WITH C AS (SELECT FIRST 5 A FROM T) SELECT FIRST 11 SKIP 0 * FROM C")
+        self.assertEqual(analyze("SELECT FIRSTNAME FROM EMP;").page_window(11, 0),
+                         "SELECT FIRST 11 SKIP 0 FIRSTNAME FROM EMP")
+        self.assertIsNone(analyze("SELECT A FROM T ORDER BY A OFFSET 10 ROWS").page_window(11, 0))
+
+    def test_modifies(self):
+        self.assertFalse(analyze("SELECT * FROM T WHERE NOTE = 'DELETE FROM X'").modifies)
+        self.assertFalse(analyze("SELECT UPDATED_AT, CREATED_BY FROM T").modifies)
+        self.assertTrue(analyze("SELECT 1 FROM RDB$DATABASE; delete from T").modifies)
+        self.assertTrue(analyze("UPDATE OR INSERT INTO T (A) VALUES (1) MATCHING (A)").modifies)
+        self.assertTrue(analyze("EXECUTE PROCEDURE HITUNG_ULANG").modifies)
+        self.assertTrue(analyze("-- komentar\nDROP TABLE T").modifies)
+
+    def test_tables(self):
+        query = ('WITH X AS (SELECT A FROM T1), Y (B) AS (SELECT B FROM T2 JOIN "Mixed" M ON T2.I = M.I) '
+                 'SELECT * FROM X, Y, T4 A LEFT JOIN PROC_SEL(1) P ON 1 = 1 '
+                 'WHERE EXTRACT(YEAR FROM A.D) > 2020 AND A.K IN (SELECT K FROM T5)')
+        self.assertEqual(analyze(query).tables, ['T1', 'T2', 'Mixed', 'T4', 'T5'])
+        self.assertEqual(analyze("INSERT INTO LOGS (A, B) SELECT A, B FROM SRC").tables, ['LOGS', 'SRC'])
+        self.assertEqual(analyze("UPDATE emp SET A = 1; DELETE FROM Emp").tables, ['EMP'])
+        self.assertEqual(analyze("SELECT * FROM T FOR UPDATE").tables, ['T'])
+
+    def test_column_refs(self):
+        statement = analyze("SELECT E.NAMA, KODE, MAX(GAJI) M FROM EMPLOYEE E JOIN DEPT AS D ON D.ID = E.DEPT_ID "
+                            "WHERE CAST(TGL AS DATE) > CURRENT_DATE ORDER BY M").statements[0]
+        self.assertEqual(statement.aliases, {'EMPLOYEE': 'EMPLOYEE', 'E': 'EMPLOYEE', 'DEPT': 'DEPT', 'D': 'DEPT'})
+        self.assertEqual(statement.column_refs, [('E', 'NAMA'), (None, 'KODE'), (None, 'GAJI'), ('D', 'ID'),
+                                                 ('E', 'DEPT_ID'), (None, 'TGL')])
+        self.assertFalse(statement.opaque)
+        self.assertTrue(analyze("SELECT * FROM (SELECT A FROM T) X").statements[0].opaque)
+        self.assertTrue(analyze("SELECT * FROM PROC_SEL(1)").statements[0].opaque)
+
+    def test_stable_order(self):
+        self.assertEqual(analyze("SELECT A FROM T WHERE B = 1 ORDER BY A DESC;").stable_order(),
+                         "SELECT A FROM T WHERE B = 1 ORDER BY A DESC, RDB$DB_KEY")
+        self.assertEqual(analyze("select * from t e").stable_order(), "select * from t e ORDER BY RDB$DB_KEY")
+        for query in ("SELECT * FROM T JOIN U ON U.ID = T.ID", "SELECT DISTINCT A FROM T",
+                      "SELECT A, COUNT(*) FROM T GROUP BY A", "SELECT MAX(A) FROM T",
+                      "SELECT * FROM T WITH LOCK", "SELECT FIRST 5 * FROM T", "SELECT * FROM (SELECT A FROM T) X"):
+            self.assertIsNone(analyze(query).stable_order(), query)
+
+    def test_cached(self):
+        self.assertIs(analyze("SELECT 1 FROM RDB$DATABASE"), analyze("SELECT 1 FROM RDB$DATABASE"))
+        self.assertIsInstance(analyze("SELECT 1 FROM RDB$DATABASE"), QueryAnalysis)
+
+    def test_estimate_cost(self):
+        self.assertEqual(estimate_cost(analyze("SELECT A FROM EMP WHERE ID = 1")).score, 1)
+        self.assertEqual(estimate_cost(analyze("SELECT * FROM EMP")).score, 8)
+        # Limit membuat query tanpa WHERE tidak lagi dianggap berat
+        self.assertLessEqual(estimate_cost(analyze("SELECT FIRST 10 * FROM EMP")).score, 5)
+        counts = {'EMP': 200, 'SCAN': 2000000}
+        self.assertEqual(estimate_cost(analyze("SELECT A FROM EMP"), counts.get).score, 1)
+        cost = estimate_cost(analyze("SELECT A FROM SCAN"), counts.get)
+        self.assertEqual((cost.score, cost.table, cost.rows), (8, 'SCAN', 2000000))
+
+    def test_table_row_counts(self):
+        counts = TableRowCounts()
+        self.assertEqual(counts.observe("c1", "SELECT COUNT(*) FROM EMP", [{'rows': [{'COUNT': " 120 "}]}]),
+                         ('EMP', 120))
+        counts.observe("c2", "select * from emp", [{'rows': [{'A': 1}] * 300}])
+        self.assertEqual(counts.get('EMP'), 300)
+        # Hasil sebagian atau query dengan filter tidak dicatat
+        self.assertIsNone(counts.observe("c1", "SELECT * FROM T", [{'rows': [{'A': 1}]}], complete=False))
+        self.assertEqual(counts.observe("c1", "SELECT * FROM T", [{'rows': []}], complete=False, total_rows=5000),
+                         ('T', 5000))
+        self.assertIsNone(counts.observe("c1", "SELECT * FROM U WHERE A = 1", [{'rows': []}]))
+        self.assertIsNone(counts.observe("c1", "SELECT MAX(A) FROM U", [{'rows': [{'MAX': 3}]}]))
+        self.assertIsNone(counts.get('U'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.standing_query import StandingQuery, StandingQueryWatcher, file_signature, probe_value
+
+
+class FakeDatabase:
+    """File database palsu; setiap query 'attach' ikut mengubah mtime seperti header page Firebird"""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = 1_000_000_000
+        self.max_id = 1
+        self.executed = []
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 1024)
+        self.touch()
+
+    def touch(self):
+        self.mtime += 1_000_000_000
+        os.utime(self.path, ns=(self.mtime, self.mtime))
+
+    def execute(self, query):
+        self.executed.append(query)
+        self.touch()
+        if query.startswith("SELECT MAX"):
+            return [{'headers': ['MAX'], 'rows': [{'MAX': self.max_id}]}]
+        return [{'headers': ['ID'], 'rows': [{'ID': i} for i in range(self.max_id)]}]
+
+
+class TestStandingQueryWatcher(unittest.TestCase):
+    """Test standing query yang dijalankan ulang hanya saat database berubah"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = FakeDatabase(os.path.join(self.temp_dir.name, "estate.fdb"))
+        self.pushed = []
+        self.watcher = StandingQueryWatcher(lambda: self.db.path, self.db.execute,
+                                            lambda query, result, error: self.pushed.append((query.query_id, result, error)))
+        self.now = 10000.0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def check(self, seconds=60):
+        self.now += seconds
+        return self.watcher.check(now=self.now)
+
+    def test_runs_only_after_change(self):
+        self.watcher.register(StandingQuery("stock", "SELECT ID FROM T", min_interval=0, max_interval=0))
+        self.watcher.register(StandingQuery("mill", "SELECT ID FROM M", min_interval=0, max_interval=0))
+        self.assertEqual(self.check(), 2)
+
+        # Run milik client sendiri mengubah mtime, tetapi tidak memicu run berikutnya
+        self.assertEqual(self.check(), 0)
+        self.assertEqual(self.check(), 0)
+
+        # Perubahan dari luar memicu semua standing query satu kali
+        self.db.touch()
+        self.assertEqual(self.check(), 2)
+        self.assertEqual(self.check(), 0)
+        self.assertEqual([item[0] for item in self.pushed], ["stock", "mill", "stock", "mill"])
+
+    def test_probe_skips_unchanged_data(self):
+        standing_query = StandingQuery("stock", "SELECT ID FROM T", probe="SELECT MAX(ID) FROM T",
+                                       min_interval=0, max_interval=0)
+        self.watcher.register(standing_query)
+        self.assertEqual(self.check(), 1)
+
+        # File berubah tetapi MAX(ID) sama: hanya probe yang dijalankan
+        self.db.touch()
+        self.db.executed.clear()
+        self.assertEqual(self.check(), 0)
+        self.assertEqual(self.db.executed, ["SELECT MAX(ID) FROM T"])
+        self.assertEqual(standing_query.skipped, 1)
+        self.assertEqual(self.check(), 0)
+
+        self.db.max_id = 5
+        self.db.touch()
+        self.assertEqual(self.check(), 1)
+        self.assertEqual(len(self.pushed[-1][1][0]['rows']), 5)
+
+    def test_min_and_max_interval(self):
+        self.watcher.register(StandingQuery("stock", "SELECT ID FROM T", min_interval=30, max_interval=600))
+        self.assertEqual(self.check(), 1)
+
+        # Perubahan dalam min_interval ditunda, tidak hilang
+        self.db.touch()
+        self.assertEqual(self.check(10), 0)
+        self.assertEqual(self.check(30), 1)
+
+        # Tanpa perubahan, refresh paksa setelah max_interval
+        self.assertEqual(self.check(300), 0)
+        self.assertEqual(self.check(301), 1)
+
+    def test_errors_are_pushed(self):
+        def failing(query):
+            raise RuntimeError("isql gagal")
+        self.watcher.execute = failing
+        self.watcher.register(StandingQuery("stock", "SELECT ID FROM T", min_interval=0))
+        self.check()
+        self.assertEqual(self.pushed, [("stock", None, "isql gagal")])
+
+    def test_unregister_and_missing_file(self):
+        self.watcher.register(StandingQuery("stock", "SELECT ID FROM T", min_interval=0))
+        self.assertIsNotNone(self.watcher.unregister("stock"))
+        self.assertEqual(self.check(), 0)
+        self.assertIsNone(file_signature(os.path.join(self.temp_dir.name, "missing.fdb")))
+        self.assertIsNone(file_signature(None))
+
+    def test_probe_value(self):
+        self.assertEqual(probe_value([{'headers': ['MAX'], 'rows': [{'MAX': 7}]}]), ['7'])
+        self.assertEqual(probe_value([{'headers': ['MAX'], 'rows': []}]), [])
+        self.assertIsNone(probe_value([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
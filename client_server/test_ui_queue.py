@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import threading
+import unittest
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.ui_queue import UiEventQueue
+
+
+class TestUiEventQueue(unittest.TestCase):
+    """Test antrian event UI"""
+
+    def test_fifo_and_coalescing(self):
+        queue = UiEventQueue()
+        calls = []
+        queue.post(calls.append, 'a')
+        for i in range(100):
+            queue.post_coalesced('clients', calls.append, f"clients {i}")
+        queue.post(calls.append, 'b')
+        self.assertEqual(len(queue), 3)
+        self.assertEqual(queue.drain(), 3)
+        # Event gabungan tetap di posisi pertama, dengan argumen terakhir
+        self.assertEqual(calls, ['a', 'clients 99', 'b'])
+        self.assertEqual(queue.coalesced, 99)
+
+        # Setelah dijalankan, event dengan key yang sama diantrikan lagi
+        queue.post_coalesced('clients', calls.append, 'again')
+        queue.drain()
+        self.assertEqual(calls[-1], 'again')
+
+    def test_bounded_work_per_frame(self):
+        queue = UiEventQueue(max_events_per_frame=10)
+        calls = []
+        for i in range(25):
+            queue.post(calls.append, i)
+        self.assertEqual(queue.drain(), 10)
+        self.assertEqual(queue.drain(), 10)
+        self.assertEqual(queue.drain(), 5)
+        self.assertEqual(calls, list(range(25)))
+
+    def test_time_budget(self):
+        queue = UiEventQueue(frame_budget=0.02)
+        for _ in range(20):
+            queue.post(time.sleep, 0.01)
+        processed = queue.drain()
+        self.assertLess(processed, 5)
+        self.assertEqual(len(queue), 20 - processed)
+
+    def test_delay_keeps_order(self):
+        queue = UiEventQueue()
+        calls = []
+        queue.post_coalesced('refresh', calls.append, 'refresh', delay=0.25)
+        queue.post(calls.append, 'now')
+        queue.drain()
+        self.assertEqual(calls, ['now'])
+        self.assertEqual(queue.drain(now=time.monotonic() + 1), 1)
+        self.assertEqual(calls, ['now', 'refresh'])
+
+    def test_error_does_not_stop_drain(self):
+        queue = UiEventQueue()
+        calls = []
+        queue.post(lambda: 1 / 0)
+        queue.post(calls.append, 'ok')
+        self.assertEqual(queue.drain(), 2)
+        self.assertEqual(calls, ['ok'])
+
+    def test_post_from_threads(self):
+        queue = UiEventQueue(max_events_per_frame=10000, frame_budget=1.0)
+        calls = []
+        threads = [threading.Thread(target=lambda: [queue.post(calls.append, 1) for _ in range(500)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        queue.drain()
+        self.assertEqual(len(calls), 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
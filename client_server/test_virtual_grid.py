@@ -0,0 +1,111 @@
+import os
+import sys
+import threading
+import unittest
+from array import array
+
+# Tambahkan path ke direktori parent
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from common.virtual_grid import column_widths, scroll_window, ListSource, MergedSource, RemoteCursorSource
+from common.merged_result import MergedResult
+from common.remote_cursor import RemoteCursor
+from common.result_store import ResultStore
+
+
+class TestVirtualGridLogic(unittest.TestCase):
+    """Test logika grid virtual (tanpa widget Tk)"""
+
+    def test_scroll_window(self):
+        # Baris terlihat 30, overscan 50 di atas dan bawah
+        self.assertEqual(scroll_window(1000000, 500000, 30, 50), (500000, 30, 499950, 500080))
+        # Scroll melewati akhir: baris terakhir tetap di bawah
+        self.assertEqual(scroll_window(100, 95, 30, 50), (70, 30, 20, 100))
+        self.assertEqual(scroll_window(10, 0, 30, 50), (0, 10, 0, 10))
+        self.assertEqual(scroll_window(0, 5, 30, 50), (0, 0, 0, 0))
+
+    def test_column_widths(self):
+        widths = column_widths(["ID", "DESCRIPTION"], [(1, "x" * 100), (22, None), None])
+        self.assertEqual(widths, [20, 300])
+
+    def test_list_source(self):
+        rows = [{'ID': i, 'NAME': f"row {i}"} for i in range(1000)]
+        source = ListSource(['NAME', 'ID'], rows)
+        self.assertEqual(len(source), 1000)
+        self.assertEqual(source.get(998, 1005), [("row 998", 998), ("row 999", 999)])
+
+        # Urutan sort atas result yang di-spill: jendela dibaca sekaligus dari store
+        handle = ResultStore(budget_bytes=0).put(['ID', 'NAME'], rows)
+        source = ListSource(['NAME', 'ID'], handle)
+        source.set_order(array('I', range(999, -1, -1)))
+        self.assertEqual(source.get(0, 3), [("row 999", 999), ("row 998", 998), ("row 997", 997)])
+
+    def test_merged_source(self):
+        merged = MergedResult("SELECT 1")
+        merged.append("A", ['V'], [{'V': 3}, {'V': 1}])
+        merged.append("B", ['V'], [{'V': 2}])
+        source = MergedSource(merged, merged.view(sort_column='V'))
+        self.assertEqual(len(source), 3)
+        self.assertEqual([values[-1] for values in source.get(0, 3)], [1, 2, 3])
+
+    def test_remote_cursor_source(self):
+        requested = []
+        cursor = RemoteCursor("c1", "client", "SELECT *", lambda cursor_id, page: requested.append(page) or True,
+                              page_size=10, prefetch=0)
+        cursor.add_page(0, ['ID'], [{'ID': i} for i in range(10)], has_more=True)
+        posted = []
+        source = RemoteCursorSource(cursor, ['ID'], lambda callback, *args: posted.append((callback, args)))
+        refreshed = []
+        source.listener = lambda: refreshed.append(True)
+        self.assertEqual(len(source), 20)
+
+        # Halaman 1 belum ada: placeholder None dan permintaan ke client, hanya sekali
+        rows = source.get(5, 15)
+        self.assertEqual(rows[:5], [(5,), (6,), (7,), (8,), (9,)])
+        self.assertEqual(rows[5:], [None] * 5)
+        source.get(5, 15)
+        self.assertEqual(requested, [1])
+
+        # Halaman tiba dari thread jaringan: listener dijalankan lewat post (UI thread)
+        cursor.add_page(1, ['ID'], [{'ID': i} for i in range(10, 15)], has_more=False)
+        self.assertEqual(len(posted), 1)
+        callback, args = posted[0]
+        callback(*args)
+        self.assertEqual(refreshed, [True])
+        self.assertEqual(len(source), 15)
+        self.assertEqual(source.get(8, 15)[-1], (14,))
+        self.assertEqual(source._waiting, set())
+
+    def test_remote_cursor_source_waiting(self):
+        class Cursor:
+            """Cursor palsu: halaman 0 ada di cache, halaman lain dijawab kemudian"""
+            page_size = 10
+            total_rows = 20
+            callbacks = {}
+
+            def get_page(self, page, callback):
+                # Saat permintaan terkirim halaman sudah terdaftar sebagai ditunggu
+                waiting.append(page in source._waiting)
+                if page == 0:
+                    callback([{'ID': i} for i in range(10)], None)
+                else:
+                    self.callbacks[page] = callback
+
+        waiting = []
+        cursor = Cursor()
+        source = RemoteCursorSource(cursor, ['ID'], lambda callback, *args: callback(*args))
+        self.assertEqual(source.get(0, 2), [(0,), (1,)])
+        self.assertEqual(source.get(10, 11), [None])
+        self.assertEqual(waiting, [True, True])
+        self.assertEqual(source._waiting, {1})
+
+        # Jawaban dari thread jaringan menghapus halaman dari _waiting sehingga bisa diminta lagi
+        thread = threading.Thread(target=cursor.callbacks.pop(1), args=([{'ID': 10}], None))
+        thread.start()
+        thread.join()
+        self.assertEqual(source._waiting, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
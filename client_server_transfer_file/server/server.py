@@ -9,14 +9,21 @@ from tkinter import ttk, scrolledtext, messagebox, simpledialog
 import datetime
 import base64
 import shutil
+from collections import deque
 
 # Tambahkan path untuk mengimpor dari direktori common
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
+# Root repository, untuk modul yang dipakai bersama dengan paket client_server
+sys.path.append(os.path.dirname(parent_dir))
 
 from common.network import NetworkMessage, send_message, receive_message, DEFAULT_PORT
 from common.db_utils import FirebirdConnector
+from client_server.common.ui_queue import UiEventQueue, DEFAULT_FRAME_MS
+from client_server.common.client_registry import InstrumentedLock, format_lock_stats
+
+LOCK_STATS_INTERVAL = 60  # detik, interval laporan contention lock di log
 
 class DatabaseFile:
     """Representasi file database yang ditransfer dari client"""
@@ -131,7 +138,7 @@ class ServerApp:
         self.port = port
         self.server_socket = None
         self.clients = {}  # client_id -> FirebirdClient
-        self.lock = threading.Lock()
+        self.lock = InstrumentedLock("clients")  # Hanya untuk membaca/mengubah self.clients; bukan untuk I/O atau dialog
         self.running = False
         self.accept_thread = None
         self.heartbeat_thread = None
@@ -140,6 +147,12 @@ class ServerApp:
         self.default_socket_timeout = 60.0  # Timeout socket default yang lebih besar
         self.client_databases = {}  # Map client_id ke DatabaseFile
         self.query_results = {}  # Map client_id ke hasil query
+        # Worker thread tidak menyentuh Tk: update UI dikirim lewat antrian yang dikuras UI thread
+        self.ui_queue = UiEventQueue()
+        self.ui_frame_ms = DEFAULT_FRAME_MS
+        self.log_buffer = deque()  # Baris log yang belum ditampilkan
+        self.log_lines_per_frame = 500
+        self.log_max_lines = 10000  # Baris log lama dibuang agar widget tetap ringan
         
         # Inisialisasi UI
         self.init_ui()
@@ -355,6 +368,7 @@ class ServerApp:
         
         # Update UI setiap 1 detik
         self.update_ui()
+        self.pump_ui_events()
     
     def configure_mssql_style(self):
         """Konfigurasi style untuk tampilan mirip MSSQL"""
@@ -415,9 +429,18 @@ class ServerApp:
     
     def update_ui(self):
         """Update UI secara periodik"""
-        self.update_client_list()
+        self.request_client_list_update()
         self.root.after(1000, self.update_ui)
     
+    def pump_ui_events(self):
+        """Kuras antrian event UI dengan frame rate tetap (UI thread)"""
+        self.ui_queue.drain()
+        self.root.after(self.ui_frame_ms, self.pump_ui_events)
+    
+    def request_client_list_update(self):
+        """Minta refresh daftar client; aman dipanggil dari thread mana pun, beberapa permintaan digabung"""
+        self.ui_queue.post_coalesced('client_list', self.update_client_list)
+    
     def toggle_clients_panel(self):
         """Toggle tampilan panel client list"""
         self.client_collapsed.set(not self.client_collapsed.get())
@@ -437,23 +460,24 @@ class ServerApp:
         for item in self.client_tree.get_children():
             self.client_tree.delete(item)
         
-        # Tambahkan client yang terhubung
+        # Tambahkan client yang terhubung (snapshot di bawah lock, widget diisi di luar lock)
         with self.lock:
-            for client_id, client in self.clients.items():
-                status = "Connected" if client.is_connected else "Disconnected"
-                
-                # Set tag for Connected status to display in green
-                if client.is_connected:
-                    tag = "connected"
-                else:
-                    tag = "disconnected"
-                
-                self.client_tree.insert("", tk.END, values=(
-                    client.display_name, 
-                    status,
-                    client.db_info.get('name', 'Unknown'),
-                    f"{client.received_size}/{client.size} bytes" if client.size > 0 else "Not transferred"
-                ), tags=(tag,))
+            clients = list(self.clients.values())
+        for client in clients:
+            status = "Connected" if client.is_connected else "Disconnected"
+            
+            # Set tag for Connected status to display in green
+            if client.is_connected:
+                tag = "connected"
+            else:
+                tag = "disconnected"
+            
+            self.client_tree.insert("", tk.END, values=(
+                client.display_name, 
+                status,
+                client.db_info.get('name', 'Unknown'),
+                f"{client.received_size}/{client.size} bytes" if client.size > 0 else "Not transferred"
+            ), tags=(tag,))
         
         # Configure tag colors
         self.client_tree.tag_configure("connected", foreground="green")
@@ -473,20 +497,37 @@ class ServerApp:
         self.target_dropdown['values'] = values
     
     def log(self, message):
-        """Tambahkan pesan ke log"""
+        """Tambahkan pesan ke log; aman dipanggil dari thread mana pun"""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_message = f"[{timestamp}] {message}\n"
         
+        self.log_buffer.append(log_message)
+        self.ui_queue.post_coalesced('log', self.flush_log)
+        
+        print(log_message, end="")
+    
+    def flush_log(self):
+        """Tampilkan baris log yang tertunda dalam satu insert (UI thread)"""
+        lines = []
+        while self.log_buffer and len(lines) < self.log_lines_per_frame:
+            lines.append(self.log_buffer.popleft())
+        if self.log_buffer:
+            # Sisanya di frame berikutnya
+            self.ui_queue.post_coalesced('log', self.flush_log)
+        if not lines:
+            return
+        
         self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, log_message)
+        self.log_text.insert(tk.END, "".join(lines))
+        excess = int(self.log_text.index('end-1c').split('.')[0]) - self.log_max_lines
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         
         # Auto-scroll jika diaktifkan
         if self.autoscroll_var.get():
             self.log_text.see(tk.END)
             
         self.log_text.config(state=tk.DISABLED)
-        
-        print(log_message, end="")
     
     def start_server(self):
         """Mulai server socket untuk menerima koneksi"""
@@ -530,14 +571,15 @@ class ServerApp:
         
         self.running = False
         
-        # Tutup semua koneksi client
+        # Tutup semua koneksi client (socket ditutup di luar lock)
         with self.lock:
-            for client_id, client in self.clients.items():
-                try:
-                    client.socket.close()
-                except:
-                    pass
+            clients = list(self.clients.values())
             self.clients.clear()
+        for client in clients:
+            try:
+                client.socket.close()
+            except:
+                pass
         
         # Tutup server socket
         if self.server_socket:
@@ -551,7 +593,7 @@ class ServerApp:
         self.start_server_button.config(state=tk.NORMAL)
         self.stop_server_button.config(state=tk.DISABLED)
         
-        self.update_client_list()
+        self.request_client_list_update()
     
     def accept_connections(self):
         """Thread untuk menerima koneksi dari client"""
@@ -724,12 +766,18 @@ class ServerApp:
                 pass
             
             # Update client list di UI
-            self.update_client_list()
+            self.request_client_list_update()
     
     def heartbeat_clients(self):
         """Thread untuk ping client secara berkala"""
+        last_lock_report = time.time()
         while self.running:
             try:
+                # Laporkan contention lock secara berkala
+                if time.time() - last_lock_report >= LOCK_STATS_INTERVAL:
+                    last_lock_report = time.time()
+                    self.report_lock_stats()
+                
                 with self.lock:
                     # Copy client list untuk iterasi
                     clients_copy = list(self.clients.items())
@@ -768,7 +816,7 @@ class ServerApp:
                             pass
                 
                 # Update client list di UI
-                self.update_client_list()
+                self.request_client_list_update()
                 
             except Exception as e:
                 self.log(f"Error in heartbeat thread: {e}")
@@ -776,6 +824,12 @@ class ServerApp:
             # Sleep selama 5 detik
             time.sleep(5)
     
+    def report_lock_stats(self):
+        """Catat statistik contention lock daftar client ke log"""
+        stats = self.lock.stats(reset=True)
+        if stats['contended'] or stats['slow_holds']:
+            self.log(f"Lock {format_lock_stats(stats)}")
+    
     def process_query_result(self, client, result_data):
         """Proses hasil query dari client"""
         query = result_data.get('query', '')
@@ -838,7 +892,7 @@ class ServerApp:
         print(f"[SERVER] Membuat tab baru untuk hasil query dari {client.display_name}")
         
         # Create result tab on the UI thread
-        self.root.after(0, self._create_result_tab, client, query, description, result, error)
+        self.ui_queue.post(self._create_result_tab, client, query, description, result, error)
         
     def _create_result_tab(self, client, query, description, result, error):
         """Create result tab in UI thread"""
@@ -1352,30 +1406,30 @@ class ServerApp:
     def _send_query_thread(self, query, target):
         """Mengirim query dalam thread terpisah untuk mencegah UI freeze"""
         try:
+            # Lock hanya untuk mengambil snapshot target; pengiriman dilakukan di luar lock
             if target == "All Clients":
                 # Kirim ke semua client
                 with self.lock:
-                    for client_id, client in self.clients.items():
-                        if client.is_connected:
-                            self.send_query_to_client(client, query)
+                    targets = [client for client in self.clients.values() if client.is_connected]
+                for client in targets:
+                    self.send_query_to_client(client, query)
             else:
                 # Extract client_id dari target
                 client_id = target.split("(")[-1].split(")")[0]
                 
                 with self.lock:
-                    if client_id in self.clients:
-                        client = self.clients[client_id]
-                        if client.is_connected:
-                            self.send_query_to_client(client, query)
-                        else:
-                            self.root.after(0, lambda: messagebox.showwarning("Client Disconnected", 
-                                                                          f"Client {client.display_name} tidak terhubung"))
-                    else:
-                        self.root.after(0, lambda: messagebox.showwarning("Client Not Found", 
-                                                                      f"Client {client_id} tidak ditemukan"))
+                    client = self.clients.get(client_id)
+                if client is None:
+                    self.ui_queue.post(lambda: messagebox.showwarning("Client Not Found", 
+                                                                  f"Client {client_id} tidak ditemukan"))
+                elif client.is_connected:
+                    self.send_query_to_client(client, query)
+                else:
+                    self.ui_queue.post(lambda: messagebox.showwarning("Client Disconnected", 
+                                                                  f"Client {client.display_name} tidak terhubung"))
         finally:
             # Sembunyikan indikator loading
-            self.root.after(0, self.hide_loading_indicator)
+            self.ui_queue.post(self.hide_loading_indicator)
     
     def show_loading_indicator(self, message="Loading..."):
         """Tampilkan indikator loading"""
@@ -1504,7 +1558,8 @@ class ServerApp:
                 client.socket.settimeout(previous_timeout)
         except Exception as e:
             self.log(f"Error saat mengirim query ke {client.display_name}: {e}")
-            messagebox.showerror("Send Error", f"Gagal mengirim query ke {client.display_name}: {e}")
+            # Dipanggil dari thread pengirim query
+            self.ui_queue.post(messagebox.showerror, "Send Error", f"Gagal mengirim query ke {client.display_name}: {e}")
     
     def send_query_ui(self):
         """Dialog untuk mengirim query"""
@@ -1616,12 +1671,12 @@ class ServerApp:
         item_data = self.client_tree.item(selected_item)
         client_name = item_data['values'][0]
         
-        # Cari client berdasarkan nama
+        # Cari client berdasarkan nama; jendela detail dibuat di luar lock
         with self.lock:
-            for client_id, client in self.clients.items():
-                if client.display_name == client_name:
-                    self.show_client_details_window(client)
-                    return
+            client = next((c for c in self.clients.values() if c.display_name == client_name), None)
+        if client is not None:
+            self.show_client_details_window(client)
+            return
         
         messagebox.showinfo("Not Found", "Client not found")
     
@@ -1678,12 +1733,12 @@ class ServerApp:
         item_data = self.client_tree.item(item)
         client_name = item_data['values'][0]
         
-        # Cari client berdasarkan nama
+        # Cari client berdasarkan nama; jendela detail dibuat di luar lock
         with self.lock:
-            for client_id, client in self.clients.items():
-                if client.display_name == client_name:
-                    self.show_client_details_window(client)
-                    return
+            client = next((c for c in self.clients.values() if c.display_name == client_name), None)
+        if client is not None:
+            self.show_client_details_window(client)
+            return
     
     def refresh_client_tables(self):
         """Refresh daftar tabel untuk client yang dipilih"""
@@ -1695,27 +1750,26 @@ class ServerApp:
         client_id = item_data['values'][0]
         
         with self.lock:
-            if client_id not in self.clients:
-                return
-            
-            client = self.clients[client_id]
-            
-            if not client.is_connected:
-                messagebox.showwarning("Client Disconnected", f"Client {client.display_name} tidak terhubung")
-                return
+            client = self.clients.get(client_id)
+        if client is None:
+            return
+        
+        if not client.is_connected:
+            messagebox.showwarning("Client Disconnected", f"Client {client.display_name} tidak terhubung")
+            return
+        
+        # Kirim query untuk mendapatkan daftar tabel
+        try:
+            tables_message = NetworkMessage(NetworkMessage.TYPE_QUERY, {
+                'query': "SELECT RDB$RELATION_NAME FROM RDB$RELATIONS WHERE RDB$SYSTEM_FLAG = 0 OR RDB$SYSTEM_FLAG IS NULL",
+                'description': 'get_tables'
+            }, client_id)
             
-            # Kirim query untuk mendapatkan daftar tabel
-            try:
-                tables_message = NetworkMessage(NetworkMessage.TYPE_QUERY, {
-                    'query': "SELECT RDB$RELATION_NAME FROM RDB$RELATIONS WHERE RDB$SYSTEM_FLAG = 0 OR RDB$SYSTEM_FLAG IS NULL",
-                    'description': 'get_tables'
-                }, client_id)
-                
-                send_message(client.socket, tables_message)
-                self.log(f"Refresh daftar tabel untuk {client.display_name}")
-            except Exception as e:
-                self.log(f"Error saat refresh tabel untuk {client.display_name}: {e}")
-                messagebox.showerror("Refresh Error", f"Gagal refresh tabel: {e}")
+            send_message(client.socket, tables_message)
+            self.log(f"Refresh daftar tabel untuk {client.display_name}")
+        except Exception as e:
+            self.log(f"Error saat refresh tabel untuk {client.display_name}: {e}")
+            messagebox.showerror("Refresh Error", f"Gagal refresh tabel: {e}")
     
     def disconnect_client(self):
         """Putuskan koneksi dengan client yang dipilih"""
@@ -1727,18 +1781,16 @@ class ServerApp:
         client_id = item_data['values'][0]
         
         with self.lock:
-            if client_id not in self.clients:
-                return
-            
-            client = self.clients[client_id]
-            
-            try:
-                client.socket.close()
-            except:
-                pass
-            
-            client.is_connected = False
-            self.log(f"Client {client.display_name} diputuskan")
+            client = self.clients.get(client_id)
+        if client is None:
+            return
+        
+        client.is_connected = False
+        try:
+            client.socket.close()
+        except:
+            pass
+        self.log(f"Client {client.display_name} diputuskan")
     
     def rename_client(self):
         """Rename client yang dipilih"""
@@ -1749,22 +1801,30 @@ class ServerApp:
         item_data = self.client_tree.item(selected[0])
         client_id = item_data['values'][0]
         
+        # Dialog modal tidak boleh dibuka selama lock dipegang: thread handler client akan tertahan
         with self.lock:
-            if client_id not in self.clients:
-                return
-            
-            client = self.clients[client_id]
-            
-            new_name = simpledialog.askstring(
-                "Rename Client", 
-                "Enter new name:",
-                initialvalue=client.display_name
-            )
-            
-            if new_name:
+            client = self.clients.get(client_id)
+            current_name = client.display_name if client is not None else None
+        if client is None:
+            return
+        
+        new_name = simpledialog.askstring(
+            "Rename Client", 
+            "Enter new name:",
+            initialvalue=current_name
+        )
+        if not new_name:
+            return
+        
+        with self.lock:
+            # Client bisa sudah terputus/diganti selama dialog terbuka
+            client = self.clients.get(client_id)
+            if client is not None:
                 client.display_name = new_name
-                self.log(f"Client {client_id} diganti namanya menjadi {new_name}")
-                self.update_client_list()
+        if client is None:
+            return
+        self.log(f"Client {client_id} diganti namanya menjadi {new_name}")
+        self.request_client_list_update()
     
     def exit_app(self):
         """Keluar dari aplikasi"""
@@ -2198,52 +2258,55 @@ class ServerApp:
 
     def request_database_file(self, client_id):
         """Request file database dari client tertentu"""
+        # Lock hanya untuk mengambil client; dialog dan pengiriman dilakukan di luar lock
         with self.lock:
-            if client_id not in self.clients:
-                messagebox.showwarning("Client Not Found", f"Client dengan ID {client_id} tidak ditemukan")
-                return False
-                
-            client = self.clients[client_id]
+            client = self.clients.get(client_id)
             
-            if not client.is_connected:
-                messagebox.showwarning("Client Disconnected", f"Client {client.display_name} tidak terhubung")
+        if client is None:
+            messagebox.showwarning("Client Not Found", f"Client dengan ID {client_id} tidak ditemukan")
+            return False
+            
+        if not client.is_connected:
+            messagebox.showwarning("Client Disconnected", f"Client {client.display_name} tidak terhubung")
+            return False
+            
+        try:
+            # Kirim permintaan file database
+            request_message = NetworkMessage(NetworkMessage.TYPE_FILE_REQUEST, 
+                                          {
+                                              "request_time": time.time()
+                                          }, 
+                                          client_id)
+            
+            success = send_message(client.socket, request_message)
+            if not success:
+                self.log(f"Gagal mengirim permintaan file database ke {client.display_name}")
                 return False
                 
-            try:
-                # Kirim permintaan file database
-                request_message = NetworkMessage(NetworkMessage.TYPE_FILE_REQUEST, 
-                                              {
-                                                  "request_time": time.time()
-                                              }, 
-                                              client_id)
-                
-                success = send_message(client.socket, request_message)
-                if not success:
-                    self.log(f"Gagal mengirim permintaan file database ke {client.display_name}")
-                    return False
-                    
-                self.log(f"Permintaan file database dikirim ke {client.display_name}")
-                return True
-                
-            except Exception as e:
-                self.log(f"Error saat meminta file database dari {client.display_name}: {e}")
-                messagebox.showerror("Request Error", f"Gagal meminta file database: {e}")
-                return False
+            self.log(f"Permintaan file database dikirim ke {client.display_name}")
+            return True
+            
+        except Exception as e:
+            self.log(f"Error saat meminta file database dari {client.display_name}: {e}")
+            messagebox.showerror("Request Error", f"Gagal meminta file database: {e}")
+            return False
     
     def request_all_database_files(self):
         """Request file database dari semua client terhubung"""
         with self.lock:
-            if not self.clients:
-                messagebox.showinfo("No Clients", "Tidak ada client yang terhubung")
-                return
-            
-            # Tampilkan notifikasi sedang memproses
-            self.log("Mengirim permintaan database ke semua client...")
+            has_clients = bool(self.clients)
             
-            # Jalankan di thread terpisah untuk mencegah UI hang
-            request_thread = threading.Thread(target=self._request_all_database_files_thread)
-            request_thread.daemon = True
-            request_thread.start()
+        if not has_clients:
+            messagebox.showinfo("No Clients", "Tidak ada client yang terhubung")
+            return
+        
+        # Tampilkan notifikasi sedang memproses
+        self.log("Mengirim permintaan database ke semua client...")
+        
+        # Jalankan di thread terpisah untuk mencegah UI hang
+        request_thread = threading.Thread(target=self._request_all_database_files_thread)
+        request_thread.daemon = True
+        request_thread.start()
             
     def _request_all_database_files_thread(self):
         """Thread untuk meminta file database dari semua client terhubung"""
@@ -2323,7 +2386,7 @@ class ServerApp:
             self.client_databases[client.client_id] = db_file
             
             # Update tampilan client list
-            self.update_client_list()
+            self.request_client_list_update()
             
         except Exception as e:
             self.log(f"Error saat memproses informasi file dari {client.display_name}: {e}")
@@ -2359,7 +2422,7 @@ class ServerApp:
                 
             # Update UI setiap 10% atau pada chunk terakhir
             if progress % 10 == 0 or progress >= 99 or is_last:
-                self.update_client_list()
+                self.request_client_list_update()
                 
             # Update progress juga di log
             if db_file.size > 0:
@@ -2375,7 +2438,7 @@ class ServerApp:
             if is_last:
                 db_file.transfer_complete = True
                 client.transfer_status = "Complete"
-                self.update_client_list()
+                self.request_client_list_update()
                 self.log(f"Transfer file database dari {client.display_name} selesai: {filename}")
                 
                 # Buat connector untuk database ini
@@ -2387,7 +2450,7 @@ class ServerApp:
             
         except Exception as e:
             client.transfer_status = f"Error: {str(e)[:30]}..."
-            self.update_client_list()
+            self.request_client_list_update()
             self.log(f"Error saat memproses chunk file dari {client.display_name}: {e}")
             import traceback
             traceback.print_exc()
@@ -2403,7 +2466,7 @@ class ServerApp:
             # Update status client
             client.transfer_status = "Complete"
             client.received_size = size
-            self.update_client_list()
+            self.request_client_list_update()
             
             # Dapatkan objek database file
             db_file = self.client_databases.get(client.client_id)
@@ -2430,7 +2493,7 @@ class ServerApp:
             
         except Exception as e:
             client.transfer_status = f"Error: {str(e)[:30]}..."
-            self.update_client_list()
+            self.request_client_list_update()
             self.log(f"Error saat memproses notifikasi selesai file dari {client.display_name}: {e}")
     
     def execute_query_on_server(self, query, target_clients=None):
@@ -2439,11 +2502,10 @@ class ServerApp:
             messagebox.showwarning("Empty Query", "Query kosong")
             return
             
+        # Ambil snapshot database target di bawah lock; query dijalankan di luar lock
         with self.lock:
-            if not self.client_databases:
-                messagebox.showinfo("No Databases", "Tidak ada database yang tersedia di server")
-                return
-                
+            has_databases = bool(self.client_databases)
+            
             # Filter client yang akan diquery
             db_to_query = {}
             if target_clients:
@@ -2451,67 +2513,71 @@ class ServerApp:
                     if client_id in self.client_databases:
                         db_to_query[client_id] = self.client_databases[client_id]
             else:
-                db_to_query = self.client_databases
-                
-            if not db_to_query:
-                messagebox.showinfo("No Databases", "Tidak ada database yang tersedia untuk client target")
-                return
+                db_to_query = dict(self.client_databases)
                 
             # Hapus hasil query sebelumnya untuk target clients
             for client_id in db_to_query:
                 if client_id in self.query_results:
                     del self.query_results[client_id]
-            
-            # Jalankan query di setiap database
-            success_count = 0
-            for client_id, db_file in db_to_query.items():
-                try:
-                    if not db_file.is_complete():
-                        self.log(f"Database dari {db_file.client_display_name} belum selesai ditransfer")
-                        continue
-                        
-                    connector = db_file.connector
-                    if not connector:
-                        connector = db_file.create_connector()
-                        
-                    if not connector:
-                        self.log(f"Tidak dapat membuat koneksi ke database dari {db_file.client_display_name}")
-                        continue
-                        
-                    # Jalankan query
-                    self.log(f"Menjalankan query di database dari {db_file.client_display_name}")
-                    start_time = time.time()
-                    result = connector.execute_query(query)
-                    elapsed_time = time.time() - start_time
-                    
-                    # Format hasil query
-                    result_data = {
-                        'query': query,
-                        'result': result,
-                        'elapsed_time': elapsed_time,
-                        'timestamp': time.time()
-                    }
                     
-                    # Simpan hasil ke variabel instance
-                    with self.lock:
-                        self.query_results[client_id] = result_data
-                    
-                    # Log hasil
-                    rows_count = sum(len(rs.get('rows', [])) for rs in result)
-                    self.log(f"Query selesai di database dari {db_file.client_display_name}: {rows_count} baris dalam {elapsed_time:.3f} detik")
+        if not has_databases:
+            messagebox.showinfo("No Databases", "Tidak ada database yang tersedia di server")
+            return
+            
+        if not db_to_query:
+            messagebox.showinfo("No Databases", "Tidak ada database yang tersedia untuk client target")
+            return
+        
+        # Jalankan query di setiap database
+        success_count = 0
+        for client_id, db_file in db_to_query.items():
+            try:
+                if not db_file.is_complete():
+                    self.log(f"Database dari {db_file.client_display_name} belum selesai ditransfer")
+                    continue
                     
-                    success_count += 1
+                connector = db_file.connector
+                if not connector:
+                    connector = db_file.create_connector()
                     
-                except Exception as e:
-                    self.log(f"Error saat menjalankan query di database dari {db_file.client_display_name}: {e}")
+                if not connector:
+                    self.log(f"Tidak dapat membuat koneksi ke database dari {db_file.client_display_name}")
+                    continue
                     
-            # Update UI dengan hasil query
-            self.update_results_ui()
-            
-            if success_count > 0:
-                self.log(f"Query berhasil dijalankan di {success_count}/{len(db_to_query)} database")
-            else:
-                messagebox.showwarning("Query Failed", "Query gagal dijalankan di semua database")
+                # Jalankan query
+                self.log(f"Menjalankan query di database dari {db_file.client_display_name}")
+                start_time = time.time()
+                result = connector.execute_query(query)
+                elapsed_time = time.time() - start_time
+                
+                # Format hasil query
+                result_data = {
+                    'query': query,
+                    'result': result,
+                    'elapsed_time': elapsed_time,
+                    'timestamp': time.time()
+                }
+                
+                # Simpan hasil ke variabel instance
+                with self.lock:
+                    self.query_results[client_id] = result_data
+                
+                # Log hasil
+                rows_count = sum(len(rs.get('rows', [])) for rs in result)
+                self.log(f"Query selesai di database dari {db_file.client_display_name}: {rows_count} baris dalam {elapsed_time:.3f} detik")
+                
+                success_count += 1
+                
+            except Exception as e:
+                self.log(f"Error saat menjalankan query di database dari {db_file.client_display_name}: {e}")
+                
+        # Update UI dengan hasil query
+        self.update_results_ui()
+        
+        if success_count > 0:
+            self.log(f"Query berhasil dijalankan di {success_count}/{len(db_to_query)} database")
+        else:
+            messagebox.showwarning("Query Failed", "Query gagal dijalankan di semua database")
 
     def show_server_query_dialog(self):
         """Tampilkan dialog untuk mengeksekusi query di server"""